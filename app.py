@@ -24,8 +24,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 from funding_opportunities_manager import FundingOpportunitiesManager
 from user_profile_manager import UserProfileManager
 from rag_explainer import RAGExplainer
-from vector_database import VectorDatabaseManager
+from vector_database import get_vector_db
 from matching_results_manager import MatchingResultsManager
+from match_cache import MatchResultCache
+from explanation_cache import ExplanationCache
+from user_registry import UserRegistry
 
 app = Flask(__name__)
 CORS(app, resources={r"/api/*": {"origins": "*"}})  # Enable CORS for all origins on API routes
@@ -43,10 +46,35 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 # Initialize managers
-funding_manager = FundingOpportunitiesManager()
-user_manager = UserProfileManager()
-vector_db = VectorDatabaseManager()
+# The vector database is created first: the other managers share this instance (and its
+# ChromaDB client) instead of opening their own.
+# EXACT_VECTOR_SEARCH=true serves /api/match from an in-memory NumPy mirror of the opportunities.
+# Opportunity writes from ingestion go through a batching background writer unless
+# VECTOR_WRITE_BATCHING=false
+vector_db = get_vector_db(
+    use_exact_search=os.getenv('EXACT_VECTOR_SEARCH', 'false').lower() == 'true',
+    write_batching=os.getenv('VECTOR_WRITE_BATCHING', 'true').lower() == 'true'
+)
 matching_results = MatchingResultsManager()
+# LAZY_URL_ENRICHMENT=true embeds new CSV rows from their fields immediately and
+# fetches opportunity URLs afterwards in a background worker.
+# Opportunities ingested from a CSV are merged into users' stored matches.
+funding_manager = FundingOpportunitiesManager(
+    lazy_enrichment=os.getenv('LAZY_URL_ENRICHMENT', 'false').lower() == 'true',
+    matching_results=matching_results
+)
+user_manager = UserProfileManager()
+# Formatted /api/match results keyed by profile embedding hash and opportunity corpus version
+match_cache = MatchResultCache(os.path.join(vector_db.persist_directory, "match_cache.db"))
+# Users and their profile JSON, PDFs and URLs; updated on upload and delete so request
+# handlers never scan the upload folder
+user_registry = UserRegistry(upload_dir=app.config['UPLOAD_FOLDER'])
+user_registry.sync()
+# /explain results keyed by user, opportunity and the version of the user's document set
+explanation_cache = ExplanationCache(os.path.join(vector_db.persist_directory, "explanation_cache.db"))
+
+if funding_manager.lazy_enrichment or len(funding_manager.enrichment_queue):
+    funding_manager.start_enrichment_worker()
 
 
 @app.route('/api/health', methods=['GET'])
@@ -90,31 +118,9 @@ def get_stats():
             funding_manager.processed_ids["opportunities"] = {}
             funding_manager._save_processed_ids()
         
-        # Also check for researchers in the database if count is 0
+        # Also check for registered users if the database has no researchers
         if db_stats['researchers'] == 0:
-            # Check files to get user count
-            upload_dir = app.config['UPLOAD_FOLDER']
-            user_count = 0
-            
-            if os.path.exists(upload_dir):
-                # Count unique users from JSON files
-                seen_users = set()
-                json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-                for json_file in json_files:
-                    try:
-                        with open(os.path.join(upload_dir, json_file), 'r') as f:
-                            data = json.load(f)
-                            person = data.get('person', {})
-                            name = person.get('name', '')
-                            if name:
-                                # Generate same ID as user_profile_manager
-                                import hashlib
-                                user_id = hashlib.md5(name.encode()).hexdigest()
-                                seen_users.add(user_id)
-                    except:
-                        pass
-                
-                user_count = len(seen_users)
+            user_count = user_registry.user_count()
             
             # Update stats with file-based count if higher
             if user_count > db_stats['researchers']:
@@ -141,13 +147,43 @@ def get_stats():
 
 @app.route('/api/opportunities', methods=['GET'])
 def get_opportunities():
-    """Get all funding opportunities"""
+    """Get funding opportunities
+    
+    Without query parameters every opportunity is returned. Pass `page`
+    (1-based) or `cursor` (from a previous response's `next_cursor`) with an
+    optional `per_page` (default 50, max 500) to page through the corpus.
+    """
     try:
-        # Get all opportunities from the database
-        opportunities = vector_db.get_all_opportunities()
+        page = request.args.get('page', type=int)
+        cursor = request.args.get('cursor')
+        
+        if page is None and cursor is None:
+            # Get all opportunities from the database
+            opportunities = vector_db.get_all_opportunities()
+            return jsonify({
+                'success': True,
+                'opportunities': opportunities
+            })
+        
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 500)
+        if cursor is not None:
+            if not cursor.isdigit():
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid cursor'
+                }), 400
+            offset = int(cursor)
+        else:
+            offset = (max(page, 1) - 1) * per_page
+        
+        opportunities, next_offset = vector_db.get_opportunities_page(offset=offset, limit=per_page)
         return jsonify({
             'success': True,
-            'opportunities': opportunities
+            'opportunities': opportunities,
+            'page': offset // per_page + 1,
+            'per_page': per_page,
+            'total': vector_db.opportunity_store.count(),
+            'next_cursor': str(next_offset) if next_offset is not None else None
         })
     except Exception as e:
         return jsonify({
@@ -189,9 +225,8 @@ def sync_database():
         # Get tracked IDs
         tracked_ids = funding_manager.processed_ids.get("opportunities", {})
         
-        # Get IDs actually in database
-        db_opportunities = vector_db.get_all_opportunities()
-        db_ids = {opp['id'] for opp in db_opportunities}
+        # Get IDs actually in database (metadata pages only, no documents)
+        db_ids = {opp['id'] for opp in vector_db.iter_opportunities(include_documents=False)}
         
         # Find tracked IDs not in database
         missing_ids = set(tracked_ids.keys()) - db_ids
@@ -206,7 +241,7 @@ def sync_database():
             'success': True,
             'message': f'Synced database. Removed {len(missing_ids)} orphaned tracking entries.',
             'tracked_count': len(funding_manager.processed_ids.get("opportunities", {})),
-            'db_count': len(db_opportunities)
+            'db_count': len(db_ids)
         })
     except Exception as e:
         return jsonify({
@@ -222,78 +257,29 @@ def get_users():
         # Get all users from the database
         users = vector_db.get_all_researchers()
         
-        # If no users in vector DB but files exist, create temporary users from files
+        # If no users in vector DB but profile files exist, list the registered users
         if not users:
-            upload_dir = app.config['UPLOAD_FOLDER']
-            if os.path.exists(upload_dir):
-                # Look for JSON files to extract user names
-                json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-                for json_file in json_files:
-                    try:
-                        with open(os.path.join(upload_dir, json_file), 'r') as f:
-                            data = json.load(f)
-                            person = data.get('person', {})
-                            name = person.get('name', '')
-                            if name:
-                                # Generate same ID as user_profile_manager
-                                import hashlib
-                                user_id = hashlib.md5(name.encode()).hexdigest()
-                                users.append({
-                                    'id': user_id,
-                                    'name': name,
-                                    'research_interests': person.get('biographical_information', {}).get('research_interests', [])
-                                })
-                    except:
-                        pass
-        
-        # Get processed documents for each user
+            users = user_registry.list_users()
+        
+        # Get the registered documents and URLs of each user
         users_with_docs = []
         for user in users:
             user_data = {
                 'id': user.get('id'),
                 'name': user.get('name'),
-                'documents': [],
-                'urls': []
+                'documents': [{'name': os.path.basename(path), 'status': 'processed'}
+                              for path in user_registry.documents(user.get('id'))],
+                'urls': user_registry.urls(user.get('id'))
             }
             
-            # Get documents from uploads folder
-            upload_dir = app.config['UPLOAD_FOLDER']
-            if os.path.exists(upload_dir):
-                for file in os.listdir(upload_dir):
-                    if file.endswith('.pdf'):
-                        user_data['documents'].append({
-                            'name': file,
-                            'status': 'processed'
-                        })
-                    elif file.endswith('.json'):
-                        # Parse JSON to check if it belongs to this user
-                        try:
-                            with open(os.path.join(upload_dir, file), 'r') as f:
-                                data = json.load(f)
-                                person = data.get('person', {})
-                                json_name = person.get('name', '')
-                                
-                                # Generate ID to match user
-                                import hashlib
-                                json_user_id = hashlib.md5(json_name.encode()).hexdigest() if json_name else ''
-                                
-                                if json_user_id == user.get('id'):
-                                    # This JSON belongs to this user - get URLs
-                                    links = person.get('links', [])
-                                    for link in links:
-                                        user_data['urls'].append({
-                                            'url': link.get('url', ''),
-                                            'type': link.get('type', 'web'),
-                                            'status': link.get('status', 'processed')
-                                        })
-                        except:
-                            pass
-            
             users_with_docs.append(user_data)
         
         return jsonify({
             'success': True,
-            'users': users_with_docs
+            'users': users_with_docs,
+            # PDFs from before per-user ownership; every profile uses them until they are assigned
+            'unassigned_documents': [{'name': os.path.basename(path), 'status': 'unassigned'}
+                                     for path in user_registry.unowned_documents()]
         })
     except Exception as e:
         return jsonify({
@@ -315,29 +301,57 @@ def remove_document():
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         if os.path.exists(filepath):
             os.remove(filepath)
+        user_registry.unregister_file(filename)
         
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/users/<user_id>/documents', methods=['POST'])
+def assign_user_documents(user_id):
+    """Assign uploaded PDFs (e.g. unassigned ones from /api/users) to a user"""
+    try:
+        filenames = (request.json or {}).get('filenames') or []
+        if not filenames:
+            return jsonify({'success': False, 'error': 'No filenames provided'}), 400
+        if not user_registry.profile_json(user_id):
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+        
+        filenames = [secure_filename(os.path.basename(filename)) for filename in filenames]
+        missing = [filename for filename in filenames
+                   if not filename.lower().endswith('.pdf')
+                   or not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], filename))]
+        if missing:
+            return jsonify({'success': False, 'error': f"Unknown PDF files: {', '.join(missing)}"}), 400
+        user_registry.assign_documents(user_id, filenames)
+        
+        return jsonify({
+            'success': True,
+            'documents': [os.path.basename(path) for path in user_registry.documents(user_id)]
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/users/<user_id>', methods=['DELETE'])
 def delete_user(user_id):
     """Delete a user and all their associated data"""
     try:
         # Remove user from vector database
         vector_db.remove_researcher(user_id)
-        
-        # Remove all files associated with the user
-        upload_dir = app.config['UPLOAD_FOLDER']
-        if os.path.exists(upload_dir):
-            for file in os.listdir(upload_dir):
-                filepath = os.path.join(upload_dir, file)
-                # Remove files that might be associated with this user
-                try:
-                    os.remove(filepath)
-                except:
-                    pass
+        match_cache.invalidate_user(user_id)
+        explanation_cache.invalidate_user(user_id)
+        json_path = user_registry.profile_json(user_id)
+        if json_path:
+            user_manager.profile_cache.invalidate(json_path)
+        
+        # Remove the user's registered files
+        for filepath in user_registry.remove_user(user_id):
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
         
         return jsonify({
             'success': True,
@@ -367,26 +381,9 @@ def remove_document_from_profile():
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
         # Find the user's JSON file
-        json_file = None
+        json_file = user_registry.profile_json(user_id)
         upload_dir = app.config['UPLOAD_FOLDER']
         
-        # Try to find matching JSON file by checking content
-        json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-        for jf in json_files:
-            try:
-                with open(os.path.join(upload_dir, jf), 'r') as f:
-                    json_data = json.load(f)
-                    person = json_data.get('person', {})
-                    name = person.get('name', '')
-                    # Generate ID same way as user_profile_manager
-                    import hashlib
-                    file_user_id = hashlib.md5(name.encode()).hexdigest()
-                    if file_user_id == user_id:
-                        json_file = os.path.join(upload_dir, jf)
-                        break
-            except:
-                pass
-        
         if not json_file:
             return jsonify({'success': False, 'error': 'User profile JSON not found'}), 404
         
@@ -394,11 +391,10 @@ def remove_document_from_profile():
         file_path = os.path.join(upload_dir, filename)
         if os.path.exists(file_path):
             os.remove(file_path)
+        user_registry.unregister_file(filename)
         
-        # Get remaining PDF files
-        pdf_files = [os.path.join(upload_dir, f) 
-                    for f in os.listdir(upload_dir) 
-                    if f.endswith('.pdf') and f != filename]
+        # Get the user's remaining PDF files
+        pdf_files = user_registry.documents(user_id, include_unowned=True)
         
         # Recreate profile with remaining documents
         profile = user_manager.create_user_profile(json_file, pdf_files)
@@ -441,47 +437,33 @@ def remove_url_from_profile():
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
         # Find the user's JSON file
-        json_file = None
-        upload_dir = app.config['UPLOAD_FOLDER']
-        
-        # Try to find matching JSON file by checking content
-        json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-        for jf in json_files:
-            try:
-                json_path = os.path.join(upload_dir, jf)
-                with open(json_path, 'r') as f:
-                    json_data = json.load(f)
-                    person = json_data.get('person', {})
-                    name = person.get('name', '')
-                    # Generate ID same way as user_profile_manager
-                    import hashlib
-                    file_user_id = hashlib.md5(name.encode()).hexdigest()
-                    if file_user_id == user_id:
-                        json_file = json_path
-                        
-                        # Remove the URL from the JSON
-                        links = person.get('links', [])
-                        updated_links = [link for link in links if link.get('url') != url_to_remove]
-                        
-                        if len(updated_links) < len(links):
-                            # URL was found and removed
-                            person['links'] = updated_links
-                            
-                            # Save updated JSON
-                            with open(json_path, 'w') as f_write:
-                                json.dump(json_data, f_write, indent=2)
-                            
-                            break
-            except:
-                pass
+        json_file = user_registry.profile_json(user_id)
         
         if not json_file:
             return jsonify({'success': False, 'error': 'User profile JSON not found'}), 404
         
-        # Get remaining PDF files
-        pdf_files = [os.path.join(upload_dir, f) 
-                    for f in os.listdir(upload_dir) 
-                    if f.endswith('.pdf')]
+        try:
+            with open(json_file, 'r') as f:
+                json_data = json.load(f)
+            person = json_data.get('person', {})
+            
+            # Remove the URL from the JSON
+            links = person.get('links', [])
+            updated_links = [link for link in links if link.get('url') != url_to_remove]
+            
+            if len(updated_links) < len(links):
+                # URL was found and removed
+                person['links'] = updated_links
+                
+                # Save updated JSON
+                with open(json_file, 'w') as f_write:
+                    json.dump(json_data, f_write, indent=2)
+                user_registry.register_file(json_file)
+        except Exception as e:
+            print(f"Warning: Could not remove URL from JSON file: {e}")
+        
+        # Get the user's PDF files
+        pdf_files = user_registry.documents(user_id, include_unowned=True)
         
         # Recreate profile with updated URLs
         profile = user_manager.create_user_profile(json_file, pdf_files)
@@ -516,38 +498,19 @@ def process_profile_updates():
         new_files = data.get('new_files', [])
         
         # Find the correct JSON file for this user
-        json_file = None
-        upload_dir = app.config['UPLOAD_FOLDER']
-        
-        if user_id:
-            # Try to find matching JSON file by checking content
-            json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-            for jf in json_files:
-                try:
-                    json_path = os.path.join(upload_dir, jf)
-                    with open(json_path, 'r') as f:
-                        json_data = json.load(f)
-                        person = json_data.get('person', {})
-                        name = person.get('name', '')
-                        # Generate ID same way as user_profile_manager
-                        import hashlib
-                        file_user_id = hashlib.md5(name.encode()).hexdigest()
-                        if file_user_id == user_id:
-                            json_file = json_path
-                            break
-                except:
-                    pass
+        json_file = user_registry.profile_json(user_id) if user_id else None
         
         if not json_file:
-            # Fallback to first JSON file if user_id not found
-            json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-            if not json_files:
+            # Fallback to the first registered user if user_id not found
+            registered = user_registry.list_users()
+            if not registered:
                 return jsonify({'success': False, 'error': 'No user profile found'}), 400
-            json_file = os.path.join(upload_dir, json_files[0])
+            user_id = registered[0]['id']
+            json_file = user_registry.profile_json(user_id)
         
-        # Get all PDF files
-        pdf_files = [os.path.join(upload_dir, f) 
-                    for f in os.listdir(upload_dir) if f.endswith('.pdf')]
+        # Get the user's PDF files, including newly uploaded ones
+        user_registry.assign_documents(user_id, [f for f in new_files if str(f).endswith('.pdf')])
+        pdf_files = user_registry.documents(user_id, include_unowned=True)
         
         print(f"Reprocessing profile with {len(pdf_files)} PDFs")
         
@@ -595,26 +558,9 @@ def update_profile():
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
         # Find the user's JSON file
-        json_file = None
+        json_file = user_registry.profile_json(user_id)
         upload_dir = app.config['UPLOAD_FOLDER']
         
-        # Try to find matching JSON file by checking content
-        json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-        for jf in json_files:
-            try:
-                with open(os.path.join(upload_dir, jf), 'r') as f:
-                    json_data = json.load(f)
-                    person = json_data.get('person', {})
-                    name = person.get('name', '')
-                    # Generate ID same way as user_profile_manager
-                    import hashlib
-                    file_user_id = hashlib.md5(name.encode()).hexdigest()
-                    if file_user_id == user_id:
-                        json_file = os.path.join(upload_dir, jf)
-                        break
-            except:
-                pass
-        
         if not json_file:
             # Create a basic JSON file from existing metadata
             metadata = user_data['metadatas'][0]
@@ -632,6 +578,7 @@ def update_profile():
             json_file = os.path.join(upload_dir, f"{user_id}_profile.json")
             with open(json_file, 'w') as f:
                 json.dump(profile_data, f)
+            user_registry.register_file(json_file)
         
         # Update the JSON file with new URLs BEFORE creating profile
         if urls:
@@ -654,21 +601,22 @@ def update_profile():
                 # Save updated JSON
                 with open(json_file, 'w') as f:
                     json.dump(json_data, f, indent=2)
+                user_registry.register_file(json_file)
             except Exception as e:
                 print(f"Warning: Could not update JSON file with URLs: {e}")
         
         # Get all PDF files to process
         pdf_files = []
         
-        # First, collect all existing PDFs from uploads directory
-        existing_pdfs = []
-        if os.path.exists(upload_dir):
-            for file in os.listdir(upload_dir):
-                if file.endswith('.pdf'):
-                    existing_pdfs.append(os.path.join(upload_dir, file))
+        # Uploaded PDFs in the request now belong to this user
+        user_registry.assign_documents(user_id, [
+            file_info.get('path', '') for file_info in files
+            if file_info.get('type') == 'pdf'
+            and os.path.exists(os.path.join(upload_dir, os.path.basename(file_info.get('path', ''))))
+        ])
         
-        # Add existing PDFs first
-        pdf_files.extend(existing_pdfs)
+        # Add the user's existing PDFs first
+        pdf_files.extend(user_registry.documents(user_id, include_unowned=True))
         
         # Then add any new PDFs from the request
         for file_info in files:
@@ -731,6 +679,11 @@ def ingest_csv():
     if not allowed_file(file.filename) or not file.filename.endswith('.csv'):
         return jsonify({'success': False, 'error': 'Only CSV files are allowed'}), 400
     
+    # Optional per-upload override of the lazy URL enrichment setting
+    lazy_enrichment = request.form.get('lazy_enrichment')
+    if lazy_enrichment is not None:
+        lazy_enrichment = lazy_enrichment.lower() == 'true'
+    
     try:
         # Save file temporarily
         filename = secure_filename(file.filename)
@@ -755,7 +708,10 @@ def ingest_csv():
             
             try:
                 summary = funding_manager.process_single_csv_file(filename, 
-                                                                progress_callback=progress_callback)
+                                                                progress_callback=progress_callback,
+                                                                lazy_enrichment=lazy_enrichment)
+                if summary.get('queued_for_enrichment'):
+                    funding_manager.start_enrichment_worker()
                 # Send final summary
                 progress_queue.put(json.dumps({
                     'status': 'complete',
@@ -849,6 +805,9 @@ def upload_profile_document():
         filename = secure_filename(file.filename)
         save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(save_path)
+        # PDFs uploaded for an existing user are registered as theirs right away;
+        # otherwise they are assigned when the profile is created or updated
+        user_registry.register_file(filename, request.form.get('user_id') or None)
         
         return jsonify({
             'success': True,
@@ -898,6 +857,7 @@ def create_profile():
             json_file = os.path.join(app.config['UPLOAD_FOLDER'], 'temp_profile.json')
             with open(json_file, 'w') as f:
                 json.dump(profile_data, f)
+            user_registry.register_file(json_file)
         
         # Create profile
         profile = user_manager.create_user_profile(json_file, pdf_files)
@@ -927,6 +887,14 @@ def create_profile():
             except Exception as e:
                 print(f"Warning: Could not update JSON file with URLs: {e}")
             
+            # Register the profile JSON and attribute the uploaded PDFs to the new user
+            if os.path.dirname(os.path.abspath(json_file)) == os.path.abspath(app.config['UPLOAD_FOLDER']):
+                user_registry.register_file(json_file)
+            user_registry.assign_documents(profile['id'], [
+                path for path in pdf_files
+                if os.path.dirname(os.path.abspath(path)) == os.path.abspath(app.config['UPLOAD_FOLDER'])
+            ])
+            
             # Save profile summary
             profile_summary = {
                 'id': profile['id'],
@@ -972,6 +940,107 @@ def get_saved_matches(user_id):
             'error': str(e)
         }), 500
 
+@app.route('/api/match/alerts/<user_id>', methods=['GET'])
+def get_match_alerts(user_id):
+    """Get new high-confidence matches found when opportunities were ingested"""
+    try:
+        include_seen = request.args.get('include_seen', 'false').lower() == 'true'
+        alerts = matching_results.get_match_alerts(user_id, unseen_only=not include_seen)
+        if request.args.get('mark_seen', 'true').lower() == 'true':
+            matching_results.mark_alerts_seen(user_id)
+        
+        return jsonify({
+            'success': True,
+            'alerts': alerts,
+            'total': len(alerts)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def format_matches(matches):
+    """Turn raw vector search results into scored matches for the frontend"""
+    formatted_matches = []
+    
+    # Get min and max scores for normalization
+    scores = [match.get('similarity_score', 0) for match in matches]
+    min_score = min(scores) if scores else 0
+    max_score = max(scores) if scores else 1
+    score_range = max_score - min_score if max_score > min_score else 1
+    
+    for match in matches:
+        # Calculate confidence scores with better distribution
+        similarity = match.get('similarity_score', 0)
+        
+        # Normalize score to 0-1 range based on actual min/max
+        if score_range > 0:
+            normalized_score = (similarity - min_score) / score_range
+        else:
+            normalized_score = similarity
+        
+        # Apply non-linear transformation for better spread
+        # This maps [0,1] to approximately [20,95] with most values in [40,85]
+        confidence = 20 + (75 * (normalized_score ** 0.7))
+        confidence = min(95, max(20, confidence))
+        
+        # Handle keywords - ensure it's always a list
+        keywords = match.get('keywords', [])
+        if isinstance(keywords, str):
+            try:
+                # Try to parse as JSON if it's a string
+                import json as json_module
+                keywords = json_module.loads(keywords)
+            except:
+                # If parsing fails, treat as comma-separated string
+                keywords = [k.strip() for k in keywords.split(',') if k.strip()]
+        elif not isinstance(keywords, list):
+            keywords = []
+        
+        formatted_matches.append({
+            'title': match.get('title', 'Unknown'),
+            'agency': match.get('agency', 'Unknown'),
+            'description': match.get('description', '')[:200] + '...' if match.get('description') else '',
+            'keywords': keywords[:5] if keywords else [],
+            'deadline': match.get('close_date', 'Not specified'),
+            'url': match.get('url', ''),
+            'confidence_score': round(confidence, 1),
+            'similarity_score': round(similarity, 4),
+            'match_id': match.get('match_id', ''),
+            'raw_distance': round(match.get('raw_distance', 0), 4) if 'raw_distance' in match else None
+        })
+    
+    # Sort by confidence score
+    formatted_matches.sort(key=lambda x: x['confidence_score'], reverse=True)
+    
+    return formatted_matches
+
+
+def save_user_matches(user_id, matches, cache_key=None):
+    """
+    Replace a user's stored matches and keep the match cache's saved marker in step
+    
+    The marker records the cache key whose matches are stored, so /api/match can
+    skip re-saving them. It is cleared when the stored matches came from anywhere
+    else (cache_key None) or the save failed.
+    """
+    if matching_results.save_matches(user_id, matches) and cache_key is not None:
+        match_cache.mark_saved(user_id, cache_key)
+    else:
+        match_cache.forget_saved(user_id)
+
+
+def _stored_research_interests(result):
+    """Research interests from a researcher profile fetched with its document"""
+    try:
+        profile = json.loads((result.get('documents') or [None])[0] or '{}')
+    except (TypeError, ValueError):
+        return []
+    interests = profile.get('research_interests') or []
+    return [str(interest) for interest in interests] if isinstance(interests, list) else [str(interests)]
+
+
 @app.route('/api/match', methods=['POST'])
 def match_opportunities():
     """Match user profile with funding opportunities"""
@@ -987,6 +1056,55 @@ def match_opportunities():
         # Search for matching opportunities directly using user's ID
         n_results = request.json.get('n_results', 20)
         
+        # Optional metadata filters applied inside the vector query, e.g.
+        # {"deadline_after": "2025-09-01", "agencies": ["NSF", "DOD"], "programs": ["SBIR"]}
+        filters = request.json.get('filters') or {}
+        
+        # Optional diversity re-ranking: 1.0 ranks by relevance only, lower values spread topics
+        mmr_lambda = request.json.get('mmr_lambda')
+        if mmr_lambda is not None:
+            try:
+                mmr_lambda = float(mmr_lambda)
+            except (TypeError, ValueError):
+                mmr_lambda = -1.0
+            if not 0.0 <= mmr_lambda <= 1.0:
+                return jsonify({
+                    'success': False,
+                    'error': 'mmr_lambda must be a number between 0 and 1'
+                }), 400
+        
+        # Repeat requests for an unchanged profile and opportunity corpus are served from the cache
+        match_options = {
+            'filters': filters,
+            'mmr_lambda': mmr_lambda,
+            'hybrid': bool(request.json.get('hybrid')),
+            'query': request.json.get('query')
+        }
+        cache_key = generation = None
+        try:
+            profile_hash = vector_db.researcher_embedding_hash(user_id)
+        except Exception as e:
+            print(f"Error hashing user embedding: {e}")
+            profile_hash = None
+        if profile_hash is not None:
+            corpus_version = vector_db.corpus_version()
+            generation = match_cache.generation(profile_hash, corpus_version)
+            cache_key = match_cache.make_key(profile_hash, corpus_version, n_results, match_options)
+            cached = match_cache.get(user_id, cache_key)
+            if cached is not None:
+                funding_manager.enrichment_queue.record_matches(cached['match_ids'])
+                if not match_cache.is_saved(user_id, cache_key):
+                    try:
+                        save_user_matches(user_id, cached['matches'], cache_key)
+                    except Exception as e:
+                        print(f"Warning: Failed to save matches to database: {e}")
+                return jsonify({
+                    'success': True,
+                    'matches': cached['matches'],
+                    'total': len(cached['matches']),
+                    'cached': True
+                })
+        
         # Get user embeddings from the database
         try:
             result = vector_db.researchers.get(ids=[user_id], include=['embeddings', 'metadatas', 'documents'])
@@ -1002,42 +1120,25 @@ def match_opportunities():
                 has_embeddings = True
         
         if not has_embeddings:
-            # Try to find user in files and recreate profile
-            upload_dir = app.config['UPLOAD_FOLDER']
+            # Try to find the user's registered profile files and recreate the profile
             user_found = False
+            json_path = user_registry.profile_json(user_id)
             
-            if os.path.exists(upload_dir):
-                # Look for JSON files with matching user
-                json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-                for json_file in json_files:
-                    try:
-                        json_path = os.path.join(upload_dir, json_file)
-                        with open(json_path, 'r') as f:
-                            data = json.load(f)
-                            person = data.get('person', {})
-                            name = person.get('name', '')
-                            if name:
-                                # Generate same ID as user_profile_manager
-                                import hashlib
-                                file_user_id = hashlib.md5(name.encode()).hexdigest()
-                                
-                                if file_user_id == user_id:
-                                    # Found the user - recreate profile
-                                    pdf_files = [os.path.join(upload_dir, f) 
-                                               for f in os.listdir(upload_dir) if f.endswith('.pdf')]
-                                    
-                                    # Recreate and store profile
-                                    profile = user_manager.create_user_profile(json_path, pdf_files)
-                                    success = user_manager.store_user_profile(profile)
-                                    
-                                    if success:
-                                        # Try again to get embeddings
-                                        result = vector_db.researchers.get(ids=[user_id], include=['embeddings', 'metadatas', 'documents'])
-                                        user_found = True
-                                    break
-                    except Exception as e:
-                        print(f"Error processing file {json_file}: {e}")
-                        pass
+            if json_path:
+                try:
+                    # Found the user - recreate profile
+                    pdf_files = user_registry.documents(user_id, include_unowned=True)
+                    
+                    # Recreate and store profile
+                    profile = user_manager.create_user_profile(json_path, pdf_files)
+                    success = user_manager.store_user_profile(profile)
+                    
+                    if success:
+                        # Try again to get embeddings
+                        result = vector_db.researchers.get(ids=[user_id], include=['embeddings', 'metadatas', 'documents'])
+                        user_found = True
+                except Exception as e:
+                    print(f"Error processing file {json_path}: {e}")
             
             # Re-check embeddings after profile creation
             has_embeddings = False
@@ -1053,66 +1154,51 @@ def match_opportunities():
         
         # Use the stored embedding to search for opportunities
         user_embedding = result['embeddings'][0]
-        matches = vector_db.search_opportunities_for_profile(
-            user_embedding,
-            n_results=n_results
-        )
-        
-        # Format matches for frontend
-        formatted_matches = []
+        try:
+            if request.json.get('hybrid'):
+                # Fuse vector matches with BM25 hits for the query text (default: the user's research interests)
+                query_text = request.json.get('query') or ' '.join(_stored_research_interests(result))
+                matches = vector_db.hybrid_search_opportunities(
+                    user_embedding,
+                    query_text,
+                    n_results=n_results,
+                    filters=filters,
+                    include_documents=False,
+                    mmr_lambda=mmr_lambda
+                )
+            else:
+                matches = vector_db.search_opportunities_for_profile(
+                    user_embedding,
+                    n_results=n_results,
+                    deadline_after=filters.get('deadline_after'),
+                    deadline_before=filters.get('deadline_before'),
+                    agencies=filters.get('agencies'),
+                    programs=filters.get('programs'),
+                    phases=filters.get('phases'),
+                    include_documents=False,
+                    mmr_lambda=mmr_lambda
+                )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid filter: {e}'
+            }), 400
         
-        # Get min and max scores for normalization
-        scores = [match.get('similarity_score', 0) for match in matches]
-        min_score = min(scores) if scores else 0
-        max_score = max(scores) if scores else 1
-        score_range = max_score - min_score if max_score > min_score else 1
+        # Opportunities that keep showing up in matches get enriched first
+        match_ids = [match['match_id'] for match in matches]
+        funding_manager.enrichment_queue.record_matches(match_ids)
         
-        for match in matches:
-            # Calculate confidence scores with better distribution
-            similarity = match.get('similarity_score', 0)
-            
-            # Normalize score to 0-1 range based on actual min/max
-            if score_range > 0:
-                normalized_score = (similarity - min_score) / score_range
-            else:
-                normalized_score = similarity
-            
-            # Apply non-linear transformation for better spread
-            # This maps [0,1] to approximately [20,95] with most values in [40,85]
-            confidence = 20 + (75 * (normalized_score ** 0.7))
-            confidence = min(95, max(20, confidence))
-            
-            # Handle keywords - ensure it's always a list
-            keywords = match.get('keywords', [])
-            if isinstance(keywords, str):
-                try:
-                    # Try to parse as JSON if it's a string
-                    import json as json_module
-                    keywords = json_module.loads(keywords)
-                except:
-                    # If parsing fails, treat as comma-separated string
-                    keywords = [k.strip() for k in keywords.split(',') if k.strip()]
-            elif not isinstance(keywords, list):
-                keywords = []
-            
-            formatted_matches.append({
-                'title': match.get('title', 'Unknown'),
-                'agency': match.get('agency', 'Unknown'),
-                'description': match.get('description', '')[:200] + '...' if match.get('description') else '',
-                'keywords': keywords[:5] if keywords else [],
-                'deadline': match.get('close_date', 'Not specified'),
-                'url': match.get('url', ''),
-                'confidence_score': round(confidence, 1),
-                'similarity_score': round(similarity, 4),
-                'raw_distance': round(match.get('raw_distance', 0), 4) if 'raw_distance' in match else None
-            })
+        # Only the returned matches need their full documents
+        matches = vector_db.hydrate_opportunities(matches)
         
-        # Sort by confidence score
-        formatted_matches.sort(key=lambda x: x['confidence_score'], reverse=True)
+        # Format matches for frontend
+        formatted_matches = format_matches(matches)
+        if cache_key is not None:
+            match_cache.put(user_id, cache_key, generation, formatted_matches, match_ids)
         
         # Save matches to user database
         try:
-            matching_results.save_matches(user_id, formatted_matches)
+            save_user_matches(user_id, formatted_matches, cache_key)
         except Exception as e:
             print(f"Warning: Failed to save matches to database: {e}")
         
@@ -1129,12 +1215,94 @@ def match_opportunities():
         }), 500
 
 
+@app.route('/api/match/batch', methods=['POST'])
+def match_opportunities_batch():
+    """Match many users with funding opportunities in one vectorized search
+    
+    Request body (all optional):
+        user_ids: Users to match (default: every stored profile)
+        n_results: Matches per user
+        filters: Filters applied to every user (same keys as /api/match)
+        user_filters: Per-user filters keyed by user_id, overriding `filters`
+        save: Save each user's matches (default true)
+    """
+    try:
+        data = request.json or {}
+        n_results = data.get('n_results', 20)
+        shared_filters = data.get('filters') or {}
+        user_filters = data.get('user_filters') or {}
+        save = data.get('save', True)
+        
+        user_ids = data.get('user_ids')
+        if user_ids is None:
+            user_ids = [researcher['id'] for researcher in vector_db.get_all_researchers()]
+        
+        # One round trip for every user's embedding
+        stored = vector_db.researchers.get(ids=list(user_ids), include=['embeddings']) if user_ids else {'ids': []}
+        embeddings_by_id = {}
+        for i, stored_id in enumerate(stored['ids']):
+            if stored['embeddings'] is not None and stored['embeddings'][i] is not None:
+                embeddings_by_id[stored_id] = stored['embeddings'][i]
+        
+        matched_ids = [user_id for user_id in user_ids if user_id in embeddings_by_id]
+        missing_ids = [user_id for user_id in user_ids if user_id not in embeddings_by_id]
+        
+        try:
+            all_matches = vector_db.batch_search_opportunities(
+                [embeddings_by_id[user_id] for user_id in matched_ids],
+                n_results=n_results,
+                filters=[user_filters.get(user_id, shared_filters) for user_id in matched_ids],
+                include_documents=False
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid filter: {e}'
+            }), 400
+        
+        # Load every returned document with a single multi-get
+        hydrated = iter(vector_db.hydrate_opportunities([match for matches in all_matches for match in matches]))
+        all_matches = [[next(hydrated) for _ in matches] for matches in all_matches]
+        
+        results = {}
+        for user_id, matches in zip(matched_ids, all_matches):
+            funding_manager.enrichment_queue.record_matches([match['match_id'] for match in matches])
+            
+            formatted_matches = format_matches(matches)
+            if save:
+                try:
+                    # Not from a cached /api/match entry, so /api/match must save its results again
+                    save_user_matches(user_id, formatted_matches)
+                except Exception as e:
+                    print(f"Warning: Failed to save matches for {user_id}: {e}")
+            results[user_id] = formatted_matches
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'missing_users': missing_ids,
+            'total_users': len(results)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/opportunity/<int:index>/explain', methods=['POST'])
 def explain_opportunity(index):
-    """Get detailed explanation for a specific opportunity"""
+    """
+    Get detailed explanation for a specific opportunity
+    
+    Explanations are cached per user and opportunity and returned without a model
+    call until the user's documents change. Pass force_refresh to regenerate.
+    """
     try:
         data = request.json
         opportunity = data.get('opportunity')
+        force_refresh = bool(data.get('force_refresh', False))
         
         if not opportunity:
             return jsonify({
@@ -1142,22 +1310,36 @@ def explain_opportunity(index):
                 'error': 'No opportunity data provided'
             }), 400
         
-        # Get user profile
-        upload_dir = app.config['UPLOAD_FOLDER']
-        json_files = [f for f in os.listdir(upload_dir) if f.endswith('.json')]
-        
-        if not json_files:
+        # Get user profile (the requested user, else the first registered one)
+        user_id = data.get('user_id')
+        json_path = user_registry.profile_json(user_id) if user_id else None
+        if not json_path:
+            registered = user_registry.list_users()
+            if registered:
+                user_id = registered[0]['id']
+                json_path = user_registry.profile_json(user_id)
+        
+        if not json_path:
             return jsonify({
                 'success': False,
                 'error': 'No user profile found'
             }), 400
         
-        json_path = os.path.join(upload_dir, json_files[0])
-        pdf_files = [os.path.join(upload_dir, f) for f in os.listdir(upload_dir) 
-                    if f.endswith('.pdf')]
+        opportunity_id = ExplanationCache.opportunity_key(opportunity)
+        document_version = user_registry.document_version(user_id, include_unowned=True)
+        cached = explanation_cache.get(user_id, opportunity_id, document_version)
+        if cached and not cached['stale'] and not force_refresh:
+            return jsonify({
+                'success': True,
+                'explanation': cached['explanation'],
+                'cached': True,
+                'generated_at': cached['created_at']
+            })
+        
+        pdf_files = user_registry.documents(user_id, include_unowned=True)
         
-        # Create profile
-        profile = user_manager.create_user_profile(json_path, pdf_files)
+        # Cached profile; PDFs are extracted and URLs fetched again only if a source file changed
+        profile = user_manager.get_user_profile(json_path, pdf_files)
         
         # Generate explanation
         rag_explainer = RAGExplainer()
@@ -1167,9 +1349,17 @@ def explain_opportunity(index):
             profile['extracted_pdfs']
         )
         
+        # Failed generations are returned but not cached
+        generated_at = datetime.now().isoformat()
+        if 'error' not in explanation:
+            generated_at = explanation_cache.put(user_id, opportunity_id, document_version, explanation)
+        
         return jsonify({
             'success': True,
-            'explanation': explanation
+            'explanation': explanation,
+            'cached': False,
+            'stale': bool(cached and cached['stale']),
+            'generated_at': generated_at
         })
         
     except Exception as e:
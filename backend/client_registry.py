@@ -0,0 +1,83 @@
+"""
+Client Registry for FundingMatch
+Process-wide ChromaDB clients, one per database directory
+"""
+
+import os
+import threading
+from typing import Dict
+
+import chromadb
+from chromadb.config import Settings
+from chromadb.api.shared_system_client import SharedSystemClient
+
+
+_lock = threading.Lock()
+_clients: Dict[str, chromadb.PersistentClient] = {}
+
+
+def _registry_key(path: str) -> str:
+    return os.path.realpath(path)
+
+
+def get_chroma_client(path: str) -> chromadb.PersistentClient:
+    """
+    Get the shared ChromaDB client for a database directory, creating it on first use
+
+    Every manager in the process goes through here, so each directory has a
+    single client (one set of SQLite handles and HNSW segments) no matter how
+    many managers open it.
+
+    Args:
+        path: ChromaDB persistence directory
+
+    Returns:
+        The PersistentClient for `path`
+    """
+    key = _registry_key(path)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = chromadb.PersistentClient(
+                path=path,
+                settings=Settings(
+                    anonymized_telemetry=False,
+                    allow_reset=True
+                )
+            )
+            _clients[key] = client
+        return client
+
+
+def release_chroma_client(path: str):
+    """
+    Forget the client for a directory (e.g. before the directory is deleted and recreated)
+
+    Args:
+        path: ChromaDB persistence directory
+    """
+    with _lock:
+        _clients.pop(_registry_key(path), None)
+
+
+def discard_chroma_client(path: str):
+    """
+    Release the client for a directory and stop ChromaDB's cached system for it
+
+    ChromaDB keeps one system per directory for the whole process, so a
+    directory whose files were replaced (e.g. after corruption) can only be
+    reopened from scratch once that system is gone.
+
+    Args:
+        path: ChromaDB persistence directory
+    """
+    release_chroma_client(path)
+    for identifier in {path, os.path.realpath(path)}:
+        system = SharedSystemClient._identifier_to_system.pop(identifier, None)
+        SharedSystemClient._identifier_to_refcount.pop(identifier, None)
+        if system is not None:
+            try:
+                system.stop()
+            except Exception:
+                # A system that failed to start cannot always be stopped cleanly
+                pass
@@ -0,0 +1,285 @@
+"""
+Concurrency helpers for FundingMatch
+Readers-writer lock and a coalescing background writer for the vector database
+"""
+
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or a single writer.
+
+    Writers are preferred: once a writer is waiting, new readers wait until it
+    has finished, so a steady stream of searches cannot starve ingestion.
+    Both locks are re-entrant, and the writer may also take the read lock.
+    A reader must not ask for the write lock.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writers_waiting = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+
+    def acquire_read(self):
+        with self._condition:
+            me = threading.get_ident()
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            if me not in self._readers:
+                # Nested reads skip the queue, or a waiting writer would deadlock them
+                while self._writer is not None or self._writers_waiting:
+                    self._condition.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def release_read(self):
+        with self._condition:
+            me = threading.get_ident()
+            if self._writer == me:
+                self._writer_depth -= 1
+                return
+            self._readers[me] -= 1
+            if self._readers[me] == 0:
+                del self._readers[me]
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            me = threading.get_ident()
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._writer_depth = 1
+
+    def release_write(self):
+        with self._condition:
+            self._writer_depth -= 1
+            if self._writer_depth == 0:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class BackgroundWriteError(RuntimeError):
+    """Queued writes that the background writer failed to apply"""
+
+    def __init__(self, item_ids: List[str], error: Exception):
+        super().__init__(f"{len(item_ids)} queued writes failed: {error}")
+        self.item_ids = item_ids
+        self.error = error
+
+
+class BackgroundWriter:
+    """
+    Single background thread that applies queued upserts and deletes in large batches.
+
+    Operations are coalesced per item ID (the last operation wins), so many small
+    writes issued close together become one delete call and one upsert call.
+    Every submitted operation gets a ticket; flush() waits for everything queued so
+    far and wait_for_own_writes() waits for the calling thread's writes only
+    (read-your-writes). If the batch holding those writes failed, the wait raises
+    BackgroundWriteError with the IDs of the lost writes instead of returning.
+    """
+
+    def __init__(self, apply_batch: Callable[[List[Tuple[str, Any]], List[str]], None],
+                 max_batch: int = 500, max_delay: float = 0.2, name: str = "vector-db-writer"):
+        """
+        Start the writer thread
+
+        Args:
+            apply_batch: Called with (upserts, deletes): upserts is a list of
+                (item_id, payload) pairs, deletes a list of item IDs
+            max_batch: Apply as soon as this many items are pending
+            max_delay: Seconds to wait for more writes before applying a partial batch
+            name: Thread name
+        """
+        self.apply_batch = apply_batch
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._condition = threading.Condition()
+        self._pending: Dict[str, Tuple[str, Any]] = {}
+        self._submitted = 0
+        self._applied = 0
+        self._taken = 0
+        # (first ticket, last ticket, item IDs, error) of failed batches not yet reported by flush()
+        self._failures: List[Tuple[int, int, List[str], Exception]] = []
+        self._flush_requested = False
+        self._stopped = False
+        self._local = threading.local()
+        self.last_error: Optional[Exception] = None
+        self.batches_applied = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        # Queued writes must not be lost when a script exits right after writing
+        atexit.register(self.close)
+
+    def _submit(self, operations: List[Tuple[str, str, Any]]) -> int:
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Background writer is closed")
+            for item_id, kind, payload in operations:
+                self._pending[item_id] = (kind, payload)
+            self._submitted += 1
+            ticket = self._submitted
+            self._condition.notify_all()
+        self._local.ticket = ticket
+        return ticket
+
+    def upsert(self, items: List[Tuple[str, Any]]) -> int:
+        """
+        Queue upserts
+
+        Args:
+            items: (item_id, payload) pairs
+
+        Returns:
+            Ticket to pass to wait_for()
+        """
+        return self._submit([(item_id, "upsert", payload) for item_id, payload in items])
+
+    def delete(self, item_ids: List[str]) -> int:
+        """Queue deletes, returning a ticket"""
+        return self._submit([(item_id, "delete", None) for item_id in item_ids])
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if not self._pending and self._stopped:
+                    return
+
+                # Give small writes a moment to accumulate into a bigger batch
+                deadline = time.monotonic() + self.max_delay
+                while not self._flush_requested and not self._stopped and len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending
+                self._pending = {}
+                first_ticket = self._taken + 1
+                ticket = self._taken = self._submitted
+                self._flush_requested = False
+
+            upserts = [(item_id, payload) for item_id, (kind, payload) in batch.items() if kind == "upsert"]
+            deletes = [item_id for item_id, (kind, _) in batch.items() if kind == "delete"]
+            try:
+                self.apply_batch(upserts, deletes)
+                self.batches_applied += 1
+            except Exception as e:
+                self.last_error = e
+                print(f"Error applying batched vector database writes ({len(batch)} items): {e}")
+                with self._condition:
+                    self._failures.append((first_ticket, ticket, list(batch), e))
+
+            with self._condition:
+                self._applied = max(self._applied, ticket)
+                self._condition.notify_all()
+
+    def _raise_failures(self, first_ticket: int, last_ticket: int, consume: bool = False):
+        """Raise BackgroundWriteError if a failed batch held writes with tickets in the range (caller holds the condition)"""
+        failed = [failure for failure in self._failures if failure[0] <= last_ticket and failure[1] >= first_ticket]
+        if not failed:
+            return
+        if consume:
+            self._failures = [failure for failure in self._failures if failure not in failed]
+        raise BackgroundWriteError([item_id for failure in failed for item_id in failure[2]], failed[-1][3])
+
+    def _wait(self, ticket: int, timeout: Optional[float]) -> bool:
+        """Wait for a ticket to be processed (caller holds the condition)"""
+        if self._applied < ticket:
+            self._flush_requested = True
+            self._condition.notify_all()
+        return self._condition.wait_for(lambda: self._applied >= ticket, timeout)
+
+    def wait_for(self, ticket: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the writes behind a ticket have been applied
+
+        Returns:
+            True if they were applied before the timeout
+
+        Raises:
+            BackgroundWriteError: If the batch holding them failed
+        """
+        with self._condition:
+            if not self._wait(ticket, timeout):
+                return False
+            self._raise_failures(ticket, ticket)
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write queued so far has been applied
+
+        Raises:
+            BackgroundWriteError: With every write lost since the previous flush()
+        """
+        with self._condition:
+            ticket = self._submitted
+            if not self._wait(ticket, timeout):
+                return False
+            self._raise_failures(1, ticket, consume=True)
+            return True
+
+    def wait_for_own_writes(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the writes queued by the calling thread have been applied
+
+        Raises:
+            BackgroundWriteError: Once, if the batch holding the thread's last write failed
+        """
+        ticket = getattr(self._local, "ticket", 0)
+        with self._condition:
+            if not self._wait(ticket, timeout):
+                return False
+            # Reported to this thread once; its later reads go through
+            self._local.ticket = 0
+            self._raise_failures(ticket, ticket)
+            return True
+
+    def close(self, timeout: Optional[float] = None):
+        """Apply everything still queued and stop the writer thread"""
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
@@ -0,0 +1,237 @@
+"""
+Opportunity Document Store for FundingMatch
+Compressed SQLite storage for full opportunity documents, keyed by opportunity ID
+"""
+
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = None
+    zstandard = None
+
+
+class OpportunityDocumentStore:
+    """
+    Stores full opportunity dicts (including scraped URL content) outside the
+    vector index, so ChromaDB only holds embeddings and compact metadata.
+
+    Each blob starts with a one-byte codec tag: zstd-compressed msgpack when
+    the optional `zstandard` and `msgpack` packages are installed, otherwise
+    zlib-compressed JSON. Blobs written with either codec stay readable.
+
+    Every write also bumps a persistent version counter in the same
+    transaction, so callers can tell whether the stored corpus has changed.
+    """
+
+    CODEC_ZLIB_JSON = b'j'
+    CODEC_ZSTD_MSGPACK = b'm'
+
+    # SQLite limits the number of bound parameters per statement
+    MAX_BATCH = 500
+
+    def __init__(self, db_path: str, compression_level: int = 6):
+        """
+        Initialize the document store
+
+        Args:
+            db_path: SQLite database file
+            compression_level: zlib (1-9) or zstd (1-22) compression level
+        """
+        self.db_path = db_path
+        self.compression_level = compression_level
+        self.lock = threading.Lock()
+
+        if zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=compression_level)
+            self._decompressor = zstandard.ZstdDecompressor()
+        else:
+            self._compressor = None
+            self._decompressor = None
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self):
+        """Create the documents and version tables"""
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS opportunity_documents (
+                id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                raw_size INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('CREATE TABLE IF NOT EXISTS store_version (id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)')
+        conn.execute('INSERT OR IGNORE INTO store_version (id, version) VALUES (0, 0)')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection):
+        conn.execute('UPDATE store_version SET version = version + 1 WHERE id = 0')
+
+    def bump_version(self):
+        """Mark the corpus as changed without writing documents (e.g. vector-only imports)"""
+        with self.lock:
+            conn = self._connect()
+            self._bump_version(conn)
+            conn.commit()
+            conn.close()
+
+    def version(self) -> int:
+        """Monotonic counter, incremented by every put, delete and clear"""
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT version FROM store_version WHERE id = 0').fetchone()[0]
+        finally:
+            conn.close()
+
+    def _encode(self, document: Dict[str, Any]) -> Tuple[bytes, int]:
+        """Serialize and compress a document, returning (blob, uncompressed size)"""
+        if self._compressor is not None:
+            raw = msgpack.packb(document, use_bin_type=True, default=str)
+            return self.CODEC_ZSTD_MSGPACK + self._compressor.compress(raw), len(raw)
+
+        raw = json.dumps(document, default=str).encode('utf-8')
+        return self.CODEC_ZLIB_JSON + zlib.compress(raw, self.compression_level), len(raw)
+
+    def _decode(self, blob: bytes) -> Dict[str, Any]:
+        """Decompress and deserialize a stored blob"""
+        codec, payload = blob[:1], blob[1:]
+        if codec == self.CODEC_ZLIB_JSON:
+            return json.loads(zlib.decompress(payload))
+        if codec == self.CODEC_ZSTD_MSGPACK:
+            if self._decompressor is None:
+                raise RuntimeError("Document was stored with zstd/msgpack; install zstandard and msgpack to read it")
+            return msgpack.unpackb(self._decompressor.decompress(payload), raw=False)
+        raise ValueError(f"Unknown document codec {codec!r}")
+
+    @staticmethod
+    def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    def put_many(self, documents: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Insert or replace documents
+
+        Args:
+            documents: List of (opportunity_id, document) tuples
+        """
+        if not documents:
+            return
+
+        timestamp = datetime.now().isoformat()
+        rows = []
+        for opp_id, document in documents:
+            blob, raw_size = self._encode(document)
+            rows.append((opp_id, blob, raw_size, timestamp))
+
+        with self.lock:
+            conn = self._connect()
+            conn.executemany(
+                'INSERT OR REPLACE INTO opportunity_documents (id, data, raw_size, updated_at) VALUES (?, ?, ?, ?)',
+                rows
+            )
+            self._bump_version(conn)
+            conn.commit()
+            conn.close()
+
+    def put(self, opp_id: str, document: Dict[str, Any]):
+        """Insert or replace a single document"""
+        self.put_many([(opp_id, document)])
+
+    def get_many(self, opp_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch several documents at once
+
+        Args:
+            opp_ids: Opportunity IDs
+
+        Returns:
+            Dict mapping each found ID to its document (missing IDs are omitted)
+        """
+        unique_ids = list(dict.fromkeys(opp_ids))
+        if not unique_ids:
+            return {}
+
+        documents = {}
+        conn = self._connect()
+        try:
+            for chunk in self._chunks(unique_ids, self.MAX_BATCH):
+                placeholders = ','.join('?' * len(chunk))
+                cursor = conn.execute(
+                    f'SELECT id, data FROM opportunity_documents WHERE id IN ({placeholders})',
+                    chunk
+                )
+                for opp_id, blob in cursor:
+                    documents[opp_id] = self._decode(blob)
+        finally:
+            conn.close()
+        return documents
+
+    def get(self, opp_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a single document"""
+        return self.get_many([opp_id]).get(opp_id)
+
+    def delete_many(self, opp_ids: List[str]):
+        """Delete documents by ID (missing IDs are ignored)"""
+        unique_ids = list(dict.fromkeys(opp_ids))
+        if not unique_ids:
+            return
+
+        with self.lock:
+            conn = self._connect()
+            for chunk in self._chunks(unique_ids, self.MAX_BATCH):
+                placeholders = ','.join('?' * len(chunk))
+                conn.execute(f'DELETE FROM opportunity_documents WHERE id IN ({placeholders})', chunk)
+            self._bump_version(conn)
+            conn.commit()
+            conn.close()
+
+    def clear(self):
+        """Delete all documents"""
+        with self.lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM opportunity_documents')
+            self._bump_version(conn)
+            conn.commit()
+            conn.close()
+
+    def count(self) -> int:
+        """Number of stored documents"""
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM opportunity_documents').fetchone()[0]
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Document count and compressed/uncompressed sizes"""
+        conn = self._connect()
+        try:
+            count, stored_bytes, raw_bytes = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0), COALESCE(SUM(raw_size), 0) FROM opportunity_documents'
+            ).fetchone()
+        finally:
+            conn.close()
+
+        return {
+            "documents": count,
+            "stored_bytes": stored_bytes,
+            "raw_bytes": raw_bytes,
+            "compression_ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else None,
+            "codec": "zstd+msgpack" if self._compressor is not None else "zlib+json"
+        }
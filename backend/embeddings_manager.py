@@ -6,6 +6,7 @@ Handles embedding generation using Google's gemini-embedding-001 model
 import os
 import time
 import json
+import threading
 from typing import List, Dict, Any, Optional
 from google import genai
 from dotenv import load_dotenv
@@ -235,6 +236,19 @@ class GeminiEmbeddingsManager:
         return float(max(0, min(1, similarity)))
 
 
+# Shared instance so the process keeps a single Gemini client
+_shared_embeddings_manager: Optional[GeminiEmbeddingsManager] = None
+_shared_embeddings_manager_lock = threading.Lock()
+
+def get_embeddings_manager() -> GeminiEmbeddingsManager:
+    """Get or create the shared embeddings manager"""
+    global _shared_embeddings_manager
+    with _shared_embeddings_manager_lock:
+        if _shared_embeddings_manager is None:
+            _shared_embeddings_manager = GeminiEmbeddingsManager()
+        return _shared_embeddings_manager
+
+
 if __name__ == "__main__":
     # Test the embeddings manager
     manager = GeminiEmbeddingsManager()
@@ -11,8 +11,11 @@ from datetime import datetime
 import numpy as np
 from tqdm import tqdm
 
-from .embeddings_manager import GeminiEmbeddingsManager
-from .vector_database import VectorDatabaseManager
+from .embeddings_manager import get_embeddings_manager
+from .vector_database import get_vector_db
+from .llm_executor import LLMExecutor
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache, profile_tag
+from .retrofit_index import RetrofitIndex, proposal_owner, unsuccessful_proposals
 from google import genai
 from dotenv import load_dotenv
 
@@ -22,11 +25,22 @@ load_dotenv()
 class EmbeddingsEnhancedMatcher:
     """Enhanced matching system using embeddings and RAG"""
     
-    def __init__(self):
-        """Initialize the enhanced matcher"""
+    # Minimum proposal similarity for an embedding-only retrofit candidate
+    RETROFIT_MIN_SIMILARITY = 0.5
+    
+    def __init__(self, executor: Optional[LLMExecutor] = None,
+                 response_cache: Optional[LLMResponseCache] = None):
+        """
+        Initialize the enhanced matcher
+        
+        Args:
+            executor: Concurrent, rate-limited executor for RAG calls (default: LLMExecutor())
+            response_cache: Cache of RAG responses (default: the shared cache,
+                see get_llm_response_cache())
+        """
         # Initialize components
-        self.embeddings_manager = GeminiEmbeddingsManager()
-        self.vector_db = VectorDatabaseManager()
+        self.embeddings_manager = get_embeddings_manager()
+        self.vector_db = get_vector_db()
         
         # Initialize Gemini for RAG
         api_key = os.getenv('GEMINI_API_KEY')
@@ -35,6 +49,10 @@ class EmbeddingsEnhancedMatcher:
             
         self.gemini_client = genai.Client(api_key=api_key)
         self.rag_model = 'gemini-2.5-pro'
+        self.executor = executor or LLMExecutor()
+        self.response_cache = response_cache if response_cache is not None else get_llm_response_cache()
+        # Keyword indexes of unsuccessful proposals, per profile ID
+        self._retrofit_indexes: Dict[str, RetrofitIndex] = {}
         
     def process_researcher_profile(self, profile_path: str) -> str:
         """
@@ -64,6 +82,14 @@ class EmbeddingsEnhancedMatcher:
             profile_with_embedding['embedding']
         )
         
+        # Explanations generated for the previous version of this profile are stale
+        if self.response_cache is not None:
+            self.response_cache.invalidate(profile_tag(profile))
+        
+        # Retrofit candidates: keyword index in memory, embeddings in the proposals collection
+        self._retrofit_indexes[profile_id] = RetrofitIndex.from_profile(profile)
+        self._index_retrofit_proposals(profile)
+        
         print(f"Processed researcher profile: {researcher_name}")
         return profile_id
     
@@ -132,9 +158,14 @@ class EmbeddingsEnhancedMatcher:
         if not profile:
             raise ValueError(f"Profile {profile_id} not found")
             
+        # Stored profile documents do not include the embedding
+        embedding = profile.get('embedding')
+        if embedding is None:
+            embedding = self.vector_db.get_researcher_embedding(profile_id)
+        
         # Search for matching opportunities
         matches = self.vector_db.search_opportunities_for_profile(
-            profile['embedding'],
+            embedding,
             n_results=top_k * 2  # Get more to filter by score
         )
         
@@ -143,21 +174,29 @@ class EmbeddingsEnhancedMatcher:
         
         print(f"Found {len(filtered_matches)} matches above {min_score} threshold")
         
-        # Enhance matches with RAG explanations
+        # Retrofit candidates for all matches in one pass
+        retrofits = self._assess_retrofits(profile_id, profile, filtered_matches)
+        
+        # Enhance matches with RAG explanations, concurrently and in rank order
+        batch = self.executor.map(lambda item: self._enhance_match_with_rag(profile, item[0], item[1]),
+                                  list(zip(filtered_matches, retrofits)), "RAG explanations")
         enhanced_matches = []
-        for match in filtered_matches:
-            enhanced_match = self._enhance_match_with_rag(profile, match)
+        for match, enhanced_match in zip(filtered_matches, batch["results"]):
+            if enhanced_match is None:
+                enhanced_match = {**match, "match_explanation": "Unable to generate detailed explanation."}
             enhanced_matches.append(enhanced_match)
             
         return enhanced_matches
     
-    def _enhance_match_with_rag(self, profile: Dict[str, Any], opportunity: Dict[str, Any]) -> Dict[str, Any]:
+    def _enhance_match_with_rag(self, profile: Dict[str, Any], opportunity: Dict[str, Any],
+                                retrofit: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Enhance match with RAG-powered explanation and retrofitting suggestions
         
         Args:
             profile: Researcher profile
             opportunity: Funding opportunity
+            retrofit: Precomputed retrofitting assessment (see _assess_retrofits())
             
         Returns:
             Enhanced match with explanations
@@ -172,15 +211,23 @@ class EmbeddingsEnhancedMatcher:
         # Generate RAG prompt
         prompt = self._create_rag_prompt(profile, opportunity, similar_proposals)
         
-        # Get AI explanation
-        try:
-            response = self.gemini_client.models.generate_content(
+        # Get AI explanation (identical prompts are answered from the response cache)
+        config = {"temperature": 0.7, "max_output_tokens": 1000}
+        
+        def call():
+            return self.executor.call(
+                self.gemini_client.models.generate_content,
                 model=self.rag_model,
-                config={"temperature": 0.7, "max_output_tokens": 1000},
+                config=config,
                 contents=prompt
             )
-            
-            explanation = response.text
+        
+        try:
+            if self.response_cache is None:
+                explanation = call().text
+            else:
+                explanation = self.response_cache.generate(call, self.rag_model, prompt, config,
+                                                           tags=[profile_tag(profile)])
             
         except Exception as e:
             print(f"Error generating explanation: {e}")
@@ -198,7 +245,7 @@ class EmbeddingsEnhancedMatcher:
                 }
                 for p in similar_proposals
             ],
-            "retrofitting_potential": self._assess_retrofitting_potential(profile, opportunity)
+            "retrofitting_potential": retrofit or self._assess_retrofitting_potential(profile, opportunity)
         }
         
         return enhanced_match
@@ -248,45 +295,107 @@ class EmbeddingsEnhancedMatcher:
         
         return prompt
     
+    def _index_retrofit_proposals(self, profile: Dict[str, Any]):
+        """Store embeddings of a profile's unsuccessful proposals in the proposals collection"""
+        proposals = unsuccessful_proposals(profile)
+        texts = [" ".join(filter(None, [
+            str(proposal.get('title', '')),
+            str(proposal.get('abstract', proposal.get('summary', ''))),
+            ", ".join(str(keyword) for keyword in proposal.get('keywords', []) or [])
+        ])) for proposal in proposals]
+        try:
+            embeddings = self.embeddings_manager.generate_embeddings_batch(texts) if texts else []
+            stored = self.vector_db.index_retrofit_proposals(proposal_owner(profile), proposals, embeddings)
+            if stored:
+                print(f"Indexed {stored} unsuccessful proposals for retrofitting")
+        except Exception as e:
+            print(f"Warning: Could not index proposals for retrofitting: {e}")
+    
+    def _retrofit_index(self, profile_id: str, profile: Dict[str, Any]) -> RetrofitIndex:
+        """Keyword index of a profile's unsuccessful proposals, built when the profile is first used"""
+        index = self._retrofit_indexes.get(profile_id)
+        if index is None:
+            index = RetrofitIndex.from_profile(profile)
+            self._retrofit_indexes[profile_id] = index
+        return index
+    
+    def _assess_retrofits(self, 
+                          profile_id: str, 
+                          profile: Dict[str, Any], 
+                          matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Assess retrofitting potential for a list of matches
+        
+        Keyword candidates come from the profile's inverted index and embedding
+        candidates from a single proposals-collection query for all matches.
+        Search results carry no embeddings, so the opportunity vectors are
+        fetched from the vector database by 'match_id'.
+        
+        Args:
+            profile_id: Researcher profile ID
+            profile: Researcher profile
+            matches: Matched opportunities
+            
+        Returns:
+            Retrofitting assessments in the order of `matches`
+        """
+        index = self._retrofit_index(profile_id, profile)
+        semantic = [[] for _ in matches]
+        if index.proposals and matches:
+            try:
+                vectors = self.vector_db.get_opportunity_vectors(
+                    [match['match_id'] for match in matches if match.get('match_id')]
+                )
+                embeddings = [vectors.get(match.get('match_id')) if match.get('embedding') is None
+                              else match['embedding'] for match in matches]
+                embedded = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+                found = self.vector_db.search_retrofit_candidates(
+                    [list(embeddings[i]) for i in embedded], proposal_owner(profile)
+                ) if embedded else []
+                for i, candidates in zip(embedded, found):
+                    semantic[i] = candidates
+            except Exception as e:
+                print(f"Warning: Embedding retrofit search failed: {e}")
+                
+        return [
+            self._assess_retrofitting_potential(profile, match, index, candidates[0] if candidates else None)
+            for match, candidates in zip(matches, semantic)
+        ]
+    
     def _assess_retrofitting_potential(self, 
                                      profile: Dict[str, Any], 
-                                     opportunity: Dict[str, Any]) -> Dict[str, Any]:
+                                     opportunity: Dict[str, Any],
+                                     index: Optional[RetrofitIndex] = None,
+                                     semantic_candidate: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Assess potential for retrofitting unsuccessful proposals
         
         Args:
             profile: Researcher profile
             opportunity: Funding opportunity
+            index: Keyword index of the profile's unsuccessful proposals (built if None)
+            semantic_candidate: Closest unsuccessful proposal by embedding, with a similarity_score
             
         Returns:
-            Retrofitting assessment
+            Retrofitting assessment. The keyword candidate is preferred; the embedding
+            candidate is used when no proposal shares a keyword and it is similar enough
         """
-        # Get unsuccessful proposals from profile
-        unsuccessful_proposals = []
-        if 'proposal_history' in profile:
-            history = profile['proposal_history']
-            if 'unsuccessful_proposals' in history:
-                unsuccessful_proposals = history['unsuccessful_proposals']
-                
-        # Find best retrofit candidate
-        best_candidate = None
-        max_overlap = 0
-        
-        for proposal in unsuccessful_proposals:
-            # Simple keyword overlap for now
-            proposal_keywords = set(proposal.get('keywords', []))
-            opp_keywords = set(opportunity.get('keywords', []))
+        index = index or RetrofitIndex.from_profile(profile)
+        best_candidate, max_overlap = index.best_match(opportunity.get('keywords', []))
+        retrofit_score = min(max_overlap / 5.0, 1.0) if best_candidate else 0  # Normalize to 0-1
+        
+        semantic_similarity = semantic_candidate.get('similarity_score', 0) if semantic_candidate else 0
+        if best_candidate is None and semantic_similarity >= self.RETROFIT_MIN_SIMILARITY:
+            best_candidate = semantic_candidate
+            retrofit_score = semantic_similarity
             
-            overlap = len(proposal_keywords & opp_keywords)
-            if overlap > max_overlap:
-                max_overlap = overlap
-                best_candidate = proposal
-                
         return {
             "has_retrofit_candidate": best_candidate is not None,
             "best_candidate": best_candidate.get('title', '') if best_candidate else None,
             "keyword_overlap": max_overlap,
-            "retrofit_score": min(max_overlap / 5.0, 1.0) if best_candidate else 0  # Normalize to 0-1
+            "retrofit_score": retrofit_score,
+            "semantic_candidate": semantic_candidate.get('title', '') if semantic_candidate else None,
+            "semantic_similarity": semantic_similarity
         }
     
     def generate_match_report(self, 
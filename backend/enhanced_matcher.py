@@ -6,25 +6,90 @@ Advanced opportunity matching using comprehensive semantic profiles
 
 import json
 import os
-from typing import Dict, List, Any, Optional
+import re
+import threading
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from google import genai
 from google.genai import types
 
+try:
+    from .lexical_index import bm25_scores
+    from .llm_executor import LLMExecutor
+    from .llm_response_cache import LLMResponseCache, get_llm_response_cache, profile_tag
+    from .prompt_context import ProfileContext, GeminiContextCache, is_missing_context_error
+except ImportError:
+    from lexical_index import bm25_scores
+    from llm_executor import LLMExecutor
+    from llm_response_cache import LLMResponseCache, get_llm_response_cache, profile_tag
+    from prompt_context import ProfileContext, GeminiContextCache, is_missing_context_error
+
 class EnhancedMatcher:
     """
     Enhanced matching engine that uses comprehensive semantic profiles
     to provide evidence-based opportunity matching with detailed justifications
+    
+    In cascade mode, find_matches() runs three stages: a local lexical/vector
+    prefilter keeps the top candidates, a cheaper model screens them in
+    batches, and only the best screened candidates get the full analysis.
+    
+    The profile part of the analysis prompt is built once per profile version
+    (see prepare_profile_context()). With a context cache it is uploaded once
+    and each analysis call sends only the opportunity. Uploaded contexts are
+    recreated when their TTL runs out and deleted when their profile context
+    is evicted.
     """
     
-    def __init__(self, gemini_api_key: str):
-        """Initialize the enhanced matcher with Gemini client"""
+    # Profile contexts kept in memory (most recent versions)
+    MAX_PROFILE_CONTEXTS = 8
+    
+    def __init__(self, gemini_api_key: str, cascade: bool = False,
+                 prefilter_top_n: int = 40, screen_model: str = 'gemini-2.5-flash',
+                 screen_batch_size: int = 10, screen_min_score: int = 60,
+                 deep_budget: int = 10, executor: Optional[LLMExecutor] = None,
+                 response_cache: Optional[LLMResponseCache] = None,
+                 context_cache: Optional[Any] = None):
+        """
+        Initialize the enhanced matcher with Gemini client
+        
+        Args:
+            gemini_api_key: Gemini API key
+            cascade: Use the three-stage cascade in find_matches()
+            prefilter_top_n: Candidates kept by the local prefilter (stage 1)
+            screen_model: Cheaper model that screens the prefiltered candidates (stage 2)
+            screen_batch_size: Opportunities screened per call
+            screen_min_score: Minimum screening score to reach the full analysis
+            deep_budget: Maximum number of full analyses with the main model (stage 3)
+            executor: Concurrent executor for model calls (default: LLMExecutor())
+            response_cache: Cache of model responses (default: the shared cache,
+                see get_llm_response_cache())
+            context_cache: Backend that uploads the shared profile prompt prefix once
+                (GeminiContextCache or prompt_context.LocalContextCache). Defaults to
+                GeminiContextCache if GEMINI_CONTEXT_CACHE is "true", else none; models
+                or prefixes that cannot be cached fall back to full prompts
+        """
         self.client = genai.Client(api_key=gemini_api_key)
         self.model = 'gemini-2.5-pro'
         self.min_match_score = 75  # Minimum score for high-quality matches
+        self.cascade = cascade
+        self.prefilter_top_n = prefilter_top_n
+        self.screen_model = screen_model
+        self.screen_batch_size = screen_batch_size
+        self.screen_min_score = screen_min_score
+        self.deep_budget = deep_budget
+        self.executor = executor or LLMExecutor()
+        self.response_cache = response_cache if response_cache is not None else get_llm_response_cache()
+        if context_cache is None and os.getenv('GEMINI_CONTEXT_CACHE', 'false').lower() == 'true':
+            context_cache = GeminiContextCache(self.client)
+        self.context_cache = context_cache
+        self._profile_contexts: Dict[str, ProfileContext] = {}
+        self._profile_contexts_lock = threading.Lock()
+        # Call counts of the last cascade run (see _find_matches_cascade)
+        self.last_cascade_report: Optional[Dict[str, Any]] = None
         
     def find_matches(self, semantic_profile: Dict[str, Any], opportunities: List[Dict[str, Any]], 
-                    filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+                    filters: Optional[Dict[str, Any]] = None,
+                    cascade: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Find and analyze matches between semantic profile and opportunities
         
@@ -32,40 +97,44 @@ class EnhancedMatcher:
             semantic_profile: Complete researcher portfolio analysis
             opportunities: List of funding opportunities
             filters: Optional filtering criteria
+            cascade: Override the matcher's cascade setting for this call
             
         Returns:
             List of match analyses sorted by score
         """
+        if self.cascade if cascade is None else cascade:
+            return self._find_matches_cascade(semantic_profile, opportunities)
+        
         matches = []
         total_opportunities = len(opportunities)
         print(f"🔍 Analyzing {total_opportunities} opportunities with Gemini 2.5 Pro...")
         print("-" * 60)
         
-        for i, opportunity in enumerate(opportunities, 1):
-            try:
-                title = opportunity.get('title', 'Unknown')[:50]
-                agency = opportunity.get('agency', 'Unknown')
-                source = opportunity.get('source', 'Unknown')
-                
-                print(f"  {i:2d}/{total_opportunities}. Analyzing: {title}...")
-                print(f"           Agency: {agency} | Source: {source}")
-                
-                # Display complete URL for verification
-                url = opportunity.get('url', 'No URL available')
-                print(f"           🔗 URL: {url}")
-                
-                match_analysis = self._analyze_match(semantic_profile, opportunity)
-                score = match_analysis.get('score', 0)
-                
-                if score >= self.min_match_score:
-                    matches.append(match_analysis)
-                    print(f"           ✅ HIGH MATCH: {score}/100 (Added to results)")
-                else:
-                    print(f"           ❌ Low match: {score}/100 (Below threshold)")
-                    
-            except Exception as e:
-                print(f"           ❌ ERROR: {str(e)[:50]}...")
+        # Analyses run concurrently; results are reported in input order
+        analyses, errors = self._analyze_all(semantic_profile, opportunities)
+        
+        for i, (opportunity, match_analysis) in enumerate(zip(opportunities, analyses), 1):
+            title = opportunity.get('title', 'Unknown')[:50]
+            agency = opportunity.get('agency', 'Unknown')
+            source = opportunity.get('source', 'Unknown')
+            
+            print(f"  {i:2d}/{total_opportunities}. Analyzed: {title}...")
+            print(f"           Agency: {agency} | Source: {source}")
+            
+            # Display complete URL for verification
+            url = opportunity.get('url', 'No URL available')
+            print(f"           🔗 URL: {url}")
+            
+            if match_analysis is None:
+                print(f"           ❌ ERROR: {errors.get(i - 1, 'Unknown error')[:50]}...")
                 continue
+            
+            score = match_analysis.get('score', 0)
+            if score >= self.min_match_score:
+                matches.append(match_analysis)
+                print(f"           ✅ HIGH MATCH: {score}/100 (Added to results)")
+            else:
+                print(f"           ❌ Low match: {score}/100 (Below threshold)")
         
         # Sort by score (highest first)
         sorted_matches = sorted(matches, key=lambda x: x['score'], reverse=True)
@@ -83,41 +152,328 @@ class EnhancedMatcher:
         
         return sorted_matches
     
-    def _analyze_match(self, profile: Dict[str, Any], opportunity: Dict[str, Any]) -> Dict[str, Any]:
+    def _find_matches_cascade(self, semantic_profile: Dict[str, Any],
+                              opportunities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Three-stage matching: local prefilter, batched screening, full analysis
+        
+        Args:
+            semantic_profile: Complete researcher portfolio analysis
+            opportunities: List of funding opportunities
+            
+        Returns:
+            List of match analyses sorted by score; call counts are stored in
+            last_cascade_report
+        """
+        total_opportunities = len(opportunities)
+        print(f"🔍 Cascade matching {total_opportunities} opportunities...")
+        print("-" * 60)
+        
+        # Stage 1: local prefilter, no model calls
+        candidates = self._prefilter(semantic_profile, opportunities)[:self.prefilter_top_n]
+        print(f"   Stage 1 (prefilter): kept {len(candidates)}/{total_opportunities}")
+        
+        # Stage 2: batched screening with the cheaper model, batches run concurrently
+        batches = [candidates[start:start + self.screen_batch_size]
+                   for start in range(0, len(candidates), self.screen_batch_size)]
+        screening = self.executor.map(lambda batch: self._screen_batch(semantic_profile, batch),
+                                      batches, "Screening")
+        screening_calls = len(batches)
+        screened = []
+        for batch, scores in zip(batches, screening["results"]):
+            # Unscreened candidates (failed batches) stay eligible, after the screened ones
+            screened.extend(zip(batch, scores if scores is not None else [None] * len(batch)))
+        
+        survivors = [(opportunity, score) for opportunity, score in screened
+                     if score is None or score >= self.screen_min_score]
+        # Stable sort keeps the prefilter order among equal (and unscreened) scores
+        survivors.sort(key=lambda item: -1 if item[1] is None else item[1], reverse=True)
+        survivors = survivors[:self.deep_budget]
+        print(f"   Stage 2 ({self.screen_model}): {len(survivors)} of {len(candidates)} passed "
+              f"in {screening_calls} calls")
+        
+        # Stage 3: full analysis of the survivors
+        matches = []
+        analyses, errors = self._analyze_all(semantic_profile, [opportunity for opportunity, _ in survivors])
+        for i, ((opportunity, screen_score), match_analysis) in enumerate(zip(survivors, analyses), 1):
+            title = opportunity.get('title', 'Unknown')[:50]
+            print(f"  {i:2d}/{len(survivors)}. Analyzed: {title}... (screen score: {screen_score})")
+            if match_analysis is None:
+                print(f"           ❌ ERROR: {errors.get(i - 1, 'Unknown error')[:50]}...")
+                continue
+            match_analysis['screen_score'] = screen_score
+            score = match_analysis.get('score', 0)
+            if score >= self.min_match_score:
+                matches.append(match_analysis)
+                print(f"           ✅ HIGH MATCH: {score}/100 (Added to results)")
+            else:
+                print(f"           ❌ Low match: {score}/100 (Below threshold)")
+        
+        deep_calls = len(survivors)
+        self.last_cascade_report = {
+            "total_opportunities": total_opportunities,
+            "prefiltered": len(candidates),
+            "screening_calls": screening_calls,
+            "screened_passed": len(survivors),
+            "deep_calls": deep_calls,
+            "baseline_deep_calls": total_opportunities,
+            "deep_calls_saved": total_opportunities - deep_calls,
+            "total_calls_saved": total_opportunities - deep_calls - screening_calls,
+            "matches": len(matches)
+        }
+        
+        print("-" * 60)
+        print("🎯 CASCADE COMPLETE:")
+        print(f"   • {self.model} calls: {deep_calls} (instead of {total_opportunities})")
+        print(f"   • {self.screen_model} calls: {screening_calls}")
+        print(f"   • Calls saved: {self.last_cascade_report['total_calls_saved']}")
+        print(f"   • High-Quality Matches Found: {len(matches)}")
+        print()
+        
+        return sorted(matches, key=lambda x: x['score'], reverse=True)
+    
+    def _analyze_all(self, profile: Dict[str, Any],
+                     opportunities: List[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, str]]:
+        """
+        Run _analyze_match() for every opportunity on the executor
+        
+        Returns:
+            (analyses in input order with None for failed jobs, {index: error})
+        """
+        context = self.prepare_profile_context(profile)
+        batch = self.executor.map(lambda opportunity: self._analyze_match(profile, opportunity, context),
+                                  opportunities, "Match analysis")
+        return batch["results"], {error["index"]: error["error"] for error in batch["errors"]}
+    
+    @staticmethod
+    def _profile_query(profile: Dict[str, Any]) -> str:
+        """Research domains, competencies and advantages of a profile as one text"""
+        portfolio_summary = profile.get('portfolio_summary', {})
+        synthesis = profile.get('synthesis', {})
+        parts = list(portfolio_summary.get('research_domains', []))
+        parts.extend(comp.get('domain', '') for comp in synthesis.get('core_competencies', []))
+        parts.extend(str(advantage) for advantage in synthesis.get('strategic_advantages', []))
+        return ' '.join(str(part) for part in parts)
+    
+    def _prefilter(self, profile: Dict[str, Any], opportunities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Order opportunities by a cheap relevance estimate
+        
+        BM25 of the profile's domains and competencies against each opportunity
+        is fused (reciprocal rank fusion) with the vector similarity carried by
+        opportunities that come from a vector search ('similarity_score').
+        """
+        rrf_k = 60
+        lexical = bm25_scores(self._profile_query(profile), opportunities)
+        rankings = [sorted(range(len(opportunities)), key=lambda i: -lexical[i])]
+        with_similarity = [i for i, opportunity in enumerate(opportunities)
+                           if opportunity.get('similarity_score') is not None]
+        if with_similarity:
+            rankings.append(sorted(with_similarity, key=lambda i: -opportunities[i]['similarity_score']))
+        
+        fused = [0.0] * len(opportunities)
+        for ranking in rankings:
+            for rank, i in enumerate(ranking, start=1):
+                fused[i] += 1.0 / (rrf_k + rank)
+        return [opportunities[i] for i in sorted(range(len(opportunities)), key=lambda i: -fused[i])]
+    
+    def _screen_batch(self, profile: Dict[str, Any], batch: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        Score a batch of opportunities with the screening model in one call
+        
+        Returns:
+            Score (0-100) per opportunity, None where the response had none
+        """
+        portfolio_summary = profile.get('portfolio_summary', {})
+        opportunities_context = ""
+        for i, opportunity in enumerate(batch):
+            opportunities_context += (f"[{i}] {opportunity.get('title', 'Unknown')} "
+                                      f"({opportunity.get('agency', 'Unknown')}): "
+                                      f"{opportunity.get('description', '')[:400]}\n")
+        
+        prompt = f"""
+You are screening funding opportunities for a researcher before a detailed review.
+
+RESEARCHER:
+• Career Stage: {portfolio_summary.get('career_stage', 'Unknown')}
+• Research Domains: {', '.join(portfolio_summary.get('research_domains', []))}
+• Core Competencies: {', '.join(comp.get('domain', '') for comp in profile.get('synthesis', {}).get('core_competencies', []))}
+
+OPPORTUNITIES:
+{opportunities_context}
+Score how well each opportunity fits the researcher from 0 to 100. Be conservative.
+Respond with JSON only: [{{"index": 0, "score": 55}}, ...]
+"""
+        response_text = self._generate(self.screen_model, prompt, profile)
+        try:
+            items = json.loads(self._extract_json(response_text, '[', ']'))
+        except json.JSONDecodeError:
+            self._discard_response(self.screen_model, prompt)
+            raise
+        
+        scores: List[Optional[int]] = [None] * len(batch)
+        for item in items:
+            index = item.get('index') if isinstance(item, dict) else None
+            if isinstance(index, int) and 0 <= index < len(batch):
+                scores[index] = int(item.get('score', 0))
+        return scores
+    
+    def _generate(self, model: str, prompt: str, profile: Dict[str, Any],
+                  context: Optional[ProfileContext] = None, suffix: Optional[str] = None) -> str:
+        """
+        Response text for a prompt, from the response cache when possible
+        
+        Args:
+            model: Model name
+            prompt: Full prompt (also the response cache key)
+            profile: Profile the prompt was built from (cache invalidation tag)
+            context: Profile context the prompt starts with; when it is cached for
+                the model, only `suffix` is sent
+            suffix: Prompt text after the profile context
+        """
+        def call():
+            cached_content = self._cached_context(context, model) if context is not None else None
+            if cached_content:
+                try:
+                    return self.executor.call(self.context_cache.generate, model, cached_content, suffix)
+                except Exception as e:
+                    if not is_missing_context_error(e):
+                        raise
+                    # Expired or deleted upstream: forget it (recreated next call) and send the full prompt
+                    self._drop_cached_context(context, model, cached_content)
+            return self.executor.call(self.client.models.generate_content, model=model, contents=prompt)
+        
+        if self.response_cache is None:
+            return call().text
+        return self.response_cache.generate(call, model, prompt, tags=[profile_tag(profile)])
+    
+    def prepare_profile_context(self, profile: Dict[str, Any]) -> ProfileContext:
+        """
+        Profile prompt prefix for a profile, built once per profile version
+        
+        Args:
+            profile: Complete semantic profile
+            
+        Returns:
+            ProfileContext reused by every prompt built for this profile version
+        """
+        version = ProfileContext.profile_version(profile)
+        evicted = []
+        with self._profile_contexts_lock:
+            context = self._profile_contexts.get(version)
+            if context is None:
+                context = ProfileContext(version, self._build_profile_prompt(profile))
+                self._profile_contexts[version] = context
+                while len(self._profile_contexts) > self.MAX_PROFILE_CONTEXTS:
+                    evicted.append(self._profile_contexts.pop(next(iter(self._profile_contexts))))
+        
+        # Uploaded prefixes of evicted versions are not used again
+        for old_context in evicted:
+            for model, cached_content in list(old_context.cached_content.items()):
+                self._drop_cached_context(old_context, model, cached_content)
+        return context
+    
+    def _cached_context(self, context: ProfileContext, model: str) -> Optional[str]:
+        """
+        Name of the uploaded prefix of a context for a model, None if it cannot be cached
+        
+        A prefix whose TTL has (nearly) run out is deleted and uploaded again.
+        """
+        if self.context_cache is None:
+            return None
+        with context.lock:
+            if context.cached_content.get(model) and context.is_expired(model):
+                self._delete_uploaded_context(context.cached_content.pop(model))
+                context.expires_at.pop(model, None)
+            if model not in context.cached_content:
+                try:
+                    context.cached_content[model] = self.executor.call(
+                        self.context_cache.create, model, context.text, f"profile-{context.version}"
+                    )
+                    expires_at = getattr(self.context_cache, "expires_at", lambda: None)()
+                    if expires_at is not None:
+                        context.expires_at[model] = expires_at
+                except Exception as e:
+                    print(f"   Context caching unavailable for {model}, sending full prompts: {str(e)[:80]}")
+                    context.cached_content[model] = None
+            return context.cached_content[model]
+    
+    def _drop_cached_context(self, context: ProfileContext, model: str, cached_content: Optional[str]):
+        """Forget (and delete) an uploaded prefix unless another thread already replaced it"""
+        with context.lock:
+            if context.cached_content.get(model) != cached_content:
+                return
+            context.cached_content.pop(model, None)
+            context.expires_at.pop(model, None)
+        if cached_content:
+            self._delete_uploaded_context(cached_content)
+    
+    def _delete_uploaded_context(self, cached_content: str):
+        """Delete an uploaded prefix; it may already be gone"""
+        delete = getattr(self.context_cache, "delete", None)
+        if delete is None:
+            return
+        try:
+            delete(cached_content)
+        except Exception as e:
+            print(f"   Could not delete cached context {cached_content}: {str(e)[:80]}")
+    
+    def _discard_response(self, model: str, prompt: str):
+        """Drop an unusable cached response so the next run asks the model again"""
+        if self.response_cache is not None:
+            self.response_cache.discard(model, prompt)
+    
+    def invalidate_profile(self, profile: Dict[str, Any]) -> int:
+        """
+        Forget cached responses generated for a researcher profile
+        
+        Call this when the profile changes.
+        
+        Returns:
+            Number of removed cache entries
+        """
+        if self.response_cache is None:
+            return 0
+        return self.response_cache.invalidate(profile_tag(profile))
+    
+    @staticmethod
+    def _extract_json(text: str, opening: str = '{', closing: str = '}') -> str:
+        """JSON part of a model response (handles markdown code fences)"""
+        json_match = re.search(r'```json\n(.*?)\n```', text, re.DOTALL)
+        if json_match:
+            return json_match.group(1)
+        if text.strip().startswith(opening):
+            # Response is already JSON
+            return text
+        # Try to find JSON in the response
+        json_start = text.find(opening)
+        json_end = text.rfind(closing) + 1
+        if json_start != -1 and json_end > json_start:
+            return text[json_start:json_end]
+        return text
+    
+    def _analyze_match(self, profile: Dict[str, Any], opportunity: Dict[str, Any],
+                       context: Optional[ProfileContext] = None) -> Dict[str, Any]:
         """
         Perform deep match analysis using Gemini AI
         
         Args:
             profile: Semantic profile from Phase 1
             opportunity: Funding opportunity details
+            context: Precomputed profile context (see prepare_profile_context())
             
         Returns:
             Detailed match analysis with evidence and recommendations
         """
-        prompt = self._build_matching_prompt(profile, opportunity)
+        context = context or self.prepare_profile_context(profile)
+        suffix = self._build_opportunity_prompt(opportunity)
+        prompt = context.text + suffix
         
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt
-        )
+        # Identical prompts (same profile and opportunity) are answered from the cache
+        response_text = self._generate(self.model, prompt, profile, context, suffix)
         
-        # Parse the JSON response
-        analysis_text = response.text
-        
-        # Extract JSON from response (handle potential markdown formatting)
-        import re
-        json_match = re.search(r'```json\n(.*?)\n```', analysis_text, re.DOTALL)
-        if json_match:
-            analysis_text = json_match.group(1)
-        elif analysis_text.strip().startswith('{'):
-            # Response is already JSON
-            pass
-        else:
-            # Try to find JSON in the response
-            json_start = analysis_text.find('{')
-            json_end = analysis_text.rfind('}') + 1
-            if json_start != -1 and json_end > json_start:
-                analysis_text = analysis_text[json_start:json_end]
+        # Parse the JSON response (handle potential markdown formatting)
+        analysis_text = self._extract_json(response_text)
         
         try:
             match_analysis = json.loads(analysis_text)
@@ -131,6 +487,7 @@ class EnhancedMatcher:
             
         except json.JSONDecodeError as e:
             print(f"Warning: Could not parse match analysis JSON: {e}")
+            self._discard_response(self.model, prompt)
             # Fallback analysis
             return {
                 "score": 50,
@@ -155,7 +512,19 @@ class EnhancedMatcher:
             opportunity: Funding opportunity details
             
         Returns:
-            Comprehensive prompt for Gemini analysis
+            Comprehensive prompt for Gemini analysis (profile prefix + opportunity suffix)
+        """
+        return self.prepare_profile_context(profile).text + self._build_opportunity_prompt(opportunity)
+    
+    def _build_profile_prompt(self, profile: Dict[str, Any]) -> str:
+        """
+        Build the profile part of the matching prompt, shared by every opportunity
+        
+        Args:
+            profile: Complete semantic profile
+            
+        Returns:
+            Prompt prefix with the researcher context, instructions and response format
         """
         # Extract key profile information
         portfolio_summary = profile.get('portfolio_summary', {})
@@ -204,18 +573,7 @@ STRATEGIC ADVANTAGES:
             
             documents_context += "\n"
         
-        # Build opportunity context
-        opportunity_context = f"""
-FUNDING OPPORTUNITY:
-• Title: {opportunity.get('title', 'Unknown')}
-• Agency: {opportunity.get('agency', 'Unknown')}
-• Program: {opportunity.get('program', 'Unknown')}
-• Description: {opportunity.get('description', 'No description available')[:1000]}
-• Award Amount: ${opportunity.get('award_amount', 0):,}
-• Deadline: {opportunity.get('deadline', 'Unknown')}
-"""
-        
-        # Build the complete prompt
+        # Build the shared part of the prompt; the opportunity follows it
         prompt = f"""
 You are an expert funding strategist analyzing opportunities for a researcher.
 
@@ -223,8 +581,6 @@ You are an expert funding strategist analyzing opportunities for a researcher.
 
 {documents_context}
 
-{opportunity_context}
-
 CRITICAL ANALYSIS INSTRUCTIONS:
 ⚠️ **ACCURACY REQUIREMENTS:**
 - Only cite documents that are explicitly listed in the "KEY SUPPORTING DOCUMENTS" section above
@@ -290,14 +646,39 @@ RESPONSE FORMAT (JSON):
 }}
 
 **IMPORTANT**: If you cannot find clear, explicit evidence of alignment in the provided profile, score the opportunity low (< 70) and explain why. Do not create connections that are not explicitly documented.
+
+The funding opportunity to analyze follows.
 """
         
         return prompt
     
+    def _build_opportunity_prompt(self, opportunity: Dict[str, Any]) -> str:
+        """
+        Build the opportunity-specific part of the matching prompt
+        
+        Args:
+            opportunity: Funding opportunity details
+            
+        Returns:
+            Prompt suffix describing the opportunity
+        """
+        # Build opportunity context
+        opportunity_context = f"""
+FUNDING OPPORTUNITY:
+• Title: {opportunity.get('title', 'Unknown')}
+• Agency: {opportunity.get('agency', 'Unknown')}
+• Program: {opportunity.get('program', 'Unknown')}
+• Description: {opportunity.get('description', 'No description available')[:1000]}
+• Award Amount: ${opportunity.get('award_amount', 0):,}
+• Deadline: {opportunity.get('deadline', 'Unknown')}
+"""
+        
+        return opportunity_context + "\nRespond with the JSON analysis for this opportunity.\n"
+    
     def batch_analyze_matches(self, semantic_profile: Dict[str, Any], 
                             opportunities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Batch process multiple opportunities for efficiency
+        Analyze multiple opportunities concurrently
         
         Args:
             semantic_profile: Complete researcher portfolio
@@ -309,20 +690,19 @@ RESPONSE FORMAT (JSON):
         print(f"🔍 Analyzing {len(opportunities)} opportunities...")
         
         high_quality_matches = []
+        analyses, errors = self._analyze_all(semantic_profile, opportunities)
         
-        for i, opportunity in enumerate(opportunities, 1):
+        for i, (opportunity, match) in enumerate(zip(opportunities, analyses), 1):
             print(f"   {i}/{len(opportunities)}: {opportunity.get('title', 'Unknown')[:50]}...")
             
-            try:
-                match = self._analyze_match(semantic_profile, opportunity)
-                if match['score'] >= self.min_match_score:
-                    high_quality_matches.append(match)
-                    print(f"      ✅ Match found (Score: {match['score']})")
-                else:
-                    print(f"      ❌ Low match (Score: {match['score']})")
-            except Exception as e:
-                print(f"      ⚠️  Error: {str(e)[:50]}...")
+            if match is None:
+                print(f"      ⚠️  Error: {errors.get(i - 1, 'Unknown error')[:50]}...")
                 continue
+            if match['score'] >= self.min_match_score:
+                high_quality_matches.append(match)
+                print(f"      ✅ Match found (Score: {match['score']})")
+            else:
+                print(f"      ❌ Low match (Score: {match['score']})")
         
         print(f"✅ Found {len(high_quality_matches)} high-quality matches")
         return sorted(high_quality_matches, key=lambda x: x['score'], reverse=True)
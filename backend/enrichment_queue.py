@@ -0,0 +1,203 @@
+"""
+Enrichment Queue for FundingMatch
+Tracks opportunities whose URL content is fetched after ingestion (lazy enrichment)
+"""
+
+import json
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class EnrichmentQueue:
+    """
+    Persistent priority queue of opportunities awaiting URL enrichment.
+
+    Opportunities closer to their deadline and opportunities that show up
+    more often in match results are enriched first. Failed entries are
+    retried with exponential backoff and given up after MAX_RETRIES attempts.
+    """
+
+    # Days assigned to opportunities with no known deadline that are not
+    # waiting on deadline extraction (e.g. continuous submissions)
+    NO_DEADLINE_DAYS = 365
+
+    # Failed attempts before an entry is given up, and the backoff after the first one
+    MAX_RETRIES = 5
+    RETRY_BASE_SECONDS = 60
+
+    def __init__(self, queue_file: str, match_weight: float = 1.0):
+        """
+        Initialize the enrichment queue
+
+        Args:
+            queue_file: JSON file used to persist pending entries
+            match_weight: How strongly match hits pull an entry forward
+        """
+        self.queue_file = Path(queue_file)
+        self.match_weight = match_weight
+        self.lock = threading.Lock()
+
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.match_counts: Dict[str, int] = {}
+
+        self._heap: List[Tuple[float, int, str]] = []
+        self._priorities: Dict[str, float] = {}
+        self._seq = itertools.count()
+
+        self._load()
+
+    def _load(self):
+        """Load pending entries from disk"""
+        if not self.queue_file.exists():
+            return
+
+        try:
+            with open(self.queue_file, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: Could not load enrichment queue: {e}")
+            return
+
+        self.pending = data.get("pending", {})
+        self.match_counts = data.get("match_counts", {})
+        for opp_id in self.pending:
+            self._push(opp_id)
+
+    def save(self):
+        """Persist pending entries to disk"""
+        with self.lock:
+            data = {
+                "pending": dict(self.pending),
+                "match_counts": dict(self.match_counts)
+            }
+
+        with open(self.queue_file, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def _priority(self, opp_id: str) -> float:
+        """Lower values are enriched first"""
+        entry = self.pending[opp_id]
+
+        if entry.get("needs_deadline"):
+            # Deadline is unknown; it may not be valid at all, so resolve it first
+            days = 0.0
+        elif entry.get("deadline"):
+            deadline = datetime.fromisoformat(entry["deadline"])
+            days = max(0.0, (deadline - datetime.now(timezone.utc)).total_seconds() / 86400)
+        else:
+            days = float(self.NO_DEADLINE_DAYS)
+
+        hits = self.match_counts.get(opp_id, 0)
+        return days / (1.0 + self.match_weight * hits)
+
+    def _push(self, opp_id: str):
+        """Push (or re-push) an entry; older heap entries become stale"""
+        priority = self._priority(opp_id)
+        self._priorities[opp_id] = priority
+        heapq.heappush(self._heap, (priority, next(self._seq), opp_id))
+
+    def add(self, opp_id: str, deadline: Optional[datetime] = None, needs_deadline: bool = False):
+        """
+        Queue an opportunity for enrichment
+
+        Args:
+            opp_id: Opportunity ID in the vector database
+            deadline: Known deadline, if any
+            needs_deadline: True if the deadline must still be extracted from the URL
+        """
+        with self.lock:
+            self.pending[opp_id] = {
+                "deadline": deadline.isoformat() if deadline else None,
+                "needs_deadline": needs_deadline,
+                "queued_at": datetime.now(timezone.utc).isoformat()
+            }
+            self._push(opp_id)
+
+    def retry(self, opp_id: str, entry: Dict[str, Any], count_attempt: bool = True) -> bool:
+        """
+        Re-queue a popped entry after a failed enrichment
+
+        Args:
+            opp_id: Opportunity ID
+            entry: Entry returned by pop()
+            count_attempt: Count the failure towards MAX_RETRIES (False for rate limits,
+                which are retried after the base backoff indefinitely)
+
+        Returns:
+            True if the entry was re-queued, False if it has used up its retries
+        """
+        retries = entry.get("retries", 0) + (1 if count_attempt else 0)
+        if retries >= self.MAX_RETRIES:
+            return False
+
+        delay = self.RETRY_BASE_SECONDS * 2 ** max(retries - 1, 0)
+        with self.lock:
+            self.pending[opp_id] = {
+                **entry,
+                "retries": retries,
+                "not_before": (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+            }
+            self._push(opp_id)
+        return True
+
+    def record_matches(self, opp_ids: List[str]):
+        """
+        Count match hits for queued opportunities so popular ones are enriched sooner
+
+        Args:
+            opp_ids: IDs of opportunities returned by a match query
+        """
+        with self.lock:
+            for opp_id in opp_ids:
+                if opp_id in self.pending:
+                    self.match_counts[opp_id] = self.match_counts.get(opp_id, 0) + 1
+                    self._push(opp_id)
+
+    def pop(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Remove and return the highest priority entry that is not backing off
+
+        Returns:
+            Tuple of (opp_id, entry) or None if no entry is due
+        """
+        now = datetime.now(timezone.utc)
+        backing_off = []
+        with self.lock:
+            try:
+                while self._heap:
+                    item = heapq.heappop(self._heap)
+                    priority, _, opp_id = item
+                    if opp_id not in self.pending or self._priorities.get(opp_id) != priority:
+                        continue  # Stale heap entry
+
+                    not_before = self.pending[opp_id].get("not_before")
+                    if not_before and datetime.fromisoformat(not_before) > now:
+                        backing_off.append(item)
+                        continue
+
+                    entry = self.pending.pop(opp_id)
+                    self._priorities.pop(opp_id, None)
+                    self.match_counts.pop(opp_id, None)
+                    return opp_id, entry
+
+                return None
+            finally:
+                for item in backing_off:
+                    heapq.heappush(self._heap, item)
+
+    def discard(self, opp_id: str):
+        """Drop an opportunity from the queue (e.g. when it is deleted)"""
+        with self.lock:
+            self.pending.pop(opp_id, None)
+            self._priorities.pop(opp_id, None)
+            self.match_counts.pop(opp_id, None)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def __contains__(self, opp_id: str) -> bool:
+        return opp_id in self.pending
@@ -0,0 +1,294 @@
+"""
+Exact Search Index for FundingMatch
+In-memory NumPy mirror of a ChromaDB collection for exact nearest-neighbour search
+"""
+
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+
+class ExactSearchIndex:
+    """
+    Keeps embeddings in a contiguous float32 matrix and answers top-k queries
+    with a single matrix product.
+
+    Distances are squared L2, the same metric ChromaDB reports for its default
+    "l2" space, so scores computed from either path are interchangeable.
+
+    Each row can carry the compact metadata stored with it, so search results
+    are complete without a round trip to the mirrored collection. `version`
+    is set by the owner to the source version the mirror matches; clear()
+    resets it to None.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize an empty index
+
+        Args:
+            initial_capacity: Number of rows to preallocate once the dimension is known
+        """
+        self.initial_capacity = initial_capacity
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        """Drop all vectors"""
+        self.matrix: Optional[np.ndarray] = None
+        self.norms: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.metadatas: List[Optional[Dict[str, Any]]] = []
+        self.positions: Dict[str, int] = {}
+        self.size = 0
+        self.version: Optional[int] = None
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return None if self.matrix is None else self.matrix.shape[1]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.positions
+
+    def _ensure_capacity(self, rows: int, dimension: int):
+        """Grow the backing arrays (doubling) to hold at least `rows` vectors"""
+        if self.matrix is None:
+            capacity = max(self.initial_capacity, rows)
+            self.matrix = np.zeros((capacity, dimension), dtype=np.float32)
+            self.norms = np.zeros(capacity, dtype=np.float32)
+            return
+
+        if dimension != self.matrix.shape[1]:
+            raise ValueError(f"Embedding dimension {dimension} does not match index dimension {self.matrix.shape[1]}")
+
+        capacity = self.matrix.shape[0]
+        if rows <= capacity:
+            return
+
+        while capacity < rows:
+            capacity *= 2
+        matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        norms = np.zeros(capacity, dtype=np.float32)
+        norms[:self.size] = self.norms[:self.size]
+        self.matrix, self.norms = matrix, norms
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]],
+               metadatas: Optional[List[Dict[str, Any]]] = None):
+        """
+        Insert or replace vectors
+
+        Args:
+            ids: Item IDs
+            embeddings: Embedding vectors, one per ID
+            metadatas: Compact metadata, one per ID (None leaves it unknown)
+        """
+        if not ids:
+            return
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError("Expected one embedding per ID")
+
+        with self.lock:
+            new_ids = [item_id for item_id in dict.fromkeys(ids) if item_id not in self.positions]
+            self._ensure_capacity(self.size + len(new_ids), vectors.shape[1])
+
+            for item_id in new_ids:
+                self.positions[item_id] = self.size
+                self.ids.append(item_id)
+                self.metadatas.append(None)
+                self.size += 1
+
+            rows = np.fromiter((self.positions[item_id] for item_id in ids), dtype=np.int64, count=len(ids))
+            self.matrix[rows] = vectors
+            self.norms[rows] = np.einsum('ij,ij->i', vectors, vectors)
+            for row, metadata in zip(rows, metadatas or [None] * len(ids)):
+                self.metadatas[row] = metadata
+
+    def delete(self, ids: List[str]):
+        """
+        Remove vectors by ID (missing IDs are ignored)
+
+        Args:
+            ids: Item IDs to remove
+        """
+        with self.lock:
+            for item_id in ids:
+                row = self.positions.pop(item_id, None)
+                if row is None:
+                    continue
+
+                # Move the last row into the hole to keep the matrix contiguous
+                last = self.size - 1
+                if row != last:
+                    moved_id = self.ids[last]
+                    self.matrix[row] = self.matrix[last]
+                    self.norms[row] = self.norms[last]
+                    self.ids[row] = moved_id
+                    self.metadatas[row] = self.metadatas[last]
+                    self.positions[moved_id] = row
+                self.ids.pop()
+                self.metadatas.pop()
+                self.size -= 1
+
+    def clear(self):
+        """Remove all vectors"""
+        with self.lock:
+            self._reset()
+
+    def search(self, query_embedding: List[float], n_results: int = 10) -> Tuple[List[str], List[float]]:
+        """
+        Exact top-k search
+
+        Args:
+            query_embedding: Query vector
+            n_results: Number of neighbours to return
+
+        Returns:
+            Tuple of (ids, squared L2 distances) sorted by ascending distance
+        """
+        with self.lock:
+            if self.size == 0 or n_results <= 0:
+                return [], []
+
+            query = np.asarray(query_embedding, dtype=np.float32)
+            matrix = self.matrix[:self.size]
+
+            # ||q - x||^2 = ||q||^2 + ||x||^2 - 2 q.x
+            distances = self.norms[:self.size] - 2.0 * (matrix @ query) + float(query @ query)
+            np.maximum(distances, 0.0, out=distances)
+
+            k = min(n_results, self.size)
+            if k < self.size:
+                top = np.argpartition(distances, k - 1)[:k]
+            else:
+                top = np.arange(self.size)
+            top = top[np.argsort(distances[top], kind='stable')]
+
+            return [self.ids[i] for i in top], distances[top].tolist()
+
+    def search_batch(self, query_embeddings: List[List[float]], n_results: int = 10,
+                     allowed_ids: Optional[set] = None) -> List[Tuple[List[str], List[float]]]:
+        """
+        Exact top-k search for several queries with one matrix product
+
+        Args:
+            query_embeddings: Query vectors
+            n_results: Number of neighbours to return per query
+            allowed_ids: Optional set of IDs to restrict the search to (metadata filters)
+
+        Returns:
+            One (ids, squared L2 distances) tuple per query, as in search()
+        """
+        with self.lock:
+            if allowed_ids is not None:
+                rows = np.fromiter((self.positions[item_id] for item_id in allowed_ids if item_id in self.positions),
+                                   dtype=np.int64)
+                return self._search_rows(query_embeddings, n_results, np.sort(rows))
+
+            if self.size == 0 or n_results <= 0 or not query_embeddings:
+                return [([], []) for _ in query_embeddings]
+
+            queries = np.asarray(query_embeddings, dtype=np.float32)
+            matrix = self.matrix[:self.size]
+
+            distances = (self.norms[:self.size][None, :] - 2.0 * (queries @ matrix.T)
+                         + np.einsum('ij,ij->i', queries, queries)[:, None])
+            np.maximum(distances, 0.0, out=distances)
+
+            k = min(n_results, self.size)
+            if k < self.size:
+                top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(self.size), (len(queries), 1))
+            top_distances = np.take_along_axis(distances, top, axis=1)
+            order = np.argsort(top_distances, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_distances = np.take_along_axis(top_distances, order, axis=1)
+
+            return [([self.ids[i] for i in row], row_distances.tolist())
+                    for row, row_distances in zip(top, top_distances)]
+
+    def _search_rows(self, query_embeddings: List[List[float]], n_results: int,
+                     rows: np.ndarray) -> List[Tuple[List[str], List[float]]]:
+        """Exact top-k search restricted to the given matrix rows"""
+        if len(rows) == 0 or n_results <= 0 or not query_embeddings:
+            return [([], []) for _ in query_embeddings]
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        matrix = self.matrix[rows]
+
+        distances = (self.norms[rows][None, :] - 2.0 * (queries @ matrix.T)
+                     + np.einsum('ij,ij->i', queries, queries)[:, None])
+        np.maximum(distances, 0.0, out=distances)
+
+        k = min(n_results, len(rows))
+        order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+        return [([self.ids[rows[i]] for i in row], distances[q, row].tolist())
+                for q, row in enumerate(order)]
+
+    def load_from_collection(self, collection, page_size: int = 1000):
+        """
+        Rebuild the index (vectors and metadata) from a ChromaDB collection
+
+        Args:
+            collection: ChromaDB collection to mirror
+            page_size: Number of embeddings fetched per request
+        """
+        ids: List[str] = []
+        embeddings = []
+        metadatas = []
+        offset = 0
+        while True:
+            page = collection.get(include=['embeddings', 'metadatas'], limit=page_size, offset=offset)
+            page_ids = page.get('ids') or []
+            if not page_ids:
+                break
+            ids.extend(page_ids)
+            embeddings.extend(page['embeddings'])
+            metadatas.extend(page['metadatas'])
+            offset += len(page_ids)
+            if len(page_ids) < page_size:
+                break
+
+        with self.lock:
+            self._reset()
+            if ids:
+                self.upsert(ids, embeddings, metadatas)
+
+    def export(self) -> Tuple[List[str], np.ndarray]:
+        """
+        Copy out the stored vectors
+
+        Returns:
+            Tuple of (ids, float32 matrix) with one row per ID
+        """
+        with self.lock:
+            if self.matrix is None:
+                return [], np.zeros((0, 0), dtype=np.float32)
+            return list(self.ids), self.matrix[:self.size].copy()
+
+    def get_metadatas(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored metadata for the given IDs (missing IDs and unknown metadata are omitted)"""
+        with self.lock:
+            return {item_id: self.metadatas[self.positions[item_id]] for item_id in ids
+                    if item_id in self.positions and self.metadatas[self.positions[item_id]] is not None}
+
+    def get_vectors(self, ids: List[str]) -> Dict[str, List[float]]:
+        """Stored vectors for the given IDs (missing IDs are omitted)"""
+        with self.lock:
+            return {item_id: self.matrix[self.positions[item_id]].tolist()
+                    for item_id in ids if item_id in self.positions}
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and memory usage of the index"""
+        with self.lock:
+            return {
+                "vectors": self.size,
+                "dimension": self.dimension,
+                "memory_bytes": 0 if self.matrix is None else self.matrix.nbytes + self.norms.nbytes
+            }
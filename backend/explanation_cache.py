@@ -0,0 +1,129 @@
+"""
+Explanation Cache for FundingMatch
+Generated match explanations keyed by user, opportunity and document-set version
+"""
+
+import json
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+class ExplanationCache:
+    """
+    SQLite store of /api/opportunity/<index>/explain results.
+
+    One explanation is kept per user and opportunity, together with the
+    version of the user's document set it was generated from. A lookup with
+    a different document version reports the entry as stale, so the caller
+    regenerates it after the user's documents change.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self):
+        """Create the cache table"""
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS explanations (
+                user_id TEXT NOT NULL,
+                opportunity_id TEXT NOT NULL,
+                document_version TEXT NOT NULL,
+                explanation TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, opportunity_id)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def opportunity_key(opportunity: Dict[str, Any]) -> str:
+        """
+        Stable ID of an opportunity sent by the frontend
+
+        Uses the vector database ID when present, else a hash of the fields
+        that identify the opportunity.
+        """
+        opportunity_id = opportunity.get('match_id') or opportunity.get('id')
+        if opportunity_id:
+            return str(opportunity_id)
+        payload = json.dumps([opportunity.get(field, '') for field in ('title', 'agency', 'url', 'deadline')],
+                             default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    def get(self, user_id: str, opportunity_id: str, document_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored explanation of an opportunity for a user
+
+        Args:
+            user_id: User ID
+            opportunity_id: Opportunity ID (see opportunity_key())
+            document_version: Current version of the user's document set
+
+        Returns:
+            Dict with 'explanation', 'created_at' and 'stale' (True if it was
+            generated from another document version), None if there is none
+        """
+        conn = self._connect()
+        row = conn.execute('''
+            SELECT explanation, document_version, created_at FROM explanations
+            WHERE user_id = ? AND opportunity_id = ?
+        ''', (user_id, opportunity_id)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return {
+            'explanation': json.loads(row[0]),
+            'created_at': row[2],
+            'stale': row[1] != document_version
+        }
+
+    def put(self, user_id: str, opportunity_id: str, document_version: str,
+            explanation: Dict[str, Any]) -> str:
+        """
+        Store an explanation, replacing the previous one
+
+        Returns:
+            Creation timestamp of the entry
+        """
+        created_at = datetime.now().isoformat()
+        with self.lock:
+            conn = self._connect()
+            conn.execute('''
+                INSERT OR REPLACE INTO explanations
+                (user_id, opportunity_id, document_version, explanation, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, opportunity_id, document_version, json.dumps(explanation, default=str), created_at))
+            conn.commit()
+            conn.close()
+        return created_at
+
+    def invalidate_user(self, user_id: str) -> int:
+        """
+        Remove every explanation of a user
+
+        Returns:
+            Number of removed entries
+        """
+        with self.lock:
+            conn = self._connect()
+            removed = conn.execute('DELETE FROM explanations WHERE user_id = ?', (user_id,)).rowcount
+            conn.commit()
+            conn.close()
+        return removed
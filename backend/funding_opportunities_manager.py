@@ -7,29 +7,47 @@ import os
 import csv
 import json
 import shutil
+import threading
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 import hashlib
+import numpy as np
 
 try:
-    from .embeddings_manager import GeminiEmbeddingsManager
-    from .vector_database import VectorDatabaseManager
+    from .embeddings_manager import get_embeddings_manager
+    from .vector_database import get_vector_db
     from .url_content_fetcher import URLContentFetcher
     from .rate_limiter import gemini_rate_limiter
+    from .enrichment_queue import EnrichmentQueue
+    from .opportunity_metadata import parse_date
+    from .lexical_index import keyword_list
+    from .matching_results_manager import MatchingResultsManager
+    from .concurrency import BackgroundWriteError
 except ImportError:
-    from embeddings_manager import GeminiEmbeddingsManager
-    from vector_database import VectorDatabaseManager
+    from embeddings_manager import get_embeddings_manager
+    from vector_database import get_vector_db
     from url_content_fetcher import URLContentFetcher
     from rate_limiter import gemini_rate_limiter
+    from enrichment_queue import EnrichmentQueue
+    from opportunity_metadata import parse_date
+    from lexical_index import keyword_list
+    from matching_results_manager import MatchingResultsManager
+    from concurrency import BackgroundWriteError
 
 
 class FundingOpportunitiesManager:
     """Manages funding opportunities lifecycle including processing, storage, and expiration"""
     
+    # Confidence at or above which a pushed match is recorded as an alert
+    HIGH_CONFIDENCE_THRESHOLD = 80.0
+    
     def __init__(self, funding_dir: str = "FundingOpportunities", 
                  ingested_dir: str = "FundingOpportunities/Ingested",
-                 progress_callback: Optional[callable] = None):
+                 progress_callback: Optional[callable] = None,
+                 lazy_enrichment: bool = False,
+                 reembed_threshold: float = 0.9,
+                 matching_results: Optional[MatchingResultsManager] = None):
         """
         Initialize the funding opportunities manager
         
@@ -37,25 +55,44 @@ class FundingOpportunitiesManager:
             funding_dir: Directory containing CSV files to process
             ingested_dir: Directory to move processed CSV files
             progress_callback: Optional callback for progress updates
+            lazy_enrichment: Embed from CSV fields first and fetch URL content later
+            reembed_threshold: Minimum token overlap (0-1) between old and enriched
+                text below which an enriched opportunity is re-embedded
+            matching_results: Stored match results that newly ingested opportunities are
+                merged into (created on first use if not given)
         """
         self.funding_dir = Path(funding_dir)
         self.ingested_dir = Path(ingested_dir)
         self.progress_callback = progress_callback
+        self.lazy_enrichment = lazy_enrichment
+        self.reembed_threshold = reembed_threshold
+        self.matching_results = matching_results
         
         # Create directories if they don't exist
         self.funding_dir.mkdir(exist_ok=True)
         self.ingested_dir.mkdir(exist_ok=True)
         
         # Initialize components
-        self.embeddings_manager = GeminiEmbeddingsManager()
-        self.vector_db = VectorDatabaseManager()
+        self.embeddings_manager = get_embeddings_manager()
+        self.vector_db = get_vector_db()
         self.url_fetcher = URLContentFetcher()
         
         # Track processed opportunities
         self.processed_ids_file = self.funding_dir / "processed_opportunities.json"
         self.processed_ids = self._load_processed_ids()
+        self._tracking_lock = threading.RLock()
         print(f"Loaded {len(self.processed_ids.get('opportunities', {}))} previously processed opportunities")
         
+        # Deferred URL enrichment
+        self.enrichment_queue = EnrichmentQueue(self.funding_dir / "enrichment_queue.json")
+        self._enrichment_thread = None
+        self._enrichment_stop = threading.Event()
+        # Set when enrichment changed the vector store after the last snapshot export
+        self._snapshot_stale = False
+        self._requeue_pending_enrichment()
+        if len(self.enrichment_queue):
+            print(f"{len(self.enrichment_queue)} opportunities awaiting URL enrichment")
+        
     def _load_processed_ids(self) -> Dict[str, Any]:
         """Load set of processed opportunity IDs"""
         if self.processed_ids_file.exists():
@@ -63,10 +100,33 @@ class FundingOpportunitiesManager:
                 return json.load(f)
         return {"opportunities": {}, "last_cleanup": None}
     
+    def _confirm_vector_writes(self) -> List[str]:
+        """
+        Wait for queued vector database writes and untrack opportunities that were not stored
+        
+        With write batching a failed batch only surfaces here, so callers run this
+        before saving processed IDs; otherwise lost opportunities would never be retried.
+        
+        Returns:
+            IDs of the opportunities whose write failed
+        """
+        try:
+            self.vector_db.flush()
+            return []
+        except BackgroundWriteError as e:
+            print(f"❌ {len(e.item_ids)} opportunities were not stored: {e.error}")
+            with self._tracking_lock:
+                for opp_id in e.item_ids:
+                    self.processed_ids["opportunities"].pop(opp_id, None)
+                    self.enrichment_queue.discard(opp_id)
+            self.enrichment_queue.save()
+            return e.item_ids
+    
     def _save_processed_ids(self):
         """Save processed opportunity IDs"""
-        with open(self.processed_ids_file, 'w') as f:
-            json.dump(self.processed_ids, f, indent=2)
+        with self._tracking_lock:
+            with open(self.processed_ids_file, 'w') as f:
+                json.dump(self.processed_ids, f, indent=2)
     
     def _generate_opportunity_id(self, opportunity: Dict[str, Any]) -> str:
         """Generate unique ID for an opportunity based on its content"""
@@ -130,6 +190,23 @@ class FundingOpportunitiesManager:
         # Generate hash
         return hashlib.md5(id_string.encode()).hexdigest()
     
+    def _opportunity_embedding_text(self, opportunity: Dict[str, Any]) -> str:
+        """Text used to embed an opportunity during CSV ingestion"""
+        text = f"{opportunity.get('title', '')} {opportunity.get('description', '')} {opportunity.get('agency', '')}"
+        if 'keywords' in opportunity:
+            text += f" {opportunity.get('keywords', '')}"
+        return text
+    
+    def _text_changed_meaningfully(self, old_text: str, new_text: str) -> bool:
+        """Check whether enrichment changed the embedding text enough to re-embed"""
+        old_tokens = set(old_text.lower().split())
+        new_tokens = set(new_text.lower().split())
+        if not old_tokens or not new_tokens:
+            return old_tokens != new_tokens
+        
+        overlap = len(old_tokens & new_tokens) / len(old_tokens | new_tokens)
+        return overlap < self.reembed_threshold
+    
     def _enrich_opportunity_with_url(self, opportunity: Dict[str, Any]) -> Dict[str, Any]:
         """Enrich opportunity with content from URL"""
         # Try different URL fields
@@ -166,7 +243,7 @@ class FundingOpportunitiesManager:
                 
                 # Try to extract deadline from URL if not present
                 if not opportunity.get('close_date') and url_content.get('deadline_info'):
-                    deadline_date = self._parse_date(url_content['deadline_info'])
+                    deadline_date = parse_date(url_content['deadline_info'])
                     if deadline_date:
                         opportunity['close_date'] = deadline_date.strftime("%Y-%m-%d")
                         print(f"  📅 Found deadline from URL: {opportunity['close_date']}")
@@ -181,80 +258,6 @@ class FundingOpportunitiesManager:
         
         return opportunity
     
-    def _parse_date(self, date_string: str) -> Optional[datetime]:
-        """Parse various date formats"""
-        if not date_string or date_string.strip() == "":
-            return None
-            
-        # Clean the date string
-        date_string = date_string.strip()
-        
-        # Handle multiple dates like "2025-09-16, 2025-09-16" or "2025-03-15, 2025-09-15"
-        if ',' in date_string:
-            # Split by comma and parse all dates
-            date_parts = date_string.split(',')
-            parsed_dates = []
-            
-            for part in date_parts:
-                part = part.strip()
-                if part:
-                    # Try to parse this part (without recursion to avoid infinite loop)
-                    for fmt in ["%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y", "%d/%m/%Y"]:
-                        try:
-                            parsed = datetime.strptime(part, fmt).replace(tzinfo=timezone.utc)
-                            parsed_dates.append(parsed)
-                            break
-                        except ValueError:
-                            continue
-            
-            if parsed_dates:
-                # Return the earliest future date
-                now = datetime.now(timezone.utc)
-                future_dates = [d for d in parsed_dates if d >= now]
-                if future_dates:
-                    return min(future_dates)
-                # If all dates are past, return the most recent one
-                return max(parsed_dates)
-            
-            # If we couldn't parse any part, continue with normal parsing
-            date_string = date_parts[0].strip()
-        
-        # Try different date formats
-        date_formats = [
-            "%Y-%m-%d",
-            "%m/%d/%Y",
-            "%B %d, %Y",
-            "%d-%m-%Y",
-            "%Y/%m/%d",
-            "%b %d, %Y",  # Jan 1, 2025
-            "%B %d %Y",   # January 1 2025
-            "%b %d %Y",   # Jan 1 2025
-            "%d %B %Y",   # 1 January 2025
-            "%d %b %Y",   # 1 Jan 2025
-            "%m-%d-%Y",
-            "%d/%m/%Y",
-            "%Y.%m.%d",
-            "%d.%m.%Y"
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_string, fmt).replace(tzinfo=timezone.utc)
-            except ValueError:
-                continue
-        
-        # Try to extract date from text like "August 20, 2025"
-        import re
-        date_pattern = re.compile(r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),?\s+(\d{4})')
-        match = date_pattern.search(date_string)
-        if match:
-            try:
-                return datetime.strptime(match.group(0), "%B %d, %Y").replace(tzinfo=timezone.utc)
-            except:
-                pass
-                
-        return None
-    
     def _extract_deadline_with_gemini(self, opportunity: Dict[str, Any]) -> Optional[str]:
         """Use Gemini to extract deadline from opportunity description"""
         # Combine all text fields
@@ -296,7 +299,7 @@ class FundingOpportunitiesManager:
                 result = response.text.strip()
                 if result not in ['NO_DEADLINE', 'ANYTIME']:
                     # Try to parse the date
-                    parsed_date = self._parse_date(result)
+                    parsed_date = parse_date(result)
                     if parsed_date:
                         return result
                 else:
@@ -308,10 +311,17 @@ class FundingOpportunitiesManager:
             
         return None
     
-    def _is_expired(self, opportunity: Dict[str, Any]) -> Tuple[bool, Optional[datetime]]:
+    def _is_expired(self, opportunity: Dict[str, Any],
+                    allow_fetch: bool = True) -> Tuple[bool, Optional[datetime]]:
         """
         Check if an opportunity is expired
         
+        Args:
+            opportunity: Opportunity data
+            allow_fetch: Fetch the URL and ask Gemini when the CSV fields have no deadline.
+                When False, an unknown deadline returns (False, None) so the caller can
+                defer the decision to the enrichment queue.
+        
         Returns:
             Tuple of (is_expired, expiration_date)
         """
@@ -330,9 +340,13 @@ class FundingOpportunitiesManager:
         
         for field in date_fields:
             if field in opportunity and opportunity[field]:
-                exp_date = self._parse_date(opportunity[field])
+                exp_date = parse_date(opportunity[field])
                 if exp_date:
                     return exp_date < now, exp_date
+        
+        if not allow_fetch:
+            # Deadline unknown until the URL is enriched
+            return False, None
                     
         # If no date found in standard fields, try to get it from URL
         if opportunity.get('url') and not opportunity.get('url_content'):
@@ -343,7 +357,7 @@ class FundingOpportunitiesManager:
         url_content = opportunity.get('url_content', {})
         deadline_from_url = url_content.get('deadline_info', '') or url_content.get('deadline', '')
         if deadline_from_url:
-            exp_date = self._parse_date(deadline_from_url)
+            exp_date = parse_date(deadline_from_url)
             if exp_date:
                 opportunity['close_date'] = deadline_from_url
                 return exp_date < now, exp_date
@@ -353,7 +367,7 @@ class FundingOpportunitiesManager:
         if gemini_deadline and gemini_deadline not in ['NO_DEADLINE', 'ANYTIME']:
             # Add the extracted deadline to the opportunity
             opportunity['close_date'] = gemini_deadline
-            exp_date = self._parse_date(gemini_deadline)
+            exp_date = parse_date(gemini_deadline)
             if exp_date:
                 return exp_date < now, exp_date
         elif gemini_deadline == 'ANYTIME':
@@ -410,6 +424,14 @@ class FundingOpportunitiesManager:
                 summary["expired_skipped"] += file_summary["expired"]
                 summary["duplicate_skipped"] += file_summary["duplicates"]
                 
+                failed = self._confirm_vector_writes()
+                if failed:
+                    # Leave the file in place so the next run stores the lost opportunities
+                    summary["new_opportunities"] -= len(failed)
+                    summary["errors"].append(f"{len(failed)} opportunities from {csv_file.name} could not be stored; "
+                                             f"the file will be processed again")
+                    continue
+                
                 # Move file to ingested folder
                 ingested_path = self.ingested_dir / csv_file.name
                 shutil.move(str(csv_file), str(ingested_path))
@@ -429,19 +451,24 @@ class FundingOpportunitiesManager:
         # Save processed IDs
         self._save_processed_ids()
         
+        self._write_vector_snapshot()
+        
         return summary
     
-    def process_single_csv_file(self, filename: str, progress_callback=None) -> Dict[str, Any]:
+    def process_single_csv_file(self, filename: str, progress_callback=None,
+                                lazy_enrichment: Optional[bool] = None) -> Dict[str, Any]:
         """
         Process a single CSV file with progress tracking
         
         Args:
             filename: Name of CSV file to process
             progress_callback: Optional callback function for progress updates
+            lazy_enrichment: Override the manager's lazy enrichment setting for this file
             
         Returns:
             Processing summary
         """
+        lazy = self.lazy_enrichment if lazy_enrichment is None else lazy_enrichment
         csv_path = self.funding_dir / filename
         
         if not csv_path.exists():
@@ -453,8 +480,11 @@ class FundingOpportunitiesManager:
             "expired_skipped": 0,
             "duplicate_skipped": 0,
             "errors": [],
-            "unprocessed": []  # Track unprocessed opportunities with reasons
+            "unprocessed": [],  # Track unprocessed opportunities with reasons
+            "queued_for_enrichment": 0
         }
+        # (id, opportunity, embedding) of every opportunity upserted from this file
+        new_items = []
         
         # Send initial progress
         if progress_callback:
@@ -532,8 +562,8 @@ class FundingOpportunitiesManager:
                 })
             
             for i, opp in enumerate(opportunities):
-                # Check if expired or has no deadline
-                is_expired, exp_date = self._is_expired(opp)
+                # Check if expired or has no deadline (lazy mode never fetches here)
+                is_expired, exp_date = self._is_expired(opp, allow_fetch=not lazy)
                 
                 if is_expired:
                     summary["expired_skipped"] += 1
@@ -590,8 +620,8 @@ class FundingOpportunitiesManager:
                         })
                     continue
                 
-                # Enrich with URL content if available
-                enriched_opp = self._enrich_opportunity_with_url(opp)
+                # Enrich with URL content if available (deferred in lazy mode)
+                enriched_opp = opp if lazy else self._enrich_opportunity_with_url(opp)
                 
                 # Add to batch
                 batch_data.append({
@@ -614,13 +644,7 @@ class FundingOpportunitiesManager:
                     # Generate embeddings and store
                     try:
                         # Extract text for embeddings
-                        texts = []
-                        for item in batch_data:
-                            opp = item["opportunity"]
-                            text = f"{opp.get('title', '')} {opp.get('description', '')} {opp.get('agency', '')}"
-                            if 'keywords' in opp:
-                                text += f" {opp.get('keywords', '')}"
-                            texts.append(text)
+                        texts = [self._opportunity_embedding_text(item["opportunity"]) for item in batch_data]
                         
                         if progress_callback:
                             progress_callback({
@@ -632,36 +656,13 @@ class FundingOpportunitiesManager:
                         # Get embeddings
                         embeddings = self.embeddings_manager.generate_embeddings_batch(texts)
                         
-                        # Add to vector database
-                        ids = []
-                        metadatas = []
-                        documents = []
-                        
-                        for i, item in enumerate(batch_data):
-                            opp = item["opportunity"]
-                            ids.append(item["id"])
-                            
-                            # Prepare metadata (ChromaDB has restrictions on metadata)
-                            metadata = {
-                                "title": str(opp.get("title", ""))[:100],  # Limit length
-                                "agency": str(opp.get("agency", "")),
-                                "deadline": str(opp.get("close_date", "")),
-                                "url": str(opp.get("url", "")),
-                                "program": str(opp.get("program", "")),
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            metadatas.append(metadata)
-                            
-                            # Store full opportunity as JSON document
-                            documents.append(json.dumps(opp))
-                        
-                        # Batch upsert to ChromaDB
-                        self.vector_db.opportunities.upsert(
-                            ids=ids,
-                            embeddings=embeddings,
-                            metadatas=metadatas,
-                            documents=documents
-                        )
+                        # Batch upsert to vector database (full opportunity stored as JSON document)
+                        batch_items = [
+                            (item["id"], item["opportunity"], embedding)
+                            for item, embedding in zip(batch_data, embeddings)
+                        ]
+                        self.vector_db.batch_add_opportunities(batch_items)
+                        new_items.extend(batch_items)
                         
                         # Track processed opportunities
                         for item in batch_data:
@@ -671,10 +672,17 @@ class FundingOpportunitiesManager:
                                 "agency": item["opportunity"].get("agency", "Unknown"),
                                 "topic_number": item["opportunity"].get("topic_number", "") or item["opportunity"].get("Topic Number", ""),
                                 "processed_at": datetime.now(timezone.utc).isoformat(),
-                                "expiration_date": item["expiration_date"].isoformat() if item["expiration_date"] else None
+                                "expiration_date": item["expiration_date"].isoformat() if item["expiration_date"] else None,
+                                "enrichment": "pending" if lazy else "complete"
                             }
                             summary["new_opportunities"] += 1
                         
+                        if lazy:
+                            self._queue_for_enrichment(
+                                [(item["id"], item["expiration_date"]) for item in batch_data]
+                            )
+                            summary["queued_for_enrichment"] += len(batch_data)
+                        
                         processed += len(batch_data)
                         batch_data = []
                         
@@ -714,12 +722,28 @@ class FundingOpportunitiesManager:
                         processed += len(batch_data)
                         batch_data = []
             
+            # Only opportunities the vector database confirmed are recorded as processed
+            failed = set(self._confirm_vector_writes())
+            if failed:
+                for opp_id, opportunity, _ in new_items:
+                    if opp_id in failed:
+                        summary["new_opportunities"] -= 1
+                        summary["unprocessed"].append({
+                            "title": opportunity.get('title', 'Unknown'),
+                            "agency": opportunity.get('agency', 'Unknown'),
+                            "reason": "Vector database write failed"
+                        })
+                summary["errors"].append(f"{len(failed)} opportunities could not be stored; "
+                                         f"the file was left in place to be processed again")
+                new_items = [item for item in new_items if item[0] not in failed]
+            
             # Save processed IDs
             self._save_processed_ids()
             
-            # Move file to ingested folder
-            ingested_path = self.ingested_dir / filename
-            csv_path.rename(ingested_path)
+            # Move file to ingested folder (kept in place for a retry if writes were lost)
+            if not failed:
+                ingested_path = self.ingested_dir / filename
+                csv_path.rename(ingested_path)
             
             # Clean up expired opportunities after processing
             if progress_callback:
@@ -732,6 +756,18 @@ class FundingOpportunitiesManager:
             expired_removed = self.remove_expired_opportunities(force=True)
             summary["expired_removed"] = expired_removed
             
+            # Merge the new opportunities into existing users' stored matches
+            if new_items:
+                if progress_callback:
+                    progress_callback({
+                        "status": "processing",
+                        "stage": "matching",
+                        "message": f"Matching {len(new_items)} new opportunities against researcher profiles..."
+                    })
+                summary["push_matching"] = self.push_new_matches(new_items)
+            
+            self._write_vector_snapshot()
+            
             # Send completion
             if progress_callback:
                 progress_callback({
@@ -752,6 +788,102 @@ class FundingOpportunitiesManager:
         
         return summary
     
+    def push_new_matches(self, new_items: List[Tuple[str, Dict[str, Any], List[float]]]) -> Dict[str, Any]:
+        """
+        Score newly ingested opportunities against every researcher and merge the hits
+        
+        The new embeddings are scored against all researcher embeddings in one
+        matrix operation. For each user with stored matches, a new opportunity
+        qualifies when its similarity reaches the lowest similarity among the
+        user's stored matches; its confidence is scaled against the stored
+        similarity range the same way /api/match scores results. The user keeps
+        as many matches as are stored: qualifying matches that rank among the
+        top of the stored and new matches are merged, the stored matches they
+        push out are dropped, and merged matches scoring at least
+        HIGH_CONFIDENCE_THRESHOLD are recorded as match alerts.
+        
+        Args:
+            new_items: (opportunity ID, opportunity, embedding) of the new opportunities
+            
+        Returns:
+            Dict with users_updated, matches_added and high_confidence_users (user IDs)
+        """
+        result = {"users_updated": 0, "matches_added": 0, "high_confidence_users": []}
+        if not new_items:
+            return result
+        
+        try:
+            user_ids, similarity = self.vector_db.score_against_researchers(
+                [embedding for _, _, embedding in new_items]
+            )
+            if not user_ids:
+                return result
+            
+            if self.matching_results is None:
+                self.matching_results = MatchingResultsManager()
+            stored_scores = self.matching_results.get_similarity_scores(user_ids)
+            
+            for row, user_id in enumerate(user_ids):
+                stored = stored_scores.get(user_id)
+                if not stored:
+                    continue  # No stored matches to merge into
+                high, low = stored[0], stored[-1]
+                scores = similarity[row]
+                qualifying = np.nonzero(scores >= low)[0]
+                # Best first; a new match is kept while it ranks within the stored match count
+                qualifying = qualifying[np.argsort(-scores[qualifying], kind='stable')][:len(stored)]
+                ascending = np.asarray(stored[::-1])
+                stronger_stored = len(stored) - np.searchsorted(ascending, scores[qualifying], side='right')
+                qualifying = qualifying[stronger_stored + np.arange(len(qualifying)) < len(stored)]
+                if len(qualifying) == 0:
+                    continue
+                
+                score_range = high - low if high > low else 1
+                normalized = np.clip((scores[qualifying] - low) / score_range, 0.0, 1.0)
+                confidences = np.clip(20 + 75 * normalized ** 0.7, 20, 95)
+                
+                matches = []
+                for index, confidence in zip(qualifying, confidences):
+                    opp_id, opportunity, _ = new_items[index]
+                    description = opportunity.get('description', '')
+                    matches.append({
+                        'match_id': opp_id,
+                        'title': opportunity.get('title', 'Unknown'),
+                        'agency': opportunity.get('agency', 'Unknown'),
+                        'description': description[:200] + '...' if description else '',
+                        'keywords': keyword_list(opportunity.get('keywords', []))[:5],
+                        'deadline': opportunity.get('close_date', 'Not specified'),
+                        'url': opportunity.get('url', ''),
+                        'confidence_score': round(float(confidence), 1),
+                        'similarity_score': round(float(scores[index]), 4)
+                    })
+                
+                if not self.matching_results.merge_matches(user_id, matches, limit=len(stored)):
+                    continue
+                result["users_updated"] += 1
+                result["matches_added"] += len(matches)
+                
+                high_confidence = [match for match in matches
+                                   if match['confidence_score'] >= self.HIGH_CONFIDENCE_THRESHOLD]
+                if high_confidence and self.matching_results.record_match_alerts(user_id, high_confidence):
+                    result["high_confidence_users"].append(user_id)
+            
+            print(f"Push matching: {result['matches_added']} new matches for {result['users_updated']} users, "
+                  f"{len(result['high_confidence_users'])} with high-confidence hits")
+            
+        except Exception as e:
+            print(f"Error matching new opportunities: {e}")
+        
+        return result
+    
+    def _write_vector_snapshot(self):
+        """Refresh the memory-mapped vector snapshot used for fast cold starts"""
+        self._snapshot_stale = False
+        try:
+            self.vector_db.export_snapshot()
+        except Exception as e:
+            print(f"Warning: Could not write vector snapshot: {e}")
+    
     def _process_nsf_csv(self, csv_path: Path) -> List[Dict[str, Any]]:
         """Process NSF CSV file"""
         opportunities = []
@@ -843,6 +975,7 @@ class FundingOpportunitiesManager:
         
         summary = {"new": 0, "expired": 0, "duplicates": 0}
         batch_data = []
+        batch_deadlines = {}  # opp_id -> expiration date, for the enrichment queue
         requests_this_minute = 0
         minute_start = time.time()
         total_opportunities = len(opportunities)
@@ -863,11 +996,12 @@ class FundingOpportunitiesManager:
                 summary["duplicates"] += 1
                 continue
             
-            # Enrich opportunity with URL content
-            opp = self._enrich_opportunity_with_url(opp)
+            # Enrich opportunity with URL content (deferred in lazy mode)
+            if not self.lazy_enrichment:
+                opp = self._enrich_opportunity_with_url(opp)
             
             # Check if expired or has no deadline
-            is_expired, exp_date = self._is_expired(opp)
+            is_expired, exp_date = self._is_expired(opp, allow_fetch=not self.lazy_enrichment)
             if is_expired:
                 if exp_date:
                     print(f"  ⏰ Skipping expired: {opp['title'][:50]}... (expired: {exp_date})")
@@ -900,8 +1034,10 @@ class FundingOpportunitiesManager:
                     "agency": opp.get('agency', 'Unknown'),
                     "topic_number": opp.get('topic_number', '') or opp.get('Topic Number', ''),
                     "processed_date": datetime.now().isoformat(),
-                    "expiration_date": exp_date.isoformat() if exp_date else None
+                    "expiration_date": exp_date.isoformat() if exp_date else None,
+                    "enrichment": "pending" if self.lazy_enrichment else "complete"
                 }
+                batch_deadlines[opp_id] = exp_date
                 
                 summary["new"] += 1
                 
@@ -909,7 +1045,10 @@ class FundingOpportunitiesManager:
                 if len(batch_data) >= batch_size:
                     self.vector_db.batch_add_opportunities(batch_data)
                     print(f"  ✓ Added batch of {len(batch_data)} opportunities")
+                    if self.lazy_enrichment:
+                        self._queue_for_enrichment(list(batch_deadlines.items()))
                     batch_data = []
+                    batch_deadlines = {}
                     
             except Exception as e:
                 print(f"  ❌ Error processing opportunity: {e}")
@@ -924,9 +1063,181 @@ class FundingOpportunitiesManager:
         if batch_data:
             self.vector_db.batch_add_opportunities(batch_data)
             print(f"  ✓ Added final batch of {len(batch_data)} opportunities")
+            if self.lazy_enrichment:
+                self._queue_for_enrichment(list(batch_deadlines.items()))
         
         return summary
     
+    def _requeue_pending_enrichment(self):
+        """Queue tracked opportunities still awaiting enrichment that the queue lost"""
+        requeued = 0
+        for opp_id, tracked in self.processed_ids.get("opportunities", {}).items():
+            if tracked.get("enrichment") == "pending" and opp_id not in self.enrichment_queue:
+                exp_date = datetime.fromisoformat(tracked["expiration_date"]) if tracked.get("expiration_date") else None
+                if exp_date and exp_date.tzinfo is None:
+                    exp_date = exp_date.replace(tzinfo=timezone.utc)
+                self.enrichment_queue.add(opp_id, deadline=exp_date, needs_deadline=exp_date is None)
+                requeued += 1
+        if requeued:
+            print(f"Re-queued {requeued} opportunities still pending URL enrichment")
+            self.enrichment_queue.save()
+    
+    def _queue_for_enrichment(self, items: List[Tuple[str, Optional[datetime]]]):
+        """
+        Queue stored opportunities for deferred URL enrichment
+        
+        Args:
+            items: List of (opp_id, expiration_date) tuples; a missing date means the
+                deadline still has to be extracted from the URL
+        """
+        for opp_id, exp_date in items:
+            self.enrichment_queue.add(opp_id, deadline=exp_date, needs_deadline=exp_date is None)
+        self.enrichment_queue.save()
+    
+    def enrich_next_opportunity(self) -> Optional[Dict[str, Any]]:
+        """
+        Enrich the highest priority queued opportunity with its URL content
+        
+        The opportunity is re-embedded only if the enriched text differs meaningfully
+        from the text it was embedded with; otherwise the stored embedding is kept.
+        Opportunities whose deadline could only be resolved from the URL are removed
+        if they turn out to be expired or have no deadline at all.
+        
+        Returns:
+            Result dictionary with the opportunity ID and action taken, or None if
+            the queue is empty
+        """
+        popped = self.enrichment_queue.pop()
+        if popped is None:
+            return None
+        
+        opp_id, entry = popped
+        result = {"id": opp_id, "action": None}
+        
+        try:
+            stored = self.vector_db.get_opportunity_with_embedding(opp_id)
+            if stored is None:
+                # Removed since it was queued (e.g. by expiration cleanup)
+                result["action"] = "missing"
+                return result
+            
+            opportunity, embedding = stored
+            old_text = self._opportunity_embedding_text(opportunity)
+            enriched = self._enrich_opportunity_with_url(dict(opportunity))
+            
+            exp_date = None
+            if entry.get("needs_deadline"):
+                is_expired, exp_date = self._is_expired(enriched)
+                if is_expired:
+                    self.vector_db.delete_opportunities([opp_id])
+                    self._snapshot_stale = True
+                    with self._tracking_lock:
+                        self.processed_ids["opportunities"].pop(opp_id, None)
+                    result["action"] = "discarded"
+                    return result
+            
+            new_text = self._opportunity_embedding_text(enriched)
+            if self._text_changed_meaningfully(old_text, new_text):
+                embedding = self.embeddings_manager.generate_embedding(new_text)
+                result["action"] = "reembedded"
+            else:
+                result["action"] = "updated"
+            
+            self.vector_db.batch_add_opportunities([(opp_id, enriched, embedding)])
+            self._snapshot_stale = True
+            # Raises if a batched write failed, so the opportunity is not marked enriched
+            self.vector_db.wait_for_own_writes()
+            
+            with self._tracking_lock:
+                tracked = self.processed_ids["opportunities"].get(opp_id)
+                if tracked is not None:
+                    tracked["enrichment"] = "complete"
+                    if exp_date:
+                        tracked["expiration_date"] = exp_date.isoformat()
+            
+            return result
+            
+        except Exception as e:
+            print(f"  ⚠️ Error enriching opportunity {opp_id}: {str(e)[:100]}")
+            # Put it back with a backoff; rate limits do not use up its retries
+            rate_limited = "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e)
+            if not self.enrichment_queue.retry(opp_id, entry, count_attempt=not rate_limited):
+                print(f"  ❌ Giving up enriching opportunity {opp_id} after "
+                      f"{self.enrichment_queue.MAX_RETRIES} attempts")
+                with self._tracking_lock:
+                    tracked = self.processed_ids["opportunities"].get(opp_id)
+                    if tracked is not None:
+                        tracked["enrichment"] = "failed"
+            result["action"] = "error"
+            result["error"] = str(e)
+            return result
+            
+        finally:
+            self.enrichment_queue.save()
+    
+    def enrich_pending_opportunities(self, max_items: Optional[int] = None) -> Dict[str, int]:
+        """
+        Drain the enrichment queue synchronously
+        
+        The vector snapshot is re-exported afterwards if enrichment changed the store.
+        
+        Args:
+            max_items: Maximum number of opportunities to enrich
+            
+        Returns:
+            Count of opportunities per action taken
+        """
+        counts = {}
+        processed = 0
+        while max_items is None or processed < max_items:
+            result = self.enrich_next_opportunity()
+            if result is None:
+                break
+            counts[result["action"]] = counts.get(result["action"], 0) + 1
+            processed += 1
+        
+        if processed:
+            self._save_processed_ids()
+        if self._snapshot_stale:
+            self._write_vector_snapshot()
+        return counts
+    
+    def start_enrichment_worker(self, poll_interval: float = 5.0):
+        """
+        Start a background thread that drains the enrichment queue
+        
+        The vector snapshot is re-exported whenever the queue runs empty after
+        enrichment changed the store.
+        
+        Args:
+            poll_interval: Seconds to wait when the queue is empty
+        """
+        if self._enrichment_thread and self._enrichment_thread.is_alive():
+            return
+        
+        self._enrichment_stop.clear()
+        
+        def worker():
+            while not self._enrichment_stop.is_set():
+                result = self.enrich_next_opportunity()
+                if result is None:
+                    if self._snapshot_stale:
+                        self._write_vector_snapshot()
+                    self._enrichment_stop.wait(poll_interval)
+                    continue
+                self._save_processed_ids()
+        
+        self._enrichment_thread = threading.Thread(target=worker, name="url-enrichment", daemon=True)
+        self._enrichment_thread.start()
+        print("Started background URL enrichment worker")
+    
+    def stop_enrichment_worker(self, timeout: Optional[float] = None):
+        """Stop the background enrichment thread"""
+        self._enrichment_stop.set()
+        if self._enrichment_thread:
+            self._enrichment_thread.join(timeout)
+            self._enrichment_thread = None
+    
     def remove_expired_opportunities(self, force: bool = False) -> int:
         """
         Remove expired opportunities from both tracking and vector database
@@ -951,7 +1262,20 @@ class FundingOpportunitiesManager:
         
         print("\nChecking for expired opportunities...")
         
-        # First, check tracked opportunities for expired ones
+        # With deadline partitions, quarters that have fully passed are dropped whole
+        try:
+            retired_ids = self.vector_db.retire_expired_partitions(now)
+        except Exception as e:
+            print(f"  ⚠️ Error retiring expired deadline partitions: {e}")
+            retired_ids = []
+        if retired_ids:
+            for opp_id in retired_ids:
+                self.processed_ids["opportunities"].pop(opp_id, None)
+                self.enrichment_queue.discard(opp_id)
+            removed_count += len(retired_ids)
+            print(f"  ✓ Dropped {len(retired_ids)} opportunities from expired deadline partitions")
+        
+        # Then check tracked opportunities for expired ones
         expired_ids = []
         expired_details = []
         
@@ -969,13 +1293,14 @@ class FundingOpportunitiesManager:
         
         # Also check opportunities in vector DB that might not be in tracking
         try:
-            all_opportunities = self.vector_db.get_all_opportunities()
-            for opp in all_opportunities:
-                if opp['id'] not in expired_ids:  # Avoid duplicates
+            seen_ids = set(expired_ids)
+            # Deadlines are in the ChromaDB metadata, so documents are not loaded
+            for opp in self.vector_db.iter_opportunities(include_documents=False):
+                if opp['id'] not in seen_ids:  # Avoid duplicates
                     deadline = opp.get('deadline', '')
                     if deadline and deadline != 'Not specified':
                         try:
-                            exp_date = self._parse_date(deadline)
+                            exp_date = parse_date(deadline)
                             if exp_date and exp_date < now:
                                 expired_ids.append(opp['id'])
                                 expired_details.append({
@@ -999,31 +1324,33 @@ class FundingOpportunitiesManager:
             
             # Batch delete from vector database
             try:
-                # ChromaDB's delete method accepts a list of IDs
-                self.vector_db.opportunities.delete(ids=expired_ids)
+                self.vector_db.delete_opportunities(expired_ids)
                 print(f"  ✓ Removed {len(expired_ids)} opportunities from vector database")
                 
                 # Remove from tracking
                 for opp_id in expired_ids:
                     if opp_id in self.processed_ids["opportunities"]:
                         del self.processed_ids["opportunities"][opp_id]
+                    self.enrichment_queue.discard(opp_id)
                 
-                removed_count = len(expired_ids)
+                removed_count += len(expired_ids)
                 
             except Exception as e:
                 print(f"  ❌ Error removing opportunities from vector DB: {e}")
                 # Try individual removal as fallback
                 for opp_id in expired_ids:
                     try:
-                        self.vector_db.opportunities.delete(ids=[opp_id])
+                        self.vector_db.delete_opportunities([opp_id])
                         if opp_id in self.processed_ids["opportunities"]:
                             del self.processed_ids["opportunities"][opp_id]
+                        self.enrichment_queue.discard(opp_id)
                         removed_count += 1
                     except Exception as e2:
                         print(f"  ❌ Error removing {opp_id}: {e2}")
         
         if removed_count > 0:
             print(f"  ✓ Successfully removed {removed_count} expired opportunities")
+            self.enrichment_queue.save()
             # Save updated tracking
             self._save_processed_ids()
         else:
@@ -1042,7 +1369,8 @@ class FundingOpportunitiesManager:
             "vector_db_stats": self.vector_db.get_collection_stats(),
             "last_cleanup": self.processed_ids.get("last_cleanup"),
             "csv_files_pending": len(list(self.funding_dir.glob("*.csv"))),
-            "csv_files_ingested": len(list(self.ingested_dir.glob("*.csv")))
+            "csv_files_ingested": len(list(self.ingested_dir.glob("*.csv"))),
+            "enrichment_pending": len(self.enrichment_queue)
         }
         
         # Count opportunities by expiration status
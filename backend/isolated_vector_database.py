@@ -6,13 +6,21 @@ Uses separate ChromaDB instances for users and opportunities to prevent corrupti
 import os
 import json
 import chromadb
-from chromadb.config import Settings
 from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 from datetime import datetime
 import shutil
 import traceback
 
+try:
+    from .opportunity_metadata import typed_metadata, build_opportunity_filter
+    from .client_registry import get_chroma_client, release_chroma_client
+    from .concurrency import ReadWriteLock
+except ImportError:
+    from opportunity_metadata import typed_metadata, build_opportunity_filter
+    from client_registry import get_chroma_client, release_chroma_client
+    from concurrency import ReadWriteLock
+
 
 class IsolatedVectorDatabaseManager:
     """Manages vector storage with complete isolation between users and opportunities"""
@@ -33,6 +41,9 @@ class IsolatedVectorDatabaseManager:
         self.opportunities_db_path = opportunities_db_path
         self.proposals_db_path = proposals_db_path
         
+        # Reads run in parallel; writes and recovery are exclusive
+        self.rw_lock = ReadWriteLock()
+        
         # Initialize separate clients
         self.users_client = self._init_client(users_db_path, "users")
         self.opportunities_client = self._init_client(opportunities_db_path, "opportunities")
@@ -46,13 +57,7 @@ class IsolatedVectorDatabaseManager:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                client = chromadb.PersistentClient(
-                    path=db_path,
-                    settings=Settings(
-                        anonymized_telemetry=False,
-                        allow_reset=True
-                    )
-                )
+                client = get_chroma_client(db_path)
                 print(f"✓ Successfully initialized {db_name} database at {db_path}")
                 return client
             except Exception as e:
@@ -60,6 +65,7 @@ class IsolatedVectorDatabaseManager:
                 
                 if attempt < max_retries - 1:
                     # Remove corrupted database and retry
+                    release_chroma_client(db_path)
                     if os.path.exists(db_path):
                         try:
                             shutil.rmtree(db_path)
@@ -104,26 +110,40 @@ class IsolatedVectorDatabaseManager:
             print(f"Error initializing proposals collection: {e}")
             self.proposals = None
     
-    def _safe_operation(self, operation_name: str, operation_func, *args, **kwargs):
-        """Execute database operation with error isolation"""
+    # Error messages that indicate real corruption. Transient errors such as
+    # "database is locked" are not among them and never trigger a re-initialization
+    CORRUPTION_ERRORS = ("no such column", "no such table", "malformed", "not a database", "corrupt")
+    
+    def _safe_operation(self, operation_name: str, operation_func, *args, write: bool = False, **kwargs):
+        """
+        Execute database operation with error isolation
+        
+        Args:
+            operation_name: Name used in logs and to pick the database to recover
+            operation_func: The operation
+            write: Run under the exclusive write lock instead of the shared read lock
+        """
+        lock = self.rw_lock.write_locked() if write else self.rw_lock.read_locked()
         try:
-            return operation_func(*args, **kwargs)
+            with lock:
+                return operation_func(*args, **kwargs)
         except Exception as e:
             print(f"Error in {operation_name}: {e}")
             traceback.print_exc()
             
             # Check if it's a corruption error
             error_str = str(e).lower()
-            if "no such column" in error_str or "database" in error_str or "corrupt" in error_str:
+            if any(marker in error_str for marker in self.CORRUPTION_ERRORS):
                 print(f"Database corruption detected in {operation_name}")
                 
-                # Attempt recovery based on operation
-                if "researcher" in operation_name.lower():
-                    self._attempt_recovery("users")
-                elif "opportunit" in operation_name.lower():
-                    self._attempt_recovery("opportunities")
-                elif "proposal" in operation_name.lower():
-                    self._attempt_recovery("proposals")
+                # Recovery swaps clients and collections, so no other operation may be running
+                with self.rw_lock.write_locked():
+                    if "researcher" in operation_name.lower():
+                        self._attempt_recovery("users")
+                    elif "opportunit" in operation_name.lower():
+                        self._attempt_recovery("opportunities")
+                    elif "proposal" in operation_name.lower():
+                        self._attempt_recovery("proposals")
             
             return None
     
@@ -188,7 +208,7 @@ class IsolatedVectorDatabaseManager:
             
             return True
         
-        return self._safe_operation("add_researcher_profile", _add)
+        return self._safe_operation("add_researcher_profile", _add, write=True)
     
     def add_funding_opportunity(self, opp_id: str, opportunity: Dict[str, Any], embedding: List[float]):
         """Add funding opportunity with isolated error handling"""
@@ -203,7 +223,8 @@ class IsolatedVectorDatabaseManager:
                 "deadline": opportunity.get("close_date", ""),
                 "url": opportunity.get("url", ""),
                 "program": opportunity.get("program", ""),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(),
+                **typed_metadata(opportunity)
             }
             
             # Store in ChromaDB
@@ -216,7 +237,7 @@ class IsolatedVectorDatabaseManager:
             
             return True
         
-        return self._safe_operation("add_funding_opportunity", _add)
+        return self._safe_operation("add_funding_opportunity", _add, write=True)
     
     def batch_add_opportunities(self, opportunities: List[Tuple[str, Dict[str, Any], List[float]]]):
         """Batch add opportunities with isolated error handling"""
@@ -240,7 +261,8 @@ class IsolatedVectorDatabaseManager:
                     "deadline": opportunity.get("close_date", ""),
                     "url": opportunity.get("url", ""),
                     "program": opportunity.get("program", ""),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": datetime.now().isoformat(),
+                    **typed_metadata(opportunity)
                 }
                 metadatas.append(metadata)
                 documents.append(json.dumps(opportunity))
@@ -255,36 +277,116 @@ class IsolatedVectorDatabaseManager:
             
             return True
         
-        return self._safe_operation("batch_add_opportunities", _batch_add)
+        return self._safe_operation("batch_add_opportunities", _batch_add, write=True)
     
     def search_opportunities_for_profile(self, 
                                        profile_embedding: List[float], 
                                        n_results: int = 20,
-                                       filter_dict: Optional[Dict] = None) -> List[Dict[str, Any]]:
-        """Search opportunities with isolated error handling"""
+                                       filter_dict: Optional[Dict] = None,
+                                       deadline_after=None,
+                                       deadline_before=None,
+                                       agencies: Optional[List[str]] = None,
+                                       programs: Optional[List[str]] = None,
+                                       phases: Optional[List[str]] = None,
+                                       include_documents: bool = True) -> List[Dict[str, Any]]:
+        """Search opportunities with isolated error handling (filters as in VectorDatabaseManager)"""
+        filters = {
+            "filter_dict": filter_dict,
+            "deadline_after": deadline_after,
+            "deadline_before": deadline_before,
+            "agencies": agencies,
+            "programs": programs,
+            "phases": phases
+        }
+        return self.batch_search_opportunities([profile_embedding], n_results, [filters],
+                                               include_documents=include_documents)[0]
+    
+    def batch_search_opportunities(self,
+                                   profile_embeddings: List[List[float]],
+                                   n_results: int = 20,
+                                   filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+                                   include_documents: bool = True) -> List[List[Dict[str, Any]]]:
+        """Search opportunities for many embeddings at once (filters as in VectorDatabaseManager)"""
+        if filters is None:
+            filters = [None] * len(profile_embeddings)
+        if len(filters) != len(profile_embeddings):
+            raise ValueError("Expected one filter per query embedding")
+        
+        # Queries sharing a where clause go to ChromaDB as one multi-embedding query
+        groups = {}
+        for i, query_filters in enumerate(filters):
+            query_filters = dict(query_filters or {})
+            where = build_opportunity_filter(
+                deadline_after=query_filters.get("deadline_after"),
+                deadline_before=query_filters.get("deadline_before"),
+                agencies=query_filters.get("agencies"),
+                programs=query_filters.get("programs"),
+                phases=query_filters.get("phases"),
+                base_filter=query_filters.get("filter_dict")
+            )
+            groups.setdefault(json.dumps(where, sort_keys=True), (where, []))[1].append(i)
+        
+        # Metadata-only projection skips loading and decoding full documents
+        field = 'documents' if include_documents else 'metadatas'
+        
         def _search():
             if not self.opportunities:
                 raise Exception("Opportunities collection not initialized")
-                
-            # Query ChromaDB
-            results = self.opportunities.query(
-                query_embeddings=[profile_embedding],
-                n_results=n_results,
-                where=filter_dict
-            )
             
-            # Parse results
-            opportunities = []
-            for i in range(len(results['ids'][0])):
-                opportunity = json.loads(results['documents'][0][i])
-                opportunity['similarity_score'] = 1 - results['distances'][0][i]
-                opportunity['match_id'] = results['ids'][0][i]
-                opportunities.append(opportunity)
+            all_results = [[] for _ in profile_embeddings]
+            decoded = {}
+            for where, indices in groups.values():
+                results = self.opportunities.query(
+                    query_embeddings=[profile_embeddings[i] for i in indices],
+                    n_results=n_results,
+                    where=where,
+                    include=[field, 'distances']
+                )
                 
-            return opportunities
+                for row, query_index in enumerate(indices):
+                    opportunities = []
+                    for opp_id, distance, stored in zip(results['ids'][row],
+                                                        results['distances'][row],
+                                                        results[field][row]):
+                        if opp_id not in decoded:
+                            decoded[opp_id] = json.loads(stored) if isinstance(stored, str) else dict(stored or {})
+                        opportunity = dict(decoded[opp_id])
+                        opportunity['similarity_score'] = 1 - distance
+                        opportunity['match_id'] = opp_id
+                        opportunities.append(opportunity)
+                    all_results[query_index] = opportunities
+            
+            return all_results
         
-        result = self._safe_operation("search_opportunities_for_profile", _search)
-        return result if result is not None else []
+        result = self._safe_operation("batch_search_opportunities", _search)
+        return result if result is not None else [[] for _ in profile_embeddings]
+    
+    def get_opportunities(self, opp_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several opportunity documents in one request with error isolation"""
+        def _get():
+            if not self.opportunities or not opp_ids:
+                return {}
+            result = self.opportunities.get(ids=list(dict.fromkeys(opp_ids)), include=['documents'])
+            return {opp_id: json.loads(document) for opp_id, document in zip(result['ids'], result['documents'])}
+        
+        result = self._safe_operation("get_opportunities", _get)
+        return result if result is not None else {}
+    
+    def hydrate_opportunities(self, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Replace projected (metadata-only) search results with full documents"""
+        documents = self.get_opportunities([match['match_id'] for match in matches])
+        hydrated = []
+        for match in matches:
+            document = documents.get(match['match_id'])
+            if document is None:
+                hydrated.append(match)
+                continue
+            hydrated.append({
+                **document,
+                'similarity_score': match['similarity_score'],
+                'match_id': match['match_id']
+            })
+        return hydrated
     
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics with error isolation"""
@@ -425,7 +527,7 @@ class IsolatedVectorDatabaseManager:
                 )
             return True
         
-        return self._safe_operation(f"clear_{collection_name}", _clear)
+        return self._safe_operation(f"clear_{collection_name}", _clear, write=True)
     
     def remove_researcher(self, researcher_id: str):
         """Remove researcher with error isolation"""
@@ -435,7 +537,7 @@ class IsolatedVectorDatabaseManager:
             self.researchers.delete(ids=[researcher_id])
             return True
         
-        return self._safe_operation("remove_researcher", _remove)
+        return self._safe_operation("remove_researcher", _remove, write=True)
     
     def validate_databases(self) -> Dict[str, Any]:
         """Validate all databases and report status"""
@@ -0,0 +1,302 @@
+"""
+Lexical Index for FundingMatch
+SQLite inverted index over opportunity text for BM25 search and keyword lookups
+"""
+
+import re
+import json
+import math
+import sqlite3
+import threading
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has in is it its of on or that the this to was were will with
+""".split())
+
+# Text fields indexed for BM25, with how many times each counts towards term frequency
+INDEXED_FIELDS = (("title", 2), ("description", 1), ("keywords", 1))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(str(text or "").lower()) if token not in STOPWORDS]
+
+
+def keyword_list(value: Any) -> List[str]:
+    """Keywords stored as a list, a JSON list string or a comma-separated string"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.split(',')
+    if not isinstance(value, list):
+        return []
+    return [str(keyword).strip() for keyword in value if str(keyword).strip()]
+
+
+def bm25_scores(query: str, opportunities: List[Dict[str, Any]],
+                k1: float = 1.2, b: float = 0.75) -> List[float]:
+    """
+    BM25 score of each opportunity for a query, computed in memory
+
+    Uses the same fields and weights as LexicalIndex, for lists that are not
+    stored in an index (e.g. opportunities fetched from external APIs).
+
+    Args:
+        query: Free-text query
+        opportunities: Opportunity dicts
+        k1: BM25 term frequency saturation
+        b: BM25 length normalization
+
+    Returns:
+        Scores in the order of `opportunities`
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    documents = [LexicalIndex._analyze(opportunity)[0] for opportunity in opportunities]
+    if not terms or not documents:
+        return [0.0] * len(documents)
+
+    lengths = [sum(frequencies.values()) for frequencies in documents]
+    average_length = sum(lengths) / len(lengths) or 1
+    scores = [0.0] * len(documents)
+    for term in terms:
+        containing = sum(1 for frequencies in documents if term in frequencies)
+        if not containing:
+            continue
+        idf = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+        for i, frequencies in enumerate(documents):
+            tf = frequencies.get(term, 0)
+            if tf:
+                norm = k1 * (1 - b + b * lengths[i] / average_length)
+                scores[i] += idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+class LexicalIndex:
+    """
+    Inverted index kept next to the opportunity document store.
+
+    Two posting tables are maintained on every write: term postings over
+    title, description and keywords (ranked with BM25), and keyword-term
+    postings that make keyword matching a lookup. An interest matches a
+    keyword when the tokens of one contain all tokens of the other.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    MAX_BATCH = 500
+
+    def __init__(self, db_path: str, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the index
+
+        Args:
+            db_path: SQLite database file
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.Lock()
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self):
+        """Create the index tables"""
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS lexical_documents (
+                id TEXT PRIMARY KEY,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lexical_postings (
+                term TEXT NOT NULL,
+                id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS lexical_postings_id ON lexical_postings (id);
+            CREATE TABLE IF NOT EXISTS keyword_terms (
+                term TEXT NOT NULL,
+                id TEXT NOT NULL,
+                keyword INTEGER NOT NULL,
+                keyword_size INTEGER NOT NULL,
+                PRIMARY KEY (term, id, keyword)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS keyword_terms_id ON keyword_terms (id);
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    @staticmethod
+    def _analyze(opportunity: Dict[str, Any]) -> Tuple[Dict[str, int], List[List[str]]]:
+        """Term frequencies and the distinct tokens of each keyword"""
+        keywords = keyword_list(opportunity.get("keywords", []))
+        frequencies: Dict[str, int] = {}
+        for field, weight in INDEXED_FIELDS:
+            text = " ".join(keywords) if field == "keywords" else opportunity.get(field, "")
+            for token in tokenize(text):
+                frequencies[token] = frequencies.get(token, 0) + weight
+
+        keyword_tokens = []
+        for keyword in keywords:
+            tokens = list(dict.fromkeys(tokenize(keyword)))
+            if tokens:
+                keyword_tokens.append(tokens)
+        return frequencies, keyword_tokens
+
+    def _delete_rows(self, conn: sqlite3.Connection, opp_ids: List[str]):
+        for chunk in self._chunks(opp_ids, self.MAX_BATCH):
+            placeholders = ','.join('?' * len(chunk))
+            for table in ("lexical_documents", "lexical_postings", "keyword_terms"):
+                conn.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', chunk)
+
+    def index_many(self, opportunities: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Index or re-index opportunities
+
+        Args:
+            opportunities: List of (opportunity_id, document) tuples
+        """
+        if not opportunities:
+            return
+
+        documents, postings, keyword_rows = [], [], []
+        for opp_id, opportunity in opportunities:
+            frequencies, keyword_tokens = self._analyze(opportunity)
+            documents.append((opp_id, sum(frequencies.values())))
+            postings.extend((term, opp_id, tf) for term, tf in frequencies.items())
+            for number, tokens in enumerate(keyword_tokens):
+                keyword_rows.extend((term, opp_id, number, len(tokens)) for term in tokens)
+
+        with self.lock:
+            conn = self._connect()
+            self._delete_rows(conn, list(dict.fromkeys(opp_id for opp_id, _ in opportunities)))
+            conn.executemany('INSERT OR REPLACE INTO lexical_documents (id, length) VALUES (?, ?)', documents)
+            conn.executemany('INSERT OR REPLACE INTO lexical_postings (term, id, tf) VALUES (?, ?, ?)', postings)
+            conn.executemany('INSERT OR REPLACE INTO keyword_terms (term, id, keyword, keyword_size) VALUES (?, ?, ?, ?)',
+                             keyword_rows)
+            conn.commit()
+            conn.close()
+
+    def delete_many(self, opp_ids: List[str]):
+        """Remove opportunities from the index (missing IDs are ignored)"""
+        unique_ids = list(dict.fromkeys(opp_ids))
+        if not unique_ids:
+            return
+        with self.lock:
+            conn = self._connect()
+            self._delete_rows(conn, unique_ids)
+            conn.commit()
+            conn.close()
+
+    def clear(self):
+        """Remove every opportunity from the index"""
+        with self.lock:
+            conn = self._connect()
+            for table in ("lexical_documents", "lexical_postings", "keyword_terms"):
+                conn.execute(f'DELETE FROM {table}')
+            conn.commit()
+            conn.close()
+
+    def count(self) -> int:
+        """Number of indexed opportunities"""
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM lexical_documents').fetchone()[0]
+        finally:
+            conn.close()
+
+    def search(self, query: str, limit: int = 20,
+               candidate_ids: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Rank opportunities for a text query with BM25
+
+        Args:
+            query: Free-text query (e.g. "SBIR Phase II autonomy")
+            limit: Number of results
+            candidate_ids: Only score these opportunities
+
+        Returns:
+            (opportunity_id, score) pairs, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        allowed = set(candidate_ids) if candidate_ids is not None else None
+        scores: Dict[str, float] = {}
+        conn = self._connect()
+        try:
+            total, average_length = conn.execute(
+                'SELECT COUNT(*), COALESCE(AVG(length), 0) FROM lexical_documents'
+            ).fetchone()
+            if not total:
+                return []
+
+            for term in terms:
+                rows = conn.execute(
+                    'SELECT p.id, p.tf, d.length FROM lexical_postings p '
+                    'JOIN lexical_documents d ON d.id = p.id WHERE p.term = ?',
+                    (term,)
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+                for opp_id, tf, length in rows:
+                    if allowed is not None and opp_id not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * length / (average_length or 1))
+                    scores[opp_id] = scores.get(opp_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        finally:
+            conn.close()
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def keyword_matches(self, interests: List[str], opp_ids: List[str]) -> Dict[str, int]:
+        """
+        Count (interest, keyword) pairs that match for each opportunity
+
+        Args:
+            interests: Research interests of a user
+            opp_ids: Opportunities to check
+
+        Returns:
+            Dict mapping opportunity ID to its number of matching pairs (IDs without matches are omitted)
+        """
+        unique_ids = list(dict.fromkeys(opp_ids))
+        interest_tokens = [list(dict.fromkeys(tokenize(interest))) for interest in interests or []]
+        interest_tokens = [tokens for tokens in interest_tokens if tokens]
+        if not unique_ids or not interest_tokens:
+            return {}
+
+        matches: Dict[str, int] = {}
+        conn = self._connect()
+        try:
+            for tokens in interest_tokens:
+                term_placeholders = ','.join('?' * len(tokens))
+                for chunk in self._chunks(unique_ids, self.MAX_BATCH):
+                    id_placeholders = ','.join('?' * len(chunk))
+                    # A keyword matches when it shares all interest tokens or all of its own
+                    rows = conn.execute(
+                        f'SELECT id, COUNT(*) AS shared, keyword_size FROM keyword_terms '
+                        f'WHERE term IN ({term_placeholders}) AND id IN ({id_placeholders}) '
+                        f'GROUP BY id, keyword HAVING shared = ? OR shared = keyword_size',
+                        [*tokens, *chunk, len(tokens)]
+                    ).fetchall()
+                    for opp_id, _, _ in rows:
+                        matches[opp_id] = matches.get(opp_id, 0) + 1
+        finally:
+            conn.close()
+        return matches
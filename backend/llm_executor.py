@@ -0,0 +1,137 @@
+"""
+Concurrent LLM executor for FundingMatch
+Runs independent LLM analysis jobs on a thread pool under a shared rate limiter
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Any, List, Dict, Optional
+
+try:
+    from .rate_limiter import RateLimiter, gemini_rate_limiter
+except ImportError:
+    from rate_limiter import RateLimiter, gemini_rate_limiter
+
+
+class LLMExecutor:
+    """
+    Thread pool for LLM jobs (one model call or analysis per item).
+
+    Jobs overlap their network latency while every model call made through
+    call() still passes the shared rate limiter, so the pool never exceeds
+    the API budget. map() returns results in input order and reports failed
+    and timed-out jobs instead of raising.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 job_timeout: Optional[float] = None,
+                 max_retries: int = 2):
+        """
+        Initialize the executor
+
+        Args:
+            max_workers: Concurrent jobs (defaults to the LLM_MAX_WORKERS
+                environment variable, then 4)
+            rate_limiter: Limiter every call() goes through (default: the shared
+                Gemini limiter)
+            job_timeout: Seconds a running job may take before it is reported as
+                timed out (defaults to the LLM_JOB_TIMEOUT environment variable,
+                then 300; 0 disables)
+            max_retries: Attempts per job for errors other than rate limits
+                (rate-limit errors are retried by the limiter itself)
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv('LLM_MAX_WORKERS', '4'))
+        if job_timeout is None:
+            job_timeout = float(os.getenv('LLM_JOB_TIMEOUT', '300'))
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = rate_limiter or gemini_rate_limiter
+        self.job_timeout = job_timeout or None
+        self.max_retries = max(1, max_retries)
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Make one rate-limited model call, retrying rate-limit errors
+
+        Raises:
+            RuntimeError: If the rate limiter gave up after repeated rate-limit errors
+        """
+        result = self.rate_limiter.execute_with_retry(lambda: func(*args, **kwargs), max_retries=3)
+        if result is None:
+            raise RuntimeError("Rate limit retries exhausted")
+        return result
+
+    def _run_job(self, func: Callable[[Any], Any], item: Any) -> Any:
+        for attempt in range(self.max_retries):
+            try:
+                return func(item)
+            except Exception:
+                if attempt == self.max_retries - 1:
+                    raise
+
+    def map(self, func: Callable[[Any], Any], items: List[Any],
+            description: str = "LLM jobs") -> Dict[str, Any]:
+        """
+        Run func on every item concurrently
+
+        Args:
+            func: Job taking one item; model calls inside should go through call()
+            items: Job inputs
+            description: Label for progress output
+
+        Returns:
+            Dict with 'results' (in input order, None for failed jobs), 'errors'
+            (list of {'index', 'error'}), 'completed' and 'failed'
+        """
+        items = list(items)
+        results: List[Any] = [None] * len(items)
+        errors: Dict[int, str] = {}
+        if not items:
+            return {"results": results, "errors": [], "completed": 0, "failed": 0}
+
+        started: Dict[int, float] = {}
+        started_lock = threading.Lock()
+
+        def run(index: int, item: Any) -> Any:
+            with started_lock:
+                started[index] = time.monotonic()
+            return self._run_job(func, item)
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)))
+        try:
+            futures = {executor.submit(run, index, item): index for index, item in enumerate(items)}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.5 if self.job_timeout else None,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        errors[index] = str(e)
+
+                if self.job_timeout:
+                    now = time.monotonic()
+                    with started_lock:
+                        expired = [future for future in pending
+                                   if futures[future] in started
+                                   and now - started[futures[future]] > self.job_timeout]
+                    for future in expired:
+                        # The worker thread cannot be interrupted; its result is discarded
+                        pending.discard(future)
+                        errors[futures[future]] = f"Timed out after {self.job_timeout:.0f} seconds"
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if errors:
+            print(f"  ⚠️  {description}: {len(errors)}/{len(items)} failed")
+        return {
+            "results": results,
+            "errors": [{"index": index, "error": errors[index]} for index in sorted(errors)],
+            "completed": len(items) - len(errors),
+            "failed": len(errors)
+        }
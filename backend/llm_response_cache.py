@@ -0,0 +1,256 @@
+"""
+LLM Response Cache for FundingMatch
+Persistent cache of model responses keyed by model, generation config and prompt hash
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def profile_tag(profile: Dict[str, Any]) -> str:
+    """Invalidation tag of responses generated for a researcher profile"""
+    name = profile.get('profile_metadata', {}).get('primary_researcher') or profile.get('name') or 'unknown'
+    return f"researcher:{name}"
+
+
+class LLMResponseCache:
+    """
+    SQLite cache of generated text.
+
+    Entries expire after `ttl_seconds` and the least recently used entries are
+    evicted beyond `max_entries`. Entries can carry tags (e.g. the researcher
+    profile the prompt was built from) so everything generated for a profile
+    can be invalidated when that profile changes.
+    """
+
+    def __init__(self, db_path: str = "./llm_response_cache.db",
+                 ttl_seconds: Optional[float] = 30 * 24 * 3600, max_entries: int = 10000):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: SQLite database file
+            ttl_seconds: Age after which an entry is stale (None keeps entries until evicted)
+            max_entries: Number of entries kept; least recently used ones are evicted
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self):
+        """Create the cache tables"""
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses(last_used);
+            CREATE TABLE IF NOT EXISTS llm_response_tags (
+                tag TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                PRIMARY KEY (tag, cache_key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_response_tags_key ON llm_response_tags(cache_key);
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _config_payload(config: Any) -> Any:
+        """JSON-compatible form of a generation config (dict or pydantic config object)"""
+        if config is None:
+            return None
+        if hasattr(config, 'model_dump'):
+            return config.model_dump(exclude_none=True)
+        return config
+
+    @classmethod
+    def make_key(cls, model: str, prompt: Any, config: Any = None) -> str:
+        """Cache key of a (model, generation config, prompt) triple"""
+        prompt_text = prompt if isinstance(prompt, str) else json.dumps(prompt, sort_keys=True, default=str)
+        prompt_hash = hashlib.sha256(prompt_text.encode('utf-8')).hexdigest()
+        payload = json.dumps([model, cls._config_payload(config), prompt_hash], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, model: str, prompt: Any, config: Any = None) -> Optional[str]:
+        """
+        Cached response text, None on a miss or for an expired entry
+        """
+        cache_key = self.make_key(model, prompt, config)
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT response, created_at FROM llm_responses WHERE cache_key = ?',
+                                   (cache_key,)).fetchone()
+                if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                    self._delete_keys(conn, [cache_key])
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    conn.commit()
+                    return None
+                conn.execute('UPDATE llm_responses SET last_used = ?, hits = hits + 1 WHERE cache_key = ?',
+                             (now, cache_key))
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            finally:
+                conn.close()
+
+    def put(self, model: str, prompt: Any, response: str, config: Any = None, tags: Iterable[str] = ()):
+        """
+        Store a response, then drop expired entries and evict beyond max_entries
+
+        Args:
+            model: Model name
+            prompt: Prompt (text or contents)
+            response: Generated text
+            config: Generation config the response was produced with
+            tags: Invalidation tags (see invalidate())
+        """
+        cache_key = self.make_key(model, prompt, config)
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            try:
+                conn.execute('''
+                    INSERT OR REPLACE INTO llm_responses (cache_key, model, response, created_at, last_used, hits)
+                    VALUES (?, ?, ?, ?, ?, 0)
+                ''', (cache_key, model, response, now, now))
+                conn.executemany('INSERT OR IGNORE INTO llm_response_tags (tag, cache_key) VALUES (?, ?)',
+                                 [(tag, cache_key) for tag in tags])
+                self._evict(conn, now)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def discard(self, model: str, prompt: Any, config: Any = None):
+        """Remove one entry (e.g. a response that turned out to be unusable)"""
+        with self.lock:
+            conn = self._connect()
+            try:
+                self._delete_keys(conn, [self.make_key(model, prompt, config)])
+                conn.commit()
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _delete_keys(conn: sqlite3.Connection, keys):
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            conn.execute(f'DELETE FROM llm_responses WHERE cache_key IN ({placeholders})', chunk)
+            conn.execute(f'DELETE FROM llm_response_tags WHERE cache_key IN ({placeholders})', chunk)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        if self.ttl_seconds is not None:
+            expired = [row[0] for row in conn.execute('SELECT cache_key FROM llm_responses WHERE created_at < ?',
+                                                      (now - self.ttl_seconds,))]
+            self._delete_keys(conn, expired)
+        excess = conn.execute('SELECT COUNT(*) FROM llm_responses').fetchone()[0] - self.max_entries
+        if excess > 0:
+            oldest = [row[0] for row in conn.execute(
+                'SELECT cache_key FROM llm_responses ORDER BY last_used LIMIT ?', (excess,))]
+            self._delete_keys(conn, oldest)
+
+    def invalidate(self, tag: str) -> int:
+        """
+        Remove every entry carrying a tag
+
+        Returns:
+            Number of removed entries
+        """
+        with self.lock:
+            conn = self._connect()
+            try:
+                keys = [row[0] for row in conn.execute('SELECT cache_key FROM llm_response_tags WHERE tag = ?', (tag,))]
+                self._delete_keys(conn, keys)
+                conn.commit()
+            finally:
+                conn.close()
+        return len(keys)
+
+    def clear(self):
+        """Remove every entry"""
+        with self.lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM llm_responses')
+            conn.execute('DELETE FROM llm_response_tags')
+            conn.commit()
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Stored entries and this process's hit/miss counts"""
+        conn = self._connect()
+        entries = conn.execute('SELECT COUNT(*) FROM llm_responses').fetchone()[0]
+        conn.close()
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+    def generate(self, generate: Callable[[], Any], model: str, prompt: Any, config: Any = None,
+                 tags: Iterable[str] = ()) -> str:
+        """
+        Cached response text for a prompt, calling `generate` on a miss
+
+        Args:
+            generate: Makes the model call and returns a response with a .text attribute
+            model: Model name
+            prompt: Prompt (text or contents)
+            config: Generation config
+            tags: Invalidation tags stored with a new entry
+
+        Returns:
+            Response text
+        """
+        cached = self.get(model, prompt, config)
+        if cached is not None:
+            return cached
+        text = generate().text
+        if text:
+            self.put(model, prompt, text, config, tags)
+        return text
+
+
+# Shared instance so every matcher in the process uses the same cache file
+_shared_llm_response_cache: Optional[LLMResponseCache] = None
+_shared_llm_response_cache_lock = threading.Lock()
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """
+    Get or create the shared response cache
+
+    Configured by LLM_RESPONSE_CACHE (set to "false" to disable, returning None),
+    LLM_RESPONSE_CACHE_PATH, LLM_RESPONSE_CACHE_TTL (seconds, 0 = no expiry) and
+    LLM_RESPONSE_CACHE_MAX_ENTRIES.
+    """
+    global _shared_llm_response_cache
+    if os.getenv('LLM_RESPONSE_CACHE', 'true').lower() != 'true':
+        return None
+    with _shared_llm_response_cache_lock:
+        if _shared_llm_response_cache is None:
+            ttl = float(os.getenv('LLM_RESPONSE_CACHE_TTL', str(30 * 24 * 3600)))
+            _shared_llm_response_cache = LLMResponseCache(
+                db_path=os.getenv('LLM_RESPONSE_CACHE_PATH', './llm_response_cache.db'),
+                ttl_seconds=ttl or None,
+                max_entries=int(os.getenv('LLM_RESPONSE_CACHE_MAX_ENTRIES', '10000'))
+            )
+        return _shared_llm_response_cache
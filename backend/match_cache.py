@@ -0,0 +1,168 @@
+"""
+Match Result Cache for FundingMatch
+Formatted match lists keyed by profile embedding hash and opportunity corpus version
+"""
+
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class MatchResultCache:
+    """
+    Two-level cache (in-memory LRU over SQLite) of /api/match results.
+
+    A key combines the profile embedding hash, the opportunity corpus version
+    and the request options, so an entry can never be stale: a new profile
+    embedding or any opportunity write produces a different key. When an entry
+    is stored, the user's entries from older generations (profile hash and
+    corpus version) are pruned.
+    """
+
+    def __init__(self, db_path: str, max_memory_entries: int = 1000):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: SQLite database file
+            max_memory_entries: Entries kept in the in-memory LRU
+        """
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.lock = threading.Lock()
+        self._memory: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        # Key whose matches were last written to the matching results database, per user
+        self._saved_keys: Dict[str, str] = {}
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_database(self):
+        """Create the cache table"""
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS match_cache (
+                user_id TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                generation TEXT NOT NULL,
+                entry TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, cache_key)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def generation(profile_hash: str, corpus_version: int) -> str:
+        """Profile and corpus state that entries are computed against"""
+        return f"{profile_hash}:{corpus_version}"
+
+    @staticmethod
+    def make_key(profile_hash: str, corpus_version: int, n_results: int,
+                 options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Cache key of a match request
+
+        Args:
+            profile_hash: Hash of the user's profile embedding
+            corpus_version: Opportunity corpus version the results were computed against
+            n_results: Number of requested results
+            options: Other request options that change the results (filters, re-ranking, ...)
+        """
+        payload = json.dumps([MatchResultCache.generation(profile_hash, corpus_version), n_results, options or {}],
+                             sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _remember(self, user_id: str, cache_key: str, entry: Dict[str, Any]):
+        self._memory[(user_id, cache_key)] = entry
+        self._memory.move_to_end((user_id, cache_key))
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, user_id: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry for a key
+
+        Returns:
+            Dict with 'generation', 'matches' and 'match_ids', or None on a miss
+        """
+        with self.lock:
+            entry = self._memory.get((user_id, cache_key))
+            if entry is not None:
+                self._memory.move_to_end((user_id, cache_key))
+                return entry
+
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT entry FROM match_cache WHERE user_id = ? AND cache_key = ?',
+                               (user_id, cache_key)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+
+        entry = json.loads(row[0])
+        with self.lock:
+            self._remember(user_id, cache_key, entry)
+        return entry
+
+    def put(self, user_id: str, cache_key: str, generation: str,
+            matches: List[Dict[str, Any]], match_ids: List[str]):
+        """
+        Store the results of a request, pruning the user's entries from other generations
+
+        Args:
+            user_id: User identifier
+            cache_key: Key from make_key()
+            generation: Value of generation() for the same profile hash and corpus version
+            matches: Formatted matches
+            match_ids: Opportunity IDs of the matches, in search order
+        """
+        entry = {'generation': generation, 'matches': matches, 'match_ids': match_ids}
+        with self.lock:
+            for key in [key for key, cached in self._memory.items()
+                        if key[0] == user_id and cached['generation'] != generation]:
+                del self._memory[key]
+            self._remember(user_id, cache_key, entry)
+
+            conn = self._connect()
+            conn.execute('DELETE FROM match_cache WHERE user_id = ? AND generation != ?', (user_id, generation))
+            conn.execute('INSERT OR REPLACE INTO match_cache (user_id, cache_key, generation, entry, created_at) '
+                         'VALUES (?, ?, ?, ?, ?)',
+                         (user_id, cache_key, generation, json.dumps(entry, default=str), datetime.now().isoformat()))
+            conn.commit()
+            conn.close()
+
+    def is_saved(self, user_id: str, cache_key: str) -> bool:
+        """True if the matches for this key are the ones last saved for the user"""
+        with self.lock:
+            return self._saved_keys.get(user_id) == cache_key
+
+    def mark_saved(self, user_id: str, cache_key: str):
+        """Record that the matches for this key were saved for the user"""
+        with self.lock:
+            self._saved_keys[user_id] = cache_key
+
+    def forget_saved(self, user_id: str):
+        """Record that the user's saved matches no longer come from any cached entry"""
+        with self.lock:
+            self._saved_keys.pop(user_id, None)
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached entry of a user"""
+        with self.lock:
+            for key in [key for key in self._memory if key[0] == user_id]:
+                del self._memory[key]
+            self._saved_keys.pop(user_id, None)
+
+            conn = self._connect()
+            conn.execute('DELETE FROM match_cache WHERE user_id = ?', (user_id,))
+            conn.commit()
+            conn.close()
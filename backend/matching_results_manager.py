@@ -53,6 +53,20 @@ class MatchingResultsManager:
             ON funding_matches(user_id, confidence_score DESC)
         """)
         
+        # New high-confidence matches found by incremental matching after ingestion
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS match_alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                opportunity_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                confidence_score REAL NOT NULL,
+                seen INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(user_id, opportunity_id)
+            )
+        """)
+        
         conn.commit()
         conn.close()
     
@@ -75,27 +89,7 @@ class MatchingResultsManager:
             cursor.execute("DELETE FROM funding_matches WHERE user_id = ?", (user_id,))
             
             # Insert new matches
-            for match in matches:
-                # Extract opportunity ID from match
-                opp_id = match.get('match_id', '') or match.get('id', '') or match.get('title', '').replace(' ', '_')[:50]
-                
-                cursor.execute("""
-                    INSERT OR REPLACE INTO funding_matches 
-                    (user_id, opportunity_id, title, agency, deadline, url, 
-                     description, keywords, confidence_score, similarity_score)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    user_id,
-                    opp_id,
-                    match.get('title', 'Unknown'),
-                    match.get('agency', 'Unknown'),
-                    match.get('deadline', match.get('close_date', 'Not specified')),
-                    match.get('url', ''),
-                    match.get('description', ''),
-                    json.dumps(match.get('keywords', [])),
-                    match.get('confidence_score', 0),
-                    match.get('similarity_score', 0)
-                ))
+            self._insert_matches(cursor, user_id, matches)
             
             conn.commit()
             conn.close()
@@ -105,6 +99,172 @@ class MatchingResultsManager:
             print(f"Error saving matches: {e}")
             return False
     
+    @staticmethod
+    def _insert_matches(cursor: sqlite3.Cursor, user_id: str, matches: List[Dict[str, Any]]):
+        """Insert or replace match rows for a user"""
+        for match in matches:
+            # Extract opportunity ID from match
+            opp_id = match.get('match_id', '') or match.get('id', '') or match.get('title', '').replace(' ', '_')[:50]
+            
+            cursor.execute("""
+                INSERT OR REPLACE INTO funding_matches 
+                (user_id, opportunity_id, title, agency, deadline, url, 
+                 description, keywords, confidence_score, similarity_score)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                user_id,
+                opp_id,
+                match.get('title', 'Unknown'),
+                match.get('agency', 'Unknown'),
+                match.get('deadline', match.get('close_date', 'Not specified')),
+                match.get('url', ''),
+                match.get('description', ''),
+                json.dumps(match.get('keywords', [])),
+                match.get('confidence_score', 0),
+                match.get('similarity_score', 0)
+            ))
+    
+    def merge_matches(self, user_id: str, matches: List[Dict[str, Any]], limit: Optional[int] = None) -> bool:
+        """
+        Add matches to a user's stored matches, keeping the existing ones
+        
+        Args:
+            user_id: User identifier
+            matches: Matches to add (replacing stored rows for the same opportunity)
+            limit: Keep only this many matches with the highest similarity
+                   (the added ones win ties), None to keep all
+            
+        Returns:
+            Success status
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            self._insert_matches(cursor, user_id, matches)
+            if limit is not None:
+                cursor.execute("""
+                    DELETE FROM funding_matches
+                    WHERE user_id = ? AND id NOT IN (
+                        SELECT id FROM funding_matches WHERE user_id = ?
+                        ORDER BY similarity_score DESC, id DESC LIMIT ?
+                    )
+                """, (user_id, user_id, limit))
+            conn.commit()
+            conn.close()
+            return True
+            
+        except Exception as e:
+            print(f"Error merging matches: {e}")
+            return False
+    
+    def get_similarity_scores(self, user_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        Stored similarity scores per user
+        
+        Args:
+            user_ids: Users to look up
+            
+        Returns:
+            Dict mapping each user with stored matches to their similarity scores, highest first
+        """
+        scores = {}
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            for start in range(0, len(user_ids), 500):
+                chunk = list(user_ids[start:start + 500])
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f"""
+                    SELECT user_id, similarity_score
+                    FROM funding_matches
+                    WHERE user_id IN ({placeholders})
+                    ORDER BY user_id, similarity_score DESC
+                """, chunk)
+                for user_id, score in cursor.fetchall():
+                    scores.setdefault(user_id, []).append(score)
+            conn.close()
+            
+        except Exception as e:
+            print(f"Error getting similarity scores: {e}")
+        return scores
+    
+    def record_match_alerts(self, user_id: str, matches: List[Dict[str, Any]]) -> bool:
+        """
+        Record new high-confidence matches for a user
+        
+        Args:
+            user_id: User identifier
+            matches: Matches with match_id, title and confidence_score
+            
+        Returns:
+            Success status
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO match_alerts (user_id, opportunity_id, title, confidence_score)
+                VALUES (?, ?, ?, ?)
+            """, [(user_id, match['match_id'], match.get('title', 'Unknown'), match.get('confidence_score', 0))
+                  for match in matches])
+            conn.commit()
+            conn.close()
+            return True
+            
+        except Exception as e:
+            print(f"Error recording match alerts: {e}")
+            return False
+    
+    def get_match_alerts(self, user_id: Optional[str] = None, unseen_only: bool = True) -> List[Dict[str, Any]]:
+        """
+        New high-confidence matches recorded after ingestion
+        
+        Args:
+            user_id: Only alerts for this user (default: all users)
+            unseen_only: Skip alerts already marked as seen
+            
+        Returns:
+            Alerts, newest and most confident first
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            
+            conditions = []
+            params = []
+            if user_id is not None:
+                conditions.append("user_id = ?")
+                params.append(user_id)
+            if unseen_only:
+                conditions.append("seen = 0")
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            
+            cursor.execute(f"""
+                SELECT user_id, opportunity_id, title, confidence_score, seen, created_at
+                FROM match_alerts {where}
+                ORDER BY created_at DESC, confidence_score DESC
+            """, params)
+            alerts = [dict(row) for row in cursor.fetchall()]
+            
+            conn.close()
+            return alerts
+            
+        except Exception as e:
+            print(f"Error getting match alerts: {e}")
+            return []
+    
+    def mark_alerts_seen(self, user_id: str):
+        """Mark every alert of a user as seen"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("UPDATE match_alerts SET seen = 1 WHERE user_id = ?", (user_id,))
+            conn.commit()
+            conn.close()
+            
+        except Exception as e:
+            print(f"Error marking match alerts as seen: {e}")
+    
     def get_matches(self, user_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Retrieve matching results for a user
@@ -0,0 +1,333 @@
+"""
+Opportunity Metadata for FundingMatch
+Normalized, typed metadata for funding opportunities and ChromaDB filter building
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+
+# Bump when the typed metadata fields change so stored rows get backfilled
+METADATA_SCHEMA_VERSION = 1
+
+# deadline_ts values for opportunities without a calendar deadline.
+# Continuous submissions sort after every real deadline; unknown deadlines
+# (e.g. awaiting URL enrichment) are excluded by any deadline filter.
+CONTINUOUS_DEADLINE_TS = 4102444800  # 2100-01-01T00:00:00Z
+UNKNOWN_DEADLINE_TS = 0
+
+# Storage partition for opportunities that never expire by date (continuous or unknown deadline)
+CONTINUOUS_PARTITION = "continuous"
+QUARTER_PARTITION = re.compile(r"^(\d{4})q([1-4])$")
+
+AGENCY_CODES = {
+    "national science foundation": "NSF",
+    "national institutes of health": "NIH",
+    "department of defense": "DOD",
+    "department of energy": "DOE",
+    "department of health and human services": "HHS",
+    "health and human services": "HHS",
+    "national aeronautics and space administration": "NASA",
+    "department of agriculture": "USDA",
+    "us department of agriculture": "USDA",
+    "department of homeland security": "DHS",
+    "department of transportation": "DOT",
+    "department of education": "ED",
+    "department of commerce": "DOC",
+    "environmental protection agency": "EPA",
+    "national oceanic and atmospheric administration": "NOAA",
+    "defense advanced research projects agency": "DARPA",
+    "air force": "USAF",
+    "department of the air force": "USAF",
+    "department of the army": "ARMY",
+    "department of the navy": "NAVY",
+}
+
+PHASE_NUMERALS = {"1": "I", "2": "II", "3": "III"}
+
+
+def parse_date(date_string: str) -> Optional[datetime]:
+    """Parse various date formats"""
+    if not date_string or date_string.strip() == "":
+        return None
+        
+    # Clean the date string
+    date_string = date_string.strip()
+    
+    # Handle multiple dates like "2025-09-16, 2025-09-16" or "2025-03-15, 2025-09-15"
+    if ',' in date_string:
+        # Split by comma and parse all dates
+        date_parts = date_string.split(',')
+        parsed_dates = []
+        
+        for part in date_parts:
+            part = part.strip()
+            if part:
+                # Try to parse this part (without recursion to avoid infinite loop)
+                for fmt in ["%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y", "%d/%m/%Y"]:
+                    try:
+                        parsed = datetime.strptime(part, fmt).replace(tzinfo=timezone.utc)
+                        parsed_dates.append(parsed)
+                        break
+                    except ValueError:
+                        continue
+        
+        if parsed_dates:
+            # Return the earliest future date
+            now = datetime.now(timezone.utc)
+            future_dates = [d for d in parsed_dates if d >= now]
+            if future_dates:
+                return min(future_dates)
+            # If all dates are past, return the most recent one
+            return max(parsed_dates)
+        
+        # If we couldn't parse any part, continue with normal parsing
+        date_string = date_parts[0].strip()
+    
+    # Try different date formats
+    date_formats = [
+        "%Y-%m-%d",
+        "%m/%d/%Y",
+        "%B %d, %Y",
+        "%d-%m-%Y",
+        "%Y/%m/%d",
+        "%b %d, %Y",  # Jan 1, 2025
+        "%B %d %Y",   # January 1 2025
+        "%b %d %Y",   # Jan 1 2025
+        "%d %B %Y",   # 1 January 2025
+        "%d %b %Y",   # 1 Jan 2025
+        "%m-%d-%Y",
+        "%d/%m/%Y",
+        "%Y.%m.%d",
+        "%d.%m.%Y"
+    ]
+    
+    for fmt in date_formats:
+        try:
+            return datetime.strptime(date_string, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    
+    # Try to extract date from text like "August 20, 2025"
+    date_pattern = re.compile(r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{1,2}),?\s+(\d{4})')
+    match = date_pattern.search(date_string)
+    if match:
+        try:
+            return datetime.strptime(match.group(0), "%B %d, %Y").replace(tzinfo=timezone.utc)
+        except (ValueError, TypeError):
+            pass
+            
+    return None
+
+
+def deadline_timestamp(opportunity: Dict[str, Any]) -> int:
+    """
+    Deadline of an opportunity as a UTC epoch timestamp
+
+    Returns:
+        Epoch seconds, CONTINUOUS_DEADLINE_TS for anytime submissions or
+        UNKNOWN_DEADLINE_TS if no deadline can be parsed
+    """
+    close_date = str(opportunity.get("close_date", "") or "")
+    if opportunity.get("accepts_anytime") or close_date.strip().lower() in ("continuous", "anytime", "rolling"):
+        return CONTINUOUS_DEADLINE_TS
+
+    for field in ("close_date", "Close Date", "deadline", "Deadline", "Next due date (Y-m-d)"):
+        value = opportunity.get(field)
+        if value:
+            parsed = parse_date(str(value))
+            if parsed:
+                return int(parsed.timestamp())
+
+    return UNKNOWN_DEADLINE_TS
+
+
+def normalize_agency(agency: str) -> str:
+    """Map an agency name to a short uppercase code (e.g. "National Science Foundation" -> "NSF")"""
+    agency = (agency or "").strip()
+    if not agency:
+        return ""
+
+    key = re.sub(r"[^a-z ]", "", agency.lower().replace("u.s.", "us")).strip()
+    key = re.sub(r"\s+", " ", key)
+    if key in AGENCY_CODES:
+        return AGENCY_CODES[key]
+
+    # Already an acronym such as "DOD" or "HHS"
+    return agency.upper()
+
+
+def normalize_program(program: str) -> str:
+    """Normalize a program name (e.g. " sbir " -> "SBIR")"""
+    return re.sub(r"\s+", " ", (program or "").strip()).upper()
+
+
+def normalize_phase(phase: str) -> str:
+    """Normalize a phase label to roman numerals (e.g. "Phase 2" -> "II", "Phase I/II" -> "I/II")"""
+    phase = re.sub(r"(?i)\bphase\b", "", str(phase or "")).strip().upper()
+    if not phase:
+        return ""
+    return "/".join(PHASE_NUMERALS.get(part.strip(), part.strip()) for part in phase.split("/"))
+
+
+def typed_metadata(opportunity: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Typed metadata fields stored with each opportunity so searches can filter inside the index
+
+    Returns:
+        Dictionary with deadline_ts, agency_code, program_code, phase and the schema version
+    """
+    return {
+        "deadline_ts": deadline_timestamp(opportunity),
+        "agency_code": normalize_agency(opportunity.get("agency", "")),
+        "program_code": normalize_program(opportunity.get("program", "")),
+        "phase": normalize_phase(opportunity.get("phase", "")),
+        "metadata_schema": METADATA_SCHEMA_VERSION
+    }
+
+
+def _to_timestamp(value: Union[int, float, str, datetime, None]) -> Optional[int]:
+    """Accept epoch seconds, datetimes or date strings"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"Could not parse date: {value}")
+    return int(parsed.timestamp())
+
+
+def build_opportunity_filter(deadline_after=None,
+                             deadline_before=None,
+                             agencies: Optional[List[str]] = None,
+                             programs: Optional[List[str]] = None,
+                             phases: Optional[List[str]] = None,
+                             base_filter: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Build a ChromaDB `where` filter over the typed opportunity metadata
+
+    Args:
+        deadline_after: Only opportunities due on or after this date (epoch, datetime or date string)
+        deadline_before: Only opportunities due on or before this date
+        agencies: Allowed agency names or codes
+        programs: Allowed program names (e.g. SBIR, STTR)
+        phases: Allowed phases (e.g. I, II)
+        base_filter: Existing raw filter to combine with
+
+    Returns:
+        ChromaDB where clause, or None if no filter applies
+    """
+    conditions = []
+    if base_filter:
+        conditions.append(base_filter)
+
+    after_ts = _to_timestamp(deadline_after)
+    before_ts = _to_timestamp(deadline_before)
+    if after_ts is not None:
+        conditions.append({"deadline_ts": {"$gte": after_ts}})
+    if before_ts is not None:
+        conditions.append({"deadline_ts": {"$lte": before_ts}})
+    if after_ts is None and before_ts is not None:
+        # Unknown deadlines are stored as 0 and would otherwise match "before" filters
+        conditions.append({"deadline_ts": {"$gt": UNKNOWN_DEADLINE_TS}})
+
+    if agencies:
+        conditions.append({"agency_code": {"$in": sorted({normalize_agency(a) for a in agencies})}})
+    if programs:
+        conditions.append({"program_code": {"$in": sorted({normalize_program(p) for p in programs})}})
+    if phases:
+        conditions.append({"phase": {"$in": sorted({normalize_phase(p) for p in phases})}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def deadline_partition(deadline_ts: Optional[int]) -> str:
+    """
+    Storage partition of an opportunity
+
+    Args:
+        deadline_ts: Typed deadline timestamp (see deadline_timestamp)
+
+    Returns:
+        UTC deadline quarter such as "2026q3", or CONTINUOUS_PARTITION for
+        continuous and unknown deadlines
+    """
+    if deadline_ts is None or deadline_ts in (UNKNOWN_DEADLINE_TS, CONTINUOUS_DEADLINE_TS):
+        return CONTINUOUS_PARTITION
+    deadline = datetime.fromtimestamp(int(deadline_ts), timezone.utc)
+    return f"{deadline.year}q{(deadline.month - 1) // 3 + 1}"
+
+
+def is_partition_name(name: str) -> bool:
+    """True for names produced by deadline_partition()"""
+    return name == CONTINUOUS_PARTITION or QUARTER_PARTITION.match(name) is not None
+
+
+def partition_bounds(partition: str) -> Optional[Tuple[int, int]]:
+    """
+    Deadline range covered by a quarter partition
+
+    Returns:
+        (start, end) epoch seconds with the end exclusive, or None for the continuous partition
+    """
+    match = QUARTER_PARTITION.match(partition)
+    if not match:
+        return None
+    year, quarter = int(match.group(1)), int(match.group(2))
+    start = datetime(year, 3 * (quarter - 1) + 1, 1, tzinfo=timezone.utc)
+    end = datetime(year + 1, 1, 1, tzinfo=timezone.utc) if quarter == 4 else \
+        datetime(year, 3 * quarter + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def deadline_range(where: Optional[Dict]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Deadline range implied by a `where` filter, used to skip partitions
+
+    Only deadline_ts conditions at the top level or inside "$and" narrow the
+    range; anything else (e.g. "$or") is ignored, which only widens it.
+
+    Returns:
+        (lowest, highest) deadline_ts that can match, None meaning unbounded
+    """
+    lowest, highest = None, None
+    if not where:
+        return lowest, highest
+
+    conditions = where["$and"] if "$and" in where else [where]
+    for condition in conditions:
+        if "$and" in condition:
+            low, high = deadline_range(condition)
+        else:
+            operand = condition.get("deadline_ts")
+            if operand is None:
+                continue
+            if not isinstance(operand, dict):
+                operand = {"$eq": operand}
+            low, high = None, None
+            for operator, value in operand.items():
+                if not isinstance(value, (int, float)):
+                    continue
+                if operator in ("$gte", "$gt", "$eq"):
+                    low = value if low is None else max(low, value)
+                if operator in ("$lte", "$lt", "$eq"):
+                    high = value if high is None else min(high, value)
+        if low is not None:
+            lowest = low if lowest is None else max(lowest, low)
+        if high is not None:
+            highest = high if highest is None else min(highest, high)
+    return lowest, highest
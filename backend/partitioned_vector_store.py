@@ -0,0 +1,236 @@
+"""
+Partitioned Vector Store for FundingMatch
+Opportunity vectors sharded by deadline quarter, plus one shard for continuous deadlines
+"""
+
+import time
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Callable, Tuple
+
+try:
+    from .vector_store import VectorStore
+    from .opportunity_metadata import (deadline_partition, partition_bounds, deadline_range,
+                                       CONTINUOUS_PARTITION)
+except ImportError:
+    from vector_store import VectorStore
+    from opportunity_metadata import (deadline_partition, partition_bounds, deadline_range,
+                                      CONTINUOUS_PARTITION)
+
+
+def _slice_page(page: Dict[str, Any], start: int, stop: Optional[int]) -> Dict[str, Any]:
+    return {key: values[start:stop] for key, values in page.items()}
+
+
+class PartitionedVectorStore(VectorStore):
+    """
+    VectorStore that spreads items over one child store per deadline quarter.
+
+    Items are routed by their `deadline_ts` metadata (see
+    opportunity_metadata.deadline_partition). Searches only visit partitions
+    whose quarter can still hold open opportunities and that overlap the
+    deadline range of the `where` filter, and a quarter that has fully passed
+    is retired by dropping its child store in one operation.
+    """
+
+    def __init__(self, open_partition: Callable[[str], VectorStore],
+                 drop_partition: Callable[[str], None],
+                 existing_partitions: Optional[List[str]] = None,
+                 search_expired: bool = False,
+                 clock: Callable[[], float] = time.time):
+        """
+        Open the partitions that already exist
+
+        Args:
+            open_partition: Opens (or creates) the child store of a partition name
+            drop_partition: Deletes the storage of a partition name
+            existing_partitions: Partition names found in storage
+            search_expired: Also search quarters that ended before now
+            clock: Current time as epoch seconds
+        """
+        self.open_partition = open_partition
+        self.drop_partition = drop_partition
+        self.search_expired = search_expired
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.stores: Dict[str, VectorStore] = {}
+        for name in existing_partitions or []:
+            self.stores[name] = open_partition(name)
+
+    @staticmethod
+    def _sort_key(name: str) -> Tuple[int, str]:
+        # Quarters in date order, the continuous partition last
+        return (1, name) if name == CONTINUOUS_PARTITION else (0, name)
+
+    def partitions(self) -> List[str]:
+        """Names of the current partitions, oldest quarter first"""
+        with self.lock:
+            return sorted(self.stores, key=self._sort_key)
+
+    def _store(self, name: str) -> VectorStore:
+        with self.lock:
+            if name not in self.stores:
+                self.stores[name] = self.open_partition(name)
+            return self.stores[name]
+
+    def _snapshot(self) -> List[Tuple[str, VectorStore]]:
+        with self.lock:
+            return [(name, self.stores[name]) for name in sorted(self.stores, key=self._sort_key)]
+
+    def _search_partitions(self, where: Optional[Dict]) -> List[VectorStore]:
+        """Partitions that can hold matches for `where`"""
+        lowest, highest = deadline_range(where)
+        if not self.search_expired:
+            now = int(self.clock())
+            lowest = now if lowest is None else max(lowest, now)
+
+        selected = []
+        for name, store in self._snapshot():
+            bounds = partition_bounds(name)
+            if bounds is not None:
+                start, end = bounds
+                if (lowest is not None and end <= lowest) or (highest is not None and start > highest):
+                    continue
+            selected.append(store)
+        return selected
+
+    @staticmethod
+    def _group(ids: List[str], metadatas: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+        groups: Dict[str, List[int]] = {}
+        for position, metadata in enumerate(metadatas):
+            groups.setdefault(deadline_partition((metadata or {}).get("deadline_ts")), []).append(position)
+        return groups
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        if not ids:
+            return
+        groups = self._group(ids, metadatas)
+        for name, store in self._snapshot():
+            # An item whose deadline changed must leave its old partition
+            moved = [ids[position] for other, positions in groups.items() if other != name for position in positions]
+            if moved:
+                store.delete(moved)
+        for name, positions in groups.items():
+            self._store(name).upsert([ids[p] for p in positions], [embeddings[p] for p in positions],
+                                     [metadatas[p] for p in positions])
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        if not ids:
+            return
+        new_metadata = dict(zip(ids, metadatas))
+        for name, store in self._snapshot():
+            found = store.get(ids)['ids']
+            if not found:
+                continue
+            staying = [item_id for item_id in found
+                       if deadline_partition(new_metadata[item_id].get("deadline_ts")) == name]
+            moving = [item_id for item_id in found if item_id not in staying]
+            if staying:
+                store.update_metadatas(staying, [new_metadata[item_id] for item_id in staying])
+            if moving:
+                page = store.get(moving, include_embeddings=True)
+                store.delete(page['ids'])
+                self.upsert(page['ids'], page['embeddings'], [new_metadata[item_id] for item_id in page['ids']])
+
+    def delete(self, ids: List[str]):
+        if not ids:
+            return
+        for _, store in self._snapshot():
+            store.delete(ids)
+
+    def get(self, ids: List[str], include_embeddings: bool = False) -> Dict[str, Any]:
+        found: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+        for _, store in self._snapshot():
+            page = store.get(ids, include_embeddings=include_embeddings)
+            for position, item_id in enumerate(page['ids']):
+                found[item_id] = (page['metadatas'][position],
+                                  page['embeddings'][position] if include_embeddings else None)
+
+        ordered = [item_id for item_id in dict.fromkeys(ids) if item_id in found]
+        result = {'ids': ordered, 'metadatas': [found[item_id][0] for item_id in ordered]}
+        if include_embeddings:
+            result['embeddings'] = [found[item_id][1] for item_id in ordered]
+        return result
+
+    def batch_query(self, embeddings: List[List[float]], n_results: int,
+                    where: Optional[Dict] = None) -> Dict[str, List[List[Any]]]:
+        merged: List[List[Tuple[float, str, Dict[str, Any]]]] = [[] for _ in embeddings]
+        for store in self._search_partitions(where):
+            if store.count() == 0:
+                continue
+            results = store.batch_query(embeddings, n_results, where)
+            for row, (ids, distances, metadatas) in enumerate(zip(results['ids'], results['distances'],
+                                                                  results['metadatas'])):
+                merged[row].extend(zip(distances, ids, metadatas))
+
+        best = [sorted(hits, key=lambda hit: hit[0])[:n_results] for hits in merged]
+        return {
+            'ids': [[item_id for _, item_id, _ in hits] for hits in best],
+            'distances': [[distance for distance, _, _ in hits] for hits in best],
+            'metadatas': [[metadata for _, _, metadata in hits] for hits in best]
+        }
+
+    def count(self) -> int:
+        return sum(store.count() for _, store in self._snapshot())
+
+    def iterate(self, page_size: int = 500, offset: int = 0, limit: Optional[int] = None,
+                where: Optional[Dict] = None, include_embeddings: bool = False) -> Iterator[Dict[str, Any]]:
+        skip = offset
+        remaining = limit
+        for _, store in self._snapshot():
+            if remaining == 0:
+                return
+            inner_offset = 0
+            if skip and not where:
+                # Whole partitions can be skipped by count when nothing is filtered
+                size = store.count()
+                if skip >= size:
+                    skip -= size
+                    continue
+                inner_offset, skip = skip, 0
+
+            for page in store.iterate(page_size=page_size, offset=inner_offset, where=where,
+                                      include_embeddings=include_embeddings):
+                if skip:
+                    if skip >= len(page['ids']):
+                        skip -= len(page['ids'])
+                        continue
+                    page, skip = _slice_page(page, skip, None), 0
+                if remaining is not None:
+                    page = _slice_page(page, 0, remaining)
+                    remaining -= len(page['ids'])
+                if page['ids']:
+                    yield page
+                if remaining == 0:
+                    return
+
+    def clear(self):
+        with self.lock:
+            for name in list(self.stores):
+                self.drop_partition(name)
+            self.stores = {}
+
+    def expired_partitions(self, now: Optional[float] = None) -> List[str]:
+        """Quarter partitions whose every deadline is before `now`"""
+        now = self.clock() if now is None else now
+        return [name for name in self.partitions()
+                if partition_bounds(name) is not None and partition_bounds(name)[1] <= now]
+
+    def retire_expired(self, now: Optional[float] = None) -> Dict[str, List[str]]:
+        """
+        Drop every partition whose quarter has ended
+
+        Args:
+            now: Epoch seconds to compare against (defaults to the clock)
+
+        Returns:
+            Mapping of dropped partition name to the item IDs it held
+        """
+        retired = {}
+        for name in self.expired_partitions(now):
+            with self.lock:
+                store = self.stores.pop(name, None)
+            if store is None:
+                continue
+            retired[name] = [item_id for page in store.iterate(page_size=1000) for item_id in page['ids']]
+            self.drop_partition(name)
+        return retired
@@ -0,0 +1,148 @@
+"""
+Profile Cache for FundingMatch
+Extracted user profiles persisted to disk and invalidated by source-file changes
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class ProfileCache:
+    """
+    On-disk cache of profiles built by UserProfileManager.create_user_profile().
+
+    One JSON file per profile JSON path holds the extracted profile and the
+    size, mtime and content hash of every source file (the profile JSON and
+    the PDFs). A lookup stats the sources: unchanged size and mtime means the
+    entry is valid without reading the file; a changed mtime with the same
+    content hash (e.g. a re-upload of the same file) keeps it valid too. Any
+    added, removed or edited source invalidates it.
+    """
+
+    def __init__(self, cache_dir: str = "profile_cache"):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding the cached profiles (created on first write)
+        """
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self._memory: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _key(user_json_path: str) -> str:
+        return hashlib.md5(os.path.abspath(user_json_path).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _sources(self, user_json_path: str, pdf_paths: List[str],
+                 known: Optional[List[Dict[str, Any]]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Size, mtime and hash of every source file, None if one is missing
+
+        Hashes in `known` are reused for files whose size and mtime are unchanged.
+        """
+        known_by_path = {source['path']: source for source in known or []}
+        sources = []
+        for path in [user_json_path] + list(pdf_paths):
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            previous = known_by_path.get(path)
+            if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime_ns:
+                file_hash = previous['hash']
+            else:
+                file_hash = self._file_hash(path)
+            sources.append({'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': file_hash})
+        return sources
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is None and os.path.exists(self._entry_path(key)):
+            try:
+                with open(self._entry_path(key), 'r') as f:
+                    entry = json.load(f)
+                self._memory[key] = entry
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read cached profile: {e}")
+        return entry
+
+    def _write(self, key: str, entry: Dict[str, Any]):
+        data = json.dumps(entry)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._entry_path(key) + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self._entry_path(key))
+        # A copy, so callers changing the profile they passed in do not change the cache
+        self._memory[key] = json.loads(data)
+
+    def get(self, user_json_path: str, pdf_paths: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Cached profile built from exactly these, unchanged, source files
+
+        Args:
+            user_json_path: Path to the user JSON file
+            pdf_paths: PDF document paths
+
+        Returns:
+            Profile dictionary (shared, treat as read-only), None if there is no valid entry
+        """
+        key = self._key(user_json_path)
+        with self.lock:
+            entry = self._load(key)
+            if entry is None:
+                return None
+            sources = self._sources(user_json_path, pdf_paths, entry['sources'])
+            if sources is None or [(s['path'], s['hash']) for s in sources] != \
+                    [(s['path'], s['hash']) for s in entry['sources']]:
+                return None
+            if sources != entry['sources']:
+                # Touched but identical files: remember the new mtimes to skip hashing next time
+                self._write(key, {**entry, 'sources': sources})
+            return entry['profile']
+
+    def put(self, user_json_path: str, pdf_paths: List[str], profile: Dict[str, Any]):
+        """
+        Store a profile built from the given source files
+
+        Args:
+            user_json_path: Path to the user JSON file
+            pdf_paths: PDF document paths the profile was built from
+            profile: Profile dictionary
+        """
+        key = self._key(user_json_path)
+        with self.lock:
+            entry = self._load(key)
+            sources = self._sources(user_json_path, pdf_paths, entry['sources'] if entry else None)
+            if sources is None:
+                return
+            try:
+                self._write(key, {'sources': sources, 'profile': profile,
+                                  'created_at': datetime.now().isoformat()})
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Warning: Could not cache profile: {e}")
+
+    def invalidate(self, user_json_path: str):
+        """Remove the cached profile of a user JSON file"""
+        key = self._key(user_json_path)
+        with self.lock:
+            self._memory.pop(key, None)
+            if os.path.exists(self._entry_path(key)):
+                os.remove(self._entry_path(key))
@@ -0,0 +1,135 @@
+"""
+Prompt Context for FundingMatch
+Precomputed profile prompt prefixes and cached-context backends for LLM calls
+"""
+
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from google.genai import types
+
+
+class ProfileContext:
+    """
+    Profile part of a prompt, built once per profile version.
+
+    `text` is the shared prefix sent before every opportunity-specific
+    suffix. `cached_content` maps a model name to the name of its uploaded
+    cached context, or to None when caching is not available for that model;
+    `expires_at` holds the monotonic time after which an uploaded context
+    must be recreated (missing for contexts that do not expire).
+    """
+
+    def __init__(self, version: str, text: str):
+        self.version = version
+        self.text = text
+        self.cached_content: Dict[str, Optional[str]] = {}
+        self.expires_at: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def is_expired(self, model: str) -> bool:
+        """True if the uploaded context for a model has (nearly) expired"""
+        expires_at = self.expires_at.get(model)
+        return expires_at is not None and time.monotonic() >= expires_at
+
+    @staticmethod
+    def profile_version(profile: Dict[str, Any]) -> str:
+        """Content hash of a profile; any change produces a new version"""
+        payload = json.dumps(profile, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def is_missing_context_error(error: Exception) -> bool:
+    """True if a generate call failed because its cached content no longer exists"""
+    message = str(error).lower()
+    return "not_found" in message or "not found" in message or "404" in message or "expired" in message
+
+
+class GeminiContextCache:
+    """Uploads shared prompt prefixes as Gemini cached content"""
+
+    # Seconds before the TTL ends at which a context is recreated instead of used
+    REFRESH_MARGIN = 60
+
+    def __init__(self, client, ttl_seconds: int = 3600):
+        """
+        Args:
+            client: google.genai client
+            ttl_seconds: Lifetime of uploaded cached contents
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    def expires_at(self) -> Optional[float]:
+        """Monotonic time at which a context created now should be recreated"""
+        return time.monotonic() + self.ttl_seconds - self.REFRESH_MARGIN
+
+    def create(self, model: str, prefix: str, display_name: str = "") -> str:
+        """
+        Upload a prefix for a model
+
+        Raises:
+            Exception: If the model does not support caching or the prefix is
+                below the model's minimum cacheable size
+        """
+        cached = self.client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                contents=[prefix],
+                ttl=f"{self.ttl_seconds}s",
+                display_name=display_name or None
+            )
+        )
+        return cached.name
+
+    def generate(self, model: str, cached_content: str, suffix: str):
+        """Generate from an uploaded prefix followed by a suffix"""
+        return self.client.models.generate_content(
+            model=model,
+            contents=suffix,
+            config=types.GenerateContentConfig(cached_content=cached_content)
+        )
+
+    def delete(self, cached_content: str):
+        """Delete an uploaded prefix"""
+        self.client.caches.delete(name=cached_content)
+
+
+class LocalContextCache:
+    """
+    In-process stand-in for GeminiContextCache (for tests and models without caching)
+
+    Prefixes are kept in memory and sent together with each suffix, so the
+    model sees the same prompt as without caching.
+    """
+
+    def __init__(self, client, ttl_seconds: Optional[float] = None):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefixes: Dict[str, str] = {}
+        self.created = 0
+        self.deleted = 0
+
+    def expires_at(self) -> Optional[float]:
+        return time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+
+    def create(self, model: str, prefix: str, display_name: str = "") -> str:
+        name = f"local/{model}/{hashlib.sha1(prefix.encode('utf-8')).hexdigest()[:16]}"
+        self.prefixes[name] = prefix
+        self.created += 1
+        return name
+
+    def generate(self, model: str, cached_content: str, suffix: str):
+        if cached_content not in self.prefixes:
+            raise KeyError(f"Cached content {cached_content} not found")
+        return self.client.models.generate_content(
+            model=model,
+            contents=self.prefixes[cached_content] + suffix
+        )
+
+    def delete(self, cached_content: str):
+        if self.prefixes.pop(cached_content, None) is not None:
+            self.deleted += 1
@@ -10,12 +10,22 @@ import json
 from google import genai
 from google.genai.types import GenerateContentConfig, Tool
 
+try:
+    from .llm_executor import LLMExecutor
+except ImportError:
+    from llm_executor import LLMExecutor
+
 
 class RAGExplainer:
     """Explains funding opportunity matches using Retrieval Augmented Generation"""
     
-    def __init__(self):
-        """Initialize Gemini client"""
+    def __init__(self, executor: Optional[LLMExecutor] = None):
+        """
+        Initialize Gemini client
+        
+        Args:
+            executor: Concurrent, rate-limited executor for model calls (default: LLMExecutor())
+        """
         # Get API key
         api_key = os.getenv('GEMINI_API_KEY')
         if not api_key:
@@ -27,6 +37,7 @@ class RAGExplainer:
         # Initialize client with new genai library
         self.client = genai.Client(api_key=api_key)
         self.model_name = "gemini-2.0-flash-exp"  # Using Gemini 2.0
+        self.executor = executor or LLMExecutor()
         
     def explain_match(self, 
                      user_profile: Dict[str, Any],
@@ -51,7 +62,8 @@ class RAGExplainer:
             prompt = self._create_explanation_prompt(context)
             
             # Use Gemini to generate response
-            response = self.client.models.generate_content(
+            response = self.executor.call(
+                self.client.models.generate_content,
                 model=self.model_name,
                 contents=prompt,
                 config=GenerateContentConfig(
@@ -366,12 +378,24 @@ NEXT STEPS:
         """
         explained_opportunities = []
         
-        # Take top N opportunities
-        for i, opportunity in enumerate(opportunities[:top_n]):
-            print(f"Generating explanation for opportunity {i+1}/{top_n}...")
-            
-            # Generate explanation
-            explanation = self.explain_match(user_profile, opportunity, user_documents)
+        # Take top N opportunities and explain them concurrently
+        selected = opportunities[:top_n]
+        print(f"Generating explanations for {len(selected)} opportunities...")
+        batch = self.executor.map(
+            lambda opportunity: self.explain_match(user_profile, opportunity, user_documents),
+            selected, "Explanations"
+        )
+        errors = {error["index"]: error["error"] for error in batch["errors"]}
+        
+        for i, (opportunity, explanation) in enumerate(zip(selected, batch["results"])):
+            if explanation is None:
+                explanation = {
+                    'summary': 'Unable to generate detailed explanation',
+                    'alignment_reasons': ['This opportunity matches your research area'],
+                    'reusable_content': [],
+                    'next_steps': ['Review the opportunity details', 'Check eligibility requirements'],
+                    'error': errors.get(i, 'Unknown error')
+                }
             
             # Add explanation to opportunity
             opportunity_with_explanation = opportunity.copy()
@@ -2,6 +2,7 @@
 Rate limiter for API calls
 """
 
+import os
 import time
 from typing import Optional, Callable, Any
 import threading
@@ -122,5 +123,5 @@ class RateLimiter:
         return None
 
 
-# Global rate limiter for Gemini API
-gemini_rate_limiter = RateLimiter(calls_per_minute=10)
\ No newline at end of file
+# Global rate limiter for Gemini API (GEMINI_CALLS_PER_MINUTE overrides the budget)
+gemini_rate_limiter = RateLimiter(calls_per_minute=int(os.getenv('GEMINI_CALLS_PER_MINUTE', '10')))
\ No newline at end of file
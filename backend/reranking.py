@@ -0,0 +1,52 @@
+"""
+Re-ranking for FundingMatch
+Maximal marginal relevance (MMR) selection over search candidates
+"""
+
+from typing import List
+import numpy as np
+
+
+def mmr_rerank(relevance: np.ndarray, embeddings: np.ndarray, k: int, mmr_lambda: float = 0.7) -> List[int]:
+    """
+    Pick `k` candidates that are relevant but not redundant with each other
+
+    Each step selects the candidate maximising
+    mmr_lambda * relevance - (1 - mmr_lambda) * (highest cosine similarity to an
+    already selected candidate). The candidate similarity matrix is computed
+    once and every step is a vectorized update over all candidates.
+
+    Args:
+        relevance: Relevance score of each candidate (higher is better), shape (n,)
+        embeddings: Candidate embeddings, shape (n, d)
+        k: Number of candidates to select
+        mmr_lambda: 1.0 ranks by relevance only; lower values favour diversity
+
+    Returns:
+        Indices of the selected candidates in selection order
+    """
+    if not 0.0 <= mmr_lambda <= 1.0:
+        raise ValueError("mmr_lambda must be between 0 and 1")
+
+    relevance = np.asarray(relevance, dtype=np.float64)
+    count = len(relevance)
+    k = min(k, count)
+    if k <= 0:
+        return []
+
+    vectors = np.asarray(embeddings, dtype=np.float64)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+    similarity = vectors @ vectors.T
+
+    redundancy = np.zeros(count)
+    available = np.ones(count, dtype=bool)
+    selected = []
+    for _ in range(k):
+        scores = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = similarity[best] if len(selected) == 1 else np.maximum(redundancy, similarity[best])
+    return selected
@@ -0,0 +1,71 @@
+"""
+Retrofit Index for FundingMatch
+Per-profile inverted index from keyword to unsuccessful proposals
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .lexical_index import keyword_list
+except ImportError:
+    from lexical_index import keyword_list
+
+
+def unsuccessful_proposals(profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Unsuccessful proposals listed in a profile's proposal history"""
+    proposals = profile.get('proposal_history', {}).get('unsuccessful_proposals', [])
+    return [proposal for proposal in proposals if isinstance(proposal, dict)]
+
+
+def proposal_owner(profile: Dict[str, Any]) -> str:
+    """Owner key of a profile's proposals in the proposals collection"""
+    name = profile.get('profile_metadata', {}).get('primary_researcher') or profile.get('name') or 'unknown'
+    return name.lower().replace(' ', '_')
+
+
+class RetrofitIndex:
+    """
+    Inverted index from keyword to the unsuccessful proposals of one profile.
+
+    Built once when a profile loads. Finding the proposal sharing the most
+    keywords with an opportunity only touches the postings of the
+    opportunity's keywords instead of intersecting with every proposal.
+    """
+
+    def __init__(self, proposals: List[Dict[str, Any]]):
+        """
+        Build the index
+
+        Args:
+            proposals: Unsuccessful proposals, each with a 'keywords' list
+        """
+        self.proposals = list(proposals)
+        self.postings: Dict[str, List[int]] = {}
+        for position, proposal in enumerate(self.proposals):
+            for keyword in set(keyword_list(proposal.get('keywords', []))):
+                self.postings.setdefault(keyword, []).append(position)
+
+    @classmethod
+    def from_profile(cls, profile: Dict[str, Any]) -> 'RetrofitIndex':
+        """Index of the unsuccessful proposals in a profile"""
+        return cls(unsuccessful_proposals(profile))
+
+    def best_match(self, keywords: Any) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Proposal sharing the most keywords with an opportunity
+
+        Args:
+            keywords: Opportunity keywords (list, JSON list or comma-separated string)
+
+        Returns:
+            (proposal, overlap); the earliest proposal wins ties, (None, 0) if no
+            proposal shares a keyword
+        """
+        overlaps = Counter()
+        for keyword in set(keyword_list(keywords)):
+            overlaps.update(self.postings.get(keyword, ()))
+        if not overlaps:
+            return None, 0
+        position, overlap = min(overlaps.items(), key=lambda item: (-item[1], item[0]))
+        return self.proposals[position], overlap
@@ -12,23 +12,31 @@ import hashlib
 try:
     from .pdf_extractor import PDFExtractor
     from .url_content_fetcher import URLContentFetcher
-    from .embeddings_manager import GeminiEmbeddingsManager
-    from .vector_database import VectorDatabaseManager
+    from .embeddings_manager import get_embeddings_manager
+    from .vector_database import get_vector_db
+    from .profile_cache import ProfileCache
 except ImportError:
     from pdf_extractor import PDFExtractor
     from url_content_fetcher import URLContentFetcher
-    from embeddings_manager import GeminiEmbeddingsManager
-    from vector_database import VectorDatabaseManager
+    from embeddings_manager import get_embeddings_manager
+    from vector_database import get_vector_db
+    from profile_cache import ProfileCache
 
 
 class UserProfileManager:
     """Manages user profiles and matches them with funding opportunities"""
     
-    def __init__(self):
+    def __init__(self, profile_cache: Optional[ProfileCache] = None):
+        """
+        Args:
+            profile_cache: Cache of built profiles used by get_user_profile() (defaults
+                to a ProfileCache in the PROFILE_CACHE_DIR directory, then ./profile_cache)
+        """
         self.pdf_extractor = PDFExtractor()
         self.url_fetcher = URLContentFetcher()
-        self.embeddings_manager = GeminiEmbeddingsManager()
-        self.vector_db = VectorDatabaseManager()
+        self.embeddings_manager = get_embeddings_manager()
+        self.vector_db = get_vector_db()
+        self.profile_cache = profile_cache or ProfileCache(os.getenv('PROFILE_CACHE_DIR', 'profile_cache'))
         
     def create_user_profile(self, user_json_path: str, pdf_paths: List[str]) -> Dict[str, Any]:
         """
@@ -126,6 +134,29 @@ class UserProfileManager:
         # Generate unique ID
         profile['id'] = hashlib.md5(profile['name'].encode()).hexdigest()
         
+        # Later get_user_profile() calls reuse this profile until a source file changes
+        self.profile_cache.put(user_json_path, pdf_paths, profile)
+        
+        return profile
+    
+    def get_user_profile(self, user_json_path: str, pdf_paths: List[str]) -> Dict[str, Any]:
+        """
+        User profile from the profile cache, rebuilt only if a source file changed
+        
+        Skips PDF extraction and URL fetching when the JSON file and PDFs are
+        the same as when the profile was last built. URL contents are not
+        re-fetched; use create_user_profile() to refresh them.
+        
+        Args:
+            user_json_path: Path to user JSON file
+            pdf_paths: List of PDF document paths
+            
+        Returns:
+            User profile dictionary (shared with the cache, do not modify)
+        """
+        profile = self.profile_cache.get(user_json_path, pdf_paths)
+        if profile is None:
+            profile = self.create_user_profile(user_json_path, pdf_paths)
         return profile
     
     def store_user_profile(self, profile: Dict[str, Any]) -> bool:
@@ -201,6 +232,12 @@ class UserProfileManager:
                 n_results=n_results
             )
             
+            # Keyword matches for every result in one index lookup
+            keyword_matches = self.vector_db.keyword_matches(
+                user_profile['research_interests'],
+                [match['match_id'] for match in matches]
+            )
+            
             # Calculate confidence scores (0-100)
             ranked_opportunities = []
             for match in matches:
@@ -210,10 +247,7 @@ class UserProfileManager:
                 confidence = min(100, max(0, similarity * 100))
                 
                 # Boost confidence based on keyword matches
-                keywords_boost = self._calculate_keyword_boost(
-                    user_profile['research_interests'],
-                    match.get('keywords', [])
-                )
+                keywords_boost = self._calculate_keyword_boost(keyword_matches.get(match['match_id'], 0))
                 
                 final_confidence = min(100, confidence + keywords_boost)
                 
@@ -237,24 +271,7 @@ class UserProfileManager:
             print(f"Error matching user to opportunities: {e}")
             return []
     
-    def _calculate_keyword_boost(self, user_interests: List[str], 
-                               opportunity_keywords: List[str]) -> float:
-        """Calculate boost based on keyword matches"""
-        if not user_interests or not opportunity_keywords:
-            return 0.0
-        
-        # Convert to lowercase for comparison
-        user_interests_lower = [i.lower() for i in user_interests]
-        opp_keywords_lower = [k.lower() if isinstance(k, str) else str(k).lower() 
-                             for k in opportunity_keywords]
-        
-        # Count matches
-        matches = 0
-        for interest in user_interests_lower:
-            for keyword in opp_keywords_lower:
-                if interest in keyword or keyword in interest:
-                    matches += 1
-        
-        # Calculate boost (max 20 points)
-        boost = min(20, matches * 5)
-        return boost
\ No newline at end of file
+    def _calculate_keyword_boost(self, keyword_matches: int) -> float:
+        """Calculate boost based on the number of matching (interest, keyword) pairs"""
+        # 5 points per match, max 20 points
+        return min(20, keyword_matches * 5)
\ No newline at end of file
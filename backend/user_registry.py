@@ -0,0 +1,388 @@
+"""
+User Registry for FundingMatch
+Indexed record of users and the profile JSON, PDF and URL sources in the upload folder
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+
+class UserRegistry:
+    """
+    SQLite index of uploaded profile sources.
+
+    Each profile JSON file is registered under the user ID derived from its
+    person name (the same MD5 that UserProfileManager uses), together with the
+    URLs listed in it. PDFs are registered under the user they were uploaded
+    for. Files carry their content hash, size and mtime, so a file is only
+    parsed again when it changes. Request handlers look users and their
+    sources up here instead of scanning and parsing the upload folder.
+
+    PDFs uploaded before PDFs had owners stay unowned until they are assigned
+    (see unowned_documents() and assign_documents()); profiles are built from
+    them too (documents(..., include_unowned=True)), as every profile used to be
+    built from every PDF, so they are never silently dropped.
+    """
+
+    DOCUMENT_EXTENSIONS = {'.json': 'json', '.pdf': 'pdf'}
+
+    def __init__(self, db_path: str = "./user_registry.db", upload_dir: str = "uploads"):
+        """
+        Initialize the registry
+
+        Args:
+            db_path: SQLite database file
+            upload_dir: Folder holding the uploaded profile files
+        """
+        self.db_path = db_path
+        self.upload_dir = upload_dir
+        self.lock = threading.Lock()
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        """Create the registry tables"""
+        conn = self._connect()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                research_interests TEXT NOT NULL DEFAULT '[]',
+                profile_json TEXT,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS user_documents (
+                filename TEXT PRIMARY KEY,
+                user_id TEXT,
+                kind TEXT NOT NULL,
+                file_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                added_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_user_documents ON user_documents(user_id, kind);
+            CREATE TABLE IF NOT EXISTS user_urls (
+                user_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                type TEXT NOT NULL DEFAULT 'web',
+                status TEXT NOT NULL DEFAULT 'processed',
+                position INTEGER NOT NULL,
+                PRIMARY KEY (user_id, url)
+            );
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def user_id_for_name(name: str) -> str:
+        """User ID of a person name, as generated by UserProfileManager"""
+        return hashlib.md5(name.encode()).hexdigest()
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, filename: str) -> str:
+        """Path of a registered file in the upload folder"""
+        return os.path.join(self.upload_dir, filename)
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Reconcile the registry with the upload folder
+
+        New and changed files are registered, rows of deleted files are
+        removed. Unchanged files (same size and mtime) are not read. PDFs
+        without an owner are given to the only user when there is exactly one;
+        with several users they stay unowned until assigned.
+
+        Returns:
+            Dict with the number of registered, unchanged and removed files
+        """
+        stats = {"registered": 0, "unchanged": 0, "removed": 0}
+        present = set()
+        if os.path.isdir(self.upload_dir):
+            for filename in os.listdir(self.upload_dir):
+                if os.path.splitext(filename)[1].lower() not in self.DOCUMENT_EXTENSIONS:
+                    continue
+                present.add(filename)
+                if self._is_current(filename):
+                    stats["unchanged"] += 1
+                else:
+                    self.register_file(filename)
+                    stats["registered"] += 1
+
+        conn = self._connect()
+        rows = conn.execute('SELECT filename FROM user_documents').fetchall()
+        conn.close()
+        for row in rows:
+            if row['filename'] not in present:
+                self.unregister_file(row['filename'])
+                stats["removed"] += 1
+
+        users = self.list_users()
+        if len(users) == 1:
+            with self.lock:
+                conn = self._connect()
+                conn.execute("UPDATE user_documents SET user_id = ? WHERE user_id IS NULL AND kind = 'pdf'",
+                             (users[0]['id'],))
+                conn.commit()
+                conn.close()
+        return stats
+
+    def _is_current(self, filename: str) -> bool:
+        """True if the registered size and mtime of a file match the file on disk"""
+        try:
+            stat = os.stat(self.path(filename))
+        except OSError:
+            return False
+        conn = self._connect()
+        row = conn.execute('SELECT size, mtime FROM user_documents WHERE filename = ?', (filename,)).fetchone()
+        conn.close()
+        return row is not None and row['size'] == stat.st_size and row['mtime'] == stat.st_mtime
+
+    def register_file(self, filename: str, user_id: Optional[str] = None) -> Optional[str]:
+        """
+        Register or refresh an uploaded file
+
+        A profile JSON registers (or updates) the user named in it and that
+        user's URLs. Unchanged files are not parsed again.
+
+        Args:
+            filename: File name inside the upload folder
+            user_id: Owner of a PDF (keeps the current owner if None)
+
+        Returns:
+            User ID of a registered profile JSON or the owner of a PDF, None if
+            the file is unchanged and no owner was given, or could not be registered
+        """
+        filename = os.path.basename(filename)
+        kind = self.DOCUMENT_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+        path = self.path(filename)
+        if kind is None or not os.path.exists(path):
+            return None
+
+        if self._is_current(filename):
+            if user_id is not None and kind == 'pdf':
+                self.assign_documents(user_id, [filename])
+                return user_id
+            return None
+
+        stat = os.stat(path)
+        file_hash = self._file_hash(path)
+        person = None
+        if kind == 'json':
+            try:
+                with open(path, 'r') as f:
+                    person = json.load(f).get('person', {})
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Warning: Could not read profile JSON {filename}: {e}")
+                person = {}
+            name = person.get('name', '') if isinstance(person, dict) else ''
+            user_id = self.user_id_for_name(name) if name else None
+
+        now = datetime.now().isoformat()
+        with self.lock:
+            conn = self._connect()
+            try:
+                previous = conn.execute('SELECT user_id FROM user_documents WHERE filename = ?',
+                                        (filename,)).fetchone()
+                if kind == 'pdf' and user_id is None and previous is not None:
+                    user_id = previous['user_id']
+                if kind == 'json' and previous is not None and previous['user_id'] not in (None, user_id):
+                    # The file now names another person: detach it from its old user
+                    conn.execute('UPDATE users SET profile_json = NULL WHERE user_id = ? AND profile_json = ?',
+                                 (previous['user_id'], filename))
+
+                conn.execute('''
+                    INSERT OR REPLACE INTO user_documents
+                    (filename, user_id, kind, file_hash, size, mtime, added_at)
+                    VALUES (?, ?, ?, ?, ?, ?, COALESCE((SELECT added_at FROM user_documents WHERE filename = ?), ?))
+                ''', (filename, user_id, kind, file_hash, stat.st_size, stat.st_mtime, filename, now))
+
+                if kind == 'json' and user_id:
+                    interests = person.get('biographical_information', {}).get('research_interests', [])
+                    conn.execute('''
+                        INSERT INTO users (user_id, name, research_interests, profile_json, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(user_id) DO UPDATE SET name = excluded.name,
+                            research_interests = excluded.research_interests,
+                            profile_json = excluded.profile_json, updated_at = excluded.updated_at
+                    ''', (user_id, person['name'], json.dumps(interests), filename, now))
+
+                    conn.execute('DELETE FROM user_urls WHERE user_id = ?', (user_id,))
+                    conn.executemany('''
+                        INSERT OR IGNORE INTO user_urls (user_id, url, type, status, position)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', [(user_id, link.get('url', ''), link.get('type', 'web'), link.get('status', 'processed'), i)
+                          for i, link in enumerate(person.get('links', []))
+                          if isinstance(link, dict) and link.get('url')])
+                conn.commit()
+            finally:
+                conn.close()
+        return user_id
+
+    def unregister_file(self, filename: str):
+        """Remove a file (and, for a profile JSON, its user's JSON reference)"""
+        filename = os.path.basename(filename)
+        with self.lock:
+            conn = self._connect()
+            conn.execute('UPDATE users SET profile_json = NULL WHERE profile_json = ?', (filename,))
+            conn.execute('DELETE FROM user_documents WHERE filename = ?', (filename,))
+            conn.commit()
+            conn.close()
+
+    def assign_documents(self, user_id: str, filenames: List[str]):
+        """
+        Make a user the owner of uploaded files, registering unknown ones
+
+        Args:
+            user_id: Owner
+            filenames: File names (or paths) inside the upload folder
+        """
+        for filename in filenames:
+            filename = os.path.basename(filename)
+            conn = self._connect()
+            known = conn.execute('SELECT 1 FROM user_documents WHERE filename = ?', (filename,)).fetchone()
+            conn.close()
+            if known is None:
+                self.register_file(filename, user_id)
+                continue
+            with self.lock:
+                conn = self._connect()
+                conn.execute("UPDATE user_documents SET user_id = ? WHERE filename = ? AND kind = 'pdf'",
+                             (user_id, filename))
+                conn.commit()
+                conn.close()
+
+    def remove_user(self, user_id: str) -> List[str]:
+        """
+        Remove a user and the rows of their files
+
+        Returns:
+            Paths of the user's files (the caller deletes them)
+        """
+        with self.lock:
+            conn = self._connect()
+            rows = conn.execute('SELECT filename FROM user_documents WHERE user_id = ?', (user_id,)).fetchall()
+            conn.execute('DELETE FROM user_documents WHERE user_id = ?', (user_id,))
+            conn.execute('DELETE FROM user_urls WHERE user_id = ?', (user_id,))
+            conn.execute('DELETE FROM users WHERE user_id = ?', (user_id,))
+            conn.commit()
+            conn.close()
+        return [self.path(row['filename']) for row in rows]
+
+    def list_users(self) -> List[Dict[str, Any]]:
+        """Registered users with a profile JSON, oldest first"""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT u.user_id, u.name, u.research_interests FROM users u
+            JOIN user_documents d ON d.filename = u.profile_json
+            ORDER BY d.added_at, u.user_id
+        ''').fetchall()
+        conn.close()
+        return [{'id': row['user_id'], 'name': row['name'],
+                 'research_interests': json.loads(row['research_interests'])} for row in rows]
+
+    def user_count(self) -> int:
+        """Number of registered users with a profile JSON"""
+        conn = self._connect()
+        count = conn.execute('SELECT COUNT(*) FROM users WHERE profile_json IS NOT NULL').fetchone()[0]
+        conn.close()
+        return count
+
+    def profile_json(self, user_id: str) -> Optional[str]:
+        """Path of a user's profile JSON, None if the user has none"""
+        conn = self._connect()
+        row = conn.execute('SELECT profile_json FROM users WHERE user_id = ?', (user_id,)).fetchone()
+        conn.close()
+        if row is None or not row['profile_json']:
+            return None
+        path = self.path(row['profile_json'])
+        if not os.path.exists(path):
+            self.unregister_file(row['profile_json'])
+            return None
+        return path
+
+    def documents(self, user_id: str, kind: str = 'pdf', include_unowned: bool = False) -> List[str]:
+        """
+        Paths of a user's files of one kind, in upload order
+
+        Args:
+            user_id: Owner
+            kind: 'pdf' or 'json'
+            include_unowned: Also return PDFs that have no owner yet (use when
+                building a profile, so unassigned PDFs keep contributing to it)
+        """
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT filename FROM user_documents
+            WHERE (user_id = ? OR (? AND user_id IS NULL AND kind = 'pdf')) AND kind = ?
+            ORDER BY added_at, filename
+        ''', (user_id, include_unowned, kind)).fetchall()
+        conn.close()
+        return [self.path(row['filename']) for row in rows]
+
+    def unowned_documents(self) -> List[str]:
+        """Paths of the PDFs that have not been assigned to a user, in upload order"""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT filename FROM user_documents WHERE user_id IS NULL AND kind = 'pdf'
+            ORDER BY added_at, filename
+        ''').fetchall()
+        conn.close()
+        return [self.path(row['filename']) for row in rows]
+
+    def document_version(self, user_id: str, include_unowned: bool = False) -> str:
+        """
+        Version of a user's document set (profile JSON and PDFs)
+
+        Files changed on disk since they were registered are registered again
+        (a stat per file; only changed files are hashed) and deleted files are
+        removed, so the version changes whenever a source file does.
+
+        Args:
+            user_id: Owner
+            include_unowned: Include unassigned PDFs, as in documents()
+
+        Returns:
+            Hash of the user's file names and content hashes
+        """
+        query = '''
+            SELECT filename, file_hash FROM user_documents
+            WHERE user_id = ? OR (? AND user_id IS NULL AND kind = 'pdf') ORDER BY filename
+        '''
+        conn = self._connect()
+        filenames = [row['filename'] for row in conn.execute(query, (user_id, include_unowned))]
+        conn.close()
+        for filename in filenames:
+            if os.path.exists(self.path(filename)):
+                self.register_file(filename)
+            else:
+                self.unregister_file(filename)
+
+        conn = self._connect()
+        rows = conn.execute(query, (user_id, include_unowned)).fetchall()
+        conn.close()
+        payload = json.dumps([[row['filename'], row['file_hash']] for row in rows])
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    def urls(self, user_id: str) -> List[Dict[str, str]]:
+        """URLs listed in a user's profile JSON"""
+        conn = self._connect()
+        rows = conn.execute('SELECT url, type, status FROM user_urls WHERE user_id = ? ORDER BY position',
+                            (user_id,)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
@@ -4,57 +4,181 @@ Uses ChromaDB for storing and searching embeddings
 """
 
 import os
+import re
 import json
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Any, Optional, Tuple
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 import numpy as np
 from datetime import datetime
+from chromadb.errors import ChromaError
+
+try:
+    from .exact_search_index import ExactSearchIndex
+    from .document_store import OpportunityDocumentStore
+    from .lexical_index import LexicalIndex
+    from .reranking import mmr_rerank
+    from .vector_store import ChromaVectorStore, LocalVectorStore, metadata_matches, validate_hnsw_settings
+    from .partitioned_vector_store import PartitionedVectorStore
+    from .vector_snapshot import VectorSnapshot
+    from .client_registry import get_chroma_client, discard_chroma_client
+    from .concurrency import ReadWriteLock, BackgroundWriter
+    from .opportunity_metadata import (typed_metadata, build_opportunity_filter, is_partition_name,
+                                       METADATA_SCHEMA_VERSION)
+except ImportError:
+    from exact_search_index import ExactSearchIndex
+    from document_store import OpportunityDocumentStore
+    from lexical_index import LexicalIndex
+    from reranking import mmr_rerank
+    from vector_store import ChromaVectorStore, LocalVectorStore, metadata_matches, validate_hnsw_settings
+    from partitioned_vector_store import PartitionedVectorStore
+    from vector_snapshot import VectorSnapshot
+    from client_registry import get_chroma_client, discard_chroma_client
+    from concurrency import ReadWriteLock, BackgroundWriter
+    from opportunity_metadata import (typed_metadata, build_opportunity_filter, is_partition_name,
+                                      METADATA_SCHEMA_VERSION)
 
 
 class VectorDatabaseManager:
     """Manages vector storage and retrieval using ChromaDB"""
     
-    def __init__(self, persist_directory: str = "./chroma_db"):
+    # Version of the opportunity document layout (documents live in the document store)
+    DOCUMENT_STORE_VERSION = 1
+    # Opportunities collection; deadline partitions are named "<collection>.<partition>"
+    OPPORTUNITIES_COLLECTION = "funding_opportunities"
+    # Search result fields kept when results are hydrated with full documents
+    SEARCH_FIELDS = ("match_id", "similarity_score", "raw_distance", "lexical_score", "rrf_score")
+    # Errors that mean the ChromaDB files themselves cannot be read
+    CHROMA_CORRUPTION_ERRORS = (ChromaError, sqlite3.DatabaseError)
+    # ChromaDB segment directories are named by UUID
+    _SEGMENT_DIR = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+    
+    def __init__(self, persist_directory: str = "./chroma_db", use_exact_search: bool = False,
+                 document_store_path: Optional[str] = None, vector_backend: Optional[str] = None,
+                 local_store_directory: Optional[str] = None, hnsw_config: Optional[Dict[str, Any]] = None,
+                 snapshot_directory: Optional[str] = None, write_batching: Optional[bool] = None,
+                 partition_by_deadline: Optional[bool] = None):
         """
         Initialize ChromaDB client
         
         Args:
             persist_directory: Directory to persist the database
+            use_exact_search: Serve opportunity searches from an in-memory NumPy mirror
+                of the opportunities collection instead of ChromaDB's HNSW index
+            document_store_path: SQLite file holding full opportunity documents
+                (defaults to opportunity_documents.db inside persist_directory)
+            vector_backend: Vector store for opportunities: "chroma" or "local"
+                (on-disk NumPy/hnswlib store, see vector_store.LocalVectorStore).
+                Defaults to the VECTOR_BACKEND environment variable, then "chroma"
+            local_store_directory: Directory of the local vector store
+                (defaults to local_vector_store inside persist_directory)
+            hnsw_config: HNSW settings for the opportunities index: space ("l2", "cosine"
+                or "ip"), construction_ef, search_ef and M. Unset values fall back to the
+                CHROMA_HNSW_SPACE, CHROMA_HNSW_CONSTRUCTION_EF, CHROMA_HNSW_SEARCH_EF and
+                CHROMA_HNSW_M environment variables, then to the backend defaults.
+                Changing space, construction_ef or M rebuilds an existing collection
+            snapshot_directory: Directory of the memory-mapped vector snapshot written by
+                export_snapshot() (defaults to vector_snapshot inside persist_directory).
+                A snapshot that matches the store serves searches while the vector
+                store warms up in the background
+            write_batching: Queue opportunity writes for a background writer that applies
+                them in coalesced batches (defaults to the VECTOR_WRITE_BATCHING environment
+                variable, then False). Reads always see the calling thread's own writes;
+                call flush() to wait for everyone's
+            partition_by_deadline: Store opportunities in one partition per deadline quarter
+                plus a "continuous" partition (defaults to the PARTITION_BY_DEADLINE environment
+                variable, then False). Searches skip quarters that have ended and
+                retire_expired_partitions() drops them whole. An existing unpartitioned
+                collection is moved into partitions on first start; once partitioned, the
+                partitions are opened even if this is off
         """
+        vector_backend = vector_backend or os.getenv('VECTOR_BACKEND', 'chroma').lower()
+        if vector_backend not in ("chroma", "local"):
+            raise ValueError(f"Unknown vector backend: {vector_backend}")
+        
         self.persist_directory = persist_directory
+        self.document_store_path = document_store_path or os.path.join(persist_directory, "opportunity_documents.db")
+        self.vector_backend = vector_backend
+        self.local_store_directory = local_store_directory or os.path.join(persist_directory, "local_vector_store")
+        self.hnsw_config = self._resolve_hnsw_config(hnsw_config)
+        if partition_by_deadline is None:
+            partition_by_deadline = os.getenv('PARTITION_BY_DEADLINE', 'false').lower() == 'true'
+        self.partition_by_deadline = partition_by_deadline
+        if vector_backend == "local" and self.hnsw_config.get("space", "l2") != "l2":
+            raise ValueError("The local vector backend only supports the l2 space")
+        # The local backend already searches in memory, so it never needs the mirror
+        self.exact_index = ExactSearchIndex() if use_exact_search and vector_backend == "chroma" else None
+        self._exact_rebuild_thread = None
+        self.snapshot_directory = snapshot_directory or os.path.join(persist_directory, "vector_snapshot")
+        self.snapshot = VectorSnapshot.load(self.snapshot_directory)
+        self._vector_store_warm = threading.Event()
+        
+        # Searches run in parallel; opportunity writes are exclusive
+        self.rw_lock = ReadWriteLock()
+        if write_batching is None:
+            write_batching = os.getenv('VECTOR_WRITE_BATCHING', 'false').lower() == 'true'
+        self.writer = BackgroundWriter(self._apply_opportunity_writes) if write_batching else None
         
         try:
-            # Create ChromaDB client with persistence
-            self.client = chromadb.PersistentClient(
-                path=persist_directory,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
-            
-            # Initialize collections
-            self._init_collections()
-        except Exception as e:
-            print(f"Error initializing ChromaDB: {e}")
-            print("Attempting to recreate database...")
-            
-            # Remove old database and retry
-            import shutil
-            if os.path.exists(persist_directory):
-                shutil.rmtree(persist_directory)
-            
-            # Try again with fresh database
-            self.client = chromadb.PersistentClient(
-                path=persist_directory,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
-                )
-            )
-            self._init_collections()
+            # ChromaDB client with persistence, shared with every other manager on this directory
+            self.client = get_chroma_client(persist_directory)
+            self.client.list_collections()
+        except self.CHROMA_CORRUPTION_ERRORS as e:
+            # Only unreadable ChromaDB files are set aside; configuration, migration and
+            # partition errors below propagate and never touch stored data
+            print(f"Error opening ChromaDB: {e}")
+            discard_chroma_client(persist_directory)
+            backup = self._set_aside_chroma_files(persist_directory)
+            print(f"Recreating ChromaDB; the unreadable files were moved to {backup}")
+            self.client = get_chroma_client(persist_directory)
+        
+        # Initialize collections
+        self._init_collections()
+        
+        self._warm_vector_store_async()
+        
+    @staticmethod
+    def _resolve_hnsw_config(hnsw_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge explicit HNSW settings with the CHROMA_HNSW_* environment variables
+        
+        Raises:
+            ValueError: For invalid settings, before any database is opened
+        """
+        config = {}
+        for key, env_var in (("space", "CHROMA_HNSW_SPACE"), ("construction_ef", "CHROMA_HNSW_CONSTRUCTION_EF"),
+                             ("search_ef", "CHROMA_HNSW_SEARCH_EF"), ("M", "CHROMA_HNSW_M")):
+            value = os.getenv(env_var)
+            if value:
+                try:
+                    config[key] = value.lower() if key == "space" else int(value)
+                except ValueError:
+                    raise ValueError(f"{env_var} must be an integer, got {value!r}")
+        config.update({key: value for key, value in (hnsw_config or {}).items() if value is not None})
+        validate_hnsw_settings(config)
+        return config
+    
+    @staticmethod
+    def _set_aside_chroma_files(persist_directory: str) -> str:
+        """
+        Move ChromaDB's own files (chroma.sqlite3 and segment directories) into a backup
+        directory, leaving the document store, lexical index and other files in place
         
+        Returns:
+            Path of the backup directory
+        """
+        backup = os.path.join(persist_directory, f"chroma_corrupt_{int(time.time())}")
+        os.makedirs(backup, exist_ok=True)
+        for name in os.listdir(persist_directory):
+            path = os.path.join(persist_directory, name)
+            if name.startswith("chroma.sqlite3") or (os.path.isdir(path) and VectorDatabaseManager._SEGMENT_DIR.match(name)):
+                shutil.move(path, os.path.join(backup, name))
+        return backup
+    
     def _init_collections(self):
         """Initialize or get existing collections"""
         # Researcher profiles collection
@@ -63,11 +187,21 @@ class VectorDatabaseManager:
             metadata={"description": "Researcher semantic profiles with embeddings"}
         )
         
-        # Funding opportunities collection
-        self.opportunities = self.client.get_or_create_collection(
-            name="funding_opportunities",
-            metadata={"description": "Funding opportunities with embeddings"}
-        )
+        # Funding opportunities: vectors and compact metadata behind the VectorStore interface.
+        # `opportunities` stays the raw ChromaDB collection (None for other backends and partitions)
+        self.opportunity_store = None
+        self.opportunities = None
+        if not self.partition_by_deadline and self._existing_partitions():
+            # The migration into partitions is one-way: never fall back to an empty unpartitioned store
+            print("Opportunities are partitioned by deadline; opening the partitions although "
+                  "PARTITION_BY_DEADLINE is not set")
+            self.partition_by_deadline = True
+        if self.vector_backend == "local":
+            if not self.partition_by_deadline or LocalVectorStore.exists(self.local_store_directory):
+                self.opportunity_store = self._open_local_store(self.local_store_directory)
+        elif not self.partition_by_deadline or self.OPPORTUNITIES_COLLECTION in self._collection_names():
+            self.opportunity_store = self._open_chroma_store(self.OPPORTUNITIES_COLLECTION)
+            self.opportunities = self.opportunity_store.collection
         
         # Proposals collection (for retrofitting analysis)
         self.proposals = self.client.get_or_create_collection(
@@ -75,6 +209,421 @@ class VectorDatabaseManager:
             metadata={"description": "Historical proposals for retrofitting analysis"}
         )
         
+        # Full opportunity documents live outside ChromaDB, next to their lexical index
+        self.documents = OpportunityDocumentStore(self.document_store_path)
+        self.lexical_index = LexicalIndex(os.path.join(os.path.dirname(self.document_store_path) or ".",
+                                                       "lexical_index.db"))
+        
+        if self.opportunities is not None:
+            self._migrate_documents_to_store()
+            self._backfill_typed_metadata()
+        
+        if self.partition_by_deadline:
+            self._open_partitions()
+        self._backfill_lexical_index()
+        
+        if self.exact_index is not None:
+            if self._usable_snapshot() is not None:
+                # Seed the mirror from the memory-mapped snapshot instead of paging through ChromaDB
+                self.exact_index.clear()
+                self.exact_index.upsert(self.snapshot.ids, self.snapshot.vectors,
+                                        [self.snapshot.metadata(row) for row in range(len(self.snapshot))])
+                self.exact_index.version = self.snapshot.corpus_version
+            else:
+                self._load_exact_index()
+    
+    def _collection_names(self) -> List[str]:
+        return [getattr(collection, "name", collection) for collection in self.client.list_collections()]
+    
+    def _open_chroma_store(self, name: str, partition: Optional[str] = None) -> ChromaVectorStore:
+        metadata = {"description": "Funding opportunities with embeddings"}
+        if partition:
+            metadata["deadline_partition"] = partition
+        return ChromaVectorStore(self.client, name=name, metadata=metadata, hnsw=self.hnsw_config)
+    
+    def _open_local_store(self, directory: str) -> LocalVectorStore:
+        local_settings = {"hnsw_m": self.hnsw_config.get("M"),
+                          "hnsw_construction_ef": self.hnsw_config.get("construction_ef"),
+                          "hnsw_search_ef": self.hnsw_config.get("search_ef")}
+        return LocalVectorStore(directory, **{key: value for key, value in local_settings.items() if value is not None})
+    
+    def _existing_partitions(self) -> List[str]:
+        """Names of the deadline partitions already stored"""
+        if self.vector_backend == "local":
+            partitions_directory = os.path.join(self.local_store_directory, "partitions")
+            if not os.path.isdir(partitions_directory):
+                return []
+            return [name for name in os.listdir(partitions_directory) if is_partition_name(name)]
+        prefix = f"{self.OPPORTUNITIES_COLLECTION}."
+        return [name[len(prefix):] for name in self._collection_names()
+                if name.startswith(prefix) and is_partition_name(name[len(prefix):])]
+    
+    def _open_partitions(self):
+        """Open the deadline partitions, moving an unpartitioned store into them"""
+        existing = self._existing_partitions()
+        if self.vector_backend == "local":
+            partitions_directory = os.path.join(self.local_store_directory, "partitions")
+            os.makedirs(partitions_directory, exist_ok=True)
+            store = PartitionedVectorStore(
+                lambda name: self._open_local_store(os.path.join(partitions_directory, name)),
+                lambda name: shutil.rmtree(os.path.join(partitions_directory, name), ignore_errors=True),
+                existing
+            )
+        else:
+            prefix = f"{self.OPPORTUNITIES_COLLECTION}."
+            store = PartitionedVectorStore(
+                lambda name: self._open_chroma_store(prefix + name, partition=name),
+                lambda name: self.client.delete_collection(prefix + name),
+                existing
+            )
+        
+        legacy = self.opportunity_store
+        if legacy is not None and legacy.count() > 0:
+            print(f"Moving {legacy.count()} opportunities into deadline partitions...")
+            for page in legacy.iterate(page_size=500, include_embeddings=True):
+                store.upsert(page['ids'], page['embeddings'], page['metadatas'])
+            print(f"✓ Partitioned opportunities: {', '.join(store.partitions())}")
+        if legacy is not None:
+            if self.opportunities is not None:
+                self.client.delete_collection(self.OPPORTUNITIES_COLLECTION)
+            else:
+                legacy.clear()
+        
+        self.opportunity_store = store
+        self.opportunities = None
+    
+    def _load_exact_index(self):
+        """
+        Fill the exact search mirror from the vector store
+        
+        The mirror is marked with the corpus version read before loading, so a write
+        landing while it loads leaves it marked out of date and it is reloaded again.
+        """
+        with self.rw_lock.read_locked():
+            version = self.documents.version()
+        if self.opportunities is not None:
+            self.exact_index.load_from_collection(self.opportunities)
+        else:
+            ids, embeddings, metadatas = [], [], []
+            for page in self.opportunity_store.iterate(page_size=1000, include_embeddings=True):
+                ids.extend(page['ids'])
+                embeddings.extend(page['embeddings'])
+                metadatas.extend(page['metadatas'])
+            self.exact_index.clear()
+            if ids:
+                self.exact_index.upsert(ids, embeddings, metadatas)
+        self.exact_index.version = version
+    
+    def _mirrored_write(self, version_before: int):
+        """
+        Advance the mirror's version past a write it has applied (caller holds the write lock)
+        
+        Only a mirror that was in sync before the write is in sync after it.
+        """
+        if self.exact_index is not None and self.exact_index.version == version_before:
+            self.exact_index.version = self.documents.version()
+    
+    def _set_opportunities_collection_flag(self, key: str, value: Any):
+        """Record a migration marker in the opportunities collection metadata"""
+        self.opportunity_store.set_collection_metadata(key, value)
+        self.opportunities = self.opportunity_store.collection
+    
+    def _migrate_documents_to_store(self, page_size: int = 200):
+        """
+        Move opportunity documents stored in ChromaDB (before the document store
+        existed) into the document store and blank them in ChromaDB
+        """
+        if (self.opportunities.metadata or {}).get("document_store") == self.DOCUMENT_STORE_VERSION:
+            return
+        
+        moved = 0
+        offset = 0
+        while True:
+            page = self.opportunities.get(include=['documents', 'embeddings'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            
+            ids = []
+            embeddings = []
+            documents = []
+            for i, opp_id in enumerate(page['ids']):
+                document = page['documents'][i]
+                if not document:
+                    continue
+                try:
+                    documents.append((opp_id, json.loads(document)))
+                except json.JSONDecodeError:
+                    continue
+                ids.append(opp_id)
+                embeddings.append(page['embeddings'][i])
+            
+            if ids:
+                self.documents.put_many(documents)
+                # Embeddings are passed along so ChromaDB does not try to re-embed the blank document
+                self.opportunities.update(ids=ids, embeddings=embeddings, documents=[""] * len(ids))
+                moved += len(ids)
+            
+            offset += len(page['ids'])
+            if len(page['ids']) < page_size:
+                break
+        
+        self._set_opportunities_collection_flag("document_store", self.DOCUMENT_STORE_VERSION)
+        if moved:
+            print(f"Moved {moved} opportunity documents into the document store")
+    
+    def _load_documents(self, opp_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load full opportunity documents, falling back to ChromaDB for rows
+        written directly to the collection by older scripts
+        """
+        documents = self.documents.get_many(opp_ids)
+        missing = [opp_id for opp_id in dict.fromkeys(opp_ids) if opp_id not in documents]
+        if missing and self.opportunities is not None:
+            stored = self.opportunities.get(ids=missing, include=['documents'])
+            for opp_id, document in zip(stored['ids'], stored['documents']):
+                if document:
+                    try:
+                        documents[opp_id] = json.loads(document)
+                    except json.JSONDecodeError:
+                        pass
+        return documents
+    
+    def _backfill_typed_metadata(self, page_size: int = 500):
+        """
+        Add typed metadata (deadline_ts, agency_code, ...) to opportunities stored
+        before it existed, so metadata filters also match older rows
+        """
+        collection_metadata = dict(self.opportunities.metadata or {})
+        if collection_metadata.get("metadata_schema") == METADATA_SCHEMA_VERSION:
+            return
+        
+        updated = 0
+        offset = 0
+        while True:
+            page = self.opportunities.get(include=['metadatas'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            
+            stale_ids = [opp_id for opp_id, metadata in zip(page['ids'], page['metadatas'])
+                         if (metadata or {}).get("metadata_schema") != METADATA_SCHEMA_VERSION]
+            documents = self._load_documents(stale_ids) if stale_ids else {}
+            
+            ids = []
+            metadatas = []
+            for opp_id, metadata in zip(page['ids'], page['metadatas']):
+                if (metadata or {}).get("metadata_schema") == METADATA_SCHEMA_VERSION:
+                    continue
+                opportunity = documents.get(opp_id) or {"agency": (metadata or {}).get("agency", ""),
+                                                        "close_date": (metadata or {}).get("deadline", "")}
+                ids.append(opp_id)
+                metadatas.append({**(metadata or {}), **typed_metadata(opportunity)})
+            
+            if ids:
+                # Metadata-only update keeps the stored embeddings and documents
+                self.opportunities.update(ids=ids, metadatas=metadatas)
+                updated += len(ids)
+            
+            offset += len(page['ids'])
+            if len(page['ids']) < page_size:
+                break
+        
+        self._set_opportunities_collection_flag("metadata_schema", METADATA_SCHEMA_VERSION)
+        if updated:
+            print(f"Backfilled typed metadata for {updated} opportunities")
+    
+    def _backfill_lexical_index(self, page_size: int = 500):
+        """Index opportunities stored before the lexical index existed"""
+        stored = self.opportunity_store.count()
+        if stored == 0 or self.lexical_index.count() == stored:
+            return
+        
+        print(f"Building lexical index for {stored} opportunities...")
+        self.lexical_index.clear()
+        for page in self.opportunity_store.iterate(page_size=page_size):
+            documents = self._load_documents(page['ids'])
+            self.lexical_index.index_many([(opp_id, documents.get(opp_id) or metadata or {})
+                                           for opp_id, metadata in zip(page['ids'], page['metadatas'])])
+        print(f"✓ Lexical index built ({self.lexical_index.count()} opportunities)")
+    
+    def _usable_snapshot(self) -> Optional[VectorSnapshot]:
+        """
+        The loaded snapshot if it still matches the vector store, dropping it otherwise
+        
+        A snapshot matches only if it was exported at the current corpus version, so
+        re-embedded vectors (same row count) are never served from an older snapshot.
+        """
+        if self.snapshot is not None and (self.snapshot.corpus_version != self.documents.version()
+                                          or len(self.snapshot) != self.opportunity_store.count()):
+            print("Vector snapshot is out of date; ignoring it")
+            self.snapshot = None
+        return self.snapshot
+    
+    def _warm_vector_store_async(self):
+        """
+        Run a first query against the vector store in the background so its index is
+        loaded; until then searches are served from the snapshot (if there is one)
+        """
+        if self._usable_snapshot() is None or len(self.snapshot) == 0:
+            self._vector_store_warm.set()
+            return
+        
+        probe = self.snapshot.vectors[0].tolist()
+        
+        def warm():
+            try:
+                self.opportunity_store.query(probe, 1)
+            except Exception as e:
+                print(f"Warning: Failed to warm vector store: {e}")
+            finally:
+                self._vector_store_warm.set()
+        
+        threading.Thread(target=warm, name="vector-store-warmup", daemon=True).start()
+    
+    @contextmanager
+    def _reading(self):
+        """Read lock for opportunity reads, after the calling thread's queued writes have landed"""
+        if self.writer is not None:
+            self.writer.wait_for_own_writes()
+        with self.rw_lock.read_locked():
+            yield
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued opportunity write has been applied
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            
+        Returns:
+            True if all writes were applied in time
+            
+        Raises:
+            BackgroundWriteError: If queued writes failed since the previous flush
+        """
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+    
+    def wait_for_own_writes(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the opportunity writes queued by the calling thread have been applied"""
+        if self.writer is None:
+            return True
+        return self.writer.wait_for_own_writes(timeout)
+    
+    def _invalidate_snapshot(self):
+        """Stop serving from the snapshot once this process has written to the store"""
+        self.snapshot = None
+    
+    def export_snapshot(self, directory: Optional[str] = None, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Write the opportunity vectors, ids and compact metadata to a memory-mapped snapshot
+        
+        Args:
+            directory: Snapshot directory (defaults to snapshot_directory)
+            page_size: Number of vectors read from the store per request
+            
+        Returns:
+            The snapshot manifest
+        """
+        self.flush()
+        ids, embeddings, metadatas = [], [], []
+        with self._reading():
+            corpus_version = self.documents.version()
+            for page in self.opportunity_store.iterate(page_size=page_size, include_embeddings=True):
+                ids.extend(page['ids'])
+                embeddings.extend(page['embeddings'])
+                metadatas.extend(page['metadatas'])
+        
+        manifest = VectorSnapshot.write(directory or self.snapshot_directory, ids, embeddings, metadatas,
+                                        corpus_version=corpus_version)
+        print(f"✓ Wrote vector snapshot with {manifest['count']} opportunities")
+        return manifest
+    
+    def import_snapshot(self, directory: Optional[str] = None, batch_size: int = 1000) -> int:
+        """
+        Load the vectors and compact metadata of a snapshot into the vector store
+        
+        Full documents are not part of the snapshot; opportunities without a stored
+        document are returned with their compact metadata only.
+        
+        Args:
+            directory: Snapshot directory (defaults to snapshot_directory)
+            batch_size: Number of vectors written per upsert
+            
+        Returns:
+            Number of opportunities imported
+        """
+        snapshot = VectorSnapshot.load(directory or self.snapshot_directory)
+        if snapshot is None:
+            raise ValueError(f"No vector snapshot in {directory or self.snapshot_directory}")
+        
+        self.flush()
+        with self.rw_lock.write_locked():
+            version_before = self.documents.version()
+            self._invalidate_snapshot()
+            for start in range(0, len(snapshot), batch_size):
+                end = min(start + batch_size, len(snapshot))
+                ids = snapshot.ids[start:end]
+                embeddings = np.asarray(snapshot.vectors[start:end]).tolist()
+                metadatas = [snapshot.metadata(row) for row in range(start, end)]
+                self.opportunity_store.upsert(ids, embeddings, metadatas)
+                if self.exact_index is not None:
+                    self.exact_index.upsert(ids, embeddings, metadatas)
+            self.documents.bump_version()
+            self._mirrored_write(version_before)
+        
+        return len(snapshot)
+    
+    def _rebuild_exact_index_async(self):
+        """Reload the exact search mirror from ChromaDB in the background"""
+        if self._exact_rebuild_thread and self._exact_rebuild_thread.is_alive():
+            return
+        
+        def rebuild():
+            try:
+                self._load_exact_index()
+            except Exception as e:
+                print(f"Warning: Failed to rebuild exact search index: {e}")
+        
+        self._exact_rebuild_thread = threading.Thread(target=rebuild, name="exact-index-rebuild", daemon=True)
+        self._exact_rebuild_thread.start()
+    
+    def _query_exact_index(self, profile_embeddings: List[List[float]], n_results: int) -> Optional[Dict[str, Any]]:
+        """
+        Query the in-memory mirror, returning results shaped like a ChromaDB query
+        
+        Args:
+            profile_embeddings: Query embeddings (one result list per embedding)
+            n_results: Number of neighbours per query
+        
+        Returns:
+            Query results, or None if the mirror is disabled or out of sync with ChromaDB
+        
+        Vectors and compact metadata both come from the mirror, so an in-sync query
+        makes no ChromaDB request.
+        """
+        if self.exact_index is None:
+            return None
+        
+        # Writes from other processes (CLI scripts) are not mirrored; the corpus version
+        # catches them, re-embeds included, and a cleared mirror has no version
+        if self.documents.version() != self.exact_index.version:
+            self._rebuild_exact_index_async()
+            return None
+        
+        hits = self.exact_index.search_batch(profile_embeddings, n_results)
+        unique_ids = list(dict.fromkeys(opp_id for ids, _ in hits for opp_id in ids))
+        stored_by_id = self.exact_index.get_metadatas(unique_ids)
+        if len(stored_by_id) != len(unique_ids):
+            self._rebuild_exact_index_async()
+            return None
+        
+        return {
+            'ids': [ids for ids, _ in hits],
+            'distances': [distances for _, distances in hits],
+            'metadatas': [[stored_by_id[opp_id] for opp_id in ids] for ids, _ in hits]
+        }
+        
     def add_researcher_profile(self, profile_id: str, profile: Dict[str, Any], embedding: List[float]):
         """
         Add researcher profile to vector database with duplicate checking
@@ -103,6 +652,8 @@ class VectorDatabaseManager:
             "timestamp": datetime.now().isoformat()
         }
         
+        metadata["embedding_hash"] = self.embedding_hash(embedding)
+        
         # Store in ChromaDB (upsert will update if exists)
         self.researchers.upsert(
             ids=[profile_id],
@@ -111,6 +662,75 @@ class VectorDatabaseManager:
             documents=[json.dumps(profile)]  # Store full profile as document
         )
         
+    @staticmethod
+    def embedding_hash(embedding: List[float]) -> str:
+        """Short content hash of an embedding"""
+        return hashlib.sha1(np.asarray(embedding, dtype=np.float32).tobytes()).hexdigest()[:16]
+    
+    def researcher_embedding_hash(self, profile_id: str) -> Optional[str]:
+        """
+        Hash of a stored researcher embedding, None if the researcher has no embedding
+        
+        Profiles stored with their hash need a metadata-only lookup; older
+        profiles are hashed from their embedding.
+        """
+        result = self.researchers.get(ids=[profile_id], include=['metadatas'])
+        if not result['ids']:
+            return None
+        stored_hash = (result['metadatas'][0] or {}).get("embedding_hash")
+        if stored_hash:
+            return stored_hash
+        
+        embedding = self.get_researcher_embedding(profile_id)
+        return self.embedding_hash(embedding) if embedding is not None else None
+    
+    def get_researcher_embedding(self, profile_id: str) -> Optional[List[float]]:
+        """Stored embedding of a researcher profile, None if there is none"""
+        result = self.researchers.get(ids=[profile_id], include=['embeddings'])
+        if result['embeddings'] is None or len(result['embeddings']) == 0 or result['embeddings'][0] is None:
+            return None
+        return list(result['embeddings'][0])
+    
+    def corpus_version(self) -> int:
+        """
+        Version of the stored opportunities, incremented by every upsert and delete
+        
+        Includes the calling thread's queued writes (it waits for them). Search
+        results computed at one version stay valid until the version changes.
+        """
+        with self._reading():
+            return self.documents.version()
+    
+    def score_against_researchers(self, embeddings: List[List[float]]) -> Tuple[List[str], np.ndarray]:
+        """
+        Similarity of opportunity embeddings to every stored researcher embedding
+        
+        All researcher embeddings are loaded in one call and scored with a single
+        matrix operation, using the same exp(-squared L2) similarity as searches.
+        
+        Args:
+            embeddings: Opportunity embeddings, shape (n, d)
+        
+        Returns:
+            (researcher_ids, similarity) with similarity of shape (len(researcher_ids), n)
+        """
+        vectors = np.asarray(embeddings, dtype=np.float64)
+        if len(vectors) == 0:
+            return [], np.zeros((0, 0))
+        
+        result = self.researchers.get(include=['embeddings'])
+        rows = result.get('embeddings')
+        pairs = [(researcher_id, row) for researcher_id, row in zip(result['ids'], rows if rows is not None else [])
+                 if row is not None and len(row) == vectors.shape[1]]
+        if not pairs:
+            return [], np.zeros((0, len(vectors)))
+        
+        researcher_ids = [researcher_id for researcher_id, _ in pairs]
+        researchers = np.asarray([row for _, row in pairs], dtype=np.float64)
+        distances = (np.sum(researchers ** 2, axis=1)[:, None] + np.sum(vectors ** 2, axis=1)[None, :]
+                     - 2.0 * researchers @ vectors.T)
+        return researcher_ids, np.exp(-np.maximum(distances, 0.0))
+    
     def add_funding_opportunity(self, opp_id: str, opportunity: Dict[str, Any], embedding: List[float]):
         """
         Add funding opportunity to vector database
@@ -120,23 +740,23 @@ class VectorDatabaseManager:
             opportunity: Opportunity data
             embedding: Opportunity embedding vector
         """
-        # Prepare metadata
-        metadata = {
-            "title": opportunity.get("title", "")[:100],  # Limit length
-            "agency": opportunity.get("agency", ""),
-            "deadline": opportunity.get("close_date", ""),
+        self.batch_add_opportunities([(opp_id, opportunity, embedding)])
+    
+    def _opportunity_metadata(self, opportunity: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the ChromaDB metadata stored alongside an opportunity"""
+        # ChromaDB only accepts scalar metadata values
+        return {
+            "title": str(opportunity.get("title", ""))[:100],  # Limit length
+            "agency": str(opportunity.get("agency", "")),
+            "deadline": str(opportunity.get("close_date", "")),
+            "url": str(opportunity.get("url", "")),
+            "program": str(opportunity.get("program", "")),
             "award_amount": str(opportunity.get("award_amount", "")),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            # Typed fields used for filtering inside the vector query
+            **typed_metadata(opportunity)
         }
         
-        # Store in ChromaDB
-        self.opportunities.upsert(
-            ids=[opp_id],
-            embeddings=[embedding],
-            metadatas=[metadata],
-            documents=[json.dumps(opportunity)]
-        )
-        
     def add_proposal(self, proposal_id: str, proposal: Dict[str, Any], embedding: List[float]):
         """
         Add proposal to vector database
@@ -166,33 +786,284 @@ class VectorDatabaseManager:
     def search_opportunities_for_profile(self, 
                                        profile_embedding: List[float], 
                                        n_results: int = 20,
-                                       filter_dict: Optional[Dict] = None) -> List[Dict[str, Any]]:
+                                       filter_dict: Optional[Dict] = None,
+                                       deadline_after=None,
+                                       deadline_before=None,
+                                       agencies: Optional[List[str]] = None,
+                                       programs: Optional[List[str]] = None,
+                                       phases: Optional[List[str]] = None,
+                                       include_documents: bool = True,
+                                       mmr_lambda: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Search for matching opportunities given a researcher profile embedding
         
         Args:
             profile_embedding: Researcher profile embedding
             n_results: Number of results to return
-            filter_dict: Optional metadata filters
+            filter_dict: Optional raw ChromaDB metadata filter
+            deadline_after: Only opportunities due on or after this date (epoch, datetime or date string)
+            deadline_before: Only opportunities due on or before this date
+            agencies: Only opportunities from these agencies (names or codes)
+            programs: Only opportunities from these programs (e.g. SBIR, STTR)
+            phases: Only opportunities for these phases (e.g. I, II)
+            include_documents: Return full opportunity documents. When False only the
+                compact ChromaDB metadata is returned; use hydrate_opportunities() to
+                load full documents for the results that are actually displayed
+            mmr_lambda: Re-rank the candidates with maximal marginal relevance so
+                near-duplicate topics do not fill the top of the list (1.0 = relevance
+                only, lower = more diverse). None keeps plain score order
             
         Returns:
             List of matching opportunities with scores
         """
+        filters = {
+            "filter_dict": filter_dict,
+            "deadline_after": deadline_after,
+            "deadline_before": deadline_before,
+            "agencies": agencies,
+            "programs": programs,
+            "phases": phases
+        }
+        return self.batch_search_opportunities([profile_embedding], n_results, [filters],
+                                               include_documents=include_documents, mmr_lambda=mmr_lambda)[0]
+    
+    def batch_search_opportunities(self,
+                                   profile_embeddings: List[List[float]],
+                                   n_results: int = 20,
+                                   filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+                                   include_documents: bool = True,
+                                   mmr_lambda: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for matching opportunities for many profile embeddings at once
+        
+        Queries that share the same filter are sent to ChromaDB (or the exact
+        mirror) as a single multi-embedding query, and each opportunity document
+        is decoded once no matter how many queries return it.
+        
+        Args:
+            profile_embeddings: Researcher profile embeddings
+            n_results: Number of results to return per query
+            filters: Optional per-query filters, each a dict of the keyword arguments
+                accepted by search_opportunities_for_profile (filter_dict, deadline_after,
+                deadline_before, agencies, programs, phases)
+            include_documents: Return full documents (True) or compact metadata only (False)
+            mmr_lambda: Maximal marginal relevance trade-off, see search_opportunities_for_profile
+            
+        Returns:
+            One list of matching opportunities (with scores) per query embedding
+        """
+        with self._reading():
+            return self._batch_search_opportunities(profile_embeddings, n_results, filters, include_documents,
+                                                    mmr_lambda)
+    
+    def _batch_search_opportunities(self, profile_embeddings: List[List[float]], n_results: int,
+                                    filters: Optional[List[Optional[Dict[str, Any]]]],
+                                    include_documents: bool,
+                                    mmr_lambda: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        if filters is None:
+            filters = [None] * len(profile_embeddings)
+        if len(filters) != len(profile_embeddings):
+            raise ValueError("Expected one filter per query embedding")
+        
+        # Group queries by their ChromaDB where clause
+        groups: Dict[str, Tuple[Optional[Dict], List[int]]] = {}
+        for i, query_filters in enumerate(filters):
+            where = self._search_filter(query_filters)
+            key = json.dumps(where, sort_keys=True)
+            groups.setdefault(key, (where, []))[1].append(i)
+        
         # Query ChromaDB - get more results initially to find better diversity
         initial_results = min(n_results * 3, 100)  # Get 3x results but cap at 100
-        results = self.opportunities.query(
-            query_embeddings=[profile_embedding],
-            n_results=initial_results,
-            where=filter_dict
+        
+        all_results: List[List[Dict[str, Any]]] = [[] for _ in profile_embeddings]
+        decoded: Dict[str, Dict[str, Any]] = {}
+        for where, indices in groups.values():
+            embeddings = [profile_embeddings[i] for i in indices]
+            
+            # While the vector store warms up after startup, serve searches from the snapshot.
+            # The exact mirror serves unfiltered searches only; filtered ones otherwise go to the vector store
+            results = None
+            if not self._vector_store_warm.is_set() and self._usable_snapshot() is not None:
+                results = self.snapshot.batch_query(embeddings, initial_results, where)
+            if results is None and where is None:
+                results = self._query_exact_index(embeddings, initial_results)
+            if results is None:
+                results = self.opportunity_store.batch_query(embeddings, initial_results, where)
+            
+            # Full documents (which can carry many KB of scraped content) come from
+            # the document store in one multi-get per group
+            if include_documents:
+                group_ids = [opp_id for ids in results['ids'] for opp_id in ids if opp_id not in decoded]
+                decoded.update(self._load_documents(group_ids))
+            
+            # MMR needs every candidate, and their embeddings are fetched once per group
+            keep = n_results if mmr_lambda is None else initial_results
+            vectors = None
+            if mmr_lambda is not None:
+                vectors = self._candidate_vectors([opp_id for ids in results['ids'] for opp_id in ids])
+            
+            for row, query_index in enumerate(indices):
+                matches = self._score_opportunity_results(
+                    results['ids'][row],
+                    results['distances'][row],
+                    results['metadatas'][row],
+                    keep,
+                    decoded
+                )
+                if mmr_lambda is not None:
+                    matches = self._diversify(matches, [match['similarity_score'] for match in matches],
+                                              vectors, n_results, mmr_lambda)
+                all_results[query_index] = matches
+        
+        return all_results
+    
+    def _candidate_vectors(self, opp_ids: List[str]) -> Dict[str, List[float]]:
+        """Embeddings of search candidates, from the exact mirror when it holds them"""
+        unique_ids = list(dict.fromkeys(opp_ids))
+        vectors = self.exact_index.get_vectors(unique_ids) if self.exact_index is not None else {}
+        missing = [opp_id for opp_id in unique_ids if opp_id not in vectors]
+        if missing:
+            stored = self.opportunity_store.get(missing, include_embeddings=True)
+            vectors.update(zip(stored['ids'], stored['embeddings']))
+        return vectors
+    
+    @staticmethod
+    def _diversify(matches: List[Dict[str, Any]], relevance: List[float], vectors: Dict[str, List[float]],
+                   n_results: int, mmr_lambda: float) -> List[Dict[str, Any]]:
+        """Select n_results matches by maximal marginal relevance"""
+        candidates = [position for position, match in enumerate(matches) if match['match_id'] in vectors]
+        if not candidates:
+            return matches[:n_results]
+        order = mmr_rerank(np.asarray([relevance[position] for position in candidates]),
+                           np.asarray([vectors[matches[position]['match_id']] for position in candidates]),
+                           n_results, mmr_lambda)
+        return [matches[candidates[index]] for index in order]
+    
+    @staticmethod
+    def _search_filter(query_filters: Optional[Dict[str, Any]]) -> Optional[Dict]:
+        """Where clause for the filter keywords accepted by search_opportunities_for_profile"""
+        query_filters = dict(query_filters or {})
+        return build_opportunity_filter(
+            deadline_after=query_filters.get("deadline_after"),
+            deadline_before=query_filters.get("deadline_before"),
+            agencies=query_filters.get("agencies"),
+            programs=query_filters.get("programs"),
+            phases=query_filters.get("phases"),
+            base_filter=query_filters.get("filter_dict")
         )
+    
+    def hybrid_search_opportunities(self,
+                                    profile_embedding: List[float],
+                                    query_text: str,
+                                    n_results: int = 20,
+                                    filters: Optional[Dict[str, Any]] = None,
+                                    include_documents: bool = True,
+                                    rrf_k: int = 60,
+                                    mmr_lambda: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Search with both the profile embedding and BM25 over opportunity text
         
-        # Parse results
+        The vector and lexical candidate lists are fused with reciprocal-rank
+        fusion (score = sum of 1 / (rrf_k + rank)), so exact program names such as
+        "SBIR Phase II" surface even when their embeddings rank them low.
+        
+        Args:
+            profile_embedding: Researcher profile embedding
+            query_text: Text for the lexical side (e.g. research interests or program names)
+            n_results: Number of results to return
+            filters: Filter keywords accepted by search_opportunities_for_profile
+            include_documents: Return full documents (True) or compact metadata only (False)
+            rrf_k: Reciprocal-rank fusion constant; larger values flatten rank differences
+            mmr_lambda: Re-rank the fused candidates with maximal marginal relevance
+                (relevance = fused score), see search_opportunities_for_profile
+            
+        Returns:
+            Matching opportunities with similarity_score, lexical_score and rrf_score,
+            best fused score first
+        """
+        where = self._search_filter(filters)
+        candidates = min(n_results * 3, 100)
+        
+        with self._reading():
+            vector_hits = self._batch_search_opportunities([profile_embedding], candidates, [filters], False)[0]
+            
+            # Over-fetch lexical hits so enough survive the metadata filter
+            lexical_hits = self.lexical_index.search(query_text, limit=candidates * (3 if where else 1))
+            lexical_scores = dict(lexical_hits)
+            stored = self.opportunity_store.get([opp_id for opp_id, _ in lexical_hits], include_embeddings=True)
+            lexical_ranked = [(opp_id, metadata, embedding)
+                              for opp_id, metadata, embedding in zip(stored['ids'], stored['metadatas'], stored['embeddings'])
+                              if metadata_matches(metadata or {}, where)][:candidates]
+            
+            # Lexical-only hits get the same similarity score a vector hit would have
+            by_id = {match['match_id']: match for match in vector_hits}
+            missing = [(opp_id, metadata, embedding) for opp_id, metadata, embedding in lexical_ranked
+                       if opp_id not in by_id]
+            if missing:
+                query = np.asarray(profile_embedding, dtype=np.float32)
+                vectors = np.asarray([embedding for _, _, embedding in missing], dtype=np.float32)
+                distances = ((vectors - query) ** 2).sum(axis=1).tolist()
+                for match in self._score_opportunity_results([opp_id for opp_id, _, _ in missing], distances,
+                                                             [metadata for _, metadata, _ in missing],
+                                                             len(missing), {}):
+                    by_id[match['match_id']] = match
+        
+        fused: Dict[str, float] = {}
+        for ranking in ([match['match_id'] for match in vector_hits], [opp_id for opp_id, _, _ in lexical_ranked]):
+            for rank, opp_id in enumerate(ranking, start=1):
+                fused[opp_id] = fused.get(opp_id, 0.0) + 1.0 / (rrf_k + rank)
+        
+        results = []
+        for opp_id in sorted(fused, key=lambda opp_id: fused[opp_id], reverse=True):
+            match = dict(by_id[opp_id])
+            match['lexical_score'] = lexical_scores.get(opp_id, 0.0)
+            match['rrf_score'] = fused[opp_id]
+            results.append(match)
+        
+        if mmr_lambda is not None and results:
+            with self._reading():
+                vectors = self._candidate_vectors([match['match_id'] for match in results])
+            top_score = results[0]['rrf_score']
+            results = self._diversify(results, [match['rrf_score'] / top_score for match in results],
+                                      vectors, n_results, mmr_lambda)
+        else:
+            results = results[:n_results]
+        
+        return self.hydrate_opportunities(results) if include_documents else results
+    
+    def keyword_matches(self, interests: List[str], opp_ids: List[str]) -> Dict[str, int]:
+        """
+        Count matching (interest, keyword) pairs per opportunity with an index lookup
+        
+        Args:
+            interests: Research interests
+            opp_ids: Opportunities to check
+            
+        Returns:
+            Dict mapping opportunity ID to the number of matching pairs
+        """
+        return self.lexical_index.keyword_matches(interests, opp_ids)
+    
+    def _score_opportunity_results(self, ids: List[str], distances: List[float], rows: List[Any],
+                                   n_results: int, decoded: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Turn one query's raw results into scored opportunity dicts
+        
+        Args:
+            ids: Result IDs
+            distances: Squared L2 distances
+            rows: Metadata dicts, used for results without a loaded document
+            n_results: Number of results to keep
+            decoded: Already loaded documents, shared across queries
+        """
         opportunities = []
-        for i in range(len(results['ids'][0])):
-            opportunity = json.loads(results['documents'][0][i])
+        for opp_id, distance, row in zip(ids, distances, rows):
+            if opp_id not in decoded:
+                decoded[opp_id] = dict(row or {})
+            # Each query gets its own copy since scores differ per query
+            opportunity = dict(decoded[opp_id])
             # Convert L2 distance to similarity score
             # For normalized embeddings, L2 distance ranges from 0 to 2
-            distance = results['distances'][0][i]
             
             # More sophisticated scoring that spreads out the scores
             # Use exponential decay to amplify differences
@@ -203,7 +1074,7 @@ class VectorDatabaseManager:
             
             # Also store raw distance for debugging
             opportunity['raw_distance'] = distance
-            opportunity['match_id'] = results['ids'][0][i]
+            opportunity['match_id'] = opp_id
             opportunities.append(opportunity)
         
         # Sort by similarity score and return top n_results
@@ -248,6 +1119,81 @@ class VectorDatabaseManager:
             
         return proposals
     
+    def index_retrofit_proposals(self, owner: str, proposals: List[Dict[str, Any]],
+                                 embeddings: List[List[float]]) -> int:
+        """
+        Replace the unsuccessful proposals stored for a researcher
+        
+        Args:
+            owner: Researcher key (see retrofit_index.proposal_owner())
+            proposals: Unsuccessful proposals from the researcher's profile
+            embeddings: Proposal embeddings (None entries are skipped)
+            
+        Returns:
+            Number of stored proposals
+        """
+        self.proposals.delete(where={"owner": owner})
+        rows = [(f"{owner}_retrofit_{i}", proposal, embedding)
+                for i, (proposal, embedding) in enumerate(zip(proposals, embeddings)) if embedding is not None]
+        if not rows:
+            return 0
+        
+        now = datetime.now().isoformat()
+        self.proposals.upsert(
+            ids=[proposal_id for proposal_id, _, _ in rows],
+            embeddings=[embedding for _, _, embedding in rows],
+            metadatas=[{
+                "title": str(proposal.get("title", ""))[:100],
+                "program": str(proposal.get("program", "")),
+                "success": "False",
+                "agency": str(proposal.get("agency", "")),
+                "owner": owner,
+                "timestamp": now
+            } for _, proposal, _ in rows],
+            documents=[json.dumps(proposal) for _, proposal, _ in rows]
+        )
+        return len(rows)
+    
+    def search_retrofit_candidates(self, opportunity_embeddings: List[List[float]], owner: str,
+                                   n_results: int = 1) -> List[List[Dict[str, Any]]]:
+        """
+        Closest unsuccessful proposals of a researcher for several opportunities
+        
+        All opportunities are looked up in one query restricted to the
+        researcher's proposals.
+        
+        Args:
+            opportunity_embeddings: Opportunity embeddings
+            owner: Researcher key the proposals were indexed under
+            n_results: Proposals per opportunity
+            
+        Returns:
+            For each opportunity, proposals with similarity scores, closest first
+        """
+        if not opportunity_embeddings:
+            return []
+        stored = len(self.proposals.get(where={"owner": owner}, include=[])['ids'])
+        if stored == 0:
+            return [[] for _ in opportunity_embeddings]
+        
+        results = self.proposals.query(
+            query_embeddings=opportunity_embeddings,
+            n_results=min(n_results, stored),
+            where={"$and": [{"owner": owner}, {"success": "False"}]}
+        )
+        
+        candidates = []
+        for ids, documents, distances in zip(results['ids'], results['documents'], results['distances']):
+            proposals = []
+            for proposal_id, document, distance in zip(ids, documents, distances):
+                proposal = json.loads(document)
+                # Same L2 distance conversion as search_similar_proposals
+                proposal['similarity_score'] = 1 - (min(2.0, max(0.0, distance)) / 2.0)
+                proposal['match_id'] = proposal_id
+                proposals.append(proposal)
+            candidates.append(proposals)
+        return candidates
+    
     def get_researcher_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
         """Get researcher profile by ID"""
         result = self.researchers.get(ids=[profile_id])
@@ -257,11 +1203,120 @@ class VectorDatabaseManager:
     
     def get_opportunity(self, opp_id: str) -> Optional[Dict[str, Any]]:
         """Get opportunity by ID"""
-        result = self.opportunities.get(ids=[opp_id])
-        if result['documents']:
-            return json.loads(result['documents'][0])
+        with self._reading():
+            return self._load_documents([opp_id]).get(opp_id)
+    
+    def get_opportunity_with_embedding(self, opp_id: str) -> Optional[Tuple[Dict[str, Any], List[float]]]:
+        """Get opportunity document and its stored embedding by ID"""
+        with self._reading():
+            result = self.opportunity_store.get([opp_id], include_embeddings=True)
+            document = self._load_documents([opp_id]).get(opp_id) if result['ids'] else None
+        if document is not None:
+            return document, list(result['embeddings'][0])
         return None
     
+    def get_opportunity_vectors(self, opp_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        Get the stored embeddings of several opportunities
+        
+        Args:
+            opp_ids: Opportunity IDs (e.g. the 'match_id' of search results)
+            
+        Returns:
+            Dict mapping each found ID to its embedding
+        """
+        if not opp_ids:
+            return {}
+        with self._reading():
+            return self._candidate_vectors(opp_ids)
+    
+    def get_opportunities(self, opp_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several opportunity documents in one request
+        
+        Args:
+            opp_ids: Opportunity IDs
+            
+        Returns:
+            Dict mapping each found ID to its opportunity document
+        """
+        if not opp_ids:
+            return {}
+        with self._reading():
+            return self._load_documents(opp_ids)
+    
+    def hydrate_opportunities(self, matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Replace projected (metadata-only) search results with full documents
+        
+        Scores and IDs from the search are kept; results whose document has been
+        deleted in the meantime keep their metadata.
+        
+        Args:
+            matches: Results from a search with include_documents=False
+            
+        Returns:
+            The same results, in order, with full opportunity fields
+        """
+        documents = self.get_opportunities([match['match_id'] for match in matches])
+        hydrated = []
+        for match in matches:
+            document = documents.get(match['match_id'])
+            if document is None:
+                hydrated.append(match)
+                continue
+            hydrated.append({
+                **document,
+                **{key: value for key, value in match.items() if key in self.SEARCH_FIELDS}
+            })
+        return hydrated
+    
+    def delete_opportunities(self, opp_ids: List[str]):
+        """
+        Delete opportunities by ID
+        
+        Args:
+            opp_ids: Opportunity IDs to remove
+        """
+        if not opp_ids:
+            return
+        if self.writer is not None:
+            self.writer.delete(list(opp_ids))
+            return
+        with self.rw_lock.write_locked():
+            self._delete_opportunities(list(opp_ids))
+    
+    def retire_expired_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Drop every deadline partition whose quarter has ended
+        
+        Each partition is removed with one drop instead of row-by-row deletes.
+        Does nothing unless the database is partitioned by deadline.
+        
+        Args:
+            now: Reference time (defaults to the current time)
+        
+        Returns:
+            IDs of the opportunities that were removed
+        """
+        if not isinstance(self.opportunity_store, PartitionedVectorStore):
+            return []
+        self.flush()
+        with self.rw_lock.write_locked():
+            retired = self.opportunity_store.retire_expired(now.timestamp() if now else None)
+            opp_ids = [opp_id for ids in retired.values() for opp_id in ids]
+            if opp_ids:
+                version_before = self.documents.version()
+                self._invalidate_snapshot()
+                self.documents.delete_many(opp_ids)
+                self.lexical_index.delete_many(opp_ids)
+                if self.exact_index is not None:
+                    self.exact_index.delete(opp_ids)
+                self._mirrored_write(version_before)
+            for name, ids in retired.items():
+                print(f"✓ Retired deadline partition {name} ({len(ids)} opportunities)")
+            return opp_ids
+    
     def batch_add_opportunities(self, opportunities: List[Tuple[str, Dict[str, Any], List[float]]]):
         """
         Batch add multiple opportunities
@@ -269,6 +1324,37 @@ class VectorDatabaseManager:
         Args:
             opportunities: List of (id, opportunity_data, embedding) tuples
         """
+        if not opportunities:
+            return
+        if self.writer is not None:
+            self.writer.upsert([(opp_id, (opportunity, embedding)) for opp_id, opportunity, embedding in opportunities])
+            return
+        with self.rw_lock.write_locked():
+            self._add_opportunities(opportunities)
+    
+    def _apply_opportunity_writes(self, upserts: List[Tuple[str, Any]], deletes: List[str]):
+        """Apply one coalesced batch from the background writer"""
+        with self.rw_lock.write_locked():
+            if deletes:
+                self._delete_opportunities(deletes)
+            if upserts:
+                self._add_opportunities([(opp_id, opportunity, embedding)
+                                         for opp_id, (opportunity, embedding) in upserts])
+    
+    def _delete_opportunities(self, opp_ids: List[str]):
+        """Delete opportunities (caller holds the write lock)"""
+        version_before = self.documents.version()
+        self._invalidate_snapshot()
+        self.opportunity_store.delete(opp_ids)
+        self.documents.delete_many(opp_ids)
+        self.lexical_index.delete_many(opp_ids)
+        
+        if self.exact_index is not None:
+            self.exact_index.delete(opp_ids)
+        self._mirrored_write(version_before)
+    
+    def _add_opportunities(self, opportunities: List[Tuple[str, Dict[str, Any], List[float]]]):
+        """Store opportunities (caller holds the write lock)"""
         ids = []
         embeddings = []
         metadatas = []
@@ -278,31 +1364,31 @@ class VectorDatabaseManager:
             ids.append(opp_id)
             embeddings.append(embedding)
             
-            # Prepare metadata
-            metadata = {
-                "title": opportunity.get("title", "")[:100],
-                "agency": opportunity.get("agency", ""),
-                "deadline": opportunity.get("close_date", ""),
-                "award_amount": str(opportunity.get("award_amount", "")),
-                "timestamp": datetime.now().isoformat()
-            }
-            metadatas.append(metadata)
-            documents.append(json.dumps(opportunity))
-        
-        # Batch upsert
-        self.opportunities.upsert(
-            ids=ids,
-            embeddings=embeddings,
-            metadatas=metadatas,
-            documents=documents
-        )
+            metadatas.append(self._opportunity_metadata(opportunity))
+            documents.append((opp_id, opportunity))
+        
+        version_before = self.documents.version()
+        self.documents.put_many(documents)
+        self.lexical_index.index_many(documents)
+        self._invalidate_snapshot()
+        
+        # Batch upsert (the vector store keeps only vectors and compact metadata)
+        self.opportunity_store.upsert(ids, embeddings, metadatas)
+        
+        if self.exact_index is not None:
+            self.exact_index.upsert(ids, embeddings, metadatas)
+        self._mirrored_write(version_before)
     
     def get_collection_stats(self) -> Dict[str, int]:
         """Get statistics about collections"""
+        with self._reading():
+            return self._collection_stats()
+    
+    def _collection_stats(self) -> Dict[str, int]:
         try:
             # Try to get counts directly
             researchers_count = self.researchers.count()
-            opportunities_count = self.opportunities.count()
+            opportunities_count = self.opportunity_store.count()
             proposals_count = self.proposals.count()
         except Exception as e:
             # If count() fails, try to get all items and count them
@@ -332,44 +1418,89 @@ class VectorDatabaseManager:
         }
     
     def get_all_opportunities(self) -> List[Dict[str, Any]]:
-        """Get all funding opportunities"""
+        """Get all funding opportunities (prefer iter_opportunities for large corpora)"""
         try:
-            # Get all opportunities
-            results = self.opportunities.get()
-            
-            opportunities = []
-            if results and isinstance(results, dict) and 'ids' in results and results['ids']:
-                for i, id in enumerate(results['ids']):
-                    metadata = results['metadatas'][i] if 'metadatas' in results else {}
-                    # Parse the full document to get all fields
-                    if 'documents' in results and i < len(results['documents']):
-                        try:
-                            doc = json.loads(results['documents'][i])
-                            opportunities.append({
-                                'id': id,
-                                'title': doc.get('title', metadata.get('title', 'Unknown')),
-                                'agency': doc.get('agency', metadata.get('agency', 'Unknown')),
-                                'url': doc.get('url', doc.get('solicitation_url', doc.get('sbir_topic_link', ''))),
-                                'description': (doc.get('description', '')[:200] + '...') if doc.get('description') else '',
-                                'deadline': doc.get('close_date', doc.get('deadline', metadata.get('deadline', ''))),
-                                'topic_number': doc.get('topic_number', doc.get('Topic Number', ''))
-                            })
-                        except:
-                            # Fallback to metadata only
-                            opportunities.append({
-                                'id': id,
-                                'title': metadata.get('title', 'Unknown'),
-                                'agency': metadata.get('agency', 'Unknown'),
-                                'url': '',
-                                'description': '',
-                                'deadline': metadata.get('deadline', '')
-                            })
-            
-            return opportunities
+            return list(self.iter_opportunities())
         except Exception as e:
             print(f"Error getting opportunities: {e}")
             return []
     
+    def iter_opportunities(self, page_size: int = 500, include_documents: bool = True,
+                           offset: int = 0, limit: Optional[int] = None,
+                           where: Optional[Dict] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield compact opportunity records one page at a time
+        
+        Only metadata (and, if requested, documents for the current page) is
+        loaded, never embeddings, so memory stays flat as the corpus grows.
+        
+        Args:
+            page_size: Number of opportunities fetched per request
+            include_documents: Load full documents to fill description, url and topic number;
+                when False records are built from vector store metadata alone
+            offset: Number of opportunities to skip
+            limit: Maximum number of records to yield
+            where: Optional ChromaDB metadata filter
+            
+        Yields:
+            Dicts with id, title, agency, url, description, deadline (and topic_number
+            when the document is available)
+        """
+        pages = self.opportunity_store.iterate(page_size=page_size, offset=offset, limit=limit, where=where)
+        while True:
+            # Lock per page, not across yields: the consumer may write between pages
+            with self._reading():
+                page = next(pages, None)
+                if page is None:
+                    return
+                documents = self._load_documents(page['ids']) if include_documents else {}
+            for opp_id, metadata in zip(page['ids'], page['metadatas']):
+                yield self._opportunity_record(opp_id, metadata or {}, documents.get(opp_id))
+    
+    def get_opportunities_page(self, offset: int = 0, limit: int = 50,
+                               include_documents: bool = True) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get one page of compact opportunity records
+        
+        Args:
+            offset: Number of opportunities to skip
+            limit: Page size
+            include_documents: As in iter_opportunities
+            
+        Returns:
+            Tuple of (records, offset of the next page or None if this is the last page)
+        """
+        # Fetch one extra record to know whether another page follows
+        records = list(self.iter_opportunities(page_size=limit + 1, include_documents=include_documents,
+                                               offset=offset, limit=limit + 1))
+        next_offset = offset + limit if len(records) > limit else None
+        return records[:limit], next_offset
+    
+    def _opportunity_record(self, opp_id: str, metadata: Dict[str, Any],
+                            doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the compact listing record for an opportunity"""
+        if doc is not None:
+            # Use the full document to get all fields
+            return {
+                'id': opp_id,
+                'title': doc.get('title', metadata.get('title', 'Unknown')),
+                'agency': doc.get('agency', metadata.get('agency', 'Unknown')),
+                'url': doc.get('url', doc.get('solicitation_url', doc.get('sbir_topic_link', ''))),
+                'description': (doc.get('description', '')[:200] + '...') if doc.get('description') else '',
+                'deadline': doc.get('close_date', doc.get('deadline', metadata.get('deadline', ''))),
+                'topic_number': doc.get('topic_number', doc.get('Topic Number', ''))
+            }
+        
+        # Metadata only
+        return {
+            'id': opp_id,
+            'title': metadata.get('title', 'Unknown'),
+            'agency': metadata.get('agency', 'Unknown'),
+            'url': metadata.get('url', ''),
+            'description': '',
+            'deadline': metadata.get('deadline', '')
+        }
+    
     def get_all_researchers(self) -> List[Dict[str, Any]]:
         """Get all researchers"""
         try:
@@ -412,8 +1543,16 @@ class VectorDatabaseManager:
             self.client.delete_collection("researcher_profiles")
             self._init_collections()
         elif collection_name == "opportunities":
-            self.client.delete_collection("funding_opportunities")
-            self._init_collections()
+            self.flush()
+            with self.rw_lock.write_locked():
+                self._invalidate_snapshot()
+                self.opportunity_store.clear()
+                self.documents.clear()
+                self.lexical_index.clear()
+                if self.exact_index is not None:
+                    self.exact_index.clear()
+                    self.exact_index.version = self.documents.version()
+                self._init_collections()
         elif collection_name == "proposals":
             self.client.delete_collection("proposals")
             self._init_collections()
@@ -428,6 +1567,29 @@ class VectorDatabaseManager:
             return False
 
 
+# One manager per database directory, shared by every component in the process
+_shared_vector_dbs: Dict[str, VectorDatabaseManager] = {}
+_shared_vector_dbs_lock = threading.Lock()
+
+def get_vector_db(persist_directory: str = "./chroma_db", **options) -> VectorDatabaseManager:
+    """
+    Get or create the shared VectorDatabaseManager for a database directory
+    
+    Args:
+        persist_directory: Directory of the database
+        **options: VectorDatabaseManager keyword arguments, applied when the
+            manager for this directory is first created
+    
+    Returns:
+        The shared manager
+    """
+    key = os.path.realpath(persist_directory)
+    with _shared_vector_dbs_lock:
+        if key not in _shared_vector_dbs:
+            _shared_vector_dbs[key] = VectorDatabaseManager(persist_directory=persist_directory, **options)
+        return _shared_vector_dbs[key]
+
+
 if __name__ == "__main__":
     # Test the vector database
     db = VectorDatabaseManager()
@@ -0,0 +1,202 @@
+"""
+Vector Snapshot for FundingMatch
+Memory-mapped on-disk copy of the opportunity vectors for fast cold starts
+"""
+
+import os
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+try:
+    from .vector_store import metadata_matches
+except ImportError:
+    from vector_store import metadata_matches
+
+
+class VectorSnapshot:
+    """
+    Read-only snapshot of the opportunity vectors, ids and compact metadata.
+
+    Layout of a snapshot directory:
+        vectors.npy    float32 matrix, one row per opportunity (memory-mapped on load)
+        norms.npy      squared row norms, for squared L2 distances
+        columns.json   ids plus one list per metadata field (columnar)
+        manifest.json  format version, row count, dimension, corpus version and creation time
+
+    The manifest is written last, so a snapshot whose manifest does not match
+    its arrays (an interrupted export) is ignored on load.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory: str, ids: List[str], vectors: np.ndarray, norms: np.ndarray,
+                 columns: Dict[str, List[Any]], manifest: Dict[str, Any]):
+        self.directory = directory
+        self.ids = ids
+        self.vectors = vectors
+        self.norms = norms
+        self.columns = columns
+        self.manifest = manifest
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.manifest.get("dimension")
+
+    @property
+    def corpus_version(self) -> Optional[int]:
+        """Opportunity corpus version the snapshot was exported at (None if not recorded)"""
+        return self.manifest.get("corpus_version")
+
+    @staticmethod
+    def _replace(path: str, write):
+        """Write a file under a temporary name, then move it into place"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def write(cls, directory: str, ids: List[str], embeddings, metadatas: List[Dict[str, Any]],
+              corpus_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Write a snapshot, replacing any existing one in `directory`
+
+        Args:
+            directory: Snapshot directory
+            ids: Opportunity IDs
+            embeddings: Embeddings, one per ID (list of lists or 2-D array)
+            metadatas: Compact metadata dicts, one per ID
+            corpus_version: Opportunity corpus version the rows were read at
+
+        Returns:
+            The snapshot manifest
+        """
+        if not (len(ids) == len(embeddings) == len(metadatas)):
+            raise ValueError("Expected one embedding and one metadata dict per ID")
+
+        os.makedirs(directory, exist_ok=True)
+        vectors = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if vectors.ndim != 2:
+            vectors = vectors.reshape(len(ids), -1)
+        norms = np.einsum('ij,ij->i', vectors, vectors).astype(np.float32)
+
+        fields = sorted({key for metadata in metadatas for key in (metadata or {})})
+        columns = {"ids": list(ids)}
+        columns.update({field: [(metadata or {}).get(field) for metadata in metadatas] for field in fields})
+
+        manifest = {
+            "format_version": cls.FORMAT_VERSION,
+            "count": len(ids),
+            "dimension": int(vectors.shape[1]) if len(ids) else None,
+            "fields": fields,
+            "corpus_version": corpus_version,
+            "created_at": datetime.now().isoformat()
+        }
+
+        cls._replace(os.path.join(directory, "vectors.npy"), lambda f: np.save(f, vectors))
+        cls._replace(os.path.join(directory, "norms.npy"), lambda f: np.save(f, norms))
+        cls._replace(os.path.join(directory, "columns.json"), lambda f: f.write(json.dumps(columns).encode('utf-8')))
+        cls._replace(os.path.join(directory, "manifest.json"),
+                     lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+        return manifest
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["VectorSnapshot"]:
+        """
+        Open a snapshot with its vectors memory-mapped
+
+        Returns:
+            The snapshot, or None if there is no complete snapshot in `directory`
+        """
+        manifest_path = os.path.join(directory, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            with open(os.path.join(directory, "columns.json"), 'r') as f:
+                columns = json.load(f)
+            vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode='r')
+            norms = np.load(os.path.join(directory, "norms.npy"), mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load vector snapshot: {e}")
+            return None
+
+        ids = columns.pop("ids", [])
+        count = manifest.get("count")
+        if (manifest.get("format_version") != cls.FORMAT_VERSION or len(ids) != count
+                or vectors.shape[0] != count or norms.shape[0] != count):
+            print("Warning: Ignoring incomplete or outdated vector snapshot")
+            return None
+
+        return cls(directory, ids, vectors, norms, columns, manifest)
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """Compact metadata of one row (fields that were missing are left out)"""
+        return {field: values[row] for field, values in self.columns.items() if values[row] is not None}
+
+    def _matching_rows(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        if where is None:
+            return None
+        return np.fromiter((row for row in range(len(self.ids)) if metadata_matches(self.metadata(row), where)),
+                           dtype=np.int64)
+
+    def batch_query(self, embeddings: List[List[float]], n_results: int,
+                    where: Optional[Dict] = None) -> Dict[str, List[List[Any]]]:
+        """
+        Exact nearest neighbours, shaped like VectorStore.batch_query
+
+        Args:
+            embeddings: Query embeddings
+            n_results: Number of neighbours per query
+            where: Optional metadata filter (same operators as the vector store)
+
+        Returns:
+            Dict with 'ids', 'distances' (squared L2) and 'metadatas' lists of lists
+        """
+        empty = {'ids': [[] for _ in embeddings], 'distances': [[] for _ in embeddings],
+                 'metadatas': [[] for _ in embeddings]}
+        rows = self._matching_rows(where)
+        if len(self.ids) == 0 or n_results <= 0 or not embeddings or (rows is not None and len(rows) == 0):
+            return empty
+
+        queries = np.asarray(embeddings, dtype=np.float32)
+        matrix = self.vectors if rows is None else self.vectors[rows]
+        norms = self.norms if rows is None else self.norms[rows]
+
+        # ||q - x||^2 = ||q||^2 + ||x||^2 - 2 q.x
+        distances = norms[None, :] - 2.0 * (queries @ matrix.T) + np.einsum('ij,ij->i', queries, queries)[:, None]
+        np.maximum(distances, 0.0, out=distances)
+
+        k = min(n_results, distances.shape[1])
+        if k < distances.shape[1]:
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(distances.shape[1]), (len(queries), 1))
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_distances = np.take_along_axis(top_distances, order, axis=1)
+        if rows is not None:
+            top = rows[top]
+
+        return {
+            'ids': [[self.ids[i] for i in row] for row in top],
+            'distances': [row.tolist() for row in top_distances],
+            'metadatas': [[self.metadata(i) for i in row] for row in top]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and age of the snapshot"""
+        return {
+            "vectors": len(self.ids),
+            "dimension": self.dimension,
+            "created_at": self.manifest.get("created_at"),
+            "vector_bytes": int(self.vectors.nbytes)
+        }
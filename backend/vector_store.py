@@ -0,0 +1,713 @@
+"""
+Vector Store backends for FundingMatch
+Common interface over ChromaDB and a local on-disk ANN index
+"""
+
+import os
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+import numpy as np
+
+try:
+    from .exact_search_index import ExactSearchIndex
+except ImportError:
+    from exact_search_index import ExactSearchIndex
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+class VectorStore(ABC):
+    """
+    Minimal vector store interface used by the database managers.
+
+    Distances are squared L2 (ChromaDB's default "l2" space) so similarity
+    scores do not depend on the backend. Metadata values are scalars and
+    `where` filters use ChromaDB's operator syntax.
+    """
+
+    @abstractmethod
+    def upsert(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        """Insert or replace vectors and their metadata"""
+
+    @abstractmethod
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Replace the metadata of existing vectors, keeping their embeddings"""
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        """Delete vectors by ID (missing IDs are ignored)"""
+
+    @abstractmethod
+    def get(self, ids: List[str], include_embeddings: bool = False) -> Dict[str, Any]:
+        """
+        Fetch stored items by ID
+
+        Returns:
+            Dict with 'ids', 'metadatas' and, if requested, 'embeddings' (missing IDs are omitted)
+        """
+
+    @abstractmethod
+    def batch_query(self, embeddings: List[List[float]], n_results: int,
+                    where: Optional[Dict] = None) -> Dict[str, List[List[Any]]]:
+        """
+        Nearest neighbours for several query embeddings sharing one filter
+
+        Returns:
+            Dict with 'ids', 'distances' and 'metadatas', each holding one list per query
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored vectors"""
+
+    @abstractmethod
+    def iterate(self, page_size: int = 500, offset: int = 0, limit: Optional[int] = None,
+                where: Optional[Dict] = None, include_embeddings: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield stored items one page at a time
+
+        Yields:
+            Dicts shaped like get() results
+        """
+
+    @abstractmethod
+    def clear(self):
+        """Delete every vector"""
+
+    def query(self, embedding: List[float], n_results: int, where: Optional[Dict] = None) -> Dict[str, List[Any]]:
+        """
+        Nearest neighbours for a single query embedding
+
+        Returns:
+            Dict with 'ids', 'distances' and 'metadatas' lists
+        """
+        results = self.batch_query([embedding], n_results, where)
+        return {key: values[0] for key, values in results.items()}
+
+
+# HNSW settings as ChromaDB collection metadata keys and as collection configuration keys
+HNSW_METADATA_KEYS = {
+    "space": "hnsw:space",
+    "construction_ef": "hnsw:construction_ef",
+    "search_ef": "hnsw:search_ef",
+    "M": "hnsw:M"
+}
+HNSW_CONFIGURATION_KEYS = {
+    "space": "space",
+    "construction_ef": "ef_construction",
+    "search_ef": "ef_search",
+    "M": "max_neighbors"
+}
+# ChromaDB defaults for collections created without HNSW settings
+DEFAULT_HNSW_SETTINGS = {"space": "l2", "construction_ef": 100, "search_ef": 100, "M": 16}
+HNSW_SPACES = ("l2", "cosine", "ip")
+
+
+def validate_hnsw_settings(settings: Dict[str, Any]):
+    """
+    Check HNSW settings (space, construction_ef, search_ef, M)
+
+    Raises:
+        ValueError: For unknown keys, an unknown space or non-positive integer values
+    """
+    unknown = set(settings) - set(HNSW_METADATA_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown HNSW settings: {sorted(unknown)}")
+    if settings.get("space", "l2") not in HNSW_SPACES:
+        raise ValueError(f"HNSW space must be one of {HNSW_SPACES}, got {settings['space']!r}")
+    for key in ("construction_ef", "search_ef", "M"):
+        value = settings.get(key)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value <= 0):
+            raise ValueError(f"HNSW setting {key} must be a positive integer, got {value!r}")
+
+
+class ChromaVectorStore(VectorStore):
+    """VectorStore backed by a ChromaDB collection"""
+
+    def __init__(self, client, name: str, metadata: Optional[Dict[str, Any]] = None,
+                 hnsw: Optional[Dict[str, Any]] = None):
+        """
+        Open (or create) a collection
+
+        Args:
+            client: ChromaDB client
+            name: Collection name
+            metadata: Collection metadata used when the collection is created
+            hnsw: Optional HNSW settings (space, construction_ef, search_ef, M). Settings
+                left out keep their current value. An existing collection whose
+                build-time settings (space, construction_ef, M) differ is rebuilt
+        """
+        self.client = client
+        self.name = name
+        self.metadata = metadata
+        self.hnsw = {key: value for key, value in (hnsw or {}).items() if value is not None}
+
+        validate_hnsw_settings(self.hnsw)
+
+        self._finish_interrupted_rebuild()
+        self.collection = client.get_or_create_collection(
+            name=name,
+            metadata={**(metadata or {}), **self._hnsw_metadata(self.hnsw)} or None
+        )
+        self._apply_hnsw_settings()
+
+    @property
+    def _rebuild_name(self) -> str:
+        return f"{self.name}-rebuild"
+
+    @staticmethod
+    def _hnsw_metadata(settings: Dict[str, Any]) -> Dict[str, Any]:
+        return {HNSW_METADATA_KEYS[key]: value for key, value in settings.items()}
+
+    def hnsw_settings(self) -> Dict[str, Any]:
+        """Effective HNSW settings of the collection"""
+        settings = dict(DEFAULT_HNSW_SETTINGS)
+
+        # Older ChromaDB versions keep HNSW settings in the collection metadata only
+        metadata = self.collection.metadata or {}
+        for key, metadata_key in HNSW_METADATA_KEYS.items():
+            if metadata_key in metadata:
+                settings[key] = metadata[metadata_key]
+
+        configuration = getattr(self.collection, "configuration", None)
+        hnsw_configuration = configuration.get("hnsw") if isinstance(configuration, dict) else None
+        if hnsw_configuration:
+            for key, configuration_key in HNSW_CONFIGURATION_KEYS.items():
+                if hnsw_configuration.get(configuration_key) is not None:
+                    settings[key] = hnsw_configuration[configuration_key]
+        return settings
+
+    def _apply_hnsw_settings(self):
+        """Bring an existing collection in line with the requested HNSW settings"""
+        current = self.hnsw_settings()
+        changed = {key for key, value in self.hnsw.items() if current.get(key) != value}
+        if not changed:
+            return
+
+        if changed == {"search_ef"}:
+            # Search-time setting: changed in place on ChromaDB versions that support it.
+            # An index already loaded by this process keeps its old value until reopened
+            try:
+                self.collection.modify(configuration={"hnsw": {"ef_search": self.hnsw["search_ef"]}})
+                self.collection = self.client.get_collection(self.name)
+                if self.hnsw_settings()["search_ef"] == self.hnsw["search_ef"]:
+                    return
+            except Exception as e:
+                print(f"Could not change search_ef in place ({e}); rebuilding collection")
+
+        self._rebuild({**current, **self.hnsw})
+
+    def _rebuild(self, settings: Dict[str, Any], page_size: int = 500):
+        """
+        Copy the collection into a new one built with `settings`, then swap names.
+
+        The copy is written under a temporary name and the original is only
+        deleted once the copy is complete, so an interrupted rebuild is either
+        discarded or finished on the next start.
+        """
+        print(f"Rebuilding collection '{self.name}' with HNSW settings {settings}...")
+        try:
+            self.client.delete_collection(self._rebuild_name)
+        except Exception:
+            pass
+
+        base_metadata = {key: value for key, value in (self.collection.metadata or {}).items()
+                         if not key.startswith("hnsw:")}
+        target = self.client.create_collection(
+            name=self._rebuild_name,
+            metadata={**base_metadata, **self._hnsw_metadata(settings), "rebuild_complete": False}
+        )
+
+        copied = 0
+        offset = 0
+        while True:
+            page = self.collection.get(include=['embeddings', 'metadatas', 'documents'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            target.add(ids=page['ids'], embeddings=page['embeddings'], metadatas=page['metadatas'],
+                       documents=[document or "" for document in page['documents']])
+            copied += len(page['ids'])
+            offset += len(page['ids'])
+            if len(page['ids']) < page_size:
+                break
+
+        target.modify(metadata=self._modifiable_metadata({**target.metadata, "rebuild_complete": True}))
+        self.client.delete_collection(self.name)
+        target.modify(name=self.name)
+        self.collection = self.client.get_collection(self.name)
+        self._clear_rebuild_flag()
+        print(f"✓ Rebuilt '{self.name}' ({copied} vectors)")
+
+    def _finish_interrupted_rebuild(self):
+        """Complete or discard a rebuild that was interrupted by a crash"""
+        names = {getattr(collection, "name", collection) for collection in self.client.list_collections()}
+        if self._rebuild_name not in names:
+            return
+
+        if self.name in names:
+            # Original still intact: throw the partial copy away
+            self.client.delete_collection(self._rebuild_name)
+            return
+
+        target = self.client.get_collection(self._rebuild_name)
+        if (target.metadata or {}).get("rebuild_complete"):
+            target.modify(name=self.name)
+            self.collection = self.client.get_collection(self.name)
+            self._clear_rebuild_flag()
+            print(f"✓ Finished interrupted rebuild of '{self.name}'")
+
+    def _clear_rebuild_flag(self):
+        metadata = dict(self.collection.metadata or {})
+        # ChromaDB rejects empty metadata; a leftover flag on its own is harmless
+        if metadata.pop("rebuild_complete", None) is not None and metadata:
+            self.collection.modify(metadata=self._modifiable_metadata(metadata))
+
+    @staticmethod
+    def _modifiable_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Collection metadata that may be passed to modify() (ChromaDB rejects space changes)"""
+        return {key: value for key, value in metadata.items() if key != "hnsw:space"}
+
+    def set_collection_metadata(self, key: str, value: Any):
+        """Set one collection metadata entry, keeping the others"""
+        metadata = dict(self.collection.metadata or {})
+        metadata[key] = value
+        self.collection.modify(metadata=self._modifiable_metadata(metadata))
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        if not ids:
+            return
+        # Blank documents: full documents live in the document store, and passing
+        # them explicitly overwrites any legacy payload stored in ChromaDB
+        self.collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=[""] * len(ids))
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        if ids:
+            self.collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(self, ids: List[str]):
+        if ids:
+            self.collection.delete(ids=list(ids))
+
+    def get(self, ids: List[str], include_embeddings: bool = False) -> Dict[str, Any]:
+        include = ['metadatas', 'embeddings'] if include_embeddings else ['metadatas']
+        result = self.collection.get(ids=list(ids), include=include)
+        page = {'ids': result['ids'], 'metadatas': result['metadatas']}
+        if include_embeddings:
+            page['embeddings'] = [list(embedding) for embedding in result['embeddings']]
+        return page
+
+    def batch_query(self, embeddings: List[List[float]], n_results: int,
+                    where: Optional[Dict] = None) -> Dict[str, List[List[Any]]]:
+        results = self.collection.query(
+            query_embeddings=embeddings,
+            n_results=n_results,
+            where=where,
+            include=['metadatas', 'distances']
+        )
+
+        distances = results['distances']
+        if self.hnsw_settings()["space"] != "l2":
+            # cosine/ip distances are 1 - similarity; for unit-length embeddings the
+            # squared L2 distance is exactly twice that
+            distances = [[max(0.0, 2.0 * distance) for distance in row] for row in distances]
+        return {'ids': results['ids'], 'distances': distances, 'metadatas': results['metadatas']}
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def iterate(self, page_size: int = 500, offset: int = 0, limit: Optional[int] = None,
+                where: Optional[Dict] = None, include_embeddings: bool = False) -> Iterator[Dict[str, Any]]:
+        include = ['metadatas', 'embeddings'] if include_embeddings else ['metadatas']
+        remaining = limit
+        while remaining is None or remaining > 0:
+            batch_size = page_size if remaining is None else min(page_size, remaining)
+            result = self.collection.get(include=include, limit=batch_size, offset=offset, where=where)
+            if not result['ids']:
+                return
+
+            page = {'ids': result['ids'], 'metadatas': result['metadatas']}
+            if include_embeddings:
+                page['embeddings'] = [list(embedding) for embedding in result['embeddings']]
+            yield page
+
+            offset += len(result['ids'])
+            if remaining is not None:
+                remaining -= len(result['ids'])
+            if len(result['ids']) < batch_size:
+                return
+
+    def clear(self):
+        settings = self.hnsw_settings()
+        self.client.delete_collection(self.name)
+        self.collection = self.client.get_or_create_collection(
+            name=self.name,
+            metadata={**(self.metadata or {}), **self._hnsw_metadata(settings)}
+        )
+
+
+def metadata_matches(metadata: Dict[str, Any], where: Optional[Dict]) -> bool:
+    """
+    Evaluate a ChromaDB-style `where` filter against one metadata dict
+
+    Supports $and, $or and the $eq, $ne, $gt, $gte, $lt, $lte, $in and $nin
+    operators, plus bare values as equality.
+    """
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(metadata_matches(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(metadata_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, operand in condition.items():
+                if not _compare(value, operator, operand):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    """Apply a single where-operator"""
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    raise ValueError(f"Unsupported where operator: {operator}")
+
+
+class LocalVectorStore(VectorStore):
+    """
+    VectorStore persisted as files in a local directory.
+
+    Vectors are kept in an ExactSearchIndex (NumPy matrix) and saved as
+    vectors.npy with ids/metadata in items.json. When the optional `hnswlib`
+    package is installed, an HNSW graph (hnsw.bin) is maintained as well and
+    answers unfiltered and filtered queries approximately; otherwise queries
+    are exact.
+
+    Writes are appended to journal.jsonl instead of rewriting those files, so
+    a write costs time proportional to its own size. The journal is replayed
+    on load and compacted into the main files once it holds as many items as
+    the store (at least `compact_min_items`), which keeps writes amortised O(1).
+    """
+
+    def __init__(self, directory: str, use_hnsw: Optional[bool] = None,
+                 hnsw_m: int = 16, hnsw_construction_ef: int = 200, hnsw_search_ef: int = 64,
+                 compact_min_items: int = 1000):
+        """
+        Open (or create) a local store
+
+        Args:
+            directory: Directory holding the store files
+            use_hnsw: Maintain an HNSW graph (default: when hnswlib is installed)
+            hnsw_m: HNSW graph degree
+            hnsw_construction_ef: HNSW candidate list size during construction
+            hnsw_search_ef: HNSW candidate list size during search
+            compact_min_items: Journaled items below which the journal is never compacted
+        """
+        if use_hnsw and hnswlib is None:
+            raise ImportError("hnswlib is required for use_hnsw=True (pip install hnswlib)")
+
+        self.directory = directory
+        self.use_hnsw = hnswlib is not None if use_hnsw is None else use_hnsw
+        self.hnsw_m = hnsw_m
+        self.hnsw_construction_ef = hnsw_construction_ef
+        self.hnsw_search_ef = hnsw_search_ef
+        self.compact_min_items = compact_min_items
+        self.lock = threading.RLock()
+        self._journaled_items = 0
+
+        self.index = ExactSearchIndex()
+        self.metadatas: Dict[str, Dict[str, Any]] = {}
+
+        # HNSW uses integer labels; labels are never reused so deleted ones can be restored
+        self.hnsw = None
+        self.labels: Dict[str, int] = {}
+        self.label_ids: Dict[int, str] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, "vectors.npy")
+
+    @property
+    def _items_path(self) -> str:
+        return os.path.join(self.directory, "items.json")
+
+    @property
+    def _hnsw_path(self) -> str:
+        return os.path.join(self.directory, "hnsw.bin")
+
+    @property
+    def _journal_path(self) -> str:
+        return os.path.join(self.directory, "journal.jsonl")
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """True if a local store has been written to the directory"""
+        return any(os.path.exists(os.path.join(directory, name)) for name in ("items.json", "journal.jsonl"))
+
+    def _load(self):
+        """Load persisted vectors, metadata and the HNSW graph, then replay the journal"""
+        graph_loaded = False
+        if os.path.exists(self._items_path):
+            with open(self._items_path, 'r') as f:
+                items = json.load(f)
+            vectors = np.load(self._vectors_path)
+
+            ids = items["ids"]
+            if ids:
+                self.index.upsert(ids, vectors)
+            self.metadatas = dict(zip(ids, items["metadatas"]))
+            self.labels = {item_id: int(label) for item_id, label in items.get("labels", {}).items()}
+            self.label_ids = {label: item_id for item_id, label in self.labels.items()}
+
+            if self.use_hnsw and ids and os.path.exists(self._hnsw_path) and len(self.labels) >= len(ids):
+                self.hnsw = hnswlib.Index(space='l2', dim=vectors.shape[1])
+                self.hnsw.load_index(self._hnsw_path, max_elements=max(len(self.labels), 1024))
+                self.hnsw.set_ef(self.hnsw_search_ef)
+                graph_loaded = True
+
+        # Without a saved graph the journal only updates the index; the graph is built afterwards
+        self._journaled_items = self._replay_journal(update_hnsw=graph_loaded)
+        if self.use_hnsw and not graph_loaded and len(self.index) > 0:
+            self._rebuild_hnsw()
+
+    def _replay_journal(self, update_hnsw: bool) -> int:
+        """Apply the journaled writes, returning the number of replayed items"""
+        if not os.path.exists(self._journal_path):
+            return 0
+        replayed = 0
+        with open(self._journal_path, 'rb+') as f:
+            for line in iter(f.readline, b''):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A write interrupted mid-line: drop it so later appends are not hidden behind it
+                    f.seek(-len(line), os.SEEK_CUR)
+                    f.truncate()
+                    break
+                if entry["op"] == "upsert":
+                    self._apply_upsert(entry["ids"], np.asarray(entry["embeddings"], dtype=np.float32),
+                                       entry["metadatas"], update_hnsw)
+                elif entry["op"] == "metadata":
+                    self._apply_metadatas(entry["ids"], entry["metadatas"])
+                elif entry["op"] == "delete":
+                    self._apply_delete(entry["ids"], update_hnsw)
+                replayed += len(entry["ids"])
+        return replayed
+
+    def _journal(self, entry: Dict[str, Any]):
+        """Append a write to the journal, compacting it once it outgrows the store"""
+        with open(self._journal_path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+        self._journaled_items += len(entry["ids"])
+        if self._journaled_items >= max(self.compact_min_items, len(self.index)):
+            self._compact()
+
+    def _compact(self):
+        """Fold the journal into the main files"""
+        self._save()
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
+        self._journaled_items = 0
+
+    def compact(self):
+        """Rewrite the store files and empty the journal"""
+        with self.lock:
+            self._compact()
+
+    def _save(self):
+        """Persist the store atomically (write to temp files, then rename)"""
+        ids, vectors = self.index.export()
+        items = {
+            "ids": ids,
+            "metadatas": [self.metadatas[item_id] for item_id in ids],
+            "labels": self.labels
+        }
+
+        tmp_vectors = self._vectors_path + ".tmp.npy"
+        np.save(tmp_vectors, vectors)
+        tmp_items = self._items_path + ".tmp"
+        with open(tmp_items, 'w') as f:
+            json.dump(items, f)
+
+        if self.hnsw is not None:
+            self.hnsw.save_index(self._hnsw_path + ".tmp")
+            os.replace(self._hnsw_path + ".tmp", self._hnsw_path)
+        os.replace(tmp_vectors, self._vectors_path)
+        os.replace(tmp_items, self._items_path)
+
+    def _rebuild_hnsw(self):
+        """Build the HNSW graph from the stored vectors"""
+        ids, vectors = self.index.export()
+        self.hnsw = hnswlib.Index(space='l2', dim=vectors.shape[1])
+        self.hnsw.init_index(max_elements=max(len(ids) * 2, 1024),
+                             ef_construction=self.hnsw_construction_ef, M=self.hnsw_m)
+        self.hnsw.set_ef(self.hnsw_search_ef)
+        self.labels = {item_id: label for label, item_id in enumerate(ids)}
+        self.label_ids = {label: item_id for item_id, label in self.labels.items()}
+        if ids:
+            self.hnsw.add_items(vectors, np.arange(len(ids)))
+
+    def _hnsw_upsert(self, ids: List[str], vectors: np.ndarray):
+        """Add or update vectors in the HNSW graph"""
+        if self.hnsw is None:
+            self.hnsw = hnswlib.Index(space='l2', dim=vectors.shape[1])
+            self.hnsw.init_index(max_elements=max(len(ids) * 2, 1024),
+                                 ef_construction=self.hnsw_construction_ef, M=self.hnsw_m)
+            self.hnsw.set_ef(self.hnsw_search_ef)
+
+        for item_id in ids:
+            if item_id not in self.labels:
+                label = len(self.label_ids)
+                self.labels[item_id] = label
+                self.label_ids[label] = item_id
+
+        if len(self.label_ids) > self.hnsw.get_max_elements():
+            self.hnsw.resize_index(len(self.label_ids) * 2)
+        # Re-adding an existing (or deleted) label updates and restores it
+        self.hnsw.add_items(vectors, np.array([self.labels[item_id] for item_id in ids]))
+
+    def _apply_upsert(self, ids: List[str], vectors: np.ndarray, metadatas: List[Dict[str, Any]],
+                      update_hnsw: bool = True):
+        self.index.upsert(ids, vectors)
+        for item_id, metadata in zip(ids, metadatas):
+            self.metadatas[item_id] = dict(metadata or {})
+        if self.use_hnsw and update_hnsw:
+            self._hnsw_upsert(ids, vectors)
+
+    def _apply_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        for item_id, metadata in zip(ids, metadatas):
+            if item_id in self.metadatas:
+                self.metadatas[item_id] = dict(metadata or {})
+
+    def _apply_delete(self, ids: List[str], update_hnsw: bool = True) -> List[str]:
+        present = [item_id for item_id in ids if item_id in self.metadatas]
+        if present:
+            self.index.delete(present)
+            for item_id in present:
+                self.metadatas.pop(item_id, None)
+                if self.hnsw is not None and update_hnsw:
+                    self.hnsw.mark_deleted(self.labels[item_id])
+        return present
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        metadatas = [dict(metadata or {}) for metadata in metadatas]
+        with self.lock:
+            self._apply_upsert(ids, vectors, metadatas)
+            self._journal({"op": "upsert", "ids": list(ids), "embeddings": vectors.tolist(), "metadatas": metadatas})
+
+    def update_metadatas(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        metadatas = [dict(metadata or {}) for metadata in metadatas]
+        with self.lock:
+            self._apply_metadatas(ids, metadatas)
+            self._journal({"op": "metadata", "ids": list(ids), "metadatas": metadatas})
+
+    def delete(self, ids: List[str]):
+        with self.lock:
+            present = self._apply_delete(ids)
+            if present:
+                self._journal({"op": "delete", "ids": present})
+
+    def get(self, ids: List[str], include_embeddings: bool = False) -> Dict[str, Any]:
+        with self.lock:
+            found = [item_id for item_id in dict.fromkeys(ids) if item_id in self.metadatas]
+            page = {'ids': found, 'metadatas': [dict(self.metadatas[item_id]) for item_id in found]}
+            if include_embeddings:
+                vectors = self.index.get_vectors(found)
+                page['embeddings'] = [vectors[item_id] for item_id in found]
+            return page
+
+    def batch_query(self, embeddings: List[List[float]], n_results: int,
+                    where: Optional[Dict] = None) -> Dict[str, List[List[Any]]]:
+        with self.lock:
+            allowed = None
+            if where:
+                allowed = {item_id for item_id, metadata in self.metadatas.items()
+                           if metadata_matches(metadata, where)}
+
+            if self.hnsw is not None and len(self.index) > 0:
+                hits = self._hnsw_query(embeddings, n_results, allowed)
+            else:
+                hits = self.index.search_batch(embeddings, n_results, allowed_ids=allowed)
+
+            return {
+                'ids': [ids for ids, _ in hits],
+                'distances': [distances for _, distances in hits],
+                'metadatas': [[dict(self.metadatas[item_id]) for item_id in ids] for ids, _ in hits]
+            }
+
+    def _hnsw_query(self, embeddings: List[List[float]], n_results: int,
+                    allowed: Optional[set]) -> List[Tuple[List[str], List[float]]]:
+        """Approximate search through the HNSW graph"""
+        k = min(n_results, len(self.index) if allowed is None else len(allowed))
+        if k <= 0:
+            return [([], []) for _ in embeddings]
+
+        self.hnsw.set_ef(max(self.hnsw_search_ef, k))
+        label_filter = None
+        if allowed is not None:
+            allowed_labels = {self.labels[item_id] for item_id in allowed}
+            label_filter = lambda label: label in allowed_labels
+
+        labels, distances = self.hnsw.knn_query(np.asarray(embeddings, dtype=np.float32), k=k, filter=label_filter)
+        return [([self.label_ids[int(label)] for label in row_labels], row_distances.tolist())
+                for row_labels, row_distances in zip(labels, distances)]
+
+    def count(self) -> int:
+        return len(self.index)
+
+    def iterate(self, page_size: int = 500, offset: int = 0, limit: Optional[int] = None,
+                where: Optional[Dict] = None, include_embeddings: bool = False) -> Iterator[Dict[str, Any]]:
+        with self.lock:
+            ids = [item_id for item_id in list(self.index.ids)
+                   if not where or metadata_matches(self.metadatas[item_id], where)]
+        end = len(ids) if limit is None else min(len(ids), offset + limit)
+
+        for start in range(offset, end, page_size):
+            page = self.get(ids[start:min(start + page_size, end)], include_embeddings=include_embeddings)
+            if page['ids']:
+                yield page
+
+    def clear(self):
+        with self.lock:
+            self.index.clear()
+            self.metadatas = {}
+            self.hnsw = None
+            self.labels = {}
+            self.label_ids = {}
+            self._journaled_items = 0
+            for path in (self._vectors_path, self._items_path, self._hnsw_path, self._journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
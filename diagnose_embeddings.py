@@ -12,8 +12,8 @@ from datetime import datetime
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-from vector_database import VectorDatabaseManager
-from embeddings_manager import GeminiEmbeddingsManager
+from vector_database import get_vector_db
+from embeddings_manager import get_embeddings_manager
 from user_profile_manager import UserProfileManager
 
 
@@ -23,8 +23,8 @@ def analyze_embeddings():
     print("=" * 80)
     
     # Initialize managers
-    vector_db = VectorDatabaseManager()
-    embeddings_manager = GeminiEmbeddingsManager()
+    vector_db = get_vector_db()
+    embeddings_manager = get_embeddings_manager()
     
     # 1. Check researcher embeddings
     print("\n1. RESEARCHER EMBEDDINGS:")
@@ -62,7 +62,7 @@ def analyze_embeddings():
     print(f"   Total opportunities in database: {len(opportunities)}")
     
     try:
-        opp_data = vector_db.opportunities.get(include=['embeddings'], limit=10)
+        opp_data = next(vector_db.opportunity_store.iterate(page_size=10, limit=10, include_embeddings=True), None)
         if opp_data and 'embeddings' in opp_data:
             embeddings = opp_data['embeddings']
             print(f"   Sample embeddings retrieved: {len(embeddings)}")
@@ -87,7 +87,7 @@ def test_matching():
     print("\n\n🎯 MATCHING TEST")
     print("=" * 80)
     
-    vector_db = VectorDatabaseManager()
+    vector_db = get_vector_db()
     
     # Get a researcher
     researchers = vector_db.get_all_researchers()
@@ -177,7 +177,7 @@ def test_new_embedding_generation():
     print("\n\n🔄 NEW EMBEDDING GENERATION TEST")
     print("=" * 80)
     
-    embeddings_manager = GeminiEmbeddingsManager()
+    embeddings_manager = get_embeddings_manager()
     
     # Test with different texts
     test_texts = [
@@ -12,7 +12,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 from user_profile_manager import UserProfileManager
-from vector_database import VectorDatabaseManager
+from vector_database import get_vector_db
 from funding_opportunities_manager import FundingOpportunitiesManager
 
 
@@ -22,7 +22,7 @@ def test_pdf_processing():
     
     # Initialize managers
     user_manager = UserProfileManager()
-    vector_db = VectorDatabaseManager()
+    vector_db = get_vector_db()
     
     # Check for Alfredo's profile
     user_name = "Alfredo Costilla-Reyes"
@@ -149,6 +149,7 @@ const Matching: React.FC = () => {
     try {
       const response = await axios.post(`${API_BASE}/opportunity/${index}/explain`, {
         opportunity: matches[index],
+        user_id: selectedUser,
       });
 
       if (response.data.success) {
@@ -423,6 +423,9 @@ const UserProfile: React.FC = () => {
     setProgress(`Uploading ${file.name}...`);
     const formData = new FormData();
     formData.append('file', file);
+    if (editingUserId) {
+      formData.append('user_id', editingUserId);
+    }
 
     try {
       const response = await axios.post(`${API_BASE}/profile/upload`, formData, {
@@ -16,7 +16,7 @@ load_dotenv()
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 from user_profile_manager import UserProfileManager
-from vector_database import VectorDatabaseManager
+from vector_database import get_vector_db
 
 
 def main():
@@ -38,7 +38,7 @@ def main():
     
     # Initialize components
     manager = UserProfileManager()
-    vector_db = VectorDatabaseManager()
+    vector_db = get_vector_db()
     
     # Check database
     stats = vector_db.get_collection_stats()
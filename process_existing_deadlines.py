@@ -5,14 +5,13 @@ Process existing funding opportunities to extract and update deadlines
 
 import os
 import sys
-import json
 from datetime import datetime
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 from funding_opportunities_manager import FundingOpportunitiesManager
-from vector_database import VectorDatabaseManager
+from vector_database import get_vector_db
 
 def process_existing_opportunities():
     """Process all existing opportunities to ensure they have deadlines"""
@@ -20,33 +19,31 @@ def process_existing_opportunities():
     
     # Initialize managers
     funding_manager = FundingOpportunitiesManager()
-    vector_db = VectorDatabaseManager()
+    vector_db = get_vector_db()
     
     # Get all opportunities from vector database
     try:
-        # Query all opportunities
-        collection_info = vector_db.opportunities.peek(limit=10000)
-        total_opportunities = len(collection_info['ids'])
+        # Page through every opportunity's metadata (also covers deadline partitions)
+        all_opportunities = {'ids': [], 'metadatas': []}
+        for page in vector_db.opportunity_store.iterate(page_size=1000):
+            all_opportunities['ids'].extend(page['ids'])
+            all_opportunities['metadatas'].extend(page['metadatas'])
+        total_opportunities = len(all_opportunities['ids'])
         print(f"\nFound {total_opportunities} opportunities in vector database")
         
-        # Get all opportunities with their metadata
-        all_opportunities = vector_db.opportunities.get(
-            ids=collection_info['ids'],
-            include=['metadatas', 'documents']
-        )
+        # Full documents live in the document store
+        documents = vector_db.get_opportunities(all_opportunities['ids'])
         
         opportunities_without_deadline = []
         opportunities_with_deadline = []
         
         # Check each opportunity
-        for i, (opp_id, metadata, doc) in enumerate(zip(
+        for i, (opp_id, metadata) in enumerate(zip(
             all_opportunities['ids'], 
-            all_opportunities['metadatas'], 
-            all_opportunities['documents']
+            all_opportunities['metadatas']
         )):
             try:
-                # Parse the document JSON
-                opportunity = json.loads(doc)
+                opportunity = documents.get(opp_id, {})
                 
                 # Check if it has a deadline
                 deadline = metadata.get('deadline', '')
@@ -85,7 +82,7 @@ def process_existing_opportunities():
                     print(f"\n  Reached API limit ({max_api_calls} calls). Removing remaining opportunities without deadlines...")
                     # Remove without API check
                     try:
-                        vector_db.opportunities.delete(ids=[opp_data['id']])
+                        vector_db.delete_opportunities([opp_data['id']])
                         removed += 1
                     except Exception as e:
                         print(f"    Error removing: {e}")
@@ -99,7 +96,7 @@ def process_existing_opportunities():
                     # No deadline found - remove from database
                     print(f"  Removing '{opp_data['title'][:50]}...' - no deadline found")
                     try:
-                        vector_db.opportunities.delete(ids=[opp_data['id']])
+                        vector_db.delete_opportunities([opp_data['id']])
                         removed += 1
                     except Exception as e:
                         print(f"    Error removing: {e}")
@@ -110,15 +107,14 @@ def process_existing_opportunities():
                     print(f"  Updating '{opp_data['title'][:50]}...' - deadline: {new_deadline}")
                     
                     try:
-                        # Update the metadata
-                        vector_db.opportunities.update(
-                            ids=[opp_data['id']],
-                            metadatas=[{
-                                **vector_db.opportunities.get(ids=[opp_data['id']])['metadatas'][0],
-                                'deadline': new_deadline
-                            }]
-                        )
-                        processed += 1
+                        # Re-store with the deadline so the metadata (and deadline partition) follow it
+                        stored = vector_db.get_opportunity_with_embedding(opp_data['id'])
+                        if stored is not None:
+                            document, embedding = stored
+                            vector_db.batch_add_opportunities([
+                                (opp_data['id'], {**document, 'close_date': new_deadline}, embedding)
+                            ])
+                            processed += 1
                     except Exception as e:
                         print(f"    Error updating: {e}")
                 
@@ -134,7 +130,7 @@ def process_existing_opportunities():
             print("\nAll opportunities already have deadlines!")
             
         # Final statistics
-        remaining = vector_db.opportunities.count()
+        remaining = vector_db.opportunity_store.count()
         print(f"\nFinal opportunity count: {remaining}")
         
     except Exception as e:
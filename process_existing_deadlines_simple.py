@@ -6,7 +6,6 @@ Simple version without Gemini API calls
 
 import os
 import sys
-import json
 from datetime import datetime
 
 # Add backend to path
@@ -23,29 +22,27 @@ def process_existing_opportunities():
     
     # Get all opportunities from vector database
     try:
-        # Query all opportunities
-        collection_info = vector_db.opportunities.peek(limit=10000)
-        total_opportunities = len(collection_info['ids'])
+        # Page through every opportunity's metadata (also covers deadline partitions)
+        all_opportunities = {'ids': [], 'metadatas': []}
+        for page in vector_db.opportunity_store.iterate(page_size=1000):
+            all_opportunities['ids'].extend(page['ids'])
+            all_opportunities['metadatas'].extend(page['metadatas'])
+        total_opportunities = len(all_opportunities['ids'])
         print(f"\nFound {total_opportunities} opportunities in vector database")
         
-        # Get all opportunities with their metadata
-        all_opportunities = vector_db.opportunities.get(
-            ids=collection_info['ids'],
-            include=['metadatas', 'documents']
-        )
+        # Full documents live in the document store
+        documents = vector_db.get_opportunities(all_opportunities['ids'])
         
         opportunities_to_remove = []
         opportunities_with_deadline = []
         
         # Check each opportunity
-        for i, (opp_id, metadata, doc) in enumerate(zip(
+        for i, (opp_id, metadata) in enumerate(zip(
             all_opportunities['ids'], 
-            all_opportunities['metadatas'], 
-            all_opportunities['documents']
+            all_opportunities['metadatas']
         )):
             try:
-                # Parse the document JSON
-                opportunity = json.loads(doc)
+                opportunity = documents.get(opp_id, {})
                 
                 # Check if it has a deadline
                 deadline = metadata.get('deadline', '')
@@ -79,7 +76,7 @@ def process_existing_opportunities():
                 batch_ids = [opp['id'] for opp in batch]
                 
                 try:
-                    vector_db.opportunities.delete(ids=batch_ids)
+                    vector_db.delete_opportunities(batch_ids)
                     removed += len(batch_ids)
                     print(f"  Removed batch of {len(batch_ids)} opportunities ({removed}/{len(opportunities_to_remove)})")
                     
@@ -96,7 +93,7 @@ def process_existing_opportunities():
             print("\nAll opportunities already have deadlines!")
             
         # Final statistics
-        remaining = vector_db.opportunities.count()
+        remaining = vector_db.opportunity_store.count()
         print(f"\nFinal opportunity count: {remaining}")
         
     except Exception as e:
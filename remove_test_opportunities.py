@@ -31,7 +31,7 @@ def remove_test_opportunities():
         # Remove each test opportunity
         for opp_id in test_opportunity_ids:
             try:
-                db.opportunities.delete(ids=[opp_id])
+                db.delete_opportunities([opp_id])
                 print(f"✓ Removed opportunity ID: {opp_id}")
             except Exception as e:
                 print(f"❌ Error removing opportunity {opp_id}: {e}")
@@ -12,7 +12,7 @@ from pathlib import Path
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-from vector_database import VectorDatabaseManager
+from vector_database import get_vector_db
 from user_profile_manager import UserProfileManager
 from funding_opportunities_manager import FundingOpportunitiesManager
 
@@ -142,7 +142,7 @@ def verify_setup():
     """Verify the system is set up correctly"""
     print("\n🔍 Verifying setup...")
     
-    vector_db = VectorDatabaseManager()
+    vector_db = get_vector_db()
     stats = vector_db.get_collection_stats()
     
     print(f"✓ Database statistics:")
@@ -164,7 +164,7 @@ def test_matching(user_id):
     print("\n🔍 Testing matching functionality...")
     
     user_manager = UserProfileManager()
-    vector_db = VectorDatabaseManager()
+    vector_db = get_vector_db()
     
     try:
         # Get user profile embedding
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark opportunity search latency: ChromaDB HNSW vs in-memory NumPy exact search
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from vector_database import VectorDatabaseManager
+
+
+def _percentiles(samples):
+    """Return p50/p99 in milliseconds"""
+    samples_ms = np.array(samples) * 1000
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def run_benchmark(corpus_size: int, dimension: int, queries: int, n_results: int):
+    """Time search_opportunities_for_profile with and without the exact mirror"""
+    rng = np.random.default_rng(42)
+    vectors = rng.normal(size=(corpus_size, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors = rng.normal(size=(queries, dimension)).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"Building corpus: {corpus_size} x {dimension}...")
+        db = VectorDatabaseManager(persist_directory=tmp_dir, use_exact_search=True)
+        batch = 1000
+        for start in range(0, corpus_size, batch):
+            db.batch_add_opportunities([
+                (f"opp_{i}", {"title": f"Opportunity {i}", "description": "x" * 500}, vectors[i].tolist())
+                for i in range(start, min(start + batch, corpus_size))
+            ])
+        
+        exact_index = db.exact_index
+        timings = {"chroma": [], "exact": [], "chroma index only": [], "exact index only": []}
+        recall_hits = 0
+        
+        for query in query_vectors:
+            query = query.tolist()
+            
+            db.exact_index = None
+            start = time.perf_counter()
+            chroma_results = db.search_opportunities_for_profile(query, n_results=n_results)
+            timings["chroma"].append(time.perf_counter() - start)
+            
+            db.exact_index = exact_index
+            start = time.perf_counter()
+            exact_results = db.search_opportunities_for_profile(query, n_results=n_results)
+            timings["exact"].append(time.perf_counter() - start)
+            
+            # Index lookups alone, without document fetching and JSON decoding
+            start = time.perf_counter()
+            db.opportunities.query(query_embeddings=[query], n_results=n_results, include=['distances'])
+            timings["chroma index only"].append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            exact_index.search(query, n_results)
+            timings["exact index only"].append(time.perf_counter() - start)
+            
+            exact_ids = {m['match_id'] for m in exact_results}
+            recall_hits += len(exact_ids & {m['match_id'] for m in chroma_results})
+        
+        print(f"\nResults ({queries} queries, top {n_results}):")
+        for name, samples in timings.items():
+            p50, p99 = _percentiles(samples)
+            print(f"  {name:>17}: p50 {p50:7.2f} ms | p99 {p99:7.2f} ms")
+        print(f"  ChromaDB recall@{n_results} vs exact: {recall_hits / (queries * n_results):.3f}")
+        print(f"  Exact index memory: {exact_index.stats()['memory_bytes'] / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact vs HNSW opportunity search")
+    parser.add_argument("--corpus-size", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--n-results", type=int, default=20)
+    args = parser.parse_args()
+    
+    run_benchmark(args.corpus_size, args.dimension, args.queries, args.n_results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark ChromaDB HNSW settings: recall@k against exact search and p50/p99 query latency
+"""
+
+import os
+import sys
+import time
+import argparse
+import itertools
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import chromadb
+from chromadb.config import Settings
+
+from vector_store import ChromaVectorStore
+
+
+def _percentiles(samples):
+    """Return p50/p99 in milliseconds"""
+    samples_ms = np.array(samples) * 1000
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def _open_client(path, reopen=False):
+    if reopen:
+        chromadb.api.client.SharedSystemClient.clear_system_cache()
+    return chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False, allow_reset=True))
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def load_corpus(args):
+    """
+    Corpus vectors from a .npy snapshot, an existing database, or synthetic data
+
+    Returns:
+        Tuple of (ids, float32 matrix)
+    """
+    if args.snapshot:
+        vectors = np.load(args.snapshot, mmap_mode='r').astype(np.float32)
+    elif args.from_db:
+        collection = _open_client(args.from_db).get_collection("funding_opportunities")
+        embeddings = []
+        offset = 0
+        while True:
+            page = collection.get(include=['embeddings'], limit=1000, offset=offset)
+            if not page['ids']:
+                break
+            embeddings.extend(page['embeddings'])
+            offset += len(page['ids'])
+        vectors = np.asarray(embeddings, dtype=np.float32)
+    else:
+        rng = np.random.default_rng(42)
+        vectors = rng.normal(size=(args.corpus_size, args.dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return [f"opp_{i}" for i in range(len(vectors))], vectors
+
+
+def run_benchmark(args):
+    """Build one collection per (space, M, construction_ef) and sweep search_ef on it"""
+    ids, vectors = load_corpus(args)
+    rng = np.random.default_rng(7)
+
+    # Queries are perturbed corpus vectors so they resemble real profiles near the data
+    picks = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = vectors[picks] + rng.normal(scale=0.05, size=(len(picks), vectors.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    # Ground truth by brute force (squared L2, the metric used for scoring)
+    distances = (vectors ** 2).sum(axis=1)[None, :] - 2.0 * (queries @ vectors.T)
+    k = min(args.n_results, len(ids))
+    truth = [set(ids[i] for i in np.argsort(row)[:k]) for row in distances]
+
+    print(f"Corpus: {len(ids)} x {vectors.shape[1]}, {len(queries)} queries, top {k}\n")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = _open_client(tmp_dir)
+
+        for number, (space, m, construction_ef) in enumerate(itertools.product(args.space, args.m, args.construction_ef)):
+            name = f"hnsw_benchmark_{number}"
+            store = ChromaVectorStore(client, name, hnsw={"space": space, "M": m, "construction_ef": construction_ef})
+
+            start = time.perf_counter()
+            for offset in range(0, len(ids), args.batch):
+                end = min(offset + args.batch, len(ids))
+                store.upsert(ids[offset:end], vectors[offset:end].tolist(), [{"row": i} for i in range(offset, end)])
+            build_seconds = time.perf_counter() - start
+
+            for search_ef in args.search_ef:
+                # search_ef is a query-time setting and is changed in place; ChromaDB only
+                # picks it up when the index is next loaded, so reopen the client
+                ChromaVectorStore(client, name, hnsw={"search_ef": search_ef})
+                client = _open_client(tmp_dir, reopen=True)
+                store = ChromaVectorStore(client, name)
+
+                latencies = []
+                hits = 0
+                for query, expected in zip(queries, truth):
+                    start = time.perf_counter()
+                    result = store.query(query.tolist(), k)
+                    latencies.append(time.perf_counter() - start)
+                    hits += len(expected & set(result['ids']))
+
+                p50, p99 = _percentiles(latencies)
+                print(f"space={space:<6} M={m:<3} construction_ef={construction_ef:<4} search_ef={search_ef:<4} | "
+                      f"build {build_seconds:6.1f} s | p50 {p50:6.2f} ms p99 {p99:6.2f} ms | "
+                      f"recall@{k} {hits / (len(queries) * k):.3f}")
+
+            client.delete_collection(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HNSW settings of the opportunities collection")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--snapshot", help="Corpus from a .npy file of embeddings")
+    source.add_argument("--from-db", help="Corpus from the funding_opportunities collection of a ChromaDB directory")
+    parser.add_argument("--corpus-size", type=int, default=20000, help="Synthetic corpus size")
+    parser.add_argument("--dimension", type=int, default=768, help="Synthetic embedding dimension")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=1000, help="Vectors per upsert call")
+    parser.add_argument("--space", type=lambda value: value.split(","), default=["l2"])
+    parser.add_argument("--m", type=_int_list, default=[16, 32])
+    parser.add_argument("--construction-ef", type=_int_list, default=[100, 200])
+    parser.add_argument("--search-ef", type=_int_list, default=[20, 50, 100, 200])
+    args = parser.parse_args()
+
+    run_benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
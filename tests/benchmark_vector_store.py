@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark VectorStore backends: build time, query latency and recall against exact search
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from vector_store import LocalVectorStore, hnswlib
+
+
+def _percentiles(samples):
+    """Return p50/p99 in milliseconds"""
+    samples_ms = np.array(samples) * 1000
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def _backends(tmp_dir):
+    """(name, store) pairs for every backend available here"""
+    backends = [("local-exact", LocalVectorStore(os.path.join(tmp_dir, "exact"), use_hnsw=False))]
+    if hnswlib is not None:
+        backends.append(("local-hnsw", LocalVectorStore(os.path.join(tmp_dir, "hnsw"), use_hnsw=True)))
+    else:
+        print("hnswlib not installed; skipping local-hnsw")
+    try:
+        import chromadb
+        from chromadb.config import Settings
+        from vector_store import ChromaVectorStore
+        client = chromadb.PersistentClient(path=os.path.join(tmp_dir, "chroma"),
+                                           settings=Settings(anonymized_telemetry=False, allow_reset=True))
+        backends.append(("chroma", ChromaVectorStore(client, "benchmark_opportunities")))
+    except ImportError as e:
+        print(f"chromadb not available; skipping chroma ({e})")
+    return backends
+
+
+def run_benchmark(corpus_size: int, dimension: int, queries: int, n_results: int, batch: int):
+    """Build every backend on the same corpus and compare latency and recall@k"""
+    rng = np.random.default_rng(42)
+    vectors = rng.normal(size=(corpus_size, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors = rng.normal(size=(queries, dimension)).astype(np.float32)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    ids = [f"opp_{i}" for i in range(corpus_size)]
+    metadatas = [{"agency_code": "NSF" if i % 4 == 0 else "DOD"} for i in range(corpus_size)]
+    
+    # Ground truth by brute force
+    distances = (vectors ** 2).sum(axis=1)[None, :] - 2.0 * (query_vectors @ vectors.T)
+    truth = [set(ids[i] for i in np.argsort(row)[:n_results]) for row in distances]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"Corpus: {corpus_size} x {dimension}, {queries} queries, top {n_results}\n")
+        for name, store in _backends(tmp_dir):
+            start = time.perf_counter()
+            for offset in range(0, corpus_size, batch):
+                end = min(offset + batch, corpus_size)
+                store.upsert(ids[offset:end], vectors[offset:end].tolist(), metadatas[offset:end])
+            build_seconds = time.perf_counter() - start
+            
+            single, filtered = [], []
+            hits = 0
+            for query, expected in zip(query_vectors, truth):
+                start = time.perf_counter()
+                result = store.query(query.tolist(), n_results)
+                single.append(time.perf_counter() - start)
+                hits += len(expected & set(result['ids']))
+                
+                start = time.perf_counter()
+                store.query(query.tolist(), n_results, where={"agency_code": {"$in": ["NSF"]}})
+                filtered.append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            store.batch_query(query_vectors.tolist(), n_results)
+            batch_ms = (time.perf_counter() - start) * 1000 / queries
+            
+            p50, p99 = _percentiles(single)
+            fp50, fp99 = _percentiles(filtered)
+            print(f"{name:>12}: build {build_seconds:6.1f} s | query p50 {p50:7.2f} ms p99 {p99:7.2f} ms | "
+                  f"filtered p50 {fp50:7.2f} ms p99 {fp99:7.2f} ms | batched {batch_ms:6.2f} ms/query | "
+                  f"recall@{n_results} {hits / (queries * n_results):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector store backends")
+    parser.add_argument("--corpus-size", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--n-results", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=1000, help="Vectors per upsert call")
+    args = parser.parse_args()
+    
+    run_benchmark(args.corpus_size, args.dimension, args.queries, args.n_results, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test batched opportunity search against one-at-a-time search
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from exact_search_index import ExactSearchIndex
+
+
+def test_exact_search_batch_matches_single_queries():
+    """search_batch returns the same neighbours as repeated search calls"""
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(300, 24)).astype(np.float32)
+    ids = [f"opp_{i}" for i in range(len(vectors))]
+    
+    index = ExactSearchIndex()
+    index.upsert(ids, vectors.tolist())
+    
+    queries = rng.normal(size=(5, 24)).astype(np.float32).tolist()
+    batched = index.search_batch(queries, 8)
+    
+    for query, (batch_ids, batch_distances) in zip(queries, batched):
+        single_ids, single_distances = index.search(query, 8)
+        assert batch_ids == single_ids
+        assert np.allclose(batch_distances, single_distances, rtol=1e-4, atol=1e-3)
+
+
+def test_vector_database_batch_search():
+    """Batched search matches single searches, honouring per-query filters"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping ChromaDB batch search test: {e}")
+        return
+    
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(60, 8))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    for use_exact_search in (False, True):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = VectorDatabaseManager(persist_directory=tmp_dir, use_exact_search=use_exact_search)
+            db.batch_add_opportunities([
+                (f"opp_{i}", {"title": f"Opportunity {i}", "agency": "NSF" if i % 2 else "DOD"}, vector.tolist())
+                for i, vector in enumerate(vectors)
+            ])
+            
+            queries = [vectors[1].tolist(), vectors[2].tolist(), vectors[3].tolist()]
+            filters = [None, {"agencies": ["NSF"]}, None]
+            batched = db.batch_search_opportunities(queries, n_results=5, filters=filters)
+            
+            assert len(batched) == 3
+            for query, query_filters, results in zip(queries, filters, batched):
+                single = db.search_opportunities_for_profile(query, n_results=5, **(query_filters or {}))
+                assert [m['match_id'] for m in results] == [m['match_id'] for m in single]
+            
+            assert batched[0][0]['match_id'] == "opp_1"
+            assert all(m['agency'] == "NSF" for m in batched[1])
+
+
+def test_projection_and_hydration():
+    """Metadata-only results rank like full results and hydrate to full documents"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping ChromaDB projection test: {e}")
+        return
+    
+    rng = np.random.default_rng(4)
+    vectors = rng.normal(size=(30, 8))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([
+            (f"opp_{i}", {"title": f"Opportunity {i}", "url_content": {"main_content": "x" * 5000}},
+             vector.tolist())
+            for i, vector in enumerate(vectors)
+        ])
+        
+        query = vectors[4].tolist()
+        full = db.search_opportunities_for_profile(query, n_results=5)
+        projected = db.search_opportunities_for_profile(query, n_results=5, include_documents=False)
+        
+        assert [m['match_id'] for m in projected] == [m['match_id'] for m in full]
+        assert projected[0]['title'] == "Opportunity 4"
+        assert 'url_content' not in projected[0]
+        
+        hydrated = db.hydrate_opportunities(projected)
+        assert [m['match_id'] for m in hydrated] == [m['match_id'] for m in full]
+        assert hydrated[0]['url_content'] == full[0]['url_content']
+        assert hydrated[0]['similarity_score'] == projected[0]['similarity_score']
+
+
+if __name__ == "__main__":
+    test_exact_search_batch_matches_single_queries()
+    test_vector_database_batch_search()
+    test_projection_and_hydration()
+    print("✓ Batch search tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-wide ChromaDB client and vector database registry
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from client_registry import get_chroma_client, release_chroma_client, discard_chroma_client
+from vector_database import VectorDatabaseManager, get_vector_db
+
+
+def test_one_client_per_directory():
+    """Equivalent paths share a client, also when requested from many threads at once"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = get_chroma_client(tmp_dir)
+        assert get_chroma_client(os.path.join(tmp_dir, ".")) is client
+
+        other_dir = os.path.join(tmp_dir, "other")
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(get_chroma_client(other_dir))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(clients) == 8 and all(c is clients[0] for c in clients)
+        assert clients[0] is not client
+
+        release_chroma_client(tmp_dir)
+        release_chroma_client(other_dir)
+
+
+def test_managers_share_client_and_state():
+    """Managers on the same directory see each other's writes through one client"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shared = get_vector_db(tmp_dir)
+        assert get_vector_db(tmp_dir) is shared
+
+        standalone = VectorDatabaseManager(persist_directory=tmp_dir)
+        assert standalone.client is shared.client
+
+        shared.batch_add_opportunities([("opp_1", {"title": "Shared"}, [0.1, 0.2, 0.3])])
+        assert standalone.get_opportunity("opp_1")["title"] == "Shared"
+        release_chroma_client(tmp_dir)
+
+
+def test_corrupt_chroma_files_are_set_aside():
+    """Unreadable ChromaDB files are moved aside; the document store is kept"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([("opp_1", {"title": "Kept"}, [1.0, 0.0, 0.0])])
+        discard_chroma_client(tmp_dir)
+        with open(os.path.join(tmp_dir, "chroma.sqlite3"), 'wb') as f:
+            f.write(b"not a database" * 100)
+
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        assert db.opportunity_store.count() == 0
+        assert db.documents.get("opp_1")["title"] == "Kept"
+        assert any(name.startswith("chroma_corrupt_") for name in os.listdir(tmp_dir))
+        discard_chroma_client(tmp_dir)
+
+
+if __name__ == "__main__":
+    test_one_client_per_directory()
+    test_managers_share_client_and_state()
+    test_corrupt_chroma_files_are_set_aside()
+    print("✓ Client registry tests passed")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the readers-writer lock and the batching background writer
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from concurrency import ReadWriteLock, BackgroundWriter, BackgroundWriteError
+from vector_database import VectorDatabaseManager
+
+
+def test_read_write_lock():
+    """Readers overlap, a writer runs alone, and nested reads do not deadlock behind a waiting writer"""
+    lock = ReadWriteLock()
+    active_readers = []
+    peak = [0]
+    counter_lock = threading.Lock()
+    barrier = threading.Barrier(4)
+
+    def reader():
+        with lock.read_locked():
+            with counter_lock:
+                active_readers.append(1)
+                peak[0] = max(peak[0], len(active_readers))
+            barrier.wait(timeout=5)
+            with counter_lock:
+                active_readers.pop()
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 4
+
+    events = []
+
+    def write():
+        with lock.write_locked():
+            events.append("write")
+
+    with lock.read_locked():
+        writer = threading.Thread(target=write)
+        writer.start()
+        time.sleep(0.05)
+        assert events == []  # Writer waits for the reader
+        with lock.read_locked():  # Re-entrant read while a writer is queued
+            events.append("nested read")
+    writer.join(timeout=5)
+    assert events == ["nested read", "write"]
+
+
+def test_background_writer_coalesces():
+    """Small writes are applied as one batch and the last operation per ID wins"""
+    batches = []
+    writer = BackgroundWriter(lambda upserts, deletes: batches.append((dict(upserts), sorted(deletes))),
+                              max_delay=0.5)
+    writer.upsert([("a", 1), ("b", 1)])
+    writer.upsert([("a", 2)])
+    writer.delete(["b", "c"])
+    assert writer.flush(timeout=5)
+    assert batches == [({"a": 2}, ["b", "c"])]
+
+    writer.upsert([("d", 1)])
+    assert writer.wait_for_own_writes(timeout=5)
+    assert batches[-1] == ({"d": 1}, [])
+    writer.close()
+
+
+def test_background_writer_reports_failures():
+    """A failed batch makes flush() and the writing thread's wait raise instead of reporting success"""
+    def apply_batch(upserts, deletes):
+        if any(item_id == "bad" for item_id, _ in upserts):
+            raise RuntimeError("disk full")
+    writer = BackgroundWriter(apply_batch, max_delay=0.05)
+    
+    writer.upsert([("bad", 1), ("other", 1)])
+    try:
+        writer.wait_for_own_writes(timeout=5)
+        assert False, "expected BackgroundWriteError"
+    except BackgroundWriteError as e:
+        assert sorted(e.item_ids) == ["bad", "other"]
+    assert writer.wait_for_own_writes(timeout=5)  # Reported to the thread once
+    
+    try:
+        writer.flush(timeout=5)
+        assert False, "expected BackgroundWriteError"
+    except BackgroundWriteError as e:
+        assert sorted(e.item_ids) == ["bad", "other"]
+    
+    writer.upsert([("good", 1)])
+    assert writer.flush(timeout=5)  # Reported failures are not raised again
+    writer.close()
+
+
+def test_manager_untracks_failed_writes():
+    """Opportunities lost by the background writer are not recorded as processed"""
+    from enrichment_queue import EnrichmentQueue
+    from funding_opportunities_manager import FundingOpportunitiesManager
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir, write_batching=True)
+        original_add = db._add_opportunities
+        
+        def failing_add(opportunities):
+            if any(opp_id == "opp_bad" for opp_id, _, _ in opportunities):
+                raise RuntimeError("disk full")
+            original_add(opportunities)
+        db._add_opportunities = failing_add
+        
+        manager = FundingOpportunitiesManager.__new__(FundingOpportunitiesManager)
+        manager.vector_db = db
+        manager.processed_ids = {"opportunities": {}}
+        manager._tracking_lock = threading.RLock()
+        manager.enrichment_queue = EnrichmentQueue(os.path.join(tmp_dir, "queue.json"))
+        
+        db.batch_add_opportunities([("opp_ok", {"title": "Fine"}, [1.0, 0.0, 0.0])])
+        db.flush()
+        db.batch_add_opportunities([("opp_bad", {"title": "Lost"}, [0.0, 1.0, 0.0])])
+        manager.processed_ids["opportunities"] = {"opp_ok": {}, "opp_bad": {}}
+        manager.enrichment_queue.add("opp_bad", needs_deadline=True)
+        
+        assert manager._confirm_vector_writes() == ["opp_bad"]
+        assert list(manager.processed_ids["opportunities"]) == ["opp_ok"]
+        assert "opp_bad" not in manager.enrichment_queue
+        assert manager._confirm_vector_writes() == []
+        db.writer.close()
+
+
+def test_manager_read_your_writes():
+    """With write batching, a thread sees its own writes immediately and others after flush()"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir, write_batching=True)
+        for i in range(20):
+            db.add_funding_opportunity(f"opp_{i}", {"title": f"Opportunity {i}"}, [float(i), 1.0, 0.0])
+        assert db.get_opportunity("opp_7")["title"] == "Opportunity 7"
+        assert db.writer.batches_applied <= 2
+
+        seen = []
+        db.delete_opportunities(["opp_3"])
+        db.flush()
+        reader = threading.Thread(target=lambda: seen.append(db.get_collection_stats()["opportunities"]))
+        reader.start()
+        reader.join()
+        assert seen == [19]
+        db.writer.close()
+
+
+if __name__ == "__main__":
+    test_read_write_lock()
+    test_background_writer_coalesces()
+    test_background_writer_reports_failures()
+    test_manager_untracks_failed_writes()
+    test_manager_read_your_writes()
+    print("✓ Concurrency tests passed")
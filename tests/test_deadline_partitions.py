@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for storing opportunities in deadline-quarter partitions
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from opportunity_metadata import deadline_partition, partition_bounds, deadline_range, CONTINUOUS_DEADLINE_TS
+from vector_database import VectorDatabaseManager
+
+
+def _ts(year, month, day):
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp())
+
+
+def test_partition_keys():
+    """Deadlines map to UTC quarters; continuous and unknown deadlines share one partition"""
+    assert deadline_partition(_ts(2026, 9, 30)) == "2026q3"
+    assert deadline_partition(_ts(2026, 10, 1)) == "2026q4"
+    assert deadline_partition(CONTINUOUS_DEADLINE_TS) == "continuous"
+    assert deadline_partition(0) == "continuous"
+    assert partition_bounds("2026q4") == (_ts(2026, 10, 1), _ts(2027, 1, 1))
+    assert partition_bounds("continuous") is None
+
+    where = {"$and": [{"deadline_ts": {"$gte": 100}}, {"deadline_ts": {"$lte": 500}}, {"agency_code": "NSF"}]}
+    assert deadline_range(where) == (100, 500)
+    assert deadline_range({"$or": [{"deadline_ts": {"$gte": 100}}]}) == (None, None)
+
+
+def test_partitioned_manager():
+    """Legacy rows are partitioned, searches skip ended quarters and retirement drops them whole"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy = VectorDatabaseManager(persist_directory=tmp_dir, vector_backend="local")
+        legacy.batch_add_opportunities([
+            ("old", {"title": "Old", "close_date": "2020-02-01"}, [1.0, 0.0, 0.0]),
+            ("future", {"title": "Future", "close_date": "2099-05-01"}, [0.9, 0.1, 0.0]),
+            ("anytime", {"title": "Anytime", "close_date": "Continuous"}, [0.8, 0.2, 0.0])
+        ])
+
+        db = VectorDatabaseManager(persist_directory=tmp_dir, vector_backend="local", partition_by_deadline=True)
+        assert db.opportunity_store.partitions() == ["2020q1", "2099q2", "continuous"]
+        assert db.get_collection_stats()["opportunities"] == 3
+        assert [opp["id"] for opp in db.iter_opportunities(include_documents=False, offset=1)] == ["future", "anytime"]
+
+        results = db.search_opportunities_for_profile([1.0, 0.0, 0.0], n_results=5)
+        assert [r["match_id"] for r in results] == ["future", "anytime"]
+
+        # A changed deadline moves the opportunity to its new partition
+        db.add_funding_opportunity("anytime", {"title": "Anytime", "close_date": "2099-11-01"}, [0.8, 0.2, 0.0])
+        assert db.opportunity_store.stores["2099q4"].count() == 1
+        assert db.opportunity_store.stores["continuous"].count() == 0
+
+        assert db.retire_expired_partitions() == ["old"]
+        assert db.opportunity_store.partitions() == ["2099q2", "2099q4", "continuous"]
+        assert db.get_opportunity("old") is None
+
+
+def test_partitions_open_without_flag():
+    """Once partitioned, a store is opened partitioned even with the flag off (both backends)"""
+    for backend in ("local", "chroma"):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = VectorDatabaseManager(persist_directory=tmp_dir, vector_backend=backend, partition_by_deadline=True)
+            db.batch_add_opportunities([("future", {"title": "Future", "close_date": "2099-05-01"}, [1.0, 0.0, 0.0])])
+
+            reopened = VectorDatabaseManager(persist_directory=tmp_dir, vector_backend=backend,
+                                             partition_by_deadline=False)
+            assert reopened.partition_by_deadline
+            assert reopened.get_collection_stats()["opportunities"] == 1
+            results = reopened.search_opportunities_for_profile([1.0, 0.0, 0.0], n_results=1)
+            assert [r["match_id"] for r in results] == ["future"]
+
+
+if __name__ == "__main__":
+    test_partition_keys()
+    test_partitioned_manager()
+    test_partitions_open_without_flag()
+    print("✓ Deadline partition tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the compressed opportunity document store and its use by the vector database
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from document_store import OpportunityDocumentStore
+
+
+def test_document_store_roundtrip():
+    """Documents survive compression and multi-get spans several SQL batches"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = OpportunityDocumentStore(os.path.join(tmp_dir, "docs.db"))
+        documents = [(f"opp_{i}", {"title": f"Opportunity {i}", "url_content": {"main_content": "grant " * 500}})
+                     for i in range(1200)]
+        store.put_many(documents)
+        
+        found = store.get_many([f"opp_{i}" for i in range(1200)] + ["missing"])
+        assert len(found) == 1200
+        assert found["opp_7"] == documents[7][1]
+        assert "missing" not in found
+        
+        stats = store.stats()
+        assert stats["documents"] == 1200
+        assert stats["stored_bytes"] < stats["raw_bytes"]
+        
+        store.delete_many(["opp_1", "opp_2"])
+        assert store.count() == 1198
+        assert store.get("opp_1") is None
+
+
+def test_vector_database_moves_documents_out_of_chroma():
+    """Legacy ChromaDB documents are migrated and new writes keep ChromaDB lean"""
+    try:
+        import chromadb
+        from chromadb.config import Settings
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping ChromaDB document store test: {e}")
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Collection written before the document store existed
+        client = chromadb.PersistentClient(path=tmp_dir, settings=Settings(anonymized_telemetry=False, allow_reset=True))
+        legacy = client.get_or_create_collection("funding_opportunities")
+        legacy.upsert(
+            ids=["legacy"],
+            embeddings=[[1.0, 0.0]],
+            metadatas=[{"title": "Legacy"}],
+            documents=[json.dumps({"title": "Legacy", "description": "old"})]
+        )
+        
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([("new", {"title": "New", "description": "fresh"}, [0.0, 1.0])])
+        
+        stored = db.opportunities.get(include=['documents'])
+        assert all(document == "" for document in stored['documents'])
+        assert db.documents.count() == 2
+        
+        assert db.get_opportunity("legacy")["description"] == "old"
+        assert db.search_opportunities_for_profile([1.0, 0.0], n_results=1)[0]["description"] == "old"
+        assert {opp["id"] for opp in db.get_all_opportunities()} == {"legacy", "new"}
+        
+        db.delete_opportunities(["new"])
+        assert db.documents.get("new") is None
+
+
+if __name__ == "__main__":
+    test_document_store_roundtrip()
+    test_vector_database_moves_documents_out_of_chroma()
+    print("✓ Document store tests passed")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Test the deferred URL enrichment queue ordering and persistence, and the
+enrichment of queued opportunities
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from enrichment_queue import EnrichmentQueue
+from funding_opportunities_manager import FundingOpportunitiesManager
+from vector_database import VectorDatabaseManager
+
+
+class _StubEmbeddings:
+    """Records the texts it embeds, raising `error` instead if one is set"""
+    
+    def __init__(self, error=None):
+        self.texts = []
+        self.error = error
+    
+    def generate_embedding(self, text):
+        if self.error is not None:
+            raise self.error
+        self.texts.append(text)
+        return [0.0, 0.0, 1.0]
+
+
+class _StubFetcher:
+    """Serves canned URL content by URL"""
+    
+    def __init__(self, pages):
+        self.pages = pages
+    
+    def fetch_url_content(self, url):
+        return self.pages.get(url)
+
+
+def _enrichment_manager(tmp_dir, pages):
+    """Manager with a real vector database and stubbed embedding and URL fetching"""
+    manager = FundingOpportunitiesManager.__new__(FundingOpportunitiesManager)
+    manager.vector_db = VectorDatabaseManager(persist_directory=os.path.join(tmp_dir, "db"))
+    manager.embeddings_manager = _StubEmbeddings()
+    manager.url_fetcher = _StubFetcher(pages)
+    manager.reembed_threshold = 0.5
+    manager.processed_ids = {"opportunities": {}}
+    manager._tracking_lock = threading.RLock()
+    manager.enrichment_queue = EnrichmentQueue(os.path.join(tmp_dir, "queue.json"))
+    manager._snapshot_stale = False
+    return manager
+
+
+def _queue_opportunity(manager, opp_id, opportunity, embedding, **queue_args):
+    manager.vector_db.batch_add_opportunities([(opp_id, opportunity, embedding)])
+    manager.vector_db.wait_for_own_writes()
+    manager.processed_ids["opportunities"][opp_id] = {"enrichment": "pending"}
+    manager.enrichment_queue.add(opp_id, **queue_args)
+
+
+def test_enrichment_queue_priority():
+    """Nearer deadlines, unknown deadlines and frequently matched entries come first"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = EnrichmentQueue(os.path.join(tmp_dir, "queue.json"))
+        now = datetime.now(timezone.utc)
+        
+        queue.add("far", deadline=now + timedelta(days=200))
+        queue.add("near", deadline=now + timedelta(days=10))
+        queue.add("unknown", needs_deadline=True)
+        queue.add("popular", deadline=now + timedelta(days=100))
+        
+        # 100 days / (1 + 19 hits) = 5 days, ahead of "near"
+        for _ in range(19):
+            queue.record_matches(["popular"])
+        
+        order = []
+        while True:
+            popped = queue.pop()
+            if popped is None:
+                break
+            order.append(popped[0])
+        
+        assert order == ["unknown", "popular", "near", "far"]
+        assert len(queue) == 0
+
+
+def test_enrichment_queue_persistence():
+    """Pending entries survive a reload and discarded entries do not"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue_file = os.path.join(tmp_dir, "queue.json")
+        queue = EnrichmentQueue(queue_file)
+        queue.add("a", deadline=datetime.now(timezone.utc) + timedelta(days=5))
+        queue.add("b", needs_deadline=True)
+        queue.discard("a")
+        queue.save()
+        
+        reloaded = EnrichmentQueue(queue_file)
+        assert len(reloaded) == 1
+        assert "b" in reloaded
+        assert reloaded.pop()[0] == "b"
+
+
+def test_enrichment_queue_retry_backoff():
+    """Retried entries wait out their backoff and are given up after MAX_RETRIES attempts"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = EnrichmentQueue(os.path.join(tmp_dir, "queue.json"))
+        queue.add("flaky", needs_deadline=True)
+        queue.add("later", deadline=datetime.now(timezone.utc) + timedelta(days=50))
+        
+        opp_id, entry = queue.pop()
+        assert opp_id == "flaky"
+        assert queue.retry(opp_id, entry)
+        assert queue.pending["flaky"]["retries"] == 1
+        # The backing-off entry is skipped, not lost
+        assert queue.pop()[0] == "later"
+        assert queue.pop() is None and "flaky" in queue
+        
+        queue.save()
+        queue = EnrichmentQueue(os.path.join(tmp_dir, "queue.json"))
+        assert queue.pop() is None
+        for attempt in range(2, EnrichmentQueue.MAX_RETRIES + 1):
+            queue.pending["flaky"]["not_before"] = datetime.now(timezone.utc).isoformat()
+            opp_id, entry = queue.pop()
+            assert queue.retry(opp_id, entry) == (attempt < EnrichmentQueue.MAX_RETRIES)
+        assert len(queue) == 0
+        
+        # Rate limits back off without using up retries
+        assert queue.retry("flaky", entry, count_attempt=False)
+        assert queue.pending["flaky"]["retries"] == entry["retries"]
+
+
+def test_enrich_drops_expired_deadline():
+    """A deadline found at the URL is re-checked and an expired opportunity is removed"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _enrichment_manager(tmp_dir, {
+            "https://example.org/old": {"description": "Closed call", "deadline_info": "2020-01-15"}
+        })
+        _queue_opportunity(manager, "old", {"title": "Old call", "description": "Sensors", "agency": "NSF",
+                                            "url": "https://example.org/old"},
+                           [1.0, 0.0, 0.0], needs_deadline=True)
+        
+        assert manager.enrich_next_opportunity() == {"id": "old", "action": "discarded"}
+        assert manager.vector_db.get_opportunity_with_embedding("old") is None
+        assert "old" not in manager.processed_ids["opportunities"]
+        assert manager.embeddings_manager.texts == []
+        assert manager.enrich_next_opportunity() is None
+
+
+def test_enrich_reembeds_changed_text():
+    """Enriched text overlapping the embedded text less than reembed_threshold is re-embedded"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _enrichment_manager(tmp_dir, {
+            "https://example.org/new": {
+                "description": "Quantum networking testbeds for distributed entanglement across metropolitan fiber",
+                "deadline_info": "2099-06-30"
+            }
+        })
+        _queue_opportunity(manager, "new", {"title": "Quantum call", "description": "Sensors", "agency": "NSF",
+                                            "url": "https://example.org/new"},
+                           [1.0, 0.0, 0.0], needs_deadline=True)
+        
+        assert manager.enrich_next_opportunity() == {"id": "new", "action": "reembedded"}
+        assert len(manager.embeddings_manager.texts) == 1
+        assert "entanglement" in manager.embeddings_manager.texts[0]
+        opportunity, embedding = manager.vector_db.get_opportunity_with_embedding("new")
+        assert embedding == [0.0, 0.0, 1.0]
+        assert opportunity["close_date"] == "2099-06-30"
+        tracked = manager.processed_ids["opportunities"]["new"]
+        assert tracked["enrichment"] == "complete" and tracked["expiration_date"].startswith("2099-06-30")
+
+
+def test_enrich_keeps_embedding_for_similar_text():
+    """Enriched text overlapping at least reembed_threshold keeps the stored embedding"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _enrichment_manager(tmp_dir, {
+            "https://example.org/same": {"description": "Quantum sensors", "eligibility_info": "Universities"}
+        })
+        deadline = datetime.now(timezone.utc) + timedelta(days=30)
+        _queue_opportunity(manager, "same", {"title": "Quantum sensors", "description": "Quantum sensors",
+                                             "agency": "NSF", "url": "https://example.org/same",
+                                             "close_date": deadline.strftime("%Y-%m-%d")},
+                           [1.0, 0.0, 0.0], deadline=deadline)
+        
+        # {quantum, sensors, nsf} against {quantum, sensors, nsf, from, url:}: overlap 0.6
+        assert manager.enrich_next_opportunity() == {"id": "same", "action": "updated"}
+        assert manager.embeddings_manager.texts == []
+        opportunity, embedding = manager.vector_db.get_opportunity_with_embedding("same")
+        assert embedding == [1.0, 0.0, 0.0]
+        assert opportunity["eligibility_enriched"] == "Universities"
+        assert manager.processed_ids["opportunities"]["same"]["enrichment"] == "complete"
+
+
+def test_enrich_retries_failed_embedding():
+    """A non-rate-limit failure re-queues the entry until its retries run out"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _enrichment_manager(tmp_dir, {
+            "https://example.org/down": {"description": "Entirely different text about ocean acidification "
+                                                        "monitoring buoys and coastal carbon chemistry",
+                                         "deadline_info": "2099-03-01"}
+        })
+        manager.embeddings_manager.error = RuntimeError("503 Service Unavailable")
+        _queue_opportunity(manager, "down", {"title": "Ocean call", "description": "Sensors", "agency": "NSF",
+                                             "url": "https://example.org/down"},
+                           [1.0, 0.0, 0.0], needs_deadline=True)
+        
+        result = manager.enrich_next_opportunity()
+        assert result["action"] == "error" and "503" in result["error"]
+        assert "down" in manager.enrichment_queue
+        assert manager.enrichment_queue.pending["down"]["needs_deadline"]
+        assert manager.processed_ids["opportunities"]["down"]["enrichment"] == "pending"
+        # Backing off: nothing is due
+        assert manager.enrich_next_opportunity() is None
+        
+        for _ in range(EnrichmentQueue.MAX_RETRIES - 1):
+            manager.enrichment_queue.pending["down"]["not_before"] = datetime.now(timezone.utc).isoformat()
+            assert manager.enrich_next_opportunity()["action"] == "error"
+        assert "down" not in manager.enrichment_queue
+        assert manager.processed_ids["opportunities"]["down"]["enrichment"] == "failed"
+        assert manager.vector_db.get_opportunity_with_embedding("down") is not None
+
+
+def test_pending_enrichment_requeued_on_load():
+    """Tracked opportunities still pending enrichment but missing from the queue are re-queued"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = _enrichment_manager(tmp_dir, {})
+        deadline = datetime.now(timezone.utc) + timedelta(days=20)
+        manager.processed_ids["opportunities"] = {
+            "lost": {"enrichment": "pending", "expiration_date": None},
+            "lost_dated": {"enrichment": "pending", "expiration_date": deadline.isoformat()},
+            "done": {"enrichment": "complete", "expiration_date": None},
+            "failed": {"enrichment": "failed", "expiration_date": None}
+        }
+        manager.enrichment_queue.add("lost_dated", deadline=deadline)
+        manager.enrichment_queue.pending["lost_dated"]["retries"] = 2
+        
+        manager._requeue_pending_enrichment()
+        assert sorted(manager.enrichment_queue.pending) == ["lost", "lost_dated"]
+        assert manager.enrichment_queue.pending["lost"]["needs_deadline"]
+        # Entries already queued keep their retry state
+        assert manager.enrichment_queue.pending["lost_dated"]["retries"] == 2
+        assert "lost" in EnrichmentQueue(os.path.join(tmp_dir, "queue.json"))
+
+
+if __name__ == "__main__":
+    test_enrichment_queue_priority()
+    test_enrichment_queue_persistence()
+    test_enrichment_queue_retry_backoff()
+    test_enrich_drops_expired_deadline()
+    test_enrich_reembeds_changed_text()
+    test_enrich_keeps_embedding_for_similar_text()
+    test_enrich_retries_failed_embedding()
+    test_pending_enrichment_requeued_on_load()
+    print("✓ Enrichment queue tests passed")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory NumPy exact search index against brute force and ChromaDB
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from exact_search_index import ExactSearchIndex
+
+
+def _brute_force(vectors, query, k):
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    order = np.argsort(distances, kind='stable')[:k]
+    return order, distances[order]
+
+
+def test_exact_search_matches_brute_force():
+    """Top-k ids and distances equal a brute-force scan"""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 32)).astype(np.float32)
+    ids = [f"opp_{i}" for i in range(len(vectors))]
+    
+    index = ExactSearchIndex(initial_capacity=16)  # Forces several resizes
+    index.upsert(ids, vectors.tolist())
+    
+    query = rng.normal(size=32).astype(np.float32)
+    found_ids, found_distances = index.search(query.tolist(), 10)
+    expected_rows, expected_distances = _brute_force(vectors, query, 10)
+    
+    assert found_ids == [ids[i] for i in expected_rows]
+    assert np.allclose(found_distances, expected_distances, rtol=1e-4, atol=1e-3)
+
+
+def test_exact_search_upsert_and_delete():
+    """Replacing and deleting vectors keeps the mirror consistent"""
+    index = ExactSearchIndex()
+    index.upsert(["a", "b", "c"], [[0.0, 0.0], [1.0, 0.0], [5.0, 5.0]])
+    
+    # Move "c" next to the query and delete "a"
+    index.upsert(["c"], [[0.1, 0.0]])
+    index.delete(["a", "missing"])
+    
+    assert len(index) == 2
+    assert "a" not in index
+    ids, distances = index.search([0.0, 0.0], 5)
+    assert ids == ["c", "b"]
+    assert np.allclose(distances, [0.01, 1.0])
+
+
+def test_exact_search_metadata():
+    """Row metadata follows its vector through deletes; clear() drops the version"""
+    index = ExactSearchIndex()
+    index.upsert(["a", "b", "c"], [[0.0, 0.0], [1.0, 0.0], [5.0, 5.0]],
+                 [{"title": "A"}, {"title": "B"}, {"title": "C"}])
+    index.version = 3
+    
+    # "c" moves into the row of "a"; an upsert without metadata leaves it unknown
+    index.delete(["a"])
+    index.upsert(["b"], [[2.0, 0.0]])
+    assert index.get_metadatas(["c", "b", "missing"]) == {"c": {"title": "C"}}
+    
+    index.clear()
+    assert index.version is None and index.get_metadatas(["c"]) == {}
+
+
+def test_vector_database_exact_search_matches_chroma():
+    """The mirror returns the same ranking as ChromaDB and falls back when out of sync"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping ChromaDB comparison: {e}")
+        return
+    
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(200, 16))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir, use_exact_search=True)
+        db.batch_add_opportunities([
+            (f"opp_{i}", {"title": f"Opportunity {i}"}, vector.tolist())
+            for i, vector in enumerate(vectors)
+        ])
+        
+        query = vectors[7].tolist()
+        exact = db.search_opportunities_for_profile(query, n_results=5)
+        
+        db.exact_index.clear()  # Out of sync: must fall back to ChromaDB
+        fallback = db.search_opportunities_for_profile(query, n_results=5)
+        
+        assert exact[0]['match_id'] == "opp_7"
+        assert [m['match_id'] for m in exact] == [m['match_id'] for m in fallback]
+
+
+def test_exact_search_resyncs_on_external_reembed():
+    """A re-embed by another process (same count) is detected by corpus version"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping ChromaDB comparison: {e}")
+        return
+    
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(20, 8))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir, use_exact_search=True)
+        db.batch_add_opportunities([
+            (f"opp_{i}", {"title": f"Opportunity {i}"}, vector.tolist())
+            for i, vector in enumerate(vectors)
+        ])
+        assert db._query_exact_index([vectors[0].tolist()], 1) is not None
+        
+        # Another process re-embeds opp_0: the row count is unchanged
+        writer = VectorDatabaseManager(persist_directory=tmp_dir)
+        writer.batch_add_opportunities([("opp_0", {"title": "Opportunity 0"}, (-vectors[0]).tolist())])
+        
+        assert db._query_exact_index([(-vectors[0]).tolist()], 1) is None
+        db._exact_rebuild_thread.join()
+        results = db._query_exact_index([(-vectors[0]).tolist()], 1)
+        assert results['ids'][0] == ["opp_0"]
+
+
+def test_exact_search_skips_chroma():
+    """An in-sync mirror answers searches without any ChromaDB request"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping ChromaDB comparison: {e}")
+        return
+    
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(50, 8))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir, use_exact_search=True)
+        db.batch_add_opportunities([
+            (f"opp_{i}", {"title": f"Opportunity {i}", "agency": "NSF"}, vector.tolist())
+            for i, vector in enumerate(vectors)
+        ])
+        db.delete_opportunities(["opp_1"])
+        
+        def no_chroma(*args, **kwargs):
+            raise AssertionError("ChromaDB was queried")
+        
+        store = db.opportunity_store
+        store.get, store.count, store.batch_query = no_chroma, no_chroma, no_chroma
+        matches = db.search_opportunities_for_profile(vectors[4].tolist(), n_results=3, include_documents=False)
+        assert matches[0]['match_id'] == "opp_4"
+        assert matches[0]['title'] == "Opportunity 4" and matches[0]['agency'] == "NSF"
+        assert "opp_1" not in [match['match_id'] for match in matches]
+        
+        # Full documents come from the document store
+        matches = db.search_opportunities_for_profile(vectors[4].tolist(), n_results=3)
+        assert matches[0]['title'] == "Opportunity 4"
+
+
+if __name__ == "__main__":
+    test_exact_search_matches_brute_force()
+    test_exact_search_upsert_and_delete()
+    test_exact_search_metadata()
+    test_vector_database_exact_search_matches_chroma()
+    test_exact_search_resyncs_on_external_reembed()
+    test_exact_search_skips_chroma()
+    print("✓ Exact search index tests passed")
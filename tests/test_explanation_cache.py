@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for cached match explanations and document-set versions
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from explanation_cache import ExplanationCache
+from user_registry import UserRegistry
+
+
+def test_document_version_tracks_source_files():
+    """The version changes when a user's file is edited, added or deleted"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upload_dir = os.path.join(tmp_dir, "uploads")
+        os.makedirs(upload_dir)
+        with open(os.path.join(upload_dir, "ada.json"), 'w') as f:
+            json.dump({"person": {"name": "Ada Lovelace"}}, f)
+        with open(os.path.join(upload_dir, "cv.pdf"), 'wb') as f:
+            f.write(b"%PDF-1.4 cv")
+
+        registry = UserRegistry(os.path.join(tmp_dir, "registry.db"), upload_dir)
+        registry.sync()
+        ada = registry.list_users()[0]['id']
+        version = registry.document_version(ada)
+        assert registry.document_version(ada) == version
+
+        with open(os.path.join(upload_dir, "cv.pdf"), 'wb') as f:
+            f.write(b"%PDF-1.4 cv, second edition")
+        edited = registry.document_version(ada)
+        assert edited != version
+
+        with open(os.path.join(upload_dir, "paper.pdf"), 'wb') as f:
+            f.write(b"%PDF-1.4 paper")
+        registry.register_file("paper.pdf", ada)
+        added = registry.document_version(ada)
+        assert added != edited
+
+        os.remove(os.path.join(upload_dir, "paper.pdf"))
+        assert registry.document_version(ada) == edited
+
+
+def test_explanation_cache():
+    """Entries are found per user and opportunity and flagged stale for other document versions"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ExplanationCache(os.path.join(tmp_dir, "explanation_cache.db"))
+        opportunity = {"title": "Robotics", "agency": "NSF", "url": "https://nsf.example", "deadline": "2099-01-01"}
+        opportunity_id = ExplanationCache.opportunity_key(opportunity)
+        assert opportunity_id == ExplanationCache.opportunity_key(dict(opportunity))
+        assert ExplanationCache.opportunity_key({**opportunity, "match_id": "opp_1"}) == "opp_1"
+        assert cache.get("ada", opportunity_id, "v1") is None
+
+        cache.put("ada", opportunity_id, "v1", {"summary": "Strong fit"})
+        entry = cache.get("ada", opportunity_id, "v1")
+        assert entry["explanation"] == {"summary": "Strong fit"} and not entry["stale"]
+        assert cache.get("ada", opportunity_id, "v2")["stale"]
+        assert cache.get("bob", opportunity_id, "v1") is None
+
+        cache.put("ada", opportunity_id, "v2", {"summary": "Stronger fit"})
+        assert cache.get("ada", opportunity_id, "v2")["explanation"] == {"summary": "Stronger fit"}
+        assert cache.invalidate_user("ada") == 1
+        assert cache.get("ada", opportunity_id, "v2") is None
+
+
+if __name__ == "__main__":
+    test_document_version_tracks_source_files()
+    test_explanation_cache()
+    print("✓ Explanation cache tests passed")
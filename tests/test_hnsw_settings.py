@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for configurable HNSW settings on the opportunities collection
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import chromadb
+from chromadb.config import Settings
+
+from vector_store import ChromaVectorStore
+from vector_database import VectorDatabaseManager
+
+
+def _client(path):
+    return chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False, allow_reset=True))
+
+
+def _corpus(size=60, dimension=8, seed=3):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [f"opp_{i:03d}" for i in range(size)], vectors
+
+
+def test_settings_applied_on_create():
+    """New collections are built with the requested settings"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = ChromaVectorStore(_client(tmp_dir), "hnsw_create",
+                                  hnsw={"space": "l2", "construction_ef": 128, "search_ef": 40, "M": 24})
+        assert store.hnsw_settings() == {"space": "l2", "construction_ef": 128, "search_ef": 40, "M": 24}
+
+        try:
+            ChromaVectorStore(_client(tmp_dir), "hnsw_bad", hnsw={"ef": 10})
+            assert False, "unknown settings should be rejected"
+        except ValueError:
+            pass
+
+
+def test_migration_preserves_data():
+    """Changing build-time settings rebuilds the collection without losing vectors or metadata"""
+    ids, vectors = _corpus()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = _client(tmp_dir)
+        store = ChromaVectorStore(client, "hnsw_migrate", metadata={"description": "test"})
+        store.upsert(ids, vectors.tolist(), [{"rank": i} for i in range(len(ids))])
+        store.set_collection_metadata("document_store", 1)
+        before = store.batch_query(vectors[:3].tolist(), 5)
+
+        # search_ef alone is changed in place
+        store = ChromaVectorStore(client, "hnsw_migrate", metadata={"description": "test"}, hnsw={"search_ef": 30})
+        assert store.hnsw_settings()["search_ef"] == 30
+
+        store = ChromaVectorStore(client, "hnsw_migrate", metadata={"description": "test"},
+                                  hnsw={"space": "cosine", "M": 32})
+        settings = store.hnsw_settings()
+        assert settings["space"] == "cosine" and settings["M"] == 32 and settings["search_ef"] == 30
+        assert store.count() == len(ids)
+        assert store.collection.metadata["document_store"] == 1
+        assert "rebuild_complete" not in store.collection.metadata
+        assert store.get([ids[7]])["metadatas"] == [{"rank": 7}]
+
+        # Cosine distances are rescaled so scores stay comparable with the l2 space
+        after = store.batch_query(vectors[:3].tolist(), 5)
+        assert after["ids"] == before["ids"]
+        assert np.allclose(after["distances"], before["distances"], atol=1e-4)
+        assert sorted(c.name for c in client.list_collections()) == ["hnsw_migrate"]
+
+
+def test_interrupted_rebuild_is_recovered():
+    """A finished copy whose rename was interrupted is picked up on the next start"""
+    ids, vectors = _corpus(size=10)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        client = _client(tmp_dir)
+        store = ChromaVectorStore(client, "hnsw_crash", hnsw={"M": 20})
+        store.upsert(ids, vectors.tolist(), [{"rank": i} for i in range(len(ids))])
+
+        # Simulate a crash after the original was deleted but before the rename
+        client.get_collection("hnsw_crash").modify(name="hnsw_crash-rebuild",
+                                                   metadata={"description": "test", "rebuild_complete": True})
+
+        store = ChromaVectorStore(client, "hnsw_crash", hnsw={"M": 20})
+        assert store.count() == len(ids)
+        assert store.hnsw_settings()["M"] == 20
+
+
+def test_vector_database_hnsw_config():
+    """VectorDatabaseManager passes hnsw_config through and keeps search results intact"""
+    ids, vectors = _corpus(size=20)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir, hnsw_config={"search_ef": 64, "M": 12})
+        assert db.opportunity_store.hnsw_settings()["M"] == 12
+        db.batch_add_opportunities([(opp_id, {"title": opp_id}, vector.tolist())
+                                    for opp_id, vector in zip(ids, vectors)])
+
+        matches = db.search_opportunities_for_profile(vectors[4].tolist(), n_results=3)
+        assert matches[0]['match_id'] == ids[4]
+
+        try:
+            VectorDatabaseManager(persist_directory=tmp_dir, vector_backend="local", hnsw_config={"space": "cosine"})
+            assert False, "local backend only supports l2"
+        except ValueError:
+            pass
+
+
+def test_configuration_errors_keep_data():
+    """Invalid settings and startup errors propagate without deleting stored data"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([("opp_1", {"title": "Kept"}, [1.0, 0.0, 0.0])])
+        stored = sorted(os.listdir(tmp_dir))
+
+        for hnsw_config in ({"space": "cosin"}, {"ef": 10}, {"M": 0}):
+            try:
+                VectorDatabaseManager(persist_directory=tmp_dir, hnsw_config=hnsw_config)
+                assert False, f"{hnsw_config} should be rejected"
+            except ValueError:
+                pass
+
+        os.environ["CHROMA_HNSW_SPACE"] = "cosin"
+        try:
+            VectorDatabaseManager(persist_directory=tmp_dir)
+            assert False, "CHROMA_HNSW_SPACE typo should be rejected"
+        except ValueError:
+            pass
+        finally:
+            del os.environ["CHROMA_HNSW_SPACE"]
+
+        # Migration errors propagate instead of recreating the database
+        original = VectorDatabaseManager._backfill_typed_metadata
+        def failing_backfill(self):
+            raise RuntimeError("migration failed")
+        VectorDatabaseManager._backfill_typed_metadata = failing_backfill
+        try:
+            VectorDatabaseManager(persist_directory=tmp_dir)
+            assert False, "migration error should propagate"
+        except RuntimeError:
+            pass
+        finally:
+            VectorDatabaseManager._backfill_typed_metadata = original
+
+        assert sorted(os.listdir(tmp_dir)) == stored
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        assert db.opportunity_store.count() == 1
+        assert db.documents.get_many(["opp_1"])["opp_1"]["title"] == "Kept"
+
+
+if __name__ == "__main__":
+    test_settings_applied_on_create()
+    test_migration_preserves_data()
+    test_interrupted_rebuild_is_recovered()
+    test_vector_database_hnsw_config()
+    test_configuration_errors_keep_data()
+    print("✓ HNSW settings tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the BM25 lexical index, keyword lookups and hybrid search
+"""
+
+import os
+import sys
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from lexical_index import LexicalIndex, tokenize
+from vector_database import VectorDatabaseManager
+
+
+OPPORTUNITIES = [
+    ("career", {"title": "Faculty Early Career Development (CAREER)", "description": "Early career faculty awards",
+                "keywords": ["career development", "education"], "close_date": "2099-07-01"}),
+    ("sbir2", {"title": "SBIR Phase II: Autonomous Systems", "description": "Phase II small business research",
+               "keywords": '["autonomy", "machine learning"]', "close_date": "2099-08-01"}),
+    ("bio", {"title": "Molecular Biology Research", "description": "Protein folding and genomics",
+             "keywords": "genomics, protein structure", "close_date": "2099-09-01"})
+]
+
+
+def test_bm25_and_keyword_lookup():
+    """BM25 ranks exact program names first; keyword matching works on whole tokens"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = LexicalIndex(os.path.join(tmp_dir, "lexical.db"))
+        index.index_many(OPPORTUNITIES)
+        assert tokenize("The SBIR Phase-II") == ["sbir", "phase", "ii"]
+
+        assert index.search("SBIR Phase II")[0][0] == "sbir2"
+        assert index.search("CAREER")[0][0] == "career"
+        assert index.search("quantum") == []
+
+        matches = index.keyword_matches(["machine learning", "genomics", "protein"],
+                                        ["career", "sbir2", "bio"])
+        assert matches == {"sbir2": 1, "bio": 2}
+
+        # Re-indexing replaces old postings
+        index.index_many([("bio", {"title": "Quantum Computing", "keywords": []})])
+        assert index.search("genomics") == []
+        index.delete_many(["bio"])
+        assert index.count() == 2
+
+
+def test_hybrid_search():
+    """Lexical hits are fused with vector hits even when their embeddings rank them last"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        embeddings = {"career": [1.0, 0.0, 0.0], "sbir2": [0.0, 0.0, 1.0], "bio": [0.9, 0.1, 0.0]}
+        db.batch_add_opportunities([(opp_id, opp, embeddings[opp_id]) for opp_id, opp in OPPORTUNITIES])
+
+        vector_only = db.search_opportunities_for_profile([1.0, 0.0, 0.0], n_results=2)
+        assert "sbir2" not in [match["match_id"] for match in vector_only]
+
+        hybrid = db.hybrid_search_opportunities([1.0, 0.0, 0.0], "SBIR Phase II", n_results=2)
+        assert {match["match_id"] for match in hybrid} == {"career", "sbir2"}
+        sbir = next(match for match in hybrid if match["match_id"] == "sbir2")
+        assert sbir["lexical_score"] > 0 and 0 < sbir["similarity_score"] < 1
+        assert sbir["title"].startswith("SBIR Phase II")
+
+        filtered = db.hybrid_search_opportunities([1.0, 0.0, 0.0], "SBIR Phase II", n_results=3,
+                                                  filters={"deadline_before": "2099-07-15"})
+        assert [match["match_id"] for match in filtered] == ["career"]
+
+        # A second manager on existing data builds the index from stored opportunities
+        os.remove(os.path.join(tmp_dir, "lexical_index.db"))
+        reopened = VectorDatabaseManager(persist_directory=tmp_dir)
+        assert reopened.lexical_index.count() == 3
+
+
+if __name__ == "__main__":
+    test_bm25_and_keyword_lookup()
+    test_hybrid_search()
+    print("✓ Lexical index tests passed")
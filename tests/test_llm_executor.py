@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent, rate-limited LLM executor
+"""
+
+import os
+import sys
+import time
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from llm_executor import LLMExecutor
+from rate_limiter import RateLimiter
+
+
+def fast_limiter():
+    return RateLimiter(calls_per_minute=60000)
+
+
+def test_results_in_order_with_partial_failures():
+    """Results keep input order; failures are reported per index after retries"""
+    attempts = {}
+    lock = threading.Lock()
+
+    def job(item):
+        with lock:
+            attempts[item] = attempts.get(item, 0) + 1
+        time.sleep(0.01 * (5 - item))  # Later items finish first
+        if item == 2:
+            raise ValueError("bad item")
+        if item == 3 and attempts[item] == 1:
+            raise ConnectionError("transient")
+        return item * 10
+
+    executor = LLMExecutor(max_workers=4, rate_limiter=fast_limiter(), max_retries=2)
+    batch = executor.map(job, [0, 1, 2, 3, 4])
+    assert batch["results"] == [0, 10, None, 30, 40]
+    assert batch["errors"] == [{"index": 2, "error": "bad item"}]
+    assert batch["completed"] == 4 and batch["failed"] == 1
+    assert attempts[2] == 2 and attempts[3] == 2
+
+
+def test_concurrency_and_timeout():
+    """Jobs overlap, and a job running past its timeout is reported without blocking the batch"""
+    executor = LLMExecutor(max_workers=4, rate_limiter=fast_limiter(), job_timeout=0.3, max_retries=1)
+    start = time.monotonic()
+    batch = executor.map(lambda seconds: time.sleep(seconds) or seconds, [0.1, 0.1, 0.1, 1.5])
+    assert time.monotonic() - start < 1.0
+    assert batch["results"][:3] == [0.1, 0.1, 0.1]
+    assert batch["errors"][0]["index"] == 3 and "Timed out" in batch["errors"][0]["error"]
+
+
+def test_call_retries_rate_limit_errors():
+    """call() goes through the rate limiter, which retries 429 errors"""
+    responses = [Exception("429 RESOURCE_EXHAUSTED"), "ok"]
+    limiter = fast_limiter()
+    limiter.backoff_seconds = 0.01
+
+    def generate(prompt):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return f"{response}: {prompt}"
+
+    executor = LLMExecutor(rate_limiter=limiter)
+    assert executor.call(generate, prompt="hello") == "ok: hello"
+
+    limiter.backoff_seconds = 0.01
+    try:
+        executor.call(lambda: (_ for _ in ()).throw(Exception("429")))
+        assert False, "Expected RuntimeError"
+    except RuntimeError:
+        pass
+
+
+if __name__ == "__main__":
+    test_results_in_order_with_partial_failures()
+    test_concurrency_and_timeout()
+    test_call_retries_rate_limit_errors()
+    print("✓ LLM executor tests passed")
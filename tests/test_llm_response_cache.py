@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent LLM response cache
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from llm_response_cache import LLMResponseCache, profile_tag
+from llm_executor import LLMExecutor
+from rate_limiter import RateLimiter
+from enhanced_matcher import EnhancedMatcher
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def test_keys_ttl_and_eviction():
+    """Entries are keyed by model, config and prompt; they expire and are evicted LRU"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "cache.db")
+        cache = LLMResponseCache(path, ttl_seconds=60, max_entries=2)
+        cache.put("pro", "prompt a", "answer a", config={"temperature": 0.7})
+        assert cache.get("pro", "prompt a", {"temperature": 0.7}) == "answer a"
+        assert cache.get("pro", "prompt a", {"temperature": 0.2}) is None
+        assert cache.get("flash", "prompt a", {"temperature": 0.7}) is None
+
+        # Survives a restart
+        assert LLMResponseCache(path).get("pro", "prompt a", {"temperature": 0.7}) == "answer a"
+
+        # "prompt a" was used most recently, so "prompt b" is evicted first
+        cache.put("pro", "prompt b", "answer b")
+        time.sleep(0.01)
+        cache.get("pro", "prompt a", {"temperature": 0.7})
+        cache.put("pro", "prompt c", "answer c")
+        assert cache.get("pro", "prompt b") is None
+        assert cache.stats()["entries"] == 2
+
+        expired = LLMResponseCache(path, ttl_seconds=0.01)
+        time.sleep(0.05)
+        assert expired.get("pro", "prompt c") is None
+
+
+def test_invalidation_and_generate():
+    """generate() calls the model once per prompt; invalidating a profile tag forces a new call"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = LLMResponseCache(os.path.join(tmp_dir, "cache.db"))
+        calls = []
+
+        def generate():
+            calls.append(1)
+            return FakeResponse(f"answer {len(calls)}")
+
+        profile = {"profile_metadata": {"primary_researcher": "Ada"}}
+        assert cache.generate(generate, "pro", "prompt", tags=[profile_tag(profile)]) == "answer 1"
+        assert cache.generate(generate, "pro", "prompt", tags=[profile_tag(profile)]) == "answer 1"
+        assert len(calls) == 1
+        assert cache.invalidate(profile_tag(profile)) == 1
+        assert cache.generate(generate, "pro", "prompt") == "answer 2"
+
+
+def test_rerun_costs_nothing():
+    """A second find_matches() over the same profile and opportunities makes no model calls"""
+    calls = []
+
+    class FakeModels:
+        def generate_content(self, model, contents):
+            calls.append(model)
+            return FakeResponse(json.dumps({"score": 80}))
+
+    class FakeClient:
+        models = FakeModels()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = LLMResponseCache(os.path.join(tmp_dir, "cache.db"))
+        executor = LLMExecutor(rate_limiter=RateLimiter(calls_per_minute=60000))
+        matcher = EnhancedMatcher("test-key", executor=executor, response_cache=cache)
+        matcher.client = FakeClient()
+
+        profile = {"profile_metadata": {"primary_researcher": "Ada"}}
+        opportunities = [{"title": "A"}, {"title": "B"}]
+        assert len(matcher.find_matches(profile, opportunities)) == 2
+        assert len(calls) == 2
+        assert len(matcher.find_matches(profile, opportunities)) == 2
+        assert len(calls) == 2
+
+        assert matcher.invalidate_profile(profile) == 2
+        matcher.find_matches(profile, opportunities)
+        assert len(calls) == 4
+
+
+if __name__ == "__main__":
+    test_keys_ttl_and_eviction()
+    test_invalidation_and_generate()
+    test_rerun_costs_nothing()
+    print("✓ LLM response cache tests passed")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned match-result cache
+"""
+
+import os
+import sys
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from match_cache import MatchResultCache
+from vector_database import VectorDatabaseManager
+
+
+def test_corpus_version_and_profile_hash():
+    """Every opportunity write bumps the corpus version; profile hashes follow the embedding"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        version = db.corpus_version()
+
+        db.add_funding_opportunity("opp_1", {"title": "One"}, [1.0, 0.0, 0.0])
+        assert db.corpus_version() == version + 1
+        db.delete_opportunities(["opp_1"])
+        assert db.corpus_version() == version + 2
+
+        assert db.researcher_embedding_hash("nobody") is None
+        db.add_researcher_profile("user_1", {"name": "User"}, [0.1, 0.2, 0.3])
+        first = db.researcher_embedding_hash("user_1")
+        assert first == VectorDatabaseManager.embedding_hash([0.1, 0.2, 0.3])
+        db.add_researcher_profile("user_1", {"name": "User"}, [0.3, 0.2, 0.1])
+        assert db.researcher_embedding_hash("user_1") != first
+
+
+def test_match_cache():
+    """Entries survive a restart and older generations are pruned"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "match_cache.db")
+        cache = MatchResultCache(path)
+        options = {"filters": {"agencies": ["NSF"]}, "mmr_lambda": None}
+        key = cache.make_key("hash", 3, 20, options)
+        assert key == cache.make_key("hash", 3, 20, dict(options))
+        assert key != cache.make_key("hash", 4, 20, options)
+        assert cache.get("user_1", key) is None
+
+        cache.put("user_1", key, cache.generation("hash", 3), [{"title": "A"}], ["opp_a"])
+        other_key = cache.make_key("hash", 3, 10, options)
+        cache.put("user_1", other_key, cache.generation("hash", 3), [{"title": "B"}], ["opp_b"])
+        assert cache.get("user_1", key)["match_ids"] == ["opp_a"]
+
+        reopened = MatchResultCache(path)
+        assert reopened.get("user_1", other_key)["matches"] == [{"title": "B"}]
+
+        # A new corpus version prunes both entries of the old generation
+        new_key = cache.make_key("hash", 4, 20, options)
+        reopened.put("user_1", new_key, cache.generation("hash", 4), [], [])
+        assert MatchResultCache(path).get("user_1", key) is None
+
+        assert not reopened.is_saved("user_1", new_key)
+        reopened.mark_saved("user_1", new_key)
+        assert reopened.is_saved("user_1", new_key)
+        reopened.invalidate_user("user_1")
+        assert reopened.get("user_1", new_key) is None
+
+
+def test_saved_marker_after_batch_save():
+    """/api/match re-saves a cached result once /api/match/batch replaced the saved matches"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The app opens its databases relative to the working directory
+        os.chdir(tmp_dir)
+        try:
+            _check_saved_marker_after_batch_save()
+        finally:
+            os.chdir(cwd)
+
+
+def _check_saved_marker_after_batch_save():
+    # The app only checks that a key is configured; no Gemini call is made below
+    dummy_key = "GEMINI_API_KEY" not in os.environ
+    try:
+        if dummy_key:
+            os.environ["GEMINI_API_KEY"] = "test-key"
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import app as app_module
+    except Exception as e:
+        print(f"Skipping match endpoint test: {e}")
+        return
+    finally:
+        if dummy_key:
+            os.environ.pop("GEMINI_API_KEY", None)
+
+    app_module.vector_db.add_researcher_profile("user_1", {"name": "User"}, [1.0, 0.0, 0.0])
+    app_module.vector_db.batch_add_opportunities([
+        ("opp_near", {"title": "Near", "close_date": "2099-01-01"}, [0.9, 0.1, 0.0]),
+        ("opp_far", {"title": "Far", "close_date": "2099-01-01"}, [0.5, 0.5, 0.0])
+    ])
+    app_module.vector_db.flush()
+    client = app_module.app.test_client()
+
+    def saved_ids():
+        response = client.get("/api/match/saved/user_1").get_json()
+        return sorted(match["opportunity_id"] for match in response["matches"])
+
+    first = client.post("/api/match", json={"user_id": "user_1", "n_results": 1}).get_json()
+    assert [match["match_id"] for match in first["matches"]] == ["opp_near"]
+    assert saved_ids() == ["opp_near"]
+
+    batch = client.post("/api/match/batch", json={"user_ids": ["user_1"], "n_results": 2}).get_json()
+    assert len(batch["results"]["user_1"]) == 2
+    assert saved_ids() == ["opp_far", "opp_near"]
+
+    # Served from the cache, and saved again because the batch overwrote the stored matches
+    again = client.post("/api/match", json={"user_id": "user_1", "n_results": 1}).get_json()
+    assert again["cached"]
+    assert saved_ids() == ["opp_near"]
+
+
+if __name__ == "__main__":
+    test_corpus_version_and_profile_hash()
+    test_match_cache()
+    test_saved_marker_after_batch_save()
+    print("✓ Match cache tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the EnhancedMatcher retrieval cascade (prefilter, screening, full analysis)
+"""
+
+import os
+import sys
+import json
+import re
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from enhanced_matcher import EnhancedMatcher
+from lexical_index import bm25_scores
+from llm_executor import LLMExecutor
+from llm_response_cache import LLMResponseCache
+from rate_limiter import RateLimiter
+
+
+PROFILE = {
+    "portfolio_summary": {"career_stage": "Mid-career", "research_domains": ["robotics", "autonomous navigation"]},
+    "synthesis": {"core_competencies": [{"domain": "machine learning"}], "strategic_advantages": []}
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    """Screens by title and scores full analyses by title; counts calls per model"""
+
+    def __init__(self):
+        self.calls = {}
+
+    def generate_content(self, model, contents):
+        self.calls[model] = self.calls.get(model, 0) + 1
+        if model == "screen":
+            titles = re.findall(r"^\[(\d+)\] (.*?) \(", contents, re.MULTILINE)
+            return FakeResponse("```json\n" + json.dumps([
+                {"index": int(i), "score": 90 if "Robotics" in title else 30} for i, title in titles
+            ]) + "\n```")
+        score = 85 if "Robotics" in contents else 40
+        return FakeResponse(json.dumps({"score": score}))
+
+
+class FakeClient:
+    def __init__(self):
+        self.models = FakeModels()
+
+
+def make_matcher(**options):
+    executor = LLMExecutor(max_workers=4, rate_limiter=RateLimiter(calls_per_minute=60000))
+    cache = LLMResponseCache(os.path.join(tempfile.mkdtemp(), "llm_response_cache.db"))
+    matcher = EnhancedMatcher("test-key", cascade=True, screen_model="screen", executor=executor,
+                              response_cache=cache, **options)
+    matcher.client = FakeClient()
+    return matcher
+
+
+def test_bm25_scores():
+    """In-memory BM25 ranks opportunities mentioning the query terms first"""
+    scores = bm25_scores("robotics navigation", [
+        {"title": "Marine Biology", "description": "Coral reefs"},
+        {"title": "Robotics Research", "description": "Autonomous navigation"}
+    ])
+    assert scores[0] == 0 and scores[1] > 0
+
+
+def test_cascade_budgets_and_report():
+    """Only prefiltered, screened survivors reach the main model"""
+    opportunities = [{"title": f"Marine Biology {i}", "description": "Coral reef ecology"} for i in range(30)]
+    opportunities += [{"title": f"Robotics Navigation {i}", "description": "Autonomous robots"} for i in range(3)]
+
+    matcher = make_matcher(prefilter_top_n=10, screen_batch_size=4, deep_budget=2)
+    matches = matcher.find_matches(PROFILE, opportunities)
+
+    calls = matcher.client.models.calls
+    assert calls == {"screen": 3, "gemini-2.5-pro": 2}
+    assert len(matches) == 2 and all(match["screen_score"] == 90 for match in matches)
+    assert all("Robotics" in match["opportunity"]["title"] for match in matches)
+
+    report = matcher.last_cascade_report
+    assert report["prefiltered"] == 10 and report["screened_passed"] == 2
+    assert report["deep_calls_saved"] == 31 and report["total_calls_saved"] == 28
+
+
+def test_prefilter_uses_vector_similarity():
+    """Vector similarity from a prior search is fused with the lexical ranking"""
+    opportunities = [
+        {"title": "Robotics Grant", "description": "", "similarity_score": 0.1},
+        {"title": "General Research", "description": "", "similarity_score": 0.9},
+        {"title": "Other", "description": "", "similarity_score": 0.5}
+    ]
+    matcher = make_matcher(prefilter_top_n=2)
+    ranked = matcher._prefilter(PROFILE, opportunities)
+    assert {opp["title"] for opp in ranked[:2]} == {"Robotics Grant", "General Research"}
+
+
+if __name__ == "__main__":
+    test_bm25_scores()
+    test_cascade_budgets_and_report()
+    test_prefilter_uses_vector_similarity()
+    print("✓ Matching cascade tests passed")
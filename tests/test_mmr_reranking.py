@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for maximal marginal relevance re-ranking of search results
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from reranking import mmr_rerank
+from vector_database import VectorDatabaseManager
+
+
+def test_mmr_rerank():
+    """Lambda 1 keeps relevance order; lower lambdas skip near-duplicates"""
+    embeddings = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]])
+    relevance = np.array([0.9, 0.89, 0.5])
+    assert mmr_rerank(relevance, embeddings, 3, 1.0) == [0, 1, 2]
+    assert mmr_rerank(relevance, embeddings, 2, 0.5) == [0, 2]
+    assert mmr_rerank(relevance, embeddings, 5, 0.5) == [0, 2, 1]
+    assert mmr_rerank(relevance, embeddings, 0, 0.5) == []
+
+    try:
+        mmr_rerank(relevance, embeddings, 2, 1.5)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_search_diversity():
+    """Searches with mmr_lambda return a distinct topic instead of a near-duplicate"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([
+            ("ai_1", {"title": "AI 1"}, [1.0, 0.0, 0.0]),
+            ("ai_2", {"title": "AI 2"}, [0.98, 0.02, 0.0]),
+            ("bio", {"title": "Biology"}, [0.8, 0.0, 0.6])
+        ])
+        query = [1.0, 0.0, 0.0]
+
+        plain = db.search_opportunities_for_profile(query, n_results=2)
+        assert [match["match_id"] for match in plain] == ["ai_1", "ai_2"]
+
+        diverse = db.search_opportunities_for_profile(query, n_results=2, mmr_lambda=0.3)
+        assert [match["match_id"] for match in diverse] == ["ai_1", "bio"]
+        assert diverse[1]["title"] == "Biology"
+
+        batched = db.batch_search_opportunities([query, query], n_results=2, mmr_lambda=0.3)
+        assert [[match["match_id"] for match in matches] for matches in batched] == [["ai_1", "bio"]] * 2
+
+
+if __name__ == "__main__":
+    test_mmr_rerank()
+    test_search_diversity()
+    print("✓ MMR re-ranking tests passed")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test typed opportunity metadata and filter pushdown into the vector query
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from opportunity_metadata import (typed_metadata, build_opportunity_filter,
+                                  CONTINUOUS_DEADLINE_TS, UNKNOWN_DEADLINE_TS)
+
+
+def test_typed_metadata_normalization():
+    """Deadlines become epoch ints and agency/program/phase are normalized"""
+    metadata = typed_metadata({
+        "agency": "National Science Foundation",
+        "program": " sbir ",
+        "phase": "Phase 2",
+        "close_date": "2026-01-05"
+    })
+    assert metadata["deadline_ts"] == 1767571200
+    assert metadata["agency_code"] == "NSF"
+    assert metadata["program_code"] == "SBIR"
+    assert metadata["phase"] == "II"
+    
+    assert typed_metadata({"accepts_anytime": True})["deadline_ts"] == CONTINUOUS_DEADLINE_TS
+    assert typed_metadata({"close_date": "sometime"})["deadline_ts"] == UNKNOWN_DEADLINE_TS
+
+
+def test_build_opportunity_filter():
+    """Single conditions are returned bare, multiple are combined with $and"""
+    assert build_opportunity_filter() is None
+    assert build_opportunity_filter(agencies=["nsf"]) == {"agency_code": {"$in": ["NSF"]}}
+    
+    where = build_opportunity_filter(deadline_after=100, programs=["SBIR"])
+    assert where == {"$and": [{"deadline_ts": {"$gte": 100}}, {"program_code": {"$in": ["SBIR"]}}]}
+
+
+def test_search_filters_inside_index():
+    """Filtered searches only return matching opportunities, including backfilled rows"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping ChromaDB filter test: {e}")
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        
+        # Row written before typed metadata existed
+        db.opportunities.upsert(
+            ids=["legacy"],
+            embeddings=[[1.0, 0.0, 0.0]],
+            metadatas=[{"title": "Legacy", "agency": "NSF", "deadline": "2030-01-01"}],
+            documents=[json.dumps({"title": "Legacy", "agency": "NSF", "close_date": "2030-01-01"})]
+        )
+        db.opportunities.modify(metadata={"description": "Funding opportunities with embeddings"})
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        
+        db.batch_add_opportunities([
+            ("sbir", {"title": "SBIR", "agency": "DOD", "program": "SBIR", "phase": "Phase I",
+                      "close_date": "2029-05-01"}, [0.9, 0.1, 0.0]),
+            ("expired", {"title": "Expired", "agency": "NSF", "close_date": "2020-01-01"}, [0.8, 0.2, 0.0])
+        ])
+        
+        def ids(**filters):
+            return [m['match_id'] for m in db.search_opportunities_for_profile([1.0, 0.0, 0.0], 5, **filters)]
+        
+        assert ids(deadline_after="2025-01-01") == ["legacy", "sbir"]
+        assert ids(agencies=["National Science Foundation"]) == ["legacy", "expired"]
+        assert ids(programs=["sbir"], phases=["1"]) == ["sbir"]
+
+
+if __name__ == "__main__":
+    test_typed_metadata_normalization()
+    test_build_opportunity_filter()
+    test_search_filters_inside_index()
+    print("✓ Opportunity filter tests passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test paged iteration over stored opportunities
+"""
+
+import os
+import sys
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+
+def test_iter_opportunities_pages():
+    """Paging yields every opportunity once, honours offset/limit and reports the next page"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping paging test: {e}")
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([
+            (f"opp_{i:02d}", {"title": f"Opportunity {i}", "description": "details", "close_date": "2030-01-01"},
+             [float(i), 1.0])
+            for i in range(23)
+        ])
+        
+        records = list(db.iter_opportunities(page_size=5))
+        assert len(records) == 23
+        assert len({record['id'] for record in records}) == 23
+        assert records[0]['description'] == "details..."
+        
+        compact = list(db.iter_opportunities(page_size=5, include_documents=False))
+        assert [r['id'] for r in compact] == [r['id'] for r in records]
+        assert compact[0]['description'] == ""
+        assert compact[0]['deadline'] == "2030-01-01"
+        
+        window = list(db.iter_opportunities(page_size=4, offset=3, limit=6))
+        assert [r['id'] for r in window] == [r['id'] for r in records[3:9]]
+        
+        page, next_offset = db.get_opportunities_page(offset=20, limit=10)
+        assert len(page) == 3 and next_offset is None
+        page, next_offset = db.get_opportunities_page(offset=0, limit=10)
+        assert len(page) == 10 and next_offset == 10
+        
+        assert len(db.get_all_opportunities()) == 23
+
+
+if __name__ == "__main__":
+    test_iter_opportunities_pages()
+    print("✓ Opportunity paging tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk profile cache used by the explain endpoint
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from profile_cache import ProfileCache
+from user_profile_manager import UserProfileManager
+
+
+def make_sources(tmp_dir):
+    json_path = os.path.join(tmp_dir, "ada.json")
+    pdf_path = os.path.join(tmp_dir, "cv.pdf")
+    with open(json_path, 'w') as f:
+        json.dump({"person": {"name": "Ada Lovelace"}}, f)
+    with open(pdf_path, 'wb') as f:
+        f.write(b"%PDF-1.4 cv")
+    return json_path, pdf_path
+
+
+def test_cache_invalidated_by_source_changes():
+    """Entries survive reopening and touches, and are dropped when a source changes"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path, pdf_path = make_sources(tmp_dir)
+        cache_dir = os.path.join(tmp_dir, "profile_cache")
+        cache = ProfileCache(cache_dir)
+        assert cache.get(json_path, [pdf_path]) is None
+
+        profile = {"name": "Ada Lovelace", "extracted_pdfs": {"cv.pdf": "text"}}
+        cache.put(json_path, [pdf_path], profile)
+        profile["name"] = "changed by the caller"
+        assert cache.get(json_path, [pdf_path])["name"] == "Ada Lovelace"
+
+        # Persisted: a new instance reads the entry from disk
+        cache = ProfileCache(cache_dir)
+        assert cache.get(json_path, [pdf_path])["extracted_pdfs"] == {"cv.pdf": "text"}
+
+        # A newer mtime with the same content keeps the entry
+        os.utime(pdf_path, ns=(os.stat(pdf_path).st_atime_ns, os.stat(pdf_path).st_mtime_ns + 10 ** 9))
+        assert cache.get(json_path, [pdf_path]) is not None
+
+        # A different document set or edited content invalidates it
+        assert cache.get(json_path, []) is None
+        with open(pdf_path, 'wb') as f:
+            f.write(b"%PDF-1.4 cv, second edition")
+        assert cache.get(json_path, [pdf_path]) is None
+
+        cache.put(json_path, [pdf_path], {"name": "Ada Lovelace"})
+        cache.invalidate(json_path)
+        assert cache.get(json_path, [pdf_path]) is None
+        assert os.listdir(cache_dir) == []
+
+
+def test_get_user_profile_skips_rebuilds():
+    """get_user_profile() builds the profile only when a source file changed"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path, pdf_path = make_sources(tmp_dir)
+        builds = []
+
+        manager = UserProfileManager.__new__(UserProfileManager)
+        manager.profile_cache = ProfileCache(os.path.join(tmp_dir, "profile_cache"))
+
+        def create_user_profile(user_json_path, pdf_paths):
+            builds.append(pdf_paths)
+            profile = {"name": "Ada Lovelace", "build": len(builds)}
+            manager.profile_cache.put(user_json_path, pdf_paths, profile)
+            return profile
+
+        manager.create_user_profile = create_user_profile
+        assert manager.get_user_profile(json_path, [pdf_path])["build"] == 1
+        assert manager.get_user_profile(json_path, [pdf_path])["build"] == 1
+
+        with open(json_path, 'w') as f:
+            json.dump({"person": {"name": "Ada Lovelace", "summary": "Mathematician"}}, f)
+        assert manager.get_user_profile(json_path, [pdf_path])["build"] == 2
+        assert len(builds) == 2
+
+
+if __name__ == "__main__":
+    test_cache_invalidated_by_source_changes()
+    test_get_user_profile_skips_rebuilds()
+    print("✓ Profile cache tests passed")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for precomputed profile prompt contexts and cached-context prompts
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from enhanced_matcher import EnhancedMatcher
+from llm_executor import LLMExecutor
+from llm_response_cache import LLMResponseCache
+from prompt_context import LocalContextCache
+from rate_limiter import RateLimiter
+
+
+PROFILE = {
+    "portfolio_summary": {"career_stage": "Mid-career", "research_domains": ["robotics"]},
+    "synthesis": {"core_competencies": [{"domain": "machine learning"}], "strategic_advantages": []}
+}
+
+OPPORTUNITIES = [{"title": f"Robotics Program {i}", "description": "Autonomous robots"} for i in range(5)]
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    """Records every prompt the model receives"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, model, contents):
+        self.prompts.append(contents)
+        return FakeResponse(json.dumps({"score": 80}))
+
+
+class FakeClient:
+    def __init__(self):
+        self.models = FakeModels()
+
+
+def make_matcher(with_context_cache):
+    executor = LLMExecutor(max_workers=4, rate_limiter=RateLimiter(calls_per_minute=60000))
+    client = FakeClient()
+    cache = LLMResponseCache(os.path.join(tempfile.mkdtemp(), "llm_response_cache.db"))
+    context_cache = LocalContextCache(client) if with_context_cache else None
+    matcher = EnhancedMatcher("test-key", executor=executor, response_cache=cache, context_cache=context_cache)
+    matcher.client = client
+    matcher.context_cache = context_cache
+    return matcher
+
+
+def test_profile_context_reused_per_version():
+    """The profile prefix is built once per profile version"""
+    matcher = make_matcher(False)
+    first = matcher.prepare_profile_context(PROFILE)
+    assert matcher.prepare_profile_context(json.loads(json.dumps(PROFILE))) is first
+
+    changed = json.loads(json.dumps(PROFILE))
+    changed["portfolio_summary"]["career_stage"] = "Senior"
+    assert matcher.prepare_profile_context(changed).version != first.version
+
+    prompt = matcher._build_matching_prompt(PROFILE, OPPORTUNITIES[0])
+    assert prompt.startswith(first.text) and "Robotics Program 0" in prompt
+
+
+def test_cached_context_sends_suffix_only():
+    """With a context cache the prefix is uploaded once and the model sees the same prompts"""
+    cached = make_matcher(True)
+    cached.find_matches(PROFILE, OPPORTUNITIES)
+    assert cached.context_cache.created == 1
+
+    context = cached.prepare_profile_context(PROFILE)
+    assert context.cached_content[cached.model].startswith("local/")
+
+    plain = make_matcher(False)
+    plain.find_matches(PROFILE, OPPORTUNITIES)
+    assert sorted(cached.client.models.prompts) == sorted(plain.client.models.prompts)
+    assert len(plain.client.models.prompts) == len(OPPORTUNITIES)
+
+
+def test_context_cache_failure_falls_back_to_full_prompt():
+    """A model that cannot cache the prefix still gets complete prompts"""
+    class FailingContextCache:
+        def create(self, model, prefix, display_name=""):
+            raise ValueError("caching not supported")
+
+    matcher = make_matcher(False)
+    matcher.context_cache = FailingContextCache()
+    matches = matcher.find_matches(PROFILE, OPPORTUNITIES[:2])
+    assert len(matches) == 2
+    context = matcher.prepare_profile_context(PROFILE)
+    assert context.cached_content[matcher.model] is None
+    assert all(prompt.startswith(context.text) for prompt in matcher.client.models.prompts)
+
+
+def test_expired_context_is_recreated():
+    """A context past its TTL is deleted and uploaded again instead of being reused"""
+    matcher = make_matcher(True)
+    matcher.context_cache.ttl_seconds = 3600
+    context = matcher.prepare_profile_context(PROFILE)
+    first = matcher._cached_context(context, matcher.model)
+    assert matcher._cached_context(context, matcher.model) == first
+    assert matcher.context_cache.created == 1
+
+    context.expires_at[matcher.model] = 0  # TTL ran out
+    assert matcher._cached_context(context, matcher.model) == first
+    assert matcher.context_cache.created == 2 and matcher.context_cache.deleted == 1
+
+
+def test_missing_context_falls_back_and_recreates():
+    """A context deleted upstream gets a full prompt now and a new upload on the next call"""
+    matcher = make_matcher(True)
+    matcher.find_matches(PROFILE, OPPORTUNITIES[:1])
+    matcher.context_cache.prefixes.clear()  # Expired on the server
+
+    matcher.find_matches(PROFILE, OPPORTUNITIES[1:2])
+    context = matcher.prepare_profile_context(PROFILE)
+    assert matcher.client.models.prompts[-1].startswith(context.text)
+    assert matcher.model not in context.cached_content
+
+    matcher.find_matches(PROFILE, OPPORTUNITIES[2:3])
+    assert matcher.context_cache.created == 2
+    assert len(matcher.client.models.prompts) == 3
+
+
+def test_evicted_contexts_are_deleted():
+    """Uploaded prefixes of profile versions dropped from memory are deleted"""
+    matcher = make_matcher(True)
+    matcher.MAX_PROFILE_CONTEXTS = 1
+    matcher._cached_context(matcher.prepare_profile_context(PROFILE), matcher.model)
+
+    changed = json.loads(json.dumps(PROFILE))
+    changed["portfolio_summary"]["career_stage"] = "Senior"
+    matcher._cached_context(matcher.prepare_profile_context(changed), matcher.model)
+    assert matcher.context_cache.deleted == 1 and len(matcher.context_cache.prefixes) == 1
+
+
+if __name__ == "__main__":
+    test_profile_context_reused_per_version()
+    test_cached_context_sends_suffix_only()
+    test_context_cache_failure_falls_back_to_full_prompt()
+    test_expired_context_is_recreated()
+    test_missing_context_falls_back_and_recreates()
+    test_evicted_contexts_are_deleted()
+    print("✓ Prompt context tests passed")
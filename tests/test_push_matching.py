@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental matching of newly ingested opportunities
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from funding_opportunities_manager import FundingOpportunitiesManager
+from matching_results_manager import MatchingResultsManager
+from vector_database import VectorDatabaseManager
+
+
+def test_score_against_researchers():
+    """One matrix of exp(-squared L2) similarities, researchers by opportunities"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        assert db.score_against_researchers([[1.0, 0.0, 0.0]])[0] == []
+
+        db.add_researcher_profile("user_a", {"name": "A"}, [1.0, 0.0, 0.0])
+        db.add_researcher_profile("user_b", {"name": "B"}, [0.0, 1.0, 0.0])
+        user_ids, similarity = db.score_against_researchers([[1.0, 0.0, 0.0], [0.0, 0.6, 0.8]])
+        assert similarity.shape == (2, 2)
+        a, b = user_ids.index("user_a"), user_ids.index("user_b")
+        assert np.isclose(similarity[a, 0], 1.0)
+        assert np.isclose(similarity[b, 0], np.exp(-2.0))
+        assert np.isclose(similarity[b, 1], np.exp(-0.8))
+
+
+def test_push_new_matches():
+    """New opportunities are merged into stored matches and strong hits become alerts"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.add_researcher_profile("user_a", {"name": "A"}, [1.0, 0.0, 0.0])
+        db.add_researcher_profile("user_b", {"name": "B"}, [0.0, 1.0, 0.0])
+        db.add_researcher_profile("user_new", {"name": "New"}, [0.0, 0.0, 1.0])
+
+        results = MatchingResultsManager(os.path.join(tmp_dir, "matching_results.db"))
+        results.save_matches("user_a", [
+            {"match_id": "old_1", "title": "Old 1", "similarity_score": 0.5, "confidence_score": 90},
+            {"match_id": "old_2", "title": "Old 2", "similarity_score": 0.3, "confidence_score": 20}
+        ])
+        results.save_matches("user_b", [
+            {"match_id": "old_3", "title": "Old 3", "similarity_score": 0.9, "confidence_score": 95}
+        ])
+
+        manager = FundingOpportunitiesManager.__new__(FundingOpportunitiesManager)
+        manager.vector_db = db
+        manager.matching_results = results
+        summary = manager.push_new_matches([
+            ("new_close", {"title": "Close", "keywords": '["ai", "ml"]', "close_date": "2099-01-01"}, [0.9, 0.1, 0.0]),
+            ("new_far", {"title": "Far", "description": "Unrelated"}, [0.0, 0.0, -1.0])
+        ])
+
+        # user_a gets the close opportunity only, which pushes out the weakest stored match;
+        # user_b's weakest match is too strong; user_new has no stored matches to merge into
+        assert summary == {"users_updated": 1, "matches_added": 1, "high_confidence_users": ["user_a"]}
+        matches = results.get_matches("user_a")
+        assert [match["opportunity_id"] for match in matches] == ["new_close", "old_1"]
+        assert matches[0]["keywords"] == ["ai", "ml"] and matches[0]["confidence_score"] == 95
+        assert results.get_match_count("user_b") == 1
+
+        alerts = results.get_match_alerts("user_a")
+        assert [alert["opportunity_id"] for alert in alerts] == ["new_close"]
+        results.mark_alerts_seen("user_a")
+        assert results.get_match_alerts("user_a") == []
+        assert len(results.get_match_alerts("user_a", unseen_only=False)) == 1
+
+
+def test_push_new_matches_keeps_match_count():
+    """Only new matches ranking within the stored match count are merged"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.add_researcher_profile("user_a", {"name": "A"}, [1.0, 0.0, 0.0])
+
+        results = MatchingResultsManager(os.path.join(tmp_dir, "matching_results.db"))
+        stored = [np.exp(-0.1), np.exp(-0.5), np.exp(-1.5)]
+        results.save_matches("user_a", [
+            {"match_id": f"old_{i}", "title": f"Old {i}", "similarity_score": float(score), "confidence_score": 50}
+            for i, score in enumerate(stored)
+        ])
+
+        manager = FundingOpportunitiesManager.__new__(FundingOpportunitiesManager)
+        manager.vector_db = db
+        manager.matching_results = results
+        # Squared distances 0.02, 0.2, 0.72 and 1.28: all reach the weakest stored match,
+        # but only the first two rank within the top three
+        new_items = []
+        for opp_id, x in [("new_1", 0.99), ("new_2", 0.9), ("new_3", 0.64), ("new_4", 0.36)]:
+            new_items.append((opp_id, {"title": opp_id}, [x, float(np.sqrt(1 - x * x)), 0.0]))
+        summary = manager.push_new_matches(new_items)
+
+        assert summary["users_updated"] == 1 and summary["matches_added"] == 2
+        matches = results.get_matches("user_a")
+        assert sorted(match["opportunity_id"] for match in matches) == ["new_1", "new_2", "old_0"]
+        assert {alert["opportunity_id"] for alert in results.get_match_alerts("user_a", unseen_only=False)} <= \
+            {"new_1", "new_2"}
+
+
+if __name__ == "__main__":
+    test_score_against_researchers()
+    test_push_new_matches()
+    test_push_new_matches_keeps_match_count()
+    print("✓ Push matching tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for retrofit candidate search (keyword inverted index and proposal embeddings)
+"""
+
+import os
+import sys
+import tempfile
+
+# Add backend (and the repository root, for package-relative modules) to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+sys.path.insert(0, ROOT)
+
+from retrofit_index import RetrofitIndex
+from backend.embeddings_matcher import EmbeddingsEnhancedMatcher
+from backend.vector_database import VectorDatabaseManager
+
+
+PROFILE = {
+    "profile_metadata": {"primary_researcher": "Jane Doe"},
+    "proposal_history": {"unsuccessful_proposals": [
+        {"title": "Swarm Robotics", "keywords": ["robotics", "swarms"]},
+        {"title": "Robot Navigation", "keywords": ["robotics", "navigation", "slam"]},
+        {"title": "Coral Reefs", "keywords": ["ecology", "oceans"]}
+    ]}
+}
+
+
+def brute_force(proposals, keywords):
+    """The original per-proposal set intersection"""
+    best, best_overlap = None, 0
+    for proposal in proposals:
+        overlap = len(set(proposal["keywords"]) & set(keywords))
+        if overlap > best_overlap:
+            best, best_overlap = proposal, overlap
+    return best, best_overlap
+
+
+def test_inverted_index_matches_intersections():
+    """The index finds the same candidate as intersecting with every proposal"""
+    index = RetrofitIndex.from_profile(PROFILE)
+    proposals = PROFILE["proposal_history"]["unsuccessful_proposals"]
+    for keywords in (["robotics"], ["navigation", "robotics"], ["oceans", "robotics"], ["chemistry"], []):
+        assert index.best_match(keywords) == brute_force(proposals, keywords)
+    # Keywords stored as a JSON string (as in ChromaDB documents) are parsed
+    assert index.best_match('["slam", "navigation"]')[0]["title"] == "Robot Navigation"
+
+
+def test_embedding_retrofit_candidates():
+    """One proposals-collection query ranks a researcher's own unsuccessful proposals"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        proposals = PROFILE["proposal_history"]["unsuccessful_proposals"]
+        assert db.index_retrofit_proposals("jane_doe", proposals, [[1.0, 0.0], [0.0, 1.0], None]) == 2
+        db.index_retrofit_proposals("someone_else", proposals[:1], [[0.0, 1.0]])
+        assert db.search_retrofit_candidates([[1.0, 0.0]], "nobody") == [[]]
+
+        found = db.search_retrofit_candidates([[1.0, 0.0], [0.1, 0.9]], "jane_doe", n_results=5)
+        assert [[p["title"] for p in candidates] for candidates in found] == [
+            ["Swarm Robotics", "Robot Navigation"], ["Robot Navigation", "Swarm Robotics"]
+        ]
+        assert found[0][0]["similarity_score"] == 1.0
+
+        matcher = EmbeddingsEnhancedMatcher.__new__(EmbeddingsEnhancedMatcher)
+        matcher.vector_db = db
+        matcher._retrofit_indexes = {}
+        retrofits = matcher._assess_retrofits("jane_doe_1", PROFILE, [
+            {"title": "Robotics call", "keywords": ["robotics", "slam"], "embedding": [1.0, 0.0]},
+            {"title": "Untagged call", "keywords": [], "embedding": [0.0, 1.0]},
+            {"title": "Unrelated call", "keywords": [], "embedding": [-1.0, 0.0]}
+        ])
+        # Keyword candidates win; without shared keywords a close embedding is used
+        assert retrofits[0]["best_candidate"] == "Robot Navigation" and retrofits[0]["keyword_overlap"] == 2
+        assert retrofits[0]["semantic_candidate"] == "Swarm Robotics"
+        assert retrofits[1]["best_candidate"] == "Robot Navigation" and retrofits[1]["retrofit_score"] == 1.0
+        assert not retrofits[2]["has_retrofit_candidate"]
+        assert "jane_doe_1" in matcher._retrofit_indexes
+
+
+def test_match_researcher_ranks_retrofits_by_embedding():
+    """match_researcher_to_opportunities ranks retrofits by the stored opportunity vectors"""
+    from backend.llm_executor import LLMExecutor
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        proposals = PROFILE["proposal_history"]["unsuccessful_proposals"]
+        db.index_retrofit_proposals("jane_doe", proposals, [[1.0, 0.0], [0.0, 1.0], None])
+        db.add_researcher_profile("jane_doe_1", PROFILE, [0.8, 0.6])
+        db.batch_add_opportunities([
+            ("opp_swarm", {"title": "Untagged swarm call", "keywords": []}, [1.0, 0.0]),
+            ("opp_nav", {"title": "Untagged navigation call", "keywords": []}, [0.0, 1.0])
+        ])
+        
+        matcher = EmbeddingsEnhancedMatcher.__new__(EmbeddingsEnhancedMatcher)
+        matcher.vector_db = db
+        matcher._retrofit_indexes = {}
+        matcher.executor = LLMExecutor(max_workers=1)
+        # Skip the Gemini explanation; keep the precomputed retrofit assessment
+        matcher._enhance_match_with_rag = lambda profile, match, retrofit: {**match, "retrofit": retrofit}
+        
+        matches = matcher.match_researcher_to_opportunities("jane_doe_1", top_k=2, min_score=0.0)
+        best = {match["match_id"]: match["retrofit"]["best_candidate"] for match in matches}
+        assert best == {"opp_swarm": "Swarm Robotics", "opp_nav": "Robot Navigation"}
+
+
+if __name__ == "__main__":
+    test_inverted_index_matches_intersections()
+    test_embedding_retrofit_candidates()
+    test_match_researcher_ranks_retrofits_by_embedding()
+    print("✓ Retrofit index tests passed")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed user upload registry
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from user_registry import UserRegistry
+
+
+def write_profile(upload_dir, filename, name, links=()):
+    with open(os.path.join(upload_dir, filename), 'w') as f:
+        json.dump({"person": {"name": name,
+                              "biographical_information": {"research_interests": ["robotics"]},
+                              "links": [{"url": url, "type": "web"} for url in links]}}, f)
+
+
+def write_pdf(upload_dir, filename):
+    with open(os.path.join(upload_dir, filename), 'wb') as f:
+        f.write(b"%PDF-1.4 " + filename.encode())
+
+
+def test_sync_and_lookup():
+    """Profile JSONs register users; unchanged files are skipped; deleted files are dropped"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upload_dir = os.path.join(tmp_dir, "uploads")
+        os.makedirs(upload_dir)
+        write_profile(upload_dir, "ada.json", "Ada Lovelace", ["https://ada.example"])
+        write_pdf(upload_dir, "cv.pdf")
+
+        registry = UserRegistry(os.path.join(tmp_dir, "registry.db"), upload_dir)
+        assert registry.sync() == {"registered": 2, "unchanged": 0, "removed": 0}
+        ada = hashlib.md5("Ada Lovelace".encode()).hexdigest()
+        assert registry.list_users() == [{"id": ada, "name": "Ada Lovelace", "research_interests": ["robotics"]}]
+        assert registry.profile_json(ada) == os.path.join(upload_dir, "ada.json")
+        assert registry.urls(ada) == [{"url": "https://ada.example", "type": "web", "status": "processed"}]
+        # The only user owns the PDF that had no owner
+        assert registry.documents(ada) == [os.path.join(upload_dir, "cv.pdf")]
+
+        # A reopened registry skips unchanged files
+        registry = UserRegistry(os.path.join(tmp_dir, "registry.db"), upload_dir)
+        assert registry.sync() == {"registered": 0, "unchanged": 2, "removed": 0}
+
+        os.remove(os.path.join(upload_dir, "cv.pdf"))
+        assert registry.sync()["removed"] == 1
+        assert registry.documents(ada) == []
+
+
+def test_per_user_documents():
+    """PDFs belong to the user they were uploaded for, not to every user"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upload_dir = os.path.join(tmp_dir, "uploads")
+        os.makedirs(upload_dir)
+        registry = UserRegistry(os.path.join(tmp_dir, "registry.db"), upload_dir)
+
+        write_profile(upload_dir, "ada.json", "Ada Lovelace")
+        write_profile(upload_dir, "alan.json", "Alan Turing")
+        ada = registry.register_file("ada.json")
+        alan = registry.register_file(os.path.join(upload_dir, "alan.json"))
+        assert registry.user_count() == 2
+
+        write_pdf(upload_dir, "engine.pdf")
+        write_pdf(upload_dir, "computable.pdf")
+        registry.register_file("engine.pdf", ada)
+        registry.register_file("computable.pdf")
+        assert registry.documents(alan) == []
+        registry.assign_documents(alan, ["uploads/computable.pdf"])
+        assert registry.documents(ada) == [os.path.join(upload_dir, "engine.pdf")]
+        assert registry.documents(alan) == [os.path.join(upload_dir, "computable.pdf")]
+
+        # Rewritten profile JSONs update the user's URLs
+        write_profile(upload_dir, "alan.json", "Alan Turing", ["https://turing.example"])
+        os.utime(os.path.join(upload_dir, "alan.json"), (1, 1))
+        registry.register_file("alan.json")
+        assert [url["url"] for url in registry.urls(alan)] == ["https://turing.example"]
+
+        removed = registry.remove_user(ada)
+        assert sorted(os.path.basename(path) for path in removed) == ["ada.json", "engine.pdf"]
+        assert [user["id"] for user in registry.list_users()] == [alan]
+        assert registry.profile_json(ada) is None
+
+
+def test_unowned_pdfs_until_assigned():
+    """With several users, ownerless PDFs are listed and still used for profiles until assigned"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upload_dir = os.path.join(tmp_dir, "uploads")
+        os.makedirs(upload_dir)
+        write_profile(upload_dir, "ada.json", "Ada Lovelace")
+        write_profile(upload_dir, "alan.json", "Alan Turing")
+        write_pdf(upload_dir, "legacy.pdf")
+        registry = UserRegistry(os.path.join(tmp_dir, "registry.db"), upload_dir)
+        registry.sync()
+        ada, alan = (hashlib.md5(name.encode()).hexdigest() for name in ("Ada Lovelace", "Alan Turing"))
+        legacy = os.path.join(upload_dir, "legacy.pdf")
+
+        assert registry.unowned_documents() == [legacy]
+        assert registry.documents(ada) == []
+        assert registry.documents(ada, include_unowned=True) == [legacy]
+        assert registry.documents(alan, include_unowned=True) == [legacy]
+        assert registry.document_version(ada, include_unowned=True) != registry.document_version(ada)
+
+        registry.assign_documents(alan, ["legacy.pdf"])
+        assert registry.unowned_documents() == []
+        assert registry.documents(ada, include_unowned=True) == []
+        assert registry.documents(alan, include_unowned=True) == [legacy]
+        assert registry.sync()["unchanged"] == 3
+
+
+if __name__ == "__main__":
+    test_sync_and_lookup()
+    test_per_user_documents()
+    test_unowned_pdfs_until_assigned()
+    print("✓ User registry tests passed")
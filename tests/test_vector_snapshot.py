@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped vector snapshot
+"""
+
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from vector_snapshot import VectorSnapshot
+from vector_database import VectorDatabaseManager
+
+
+def _corpus(size=40, dimension=8, seed=11):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"opp_{i:03d}" for i in range(size)]
+    metadatas = [{"agency_code": "NSF" if i % 2 else "DOD", "deadline_ts": 1000 + i} for i in range(size)]
+    return ids, vectors, metadatas
+
+
+def test_snapshot_round_trip_and_query():
+    """Snapshots load memory-mapped and answer exact (optionally filtered) queries"""
+    ids, vectors, metadatas = _corpus()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        assert VectorSnapshot.load(tmp_dir) is None
+
+        VectorSnapshot.write(tmp_dir, ids, vectors.tolist(), metadatas)
+        snapshot = VectorSnapshot.load(tmp_dir)
+        assert len(snapshot) == len(ids)
+        assert isinstance(snapshot.vectors, np.memmap)
+        assert snapshot.metadata(3) == metadatas[3]
+
+        results = snapshot.batch_query(vectors[[5, 6]].tolist(), 4)
+        for row, query in zip(results['ids'], (5, 6)):
+            expected = np.argsort(((vectors - vectors[query]) ** 2).sum(axis=1))[:4]
+            assert row == [ids[i] for i in expected]
+        assert results['metadatas'][0][0] == metadatas[5]
+
+        filtered = snapshot.batch_query([vectors[4].tolist()], 5,
+                                        where={"$and": [{"agency_code": "NSF"}, {"deadline_ts": {"$gte": 1010}}]})
+        assert filtered['ids'][0] and all(int(opp_id[-3:]) % 2 and int(opp_id[-3:]) >= 10
+                                          for opp_id in filtered['ids'][0])
+
+        # A manifest that disagrees with the arrays (interrupted export) is ignored
+        with open(os.path.join(tmp_dir, "manifest.json"), 'r') as f:
+            manifest = json.load(f)
+        manifest["count"] += 1
+        with open(os.path.join(tmp_dir, "manifest.json"), 'w') as f:
+            json.dump(manifest, f)
+        assert VectorSnapshot.load(tmp_dir) is None
+
+
+def test_manager_serves_from_snapshot_until_warm():
+    """Export, then search from the snapshot on a fresh manager; writes stop snapshot use"""
+    ids, vectors, _ = _corpus(size=25)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([(opp_id, {"title": opp_id, "agency": "NSF"}, vector.tolist())
+                                    for opp_id, vector in zip(ids, vectors)])
+        assert db.export_snapshot()["count"] == len(ids)
+        expected = db.search_opportunities_for_profile(vectors[3].tolist(), n_results=5)
+
+        db = VectorDatabaseManager(persist_directory=tmp_dir, use_exact_search=True)
+        assert db.snapshot is not None and len(db.exact_index) == len(ids)
+        db._vector_store_warm.clear()  # Pretend the vector store is still warming up
+        matches = db.search_opportunities_for_profile(vectors[3].tolist(), n_results=5)
+        assert [m['match_id'] for m in matches] == [m['match_id'] for m in expected]
+        assert matches[0]['title'] == ids[3]
+
+        db.delete_opportunities([ids[3]])
+        assert db.snapshot is None
+        matches = db.search_opportunities_for_profile(vectors[3].tolist(), n_results=5)
+        assert ids[3] not in [m['match_id'] for m in matches]
+
+
+def test_reembedded_vectors_invalidate_snapshot():
+    """A snapshot exported before a re-embed (same row count) is not used to seed the mirror"""
+    ids, vectors, _ = _corpus(size=10)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir)
+        db.batch_add_opportunities([(opp_id, {"title": opp_id, "agency": "NSF"}, vector.tolist())
+                                    for opp_id, vector in zip(ids, vectors)])
+        assert db.export_snapshot()["corpus_version"] == db.corpus_version()
+
+        replacement = -vectors[0]
+        db.batch_add_opportunities([(ids[0], {"title": ids[0], "agency": "NSF"}, replacement.tolist())])
+
+        db = VectorDatabaseManager(persist_directory=tmp_dir, use_exact_search=True)
+        assert db.snapshot is None and len(db.exact_index) == len(ids)
+        matches = db.search_opportunities_for_profile(replacement.tolist(), n_results=1)
+        assert matches[0]['match_id'] == ids[0]
+
+
+def test_import_snapshot():
+    """A snapshot restores vectors and compact metadata into an empty store"""
+    ids, vectors, metadatas = _corpus(size=12)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_dir = os.path.join(tmp_dir, "snapshot")
+        VectorSnapshot.write(snapshot_dir, ids, vectors, metadatas)
+
+        db = VectorDatabaseManager(persist_directory=os.path.join(tmp_dir, "db"))
+        assert db.import_snapshot(snapshot_dir) == len(ids)
+        assert db.opportunity_store.count() == len(ids)
+        matches = db.search_opportunities_for_profile(vectors[2].tolist(), n_results=1)
+        assert matches[0]['match_id'] == ids[2]
+
+
+if __name__ == "__main__":
+    test_snapshot_round_trip_and_query()
+    test_manager_serves_from_snapshot_until_warm()
+    test_reembedded_vectors_invalidate_snapshot()
+    test_import_snapshot()
+    print("✓ Vector snapshot tests passed")
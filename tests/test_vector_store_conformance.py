@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Conformance tests shared by every VectorStore backend
+"""
+
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from vector_store import LocalVectorStore, metadata_matches, hnswlib
+
+
+def _backends(tmp_dir):
+    """(name, factory) pairs; factories reopen the same on-disk store"""
+    backends = [("local-exact", lambda: LocalVectorStore(os.path.join(tmp_dir, "exact"), use_hnsw=False))]
+    if hnswlib is not None:
+        backends.append(("local-hnsw", lambda: LocalVectorStore(os.path.join(tmp_dir, "hnsw"), use_hnsw=True)))
+    try:
+        import chromadb
+        from chromadb.config import Settings
+        from vector_store import ChromaVectorStore
+        client = chromadb.PersistentClient(path=os.path.join(tmp_dir, "chroma"),
+                                           settings=Settings(anonymized_telemetry=False, allow_reset=True))
+        backends.append(("chroma", lambda: ChromaVectorStore(client, "conformance_test")))
+    except ImportError as e:
+        print(f"Skipping ChromaDB backend: {e}")
+    return backends
+
+
+def _corpus(size=120, dimension=12, seed=5):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"opp_{i:03d}" for i in range(size)]
+    metadatas = [{"agency_code": "NSF" if i % 3 == 0 else "DOD", "deadline_ts": 1000 + i} for i in range(size)]
+    return ids, vectors, metadatas
+
+
+def _brute_force(vectors, ids, query, k, allowed=None):
+    distances = ((vectors - query) ** 2).sum(axis=1)
+    order = [i for i in np.argsort(distances, kind='stable') if allowed is None or ids[i] in allowed]
+    return [ids[i] for i in order[:k]]
+
+
+def test_store_crud_and_iteration():
+    """upsert/get/update/delete/count/iterate/clear behave the same on every backend"""
+    ids, vectors, metadatas = _corpus()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, open_store in _backends(tmp_dir):
+            store = open_store()
+            store.upsert(ids, vectors.tolist(), metadatas)
+            assert store.count() == len(ids), name
+            
+            # Upserting an existing id replaces it instead of adding a row
+            store.upsert([ids[0]], [vectors[1].tolist()], [{"agency_code": "NIH", "deadline_ts": 1}])
+            assert store.count() == len(ids), name
+            got = store.get([ids[0], "missing"], include_embeddings=True)
+            assert got['ids'] == [ids[0]], name
+            assert got['metadatas'][0]["agency_code"] == "NIH", name
+            assert np.allclose(got['embeddings'][0], vectors[1], atol=1e-5), name
+            
+            store.update_metadatas([ids[0]], [{"agency_code": "NSF", "deadline_ts": 1000}])
+            assert store.get([ids[0]])['metadatas'][0]["agency_code"] == "NSF", name
+            
+            store.delete([ids[5], ids[6], "missing"])
+            assert store.count() == len(ids) - 2, name
+            
+            pages = list(store.iterate(page_size=25))
+            seen = [item_id for page in pages for item_id in page['ids']]
+            assert sorted(seen) == sorted(set(ids) - {ids[5], ids[6]}), name
+            assert all(len(page['ids']) <= 25 for page in pages), name
+            
+            window = [item_id for page in store.iterate(page_size=7, offset=10, limit=20) for item_id in page['ids']]
+            assert window == seen[10:30], name
+            
+            nsf = [item_id for page in store.iterate(where={"agency_code": {"$in": ["NSF"]}}) for item_id in page['ids']]
+            deleted = {ids[5], ids[6]}
+            assert sorted(nsf) == sorted(i for i, m in zip(ids, metadatas)
+                                         if m["agency_code"] == "NSF" and i not in deleted), name
+            
+            store.clear()
+            assert store.count() == 0, name
+
+
+def test_store_query_matches_brute_force():
+    """Unfiltered and filtered queries return the exact neighbours on small corpora"""
+    ids, vectors, metadatas = _corpus()
+    where = {"$and": [{"agency_code": {"$in": ["NSF"]}}, {"deadline_ts": {"$gte": 1030}}]}
+    allowed = {i for i, m in zip(ids, metadatas) if metadata_matches(m, where)}
+    queries = [vectors[3], vectors[40], -vectors[7]]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, open_store in _backends(tmp_dir):
+            store = open_store()
+            store.upsert(ids, vectors.tolist(), metadatas)
+            
+            results = store.batch_query([q.tolist() for q in queries], 5)
+            for query, found_ids, distances in zip(queries, results['ids'], results['distances']):
+                assert found_ids == _brute_force(vectors, ids, query, 5), name
+                assert distances == sorted(distances), name
+            
+            filtered = store.batch_query([q.tolist() for q in queries], 5, where=where)
+            for query, found_ids, found_metadatas in zip(queries, filtered['ids'], filtered['metadatas']):
+                assert found_ids == _brute_force(vectors, ids, query, 5, allowed), name
+                assert all(metadata_matches(m, where) for m in found_metadatas), name
+            
+            single = store.query(vectors[3].tolist(), 1)
+            assert single['ids'] == [ids[3]], name
+            assert single['distances'][0] < 1e-4, name
+
+
+def test_local_store_persists():
+    """A reopened local store returns the same data"""
+    ids, vectors, metadatas = _corpus(size=30)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, open_store in _backends(tmp_dir):
+            if not name.startswith("local"):
+                continue
+            store = open_store()
+            store.upsert(ids, vectors.tolist(), metadatas)
+            store.delete([ids[0]])
+            
+            reopened = open_store()
+            assert reopened.count() == len(ids) - 1, name
+            assert reopened.query(vectors[4].tolist(), 1)['ids'] == [ids[4]], name
+            assert reopened.get([ids[4]])['metadatas'][0] == metadatas[4], name
+
+
+def test_local_store_journal():
+    """Writes go to the journal, replay on reopen and compact once it outgrows the store"""
+    ids, vectors, metadatas = _corpus(size=30)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = os.path.join(tmp_dir, "journaled")
+        store = LocalVectorStore(directory, use_hnsw=False, compact_min_items=50)
+        store.upsert(ids[:20], vectors[:20].tolist(), metadatas[:20])
+        assert not os.path.exists(os.path.join(directory, "items.json"))
+        store.upsert(ids[20:], vectors[20:].tolist(), metadatas[20:])
+        store.update_metadatas([ids[5]], [{"agency_code": "NIH", "deadline_ts": 1}])
+        store.delete([ids[0]])
+        
+        # A write cut off mid-line is ignored on replay
+        with open(os.path.join(directory, "journal.jsonl"), 'a') as f:
+            f.write('{"op": "delete", "ids": ["opp_0')
+        reopened = LocalVectorStore(directory, use_hnsw=False, compact_min_items=50)
+        assert reopened.count() == len(ids) - 1
+        assert reopened.get([ids[5]])['metadatas'][0] == {"agency_code": "NIH", "deadline_ts": 1}
+        assert reopened.query(vectors[25].tolist(), 1)['ids'] == [ids[25]]
+        reopened.delete([ids[29]])
+        assert LocalVectorStore(directory, use_hnsw=False).count() == len(ids) - 2
+        
+        # 30 + 1 + 1 + 1 journaled items, the next upsert crosses the threshold of 50
+        reopened.upsert(ids[1:20], vectors[1:20].tolist(), metadatas[1:20])
+        assert os.path.exists(os.path.join(directory, "items.json"))
+        assert not os.path.exists(os.path.join(directory, "journal.jsonl"))
+        compacted = LocalVectorStore(directory, use_hnsw=False)
+        assert compacted.count() == len(ids) - 2
+        assert compacted.get([ids[5]])['metadatas'][0] == metadatas[5]
+
+
+def test_vector_database_local_backend():
+    """VectorDatabaseManager works end to end on the local backend"""
+    try:
+        from vector_database import VectorDatabaseManager
+    except ImportError as e:
+        print(f"Skipping local backend manager test: {e}")
+        return
+    
+    ids, vectors, _ = _corpus(size=40)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = VectorDatabaseManager(persist_directory=tmp_dir, vector_backend="local")
+        db.batch_add_opportunities([
+            (opp_id, {"title": opp_id, "agency": "NSF" if i % 2 else "DOD", "close_date": "2031-01-01"},
+             vector.tolist())
+            for i, (opp_id, vector) in enumerate(zip(ids, vectors))
+        ])
+        
+        matches = db.search_opportunities_for_profile(vectors[9].tolist(), n_results=3)
+        assert matches[0]['match_id'] == ids[9]
+        assert matches[0]['close_date'] == "2031-01-01"
+        
+        nsf = db.search_opportunities_for_profile(vectors[8].tolist(), n_results=5, agencies=["NSF"])
+        assert nsf and all(m['agency'] == "NSF" for m in nsf)
+        
+        db.delete_opportunities([ids[9]])
+        assert db.get_collection_stats()["opportunities"] == len(ids) - 1
+        assert len(list(db.iter_opportunities(page_size=7))) == len(ids) - 1
+
+
+if __name__ == "__main__":
+    test_store_crud_and_iteration()
+    test_store_query_matches_brute_force()
+    test_local_store_persists()
+    test_local_store_journal()
+    test_vector_database_local_backend()
+    print("✓ Vector store conformance tests passed")